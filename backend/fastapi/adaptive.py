@@ -0,0 +1,249 @@
+import heapq
+import math
+import random
+from array import array
+from bisect import bisect_left
+from collections import OrderedDict, deque
+from typing import Deque, Dict, Iterable, List, Optional, Sequence, Tuple
+from models import ProgressEvent
+from text_utils import normalize_text
+
+# Öğrencinin yeteneği, öğrenciye özel öğe ustalığı ve öğenin genel zorluğu için Elo adım katsayıları
+K_ABILITY = 0.3
+K_MASTERY = 0.5
+K_DIFFICULTY = 0.05
+
+ADAPTIVE_SKILLS = ("phonological", "spelling")
+# İlerleme kaydındaki öğe türü -> beceri
+ITEM_KIND_SKILLS = {"syllable": "phonological", "confusion": "spelling"}
+
+
+def _sigmoid(value: float) -> float:
+    return 1.0 / (1.0 + math.exp(-value))
+
+
+def _logit(p: float) -> float:
+    return math.log(p / (1.0 - p))
+
+
+class ItemBank:
+    """
+    Bir beceriye ait öğeler (hedef heceler veya karışıklık türleri) ve genel zorlukları.
+    Zorluklar sıkıştırılmış bir dizide tutulur; seçim için zorluğa göre sıralı bir kopya bisect ile aranır.
+    Sıralı kopya her güncellemede değil, öğe sayısı kadar (en az `min_rebuild`) güncellemede bir
+    yeniden kurulur; böylece güncelleme başına maliyet ortalamada O(log n) kalır. Tek güncellemenin
+    zorluğu az değiştirdiği için aradaki sıralama farkı seçimi önemli ölçüde etkilemez.
+    """
+
+    def __init__(self, difficulties: Dict[str, float], min_rebuild: int = 500):
+        self.items: List[str] = list(difficulties)
+        self.index: Dict[str, int] = {item: i for i, item in enumerate(self.items)}
+        self.difficulty = array("d", difficulties.values())
+        self.rebuild_every = max(min_rebuild, len(self.items))
+        self.rebuilds = 0
+        self._pending = 0
+        self._rebuild()
+
+    def _rebuild(self):
+        order = sorted(range(len(self.items)), key=self.difficulty.__getitem__)
+        self._sorted_ids = array("l", order)
+        self._sorted_difficulty = array("d", (self.difficulty[i] for i in order))
+        self._pending = 0
+        self.rebuilds += 1
+
+    def update(self, item_id: int, delta: float):
+        self.difficulty[item_id] += delta
+        self._pending += 1
+        if self._pending >= self.rebuild_every:
+            self._rebuild()
+
+    def near(self, difficulty: float, width: int) -> Sequence[int]:
+        """
+        Zorluğu verilen değere en yakın `width` öğe (O(log n) arama)
+        """
+        position = bisect_left(self._sorted_difficulty, difficulty)
+        start = max(0, min(position - width // 2, len(self._sorted_ids) - width))
+        return self._sorted_ids[start:start + width]
+
+
+class StudentState:
+    """
+    Öğrencinin beceri bazında yeteneği ve gördüğü öğelerdeki kişisel ustalık farkı (seyrek)
+    """
+
+    __slots__ = ("ability", "mastery", "recent")
+
+    def __init__(self, recent: int):
+        self.ability: Dict[str, float] = {skill: 0.0 for skill in ADAPTIVE_SKILLS}
+        self.mastery: Dict[str, Dict[int, float]] = {skill: {} for skill in ADAPTIVE_SKILLS}
+        self.recent: Dict[str, Deque[int]] = {skill: deque(maxlen=recent) for skill in ADAPTIVE_SKILLS}
+
+
+class AdaptiveEngine:
+    """
+    Cevap olaylarından öğrenci başına hece ve karışıklık türü ustalığını Elo benzeri güncellemelerle izler
+    ve sonraki oyunda hedeflenecek öğeleri seçer.
+
+    Başarı olasılığı p = sigmoid(yetenek + kişisel ustalık - öğe zorluğu). Yeni öğeler, tahmini başarısı
+    `target_success` olan zorluk çevresinden; tekrar öğeleri ise öğrencinin en zayıf olduğu gördüğü
+    öğelerden seçilir. Öğrenci durumları bellekte LRU ile sınırlıdır; soğuk başlangıçta ilerleme
+    kaydındaki öğe istatistiklerinden tohumlanabilir.
+    """
+
+    def __init__(
+        self,
+        banks: Dict[str, ItemBank],
+        aliases: Optional[Dict[str, Dict[str, str]]] = None,
+        target_success: float = 0.7,
+        review_ratio: float = 0.4,
+        window: int = 24,
+        recent: int = 15,
+        max_students: int = 10000,
+        rng: Optional[random.Random] = None,
+    ):
+        if not 0 < target_success < 1:
+            raise ValueError("Hedef başarı olasılığı 0 ile 1 arasında olmalı")
+        self.banks = banks
+        # Olaylardaki farklı yazımlar -> öğe (ör. yazım oyununda "herkes/herkez" -> "s/z")
+        self.aliases = aliases or {}
+        self.target_offset = _logit(target_success)
+        self.review_ratio = review_ratio
+        self.window = window
+        self.recent = recent
+        self.max_students = max_students
+        self.rng = rng or random.Random()
+        self._students: "OrderedDict[str, StudentState]" = OrderedDict()
+        self._counters = {"updates": 0, "unknown_items": 0, "selections": 0, "seeded": 0}
+
+    def _item_id(self, skill: str, item: Optional[str]) -> Optional[int]:
+        if not item:
+            return None
+        key = normalize_text(item)
+        key = self.aliases.get(skill, {}).get(key, key)
+        return self.banks[skill].index.get(key)
+
+    def _state(self, user_id: str) -> StudentState:
+        state = self._students.get(user_id)
+        if state is None:
+            state = self._students[user_id] = StudentState(self.recent)
+            while len(self._students) > self.max_students:
+                self._students.popitem(last=False)
+        else:
+            self._students.move_to_end(user_id)
+        return state
+
+    def knows(self, user_id: str) -> bool:
+        return user_id in self._students
+
+    def seed(self, user_id: str, item_stats: Iterable[Tuple[str, str, int, int]]):
+        """
+        Bellekte olmayan öğrencinin ustalıklarını ilerleme kaydındaki (tür, öğe, deneme, doğru) toplamlarından başlatır
+        """
+        state = self._state(user_id)
+        for kind, item, attempts, correct in item_stats:
+            skill = ITEM_KIND_SKILLS.get(kind)
+            item_id = self._item_id(skill, item) if skill in self.banks else None
+            if item_id is None or attempts <= 0:
+                continue
+            # Laplace düzeltmeli doğruluk oranını verecek kişisel ustalık
+            p = (correct + 1) / (attempts + 2)
+            state.mastery[skill][item_id] = _logit(p) + self.banks[skill].difficulty[item_id]
+        self._counters["seeded"] += 1
+
+    def observe(self, user_id: str, events: Iterable[ProgressEvent]):
+        state = self._state(user_id)
+        for event in events:
+            skill = event.game_type
+            if skill not in self.banks:
+                continue
+            item_id = self._item_id(skill, event.syllable if skill == "phonological" else event.confusion_pair)
+            if item_id is None:
+                self._counters["unknown_items"] += 1
+                continue
+            bank = self.banks[skill]
+            mastery = state.mastery[skill].get(item_id, 0.0)
+            error = float(event.correct) - _sigmoid(state.ability[skill] + mastery - bank.difficulty[item_id])
+            state.ability[skill] += K_ABILITY * error
+            state.mastery[skill][item_id] = mastery + K_MASTERY * error
+            bank.update(item_id, -K_DIFFICULTY * error)
+            self._counters["updates"] += 1
+
+    def probability(self, user_id: str, skill: str, item: str) -> Optional[float]:
+        item_id = self._item_id(skill, item)
+        if item_id is None:
+            return None
+        state = self._state(user_id)
+        mastery = state.mastery[skill].get(item_id, 0.0)
+        return _sigmoid(state.ability[skill] + mastery - self.banks[skill].difficulty[item_id])
+
+    def select(self, user_id: str, skill: str, count: int) -> List[str]:
+        """
+        Sonraki oyunda hedeflenecek `count` farklı öğe: bir kısmı en zayıf görülmüş öğelerden (tekrar),
+        kalanı tahmini başarısı hedefe yakın zorluktaki öğelerden
+        """
+        bank = self.banks[skill]
+        state = self._state(user_id)
+        ability = state.ability[skill]
+        recent = set(state.recent[skill])
+        chosen: List[int] = []
+
+        # Tekrar: kişisel başarı olasılığı hedefin altında kalan en zayıf öğeler
+        review_count = int(count * self.review_ratio)
+        if review_count:
+            weak = heapq.nsmallest(
+                review_count,
+                (
+                    (ability + mastery - bank.difficulty[item_id], item_id)
+                    for item_id, mastery in state.mastery[skill].items()
+                    if item_id not in recent
+                ),
+            )
+            chosen.extend(item_id for logit, item_id in weak if logit < self.target_offset)
+
+        # Yeni öğeler: p = hedef olacak zorluk = yetenek - logit(hedef)
+        width = max(self.window, count * 4)
+        candidates = [
+            item_id for item_id in bank.near(ability - self.target_offset, width)
+            if item_id not in recent and item_id not in chosen
+        ]
+        self.rng.shuffle(candidates)
+        chosen.extend(candidates[:count - len(chosen)])
+        # Pencere son seçimlerle tükendiyse son seçilenler de kullanılabilir
+        if len(chosen) < count:
+            fallback = [item_id for item_id in bank.near(ability - self.target_offset, width) if item_id not in chosen]
+            chosen.extend(fallback[:count - len(chosen)])
+
+        state.recent[skill].extend(chosen)
+        self._counters["selections"] += 1
+        return [bank.items[item_id] for item_id in chosen]
+
+    def stats(self) -> dict:
+        return {
+            "students": len(self._students),
+            "items": {skill: len(bank.items) for skill, bank in self.banks.items()},
+            "rebuilds": {skill: bank.rebuilds for skill, bank in self.banks.items()},
+            **self._counters,
+        }
+
+
+def build_adaptive_engine(phonological_engine, spelling_engine, **kwargs) -> AdaptiveEngine:
+    """
+    Yerel üreticilerin öğe listelerinden başlangıç zorluklarıyla motoru kurar: az kelimede geçen heceler
+    ve az örneği olan karışıklık türleri daha zor kabul edilir
+    """
+    def priors(counts: Dict[str, int]) -> Dict[str, float]:
+        median = sorted(counts.values())[len(counts) // 2]
+        return {item: -math.log(count / median) * 0.5 for item, count in counts.items()}
+
+    phonological = {target: len(phonological_engine.index[target]) for target in phonological_engine.targets}
+    spelling = {confusion: len(spelling_engine.by_confusion[confusion]) for confusion in spelling_engine.confusions}
+    aliases = {
+        "spelling": {
+            normalize_text(f"{pair.correct}/{pair.wrong}"): pair.confusion for pair in spelling_engine.pairs
+        },
+    }
+    return AdaptiveEngine(
+        {"phonological": ItemBank(priors(phonological)), "spelling": ItemBank(priors(spelling))},
+        aliases=aliases,
+        **kwargs,
+    )
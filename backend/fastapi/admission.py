@@ -0,0 +1,125 @@
+import asyncio
+import heapq
+import itertools
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Küçük değer önce işlenir: etkileşimli oyun istekleri analiz/yol haritasının önüne geçer
+ENDPOINT_PRIORITIES = {
+    "phonological": 0,
+    "spelling": 0,
+    "word_list": 0,
+    "paragraph": 0,
+    "analysis": 1,
+    "roadmap": 1,
+}
+BACKGROUND_PRIORITY = 2
+
+
+class OverloadedError(Exception):
+    """
+    Kuyruk dolu olduğunda isteğin hızlıca reddedildiğini belirtir (HTTP 503 + Retry-After)
+    """
+
+    def __init__(self, message: str, retry_after: int):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Bir Ollama backend'i önünde eşzamanlı üretim sayısını sınırlayan öncelikli kuyruk.
+    Kuyruk derinliği sınırı aşılırsa yeni istekler beklemeden OverloadedError ile reddedilir.
+    """
+
+    def __init__(self, max_concurrency: int = 4, max_queue_depth: int = 64, retry_after: int = 5):
+        self.max_concurrency = max_concurrency
+        self.max_queue_depth = max_queue_depth
+        self.retry_after = retry_after
+        self._active = 0
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._sequence = itertools.count()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    @property
+    def queue_depth(self) -> int:
+        return sum(1 for _, _, future in self._waiters if not future.done())
+
+    @property
+    def load(self) -> int:
+        """
+        Çalışan ve bekleyen toplam istek sayısı
+        """
+        return self._active + self.queue_depth
+
+    def _endpoint_counters(self, endpoint: str) -> Dict[str, float]:
+        return self._counters.setdefault(
+            endpoint, {"admitted": 0, "rejected": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+        )
+
+    async def acquire(self, endpoint: str, priority: Optional[int] = None):
+        if priority is None:
+            priority = ENDPOINT_PRIORITIES.get(endpoint, BACKGROUND_PRIORITY)
+        counters = self._endpoint_counters(endpoint)
+        started = time.monotonic()
+
+        if self._active < self.max_concurrency and self.queue_depth == 0:
+            # İptal edilmiş bekleyenlerden kalan kayıtları temizle
+            self._waiters.clear()
+            self._active += 1
+        else:
+            if self.queue_depth >= self.max_queue_depth:
+                counters["rejected"] += 1
+                raise OverloadedError("Llama kuyruğu dolu, lütfen daha sonra tekrar deneyin", self.retry_after)
+            future = asyncio.get_running_loop().create_future()
+            heapq.heappush(self._waiters, (priority, next(self._sequence), future))
+            try:
+                await future
+            except asyncio.CancelledError:
+                if future.done() and not future.cancelled():
+                    # Yer ayrılmışken iptal edildi; yeri sıradakine devret
+                    self._release_slot()
+                raise
+
+        waited = time.monotonic() - started
+        counters["admitted"] += 1
+        counters["wait_seconds_total"] += waited
+        counters["wait_seconds_max"] = max(counters["wait_seconds_max"], waited)
+
+    def release(self):
+        self._release_slot()
+
+    def _release_slot(self):
+        # Yer, bekleyen en yüksek öncelikli isteğe doğrudan devredilir
+        while self._waiters:
+            _, _, future = heapq.heappop(self._waiters)
+            if not future.done():
+                future.set_result(None)
+                return
+        self._active -= 1
+
+    def slot(self, endpoint: str, priority: Optional[int] = None) -> "_Slot":
+        return _Slot(self, endpoint, priority)
+
+    def stats(self) -> dict:
+        return {
+            "active": self._active,
+            "queue_depth": self.queue_depth,
+            "max_concurrency": self.max_concurrency,
+            "max_queue_depth": self.max_queue_depth,
+            "endpoints": {endpoint: dict(counters) for endpoint, counters in self._counters.items()},
+        }
+
+
+class _Slot:
+    def __init__(self, controller: AdmissionController, endpoint: str, priority: Optional[int]):
+        self.controller = controller
+        self.endpoint = endpoint
+        self.priority = priority
+
+    async def __aenter__(self):
+        await self.controller.acquire(self.endpoint, self.priority)
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.controller.release()
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+from typing import Iterable, List, Optional
+import httpx
+from admission import AdmissionController
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+logger = logging.getLogger(__name__)
+
+
+class NoBackendAvailableError(Exception):
+    """
+    Kullanılabilir (sağlıklı ve denenmemiş) Ollama backend'i kalmadığını belirtir
+    """
+
+
+class CircuitOpenError(NoBackendAvailableError):
+    """
+    Tüm backend'lerin devresi açık; istek Ollama'ya gönderilmeden hemen reddedilir
+    """
+
+
+class OllamaBackend:
+    """
+    Tek bir Ollama sunucusu: kendi kuyruğu, gecikme ortalaması ve sağlık durumu ile
+    """
+
+    def __init__(
+        self,
+        url: str,
+        admission: AdmissionController,
+        latency_alpha: float = 0.2,
+        failure_threshold: int = 3,
+        reset_timeout: float = 30.0,
+    ):
+        self.url = url.rstrip("/")
+        self.admission = admission
+        self.latency_alpha = latency_alpha
+        self.ewma_latency: Optional[float] = None
+        self.breaker = CircuitBreaker(self.url, failure_threshold, reset_timeout)
+        self.requests = 0
+        self.failures = 0
+
+    @property
+    def outstanding(self) -> int:
+        return self.admission.load
+
+    @property
+    def ejected(self) -> bool:
+        return self.breaker.state != CLOSED
+
+    def record_success(self, latency: float):
+        self.requests += 1
+        self.breaker.record_success()
+        if self.ewma_latency is None:
+            self.ewma_latency = latency
+        else:
+            self.ewma_latency += self.latency_alpha * (latency - self.ewma_latency)
+
+    def record_failure(self):
+        self.requests += 1
+        self.failures += 1
+        self.breaker.record_failure()
+
+    def stats(self) -> dict:
+        return {
+            "url": self.url,
+            "ejected": self.ejected,
+            "circuit": self.breaker.stats(),
+            "outstanding": self.outstanding,
+            "ewma_latency": self.ewma_latency,
+            "requests": self.requests,
+            "failures": self.failures,
+            "admission": self.admission.stats(),
+        }
+
+
+class BackendPool:
+    """
+    Birden fazla Ollama sunucusu arasında yük dengeleme ve periyodik sağlık kontrolü.
+
+    - least_outstanding: en az bekleyen/çalışan isteği olan backend seçilir
+    - latency: bekleyen iş sayısı gecikme ortalaması ile ağırlıklandırılır
+    """
+
+    def __init__(
+        self,
+        urls: List[str],
+        max_concurrency: int = 4,
+        max_queue_depth: int = 64,
+        retry_after: int = 5,
+        strategy: str = "least_outstanding",
+        failure_threshold: int = 3,
+        eject_duration: float = 30.0,
+        health_check_interval: float = 10.0,
+        health_check_timeout: float = 2.0,
+    ):
+        if not urls:
+            raise ValueError("En az bir Ollama adresi gerekli")
+        if strategy not in ("least_outstanding", "latency"):
+            raise ValueError(f"Bilinmeyen yük dengeleme stratejisi: {strategy}")
+        # eject_duration: devrenin açık kaldığı süre; sonra tek deneme isteğiyle (half-open) kontrol edilir
+        self.backends = [
+            OllamaBackend(
+                url,
+                AdmissionController(max_concurrency, max_queue_depth, retry_after),
+                failure_threshold=failure_threshold,
+                reset_timeout=eject_duration,
+            )
+            for url in urls
+        ]
+        self.strategy = strategy
+        self.health_check_interval = health_check_interval
+        self.health_check_timeout = health_check_timeout
+        self._health_task: Optional[asyncio.Task] = None
+
+    def _score(self, backend: OllamaBackend) -> float:
+        if self.strategy == "latency":
+            # Henüz ölçüm yoksa en iyi bilinen gecikmeyi varsay ki yeni backend de denensin
+            known = [b.ewma_latency for b in self.backends if b.ewma_latency is not None]
+            latency = backend.ewma_latency if backend.ewma_latency is not None else min(known, default=1.0)
+            return (backend.outstanding + 1) * latency
+        return backend.outstanding
+
+    def pick(self, exclude: Iterable[OllamaBackend] = ()) -> OllamaBackend:
+        excluded = set(id(backend) for backend in exclude)
+        candidates = [b for b in self.backends if id(b) not in excluded]
+        if not candidates:
+            raise NoBackendAvailableError("Denenecek Ollama backend'i kalmadı")
+        healthy = [b for b in candidates if b.breaker.state == CLOSED]
+        if healthy:
+            return min(healthy, key=self._score)
+        # Hepsinin devresi açıksa bekleme süresi dolan bir backend'e tek deneme isteği gönderilir,
+        # yoksa bağlantı zaman aşımı beklenmeden hemen hata verilir
+        for backend in sorted(candidates, key=lambda b: b.breaker.opened_until):
+            if backend.breaker.try_probe():
+                return backend
+        raise CircuitOpenError("Tüm Ollama backend'lerinin devresi açık")
+
+    @property
+    def available(self) -> bool:
+        """
+        En az bir backend'e istek gönderilebilir mi (kapalı devre veya denemeye hazır)
+        """
+        return any(backend.breaker.state != OPEN for backend in self.backends)
+
+    def record_success(self, backend: OllamaBackend, latency: float):
+        backend.record_success(latency)
+
+    def record_failure(self, backend: OllamaBackend):
+        backend.record_failure()
+
+    async def check_health(self, client: httpx.AsyncClient):
+        """
+        Her backend'e /api/tags ile sağlık sorgusu atar, sonuca göre devre dışı bırakır veya geri alır
+        """
+        async def probe(backend: OllamaBackend):
+            try:
+                response = await client.get(f"{backend.url}/api/tags", timeout=self.health_check_timeout)
+                response.raise_for_status()
+            except (httpx.RequestError, httpx.HTTPStatusError):
+                if backend.breaker.state != OPEN:
+                    self.record_failure(backend)
+                return
+            # Bekleme süresi dolmuş açık devre, sağlık yanıtı alınınca kapatılır
+            if backend.breaker.state == HALF_OPEN:
+                backend.breaker.close()
+
+        await asyncio.gather(*(probe(backend) for backend in self.backends))
+
+    def start(self, client: httpx.AsyncClient):
+        if self._health_task is None and self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(self._health_loop(client))
+
+    async def _health_loop(self, client: httpx.AsyncClient):
+        while True:
+            try:
+                await self.check_health(client)
+            except Exception as e:
+                logger.warning("Sağlık kontrolü hatası: %s", e)
+            await asyncio.sleep(self.health_check_interval)
+
+    async def close(self):
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+
+    def stats(self) -> dict:
+        return {
+            "strategy": self.strategy,
+            "backends": [backend.stats() for backend in self.backends],
+        }
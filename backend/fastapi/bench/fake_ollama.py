@@ -0,0 +1,227 @@
+#!/usr/bin/env python3
+"""
+GPU gerektirmeyen sahte Ollama sunucusu (benchmark için).
+
+/api/generate (stream ve stream olmayan) ile /api/tags uçlarını taklit eder. Yanıt süresi;
+sabit gecikme + prompt değerlendirme + token üretim hızından hesaplanır. Hata ve askıda kalma
+oranları ile backend arızaları da canlandırılabilir. `format` olarak JSON Schema gelirse öğe sayısı
+(minItems/maxItems) dikkate alınır; --invalid-rate ile şemaya uymayan öğeler üretilir.
+
+Kullanım (backend/fastapi dizininden):
+    python -m bench.fake_ollama --port 11435 --latency 0.2 --tokens-per-second 40 --failure-rate 0.02
+"""
+import argparse
+import asyncio
+import json
+import random
+import time
+from functools import lru_cache
+from typing import Optional
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from lexicon import load_lexicon
+
+# Yaklaşık token uzunluğu (karakter); süreler bu tahmine göre hesaplanır
+CHARS_PER_TOKEN = 4
+
+
+class FakeOllamaConfig:
+    def __init__(
+        self,
+        latency: float = 0.1,
+        jitter: float = 0.2,
+        tokens_per_second: float = 40.0,
+        prompt_tokens_per_second: float = 800.0,
+        failure_rate: float = 0.0,
+        hang_rate: float = 0.0,
+        invalid_rate: float = 0.0,
+        seed: Optional[int] = None,
+    ):
+        self.latency = latency
+        self.jitter = jitter
+        self.tokens_per_second = tokens_per_second
+        self.prompt_tokens_per_second = prompt_tokens_per_second
+        self.failure_rate = failure_rate
+        self.hang_rate = hang_rate
+        self.invalid_rate = invalid_rate
+        self.rng = random.Random(seed)
+
+
+@lru_cache(maxsize=None)
+def _vocabulary(length: Optional[int] = None) -> tuple:
+    words = [entry.word for entry in load_lexicon() if " " not in entry.word]
+    if length is not None:
+        words = [word for word in words if len(word) == length] or words
+    return tuple(words)
+
+
+def _words(rng: random.Random, count: int, length: Optional[int] = None) -> list:
+    return rng.sample(_vocabulary(length), count)
+
+
+def _requested_count(response_format) -> int:
+    """
+    Şemadaki öğe listesinin sabitlenmiş uzunluğu (kısmi yeniden üretim); yoksa 5
+    """
+    if isinstance(response_format, dict):
+        for prop in response_format.get("properties", {}).values():
+            if prop.get("type") == "array" and prop.get("maxItems") is not None and prop.get("maxItems") == prop.get("minItems"):
+                return prop["maxItems"]
+    return 5
+
+
+def _invalidate(data: dict, rng: random.Random) -> dict:
+    """
+    Liste yanıtlarında rastgele bir öğeyi şemaya uymayacak biçimde bozar
+    """
+    for key in ("questions", "words", "paragraphs"):
+        items = data.get(key)
+        if items:
+            index = rng.randrange(len(items))
+            items[index] = {"question": ""} if isinstance(items[index], dict) else ""
+            return data
+    return data
+
+
+def fake_response(text: str, rng: random.Random, count: int = 5) -> dict:
+    """
+    Prompt içeriğine göre endpoint'i tahmin edip geçerli biçimde (ama rastgele) bir JSON yanıtı üretir
+    """
+    if "Hece Avcısı" in text:
+        questions = []
+        for _ in range(count):
+            options = _words(rng, 4)
+            target = options[0][:2]
+            questions.append({
+                "question": f"Hedef hece '{target}' içeren kelimeleri seç:",
+                "options": options,
+                "correct_answers": [0],
+            })
+        return {"questions": questions}
+    if "Yazım hatası" in text:
+        questions = []
+        for _ in range(count):
+            words = _words(rng, 5)
+            wrong_index = rng.randrange(5)
+            words[wrong_index] = words[wrong_index][::-1]
+            questions.append({"words": words, "wrong_index": wrong_index})
+        return {"questions": questions}
+    if "paragraf" in text:
+        return {"paragraphs": [
+            " ".join(f"{word.capitalize()} için hazırlık yapıldı." for word in _words(rng, 4)) for _ in range(count)
+        ]}
+    if "analiz" in text:
+        return {"analysis": "Kullanıcının performansı dengeli bir gelişim göstermektedir. "
+                            "Fonolojik alanda düzenli pratik yapılması önerilir. "
+                            "Güçlü yönlerin korunması motivasyonu destekleyecektir."}
+    if "yol haritası" in text:
+        return {
+            "daily_plans": [
+                {"day": day, "phonological_games": rng.randint(1, 5), "spelling_games": rng.randint(1, 4),
+                 "word_exercises": rng.randint(1, 3), "reading_time": rng.choice([5, 10, 15, 20, 30])}
+                for day in range(1, 8)
+            ],
+            "total_duration_days": 7,
+            "focus_areas": ["Hece tanıma", "Yazım doğruluğu"],
+        }
+    return {"words": _words(rng, count, length=6)}
+
+
+def create_app(config: FakeOllamaConfig) -> FastAPI:
+    app = FastAPI(title="Fake Ollama")
+    counters = {"requests": 0, "failures": 0, "hangs": 0, "invalid": 0}
+
+    @app.get("/api/tags")
+    async def tags():
+        return {"models": [{"name": "llama3:8b"}]}
+
+    @app.get("/stats")
+    async def stats():
+        return counters
+
+    @app.post("/api/generate")
+    async def generate(request: Request):
+        data = await request.json()
+        counters["requests"] += 1
+        rng = config.rng
+
+        if rng.random() < config.failure_rate:
+            counters["failures"] += 1
+            await asyncio.sleep(config.latency)
+            return JSONResponse({"error": "injected failure"}, status_code=500)
+        if rng.random() < config.hang_rate:
+            # İstemci zaman aşımına düşene kadar yanıt verme
+            counters["hangs"] += 1
+            await asyncio.sleep(3600)
+
+        text = (data.get("system") or "") + data.get("prompt", "")
+        content = fake_response(text, rng, _requested_count(data.get("format")))
+        if rng.random() < config.invalid_rate:
+            counters["invalid"] += 1
+            content = _invalidate(content, rng)
+        output = json.dumps(content, ensure_ascii=False)
+        prompt_tokens = max(1, len(text) // CHARS_PER_TOKEN)
+        output_tokens = max(1, len(output) // CHARS_PER_TOKEN)
+        load_seconds = config.latency * (1 + rng.uniform(-config.jitter, config.jitter))
+        prompt_seconds = prompt_tokens / config.prompt_tokens_per_second
+        token_seconds = 1 / config.tokens_per_second
+
+        def timings(eval_count: int, started: float) -> dict:
+            return {
+                "done": True,
+                "total_duration": int((time.monotonic() - started) * 1e9),
+                "load_duration": int(load_seconds * 1e9),
+                "prompt_eval_count": prompt_tokens,
+                "prompt_eval_duration": int(prompt_seconds * 1e9),
+                "eval_count": eval_count,
+                "eval_duration": int(eval_count * token_seconds * 1e9),
+            }
+
+        started = time.monotonic()
+        await asyncio.sleep(load_seconds + prompt_seconds)
+
+        if data.get("stream"):
+            async def chunks():
+                for i in range(0, len(output), CHARS_PER_TOKEN):
+                    await asyncio.sleep(token_seconds)
+                    yield json.dumps({"response": output[i:i + CHARS_PER_TOKEN], "done": False}, ensure_ascii=False) + "\n"
+                yield json.dumps({"response": "", **timings(output_tokens, started)}) + "\n"
+
+            return StreamingResponse(chunks(), media_type="application/x-ndjson")
+
+        await asyncio.sleep(output_tokens * token_seconds)
+        return {"model": data.get("model"), "response": output, **timings(output_tokens, started)}
+
+    return app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark için sahte Ollama sunucusu")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=11435)
+    parser.add_argument("--latency", type=float, default=0.1, help="Her istekte sabit gecikme (saniye, model yükleme vb.)")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Gecikmeye uygulanacak göreli rastgele sapma (0-1)")
+    parser.add_argument("--tokens-per-second", type=float, default=40.0, help="Üretim hızı")
+    parser.add_argument("--prompt-tokens-per-second", type=float, default=800.0, help="Prompt değerlendirme hızı")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="HTTP 500 dönen isteklerin oranı")
+    parser.add_argument("--hang-rate", type=float, default=0.0, help="Hiç yanıt vermeyen isteklerin oranı")
+    parser.add_argument("--invalid-rate", type=float, default=0.0, help="Şemaya uymayan öğe içeren yanıtların oranı")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args()
+
+    config = FakeOllamaConfig(
+        latency=args.latency,
+        jitter=args.jitter,
+        tokens_per_second=args.tokens_per_second,
+        prompt_tokens_per_second=args.prompt_tokens_per_second,
+        failure_rate=args.failure_rate,
+        hang_rate=args.hang_rate,
+        invalid_rate=args.invalid_rate,
+        seed=args.seed,
+    )
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+API için yük üreteci: main.py'deki altı endpoint'i belirlenen eşzamanlılık seviyelerinde çalıştırır,
+her seviye için p50/p95/p99 gecikme, RPS, hata sayısı ve sunucunun olay döngüsü gecikmesini raporlar.
+
+Sahte Ollama ve API'yi kendisi başlatmak için (backend/fastapi dizininden):
+    python -m bench.load --spawn --concurrency 1,8,32 --duration 10
+
+Çalışan bir API'ye karşı:
+    python -m bench.load --url http://127.0.0.1:8000 --concurrency 16 --endpoints roadmap,analysis
+"""
+import argparse
+import asyncio
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+from typing import Dict, List, Optional, Tuple
+import httpx
+
+ENDPOINTS = {
+    "phonological": "/api/phonological-game",
+    "spelling": "/api/spelling-game",
+    "word_list": "/api/word-list",
+    "paragraph": "/api/paragraph",
+    "analysis": "/api/analysis",
+    "roadmap": "/api/roadmap",
+}
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_BUCKET_LINE = re.compile(r'^heyai_event_loop_lag_seconds_bucket\{le="([^"]+)"\} ([0-9.e+-]+)$')
+_SUM_LINE = re.compile(r"^heyai_event_loop_lag_seconds_(sum|count) ([0-9.e+-]+)$")
+
+
+def percentile(values: List[float], pct: float) -> Optional[float]:
+    """
+    En yakın sıra yöntemiyle yüzdelik
+    """
+    if not values:
+        return None
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+
+def load_payloads() -> Dict[str, dict]:
+    with open(os.path.join(BASE_DIR, "test_data.json"), encoding="utf-8") as f:
+        game_request = json.load(f)
+    with open(os.path.join(BASE_DIR, "test_analysis_data.json"), encoding="utf-8") as f:
+        analysis_request = json.load(f)
+    return {name: analysis_request if name == "analysis" else game_request for name in ENDPOINTS}
+
+
+async def scrape_loop_lag(client: httpx.AsyncClient) -> Optional[dict]:
+    """
+    Sunucunun /metrics çıktısından olay döngüsü gecikme histogramını okur
+    """
+    try:
+        response = await client.get("/metrics", timeout=5)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        return None
+    buckets, totals = {}, {}
+    for line in response.text.splitlines():
+        match = _BUCKET_LINE.match(line)
+        if match:
+            buckets[float(match.group(1))] = float(match.group(2))
+            continue
+        match = _SUM_LINE.match(line)
+        if match:
+            totals[match.group(1)] = float(match.group(2))
+    if not totals:
+        return None
+    return {"buckets": buckets, **totals}
+
+
+def summarize_loop_lag(before: Optional[dict], after: Optional[dict]) -> Optional[dict]:
+    if before is None or after is None:
+        return None
+    count = after["count"] - before["count"]
+    if count <= 0:
+        return None
+    # Histogram kovalarından p99 üst sınırı tahmini
+    p99 = None
+    for bound in sorted(after["buckets"]):
+        observed = after["buckets"][bound] - before["buckets"].get(bound, 0)
+        if observed >= 0.99 * count:
+            p99 = bound
+            break
+    return {"samples": count, "mean_ms": (after["sum"] - before["sum"]) / count * 1000, "p99_le_ms": p99 * 1000 if p99 not in (None, float("inf")) else None}
+
+
+class ClientLagMonitor:
+    """
+    Yük üretecinin kendi olay döngüsü gecikmesi; yüksekse ölçümler istemci tarafından sınırlanıyordur
+    """
+
+    def __init__(self, interval: float = 0.1):
+        self.interval = interval
+        self.samples: List[float] = []
+        self._task: Optional[asyncio.Task] = None
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            self.samples.append(max(0.0, time.monotonic() - started - self.interval))
+
+    def start(self):
+        self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+async def run_level(
+    client: httpx.AsyncClient,
+    endpoints: List[str],
+    payloads: Dict[str, dict],
+    concurrency: int,
+    duration: float,
+    max_requests: Optional[int],
+    headers: dict,
+) -> dict:
+    results: List[Tuple[str, float, int]] = []
+    deadline = time.monotonic() + duration
+    issued = 0
+
+    async def worker(worker_id: int):
+        nonlocal issued
+        iteration = 0
+        while time.monotonic() < deadline and (max_requests is None or issued < max_requests):
+            issued += 1
+            name = endpoints[(worker_id + iteration) % len(endpoints)]
+            iteration += 1
+            started = time.monotonic()
+            try:
+                response = await client.post(ENDPOINTS[name], json=payloads[name], headers=headers)
+                status = response.status_code
+            except httpx.HTTPError:
+                status = 0
+            results.append((name, time.monotonic() - started, status))
+
+    lag_before = await scrape_loop_lag(client)
+    monitor = ClientLagMonitor()
+    monitor.start()
+    started = time.monotonic()
+    await asyncio.gather(*(worker(i) for i in range(concurrency)))
+    elapsed = time.monotonic() - started
+    await monitor.stop()
+    lag_after = await scrape_loop_lag(client)
+
+    def stats_for(rows: List[Tuple[str, float, int]]) -> dict:
+        ok = [latency for _, latency, status in rows if 200 <= status < 300]
+        return {
+            "requests": len(rows),
+            "errors": sum(1 for _, _, status in rows if not 200 <= status < 300),
+            "rejected_503": sum(1 for _, _, status in rows if status == 503),
+            "rps": len(rows) / elapsed if elapsed else 0.0,
+            "p50_ms": _ms(percentile(ok, 50)),
+            "p95_ms": _ms(percentile(ok, 95)),
+            "p99_ms": _ms(percentile(ok, 99)),
+        }
+
+    return {
+        "concurrency": concurrency,
+        "elapsed_s": elapsed,
+        "total": stats_for(results),
+        "endpoints": {name: stats_for([row for row in results if row[0] == name]) for name in endpoints},
+        "server_loop_lag": summarize_loop_lag(lag_before, lag_after),
+        "client_loop_lag_max_ms": _ms(max(monitor.samples, default=0.0)),
+    }
+
+
+def _ms(value: Optional[float]) -> Optional[float]:
+    return None if value is None else value * 1000
+
+
+def _fmt(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.1f}"
+
+
+def print_report(level: dict):
+    print(f"\n=== Eşzamanlılık {level['concurrency']} ({level['elapsed_s']:.1f} sn) ===")
+    print(f"{'endpoint':<14}{'istek':>8}{'hata':>7}{'503':>6}{'rps':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    rows = list(level["endpoints"].items()) + [("TOPLAM", level["total"])]
+    for name, stats in rows:
+        print(f"{name:<14}{stats['requests']:>8}{stats['errors']:>7}{stats['rejected_503']:>6}{stats['rps']:>9.1f}"
+              f"{_fmt(stats['p50_ms']):>10}{_fmt(stats['p95_ms']):>10}{_fmt(stats['p99_ms']):>10}")
+    lag = level["server_loop_lag"]
+    if lag:
+        print(f"Sunucu olay döngüsü gecikmesi: ortalama {lag['mean_ms']:.2f} ms, p99 <= {_fmt(lag['p99_le_ms'])} ms ({lag['samples']:.0f} örnek)")
+    else:
+        print("Sunucu olay döngüsü gecikmesi: ölçülemedi (/metrics erişilemiyor veya örnek yok)")
+    print(f"İstemci olay döngüsü gecikmesi (en fazla): {_fmt(level['client_loop_lag_max_ms'])} ms")
+
+
+def _wait_until_ready(url: str, path: str, timeout: float = 30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}{path}", timeout=1).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"{url} {timeout} saniye içinde hazır olmadı")
+
+
+def spawn_servers(args) -> List[subprocess.Popen]:
+    """
+    Sahte Ollama'yı ve API'yi alt süreç olarak başlatır
+    """
+    fake_url = f"http://127.0.0.1:{args.fake_port}"
+    fake = subprocess.Popen(
+        [sys.executable, "-m", "bench.fake_ollama", "--port", str(args.fake_port),
+         "--latency", str(args.fake_latency), "--tokens-per-second", str(args.fake_tokens_per_second),
+         "--failure-rate", str(args.fake_failure_rate), "--hang-rate", str(args.fake_hang_rate),
+         "--invalid-rate", str(args.fake_invalid_rate),
+         "--seed", str(args.seed)],
+        cwd=BASE_DIR,
+    )
+    env = {**os.environ, "OLLAMA_URL": fake_url, "LOG_LEVEL": "WARNING"}
+    for item in args.api_env:
+        key, _, value = item.partition("=")
+        env[key] = value
+    api = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "main:app", "--host", "127.0.0.1", "--port", str(args.api_port),
+         "--log-level", "warning", "--no-access-log"],
+        cwd=BASE_DIR,
+        env=env,
+    )
+    processes = [fake, api]
+    try:
+        _wait_until_ready(fake_url, "/api/tags")
+        _wait_until_ready(f"http://127.0.0.1:{args.api_port}", "/health")
+    except Exception:
+        for process in processes:
+            process.terminate()
+        raise
+    return processes
+
+
+async def run(args) -> List[dict]:
+    endpoints = [name.strip() for name in args.endpoints.split(",") if name.strip()]
+    unknown = [name for name in endpoints if name not in ENDPOINTS]
+    if unknown:
+        raise SystemExit(f"Bilinmeyen endpoint: {', '.join(unknown)} (seçenekler: {', '.join(ENDPOINTS)})")
+    payloads = load_payloads()
+    headers = {"Cache-Control": "no-cache"} if args.no_cache else {}
+    levels = [int(level) for level in args.concurrency.split(",")]
+
+    limits = httpx.Limits(max_connections=max(levels) + 8, max_keepalive_connections=max(levels) + 8)
+    async with httpx.AsyncClient(base_url=args.url, limits=limits, timeout=args.timeout) as client:
+        if args.warmup:
+            await run_level(client, endpoints, payloads, min(levels), args.warmup, None, headers)
+        report = []
+        for level in levels:
+            result = await run_level(client, endpoints, payloads, level, args.duration, args.requests, headers)
+            print_report(result)
+            report.append(result)
+        return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="API yük testi ve gecikme ölçümü")
+    parser.add_argument("--url", default=None, help="Çalışan API adresi (verilmezse --spawn gerekir)")
+    parser.add_argument("--spawn", action="store_true", help="Sahte Ollama ve API'yi alt süreç olarak başlat")
+    parser.add_argument("--endpoints", default=",".join(ENDPOINTS), help="Virgülle ayrılmış endpoint listesi")
+    parser.add_argument("--concurrency", default="1,8,32", help="Virgülle ayrılmış eşzamanlılık seviyeleri")
+    parser.add_argument("--duration", type=float, default=10.0, help="Her seviyenin süresi (saniye)")
+    parser.add_argument("--requests", type=int, default=None, help="Seviye başına en fazla istek sayısı")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Ölçüm öncesi ısınma süresi (saniye, 0 kapatır)")
+    parser.add_argument("--timeout", type=float, default=180.0, help="İstek zaman aşımı (saniye)")
+    parser.add_argument("--no-cache", action="store_true", help="Cache-Control: no-cache gönder (yanıt önbelleğini atla)")
+    parser.add_argument("--json", dest="json_path", default=None, help="Sonuçları JSON dosyasına yaz")
+    parser.add_argument("--api-port", type=int, default=8765)
+    parser.add_argument("--api-env", action="append", default=[], help="Başlatılan API için ortam değişkeni (KEY=VALUE)")
+    parser.add_argument("--fake-port", type=int, default=11435)
+    parser.add_argument("--fake-latency", type=float, default=0.1)
+    parser.add_argument("--fake-tokens-per-second", type=float, default=40.0)
+    parser.add_argument("--fake-failure-rate", type=float, default=0.0)
+    parser.add_argument("--fake-hang-rate", type=float, default=0.0)
+    parser.add_argument("--fake-invalid-rate", type=float, default=0.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    processes: List[subprocess.Popen] = []
+    if args.spawn:
+        processes = spawn_servers(args)
+        args.url = f"http://127.0.0.1:{args.api_port}"
+    elif not args.url:
+        parser.error("--url veya --spawn verilmeli")
+
+    try:
+        report = asyncio.run(run(args))
+    finally:
+        for process in processes:
+            process.terminate()
+        for process in processes:
+            process.wait(timeout=10)
+
+    if args.json_path:
+        with open(args.json_path, "w", encoding="utf-8") as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"\nSonuçlar {args.json_path} dosyasına yazıldı")
+
+
+if __name__ == "__main__":
+    main()
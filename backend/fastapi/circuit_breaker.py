@@ -0,0 +1,85 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitBreaker:
+    """
+    Backend başına devre kesici.
+
+    - closed: istekler normal gönderilir; art arda `failure_threshold` hata devreyi açar
+    - open: `reset_timeout` boyunca istek gönderilmez, çağıran hemen hata alır
+    - half_open: süre dolunca tek bir deneme isteğine izin verilir; başarılıysa devre kapanır,
+      başarısızsa tekrar açılır. Deneme sonuçlanmazsa (ör. iptal) `reset_timeout` sonra yenisine izin verilir.
+    """
+
+    def __init__(self, name: str, failure_threshold: int = 3, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.consecutive_failures = 0
+        self.opened_until = 0.0
+        self.trips = 0
+        self._open = False
+        self._probing = False
+
+    @property
+    def state(self) -> str:
+        if not self._open:
+            return CLOSED
+        if self._probing or time.monotonic() >= self.opened_until:
+            return HALF_OPEN
+        return OPEN
+
+    def try_probe(self) -> bool:
+        """
+        Açık devrede bekleme süresi dolduysa bir deneme isteğine izin verir
+        """
+        if not self._open:
+            return True
+        if time.monotonic() < self.opened_until:
+            return False
+        self._probing = True
+        # Deneme sonuçlanana kadar başka istek gönderilmesin
+        self.opened_until = time.monotonic() + self.reset_timeout
+        logger.info("🔄 Devre yarı açık, deneme isteği gönderiliyor: %s", self.name)
+        return True
+
+    def record_success(self):
+        self.consecutive_failures = 0
+        if self._open:
+            self.close()
+
+    def record_failure(self):
+        self.consecutive_failures += 1
+        # Açıkken gelen hata (deneme isteği veya devre açılmadan önce gönderilmiş istekler) süreyi yeniler
+        if self._open or self.consecutive_failures >= self.failure_threshold:
+            self.trip()
+
+    def trip(self):
+        if not self._open:
+            self.trips += 1
+            logger.warning("⚠️ Devre açıldı, %s sn boyunca istek gönderilmeyecek: %s", self.reset_timeout, self.name)
+        self._open = True
+        self._probing = False
+        self.opened_until = time.monotonic() + self.reset_timeout
+
+    def close(self):
+        if self._open:
+            logger.info("✅ Devre kapandı: %s", self.name)
+        self._open = False
+        self._probing = False
+        self.consecutive_failures = 0
+
+    def stats(self) -> dict:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "trips": self.trips,
+            "retry_in": max(0.0, self.opened_until - time.monotonic()) if self._open else 0.0,
+        }
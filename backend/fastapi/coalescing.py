@@ -0,0 +1,62 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class SingleFlight:
+    """
+    Aynı anahtarla eşzamanlı gelen çağrıları tek bir çağrıda birleştirir (single-flight).
+    İlk gelen çağrı işi başlatır, diğerleri aynı sonucu bekler. `window` > 0 ise tamamlanan
+    sonuç bu süre boyunca yeni gelen aynı anahtarlı çağrılara da verilir.
+    """
+
+    def __init__(self, window: float = 0.0):
+        self.window = window
+        self._inflight: Dict[str, asyncio.Task] = {}
+        self._recent: "OrderedDict[str, Tuple[float, Any]]" = OrderedDict()
+        self._counters: Dict[str, Dict[str, int]] = {}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[Any]], group: str = "default") -> Any:
+        counters = self._counters.setdefault(group, {"calls": 0, "coalesced": 0})
+        counters["calls"] += 1
+
+        if self.window > 0:
+            self._prune()
+            recent = self._recent.get(key)
+            if recent is not None:
+                counters["coalesced"] += 1
+                return recent[1]
+
+        task = self._inflight.get(key)
+        if task is not None:
+            counters["coalesced"] += 1
+        else:
+            # İş ayrı bir görevde çalışır; ilk çağıran iptal edilse bile bekleyenler sonucu alır
+            task = asyncio.ensure_future(fn())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done, key=key: self._on_done(key, done))
+
+        return await asyncio.shield(task)
+
+    def _on_done(self, key: str, task: asyncio.Task):
+        self._inflight.pop(key, None)
+        if self.window > 0 and not task.cancelled() and task.exception() is None:
+            self._recent[key] = (time.monotonic(), task.result())
+            self._recent.move_to_end(key)
+
+    def _prune(self):
+        deadline = time.monotonic() - self.window
+        while self._recent:
+            key, (finished_at, _) = next(iter(self._recent.items()))
+            if finished_at >= deadline:
+                break
+            self._recent.popitem(last=False)
+
+    def stats(self) -> dict:
+        return {
+            "window": self.window,
+            "inflight": len(self._inflight),
+            # "coalesced" Ollama'ya gitmeden karşılanan (tasarruf edilen) çağrı sayısıdır
+            "groups": {group: dict(counters) for group, counters in self._counters.items()},
+        }
@@ -0,0 +1,43 @@
+import asyncio
+import httpx
+import pytest
+from bench.fake_ollama import FakeOllamaConfig, create_app
+from llama_service import LlamaService
+
+# test_api.py çalışan bir sunucuya (localhost:8000) istek atan elle çalıştırılan bir script'tir;
+# çevrimdışı pytest çalıştırmasına dahil edilmez
+collect_ignore = ["test_api.py"]
+
+
+class FakeBackend:
+    """
+    Süreç içinde çalışan sahte Ollama; yarıda kesilen (iptal edilen) /api/generate istekleri sayılır
+    """
+
+    def __init__(self, url: str, **config):
+        self.url = url
+        self.app = create_app(FakeOllamaConfig(jitter=0.0, tokens_per_second=1e6, prompt_tokens_per_second=1e6, seed=1, **config))
+        self.started = 0
+        self.cancelled = 0
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "http" and scope["path"] == "/api/generate":
+            self.started += 1
+        try:
+            await self.app(scope, receive, send)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+
+
+@pytest.fixture
+def fake_service():
+    """
+    Verilen sahte backend'lere httpx ASGITransport ile bağlı LlamaService kurar (ağ ve sağlık döngüsü yok)
+    """
+    def build(*backends: FakeBackend, **kwargs) -> LlamaService:
+        service = LlamaService(llama_urls=[backend.url for backend in backends], health_check_interval=0, **kwargs)
+        service._client = httpx.AsyncClient(mounts={backend.url: httpx.ASGITransport(app=backend) for backend in backends})
+        return service
+
+    return build
@@ -0,0 +1,152 @@
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, Tuple
+from models import UserInfo
+from logging_setup import request_id_var
+from text_utils import turkish_lower
+
+logger = logging.getLogger(__name__)
+
+# hard_area serbest metin olduğu için anahtar kelimelere göre kovalara ayrılır
+HARD_AREA_BUCKETS = [
+    ("hece", ("hece", "ses", "fonolojik")),
+    ("yazim", ("yazım", "yazı", "harf", "imla")),
+    ("okuma", ("okuma", "akıcı", "hız", "anlama")),
+    ("kelime", ("kelime", "sözcük")),
+]
+
+PoolKey = Tuple[str, str, str]
+Producer = Callable[[UserInfo], Awaitable[Any]]
+
+
+def hard_area_bucket(hard_area: str) -> str:
+    """
+    Zorluk alanı metnini sabit bir kova adına indirger
+    """
+    text = turkish_lower(hard_area)
+    for bucket, keywords in HARD_AREA_BUCKETS:
+        if any(keyword in text for keyword in keywords):
+            return bucket
+    return "genel"
+
+
+class ContentPool:
+    """
+    Endpoint, yaş grubu ve zorluk alanı kovası bazında önceden üretilmiş içerik havuzu.
+    İstek geldiğinde hazır içerik anında döner, havuz arka planda yeniden doldurulur.
+    """
+
+    def __init__(
+        self,
+        producers: Dict[str, Producer],
+        low_watermark: int = 2,
+        high_watermark: int = 5,
+        max_age: float = 1800.0,
+        max_refill_concurrency: int = 2,
+    ):
+        if low_watermark > high_watermark:
+            raise ValueError("low_watermark, high_watermark değerinden büyük olamaz")
+        self.producers = producers
+        self.low_watermark = low_watermark
+        self.high_watermark = high_watermark
+        self.max_age = max_age
+        self._refill_semaphore = asyncio.Semaphore(max_refill_concurrency)
+        self._queues: Dict[PoolKey, Deque[Tuple[float, Any]]] = {}
+        # Her kova için arka plan üretiminde kullanılacak son görülen profil
+        self._exemplars: Dict[PoolKey, UserInfo] = {}
+        self._refill_tasks: Dict[PoolKey, asyncio.Task] = {}
+        self._counters: Dict[str, Dict[str, int]] = {
+            endpoint: {"hits": 0, "misses": 0, "expired": 0, "skipped": 0, "generated": 0, "refill_errors": 0}
+            for endpoint in producers
+        }
+
+    def key_for(self, endpoint: str, user_info: UserInfo) -> PoolKey:
+        return (endpoint, user_info.age_group.strip(), hard_area_bucket(user_info.hard_area))
+
+    async def get(self, endpoint: str, user_info: UserInfo, accept: Optional[Callable[[Any], bool]] = None) -> Optional[Any]:
+        """
+        Havuzdan taze bir içerik döndürür, yoksa None döner. Her çağrı gerekirse yeniden doldurmayı tetikler.
+        `accept` verilirse (ör. öğrencinin daha önce gördüğü içerik) geçmeyen içerikler atlanır ve
+        başka istekler için havuzda sırasıyla kalır.
+        """
+        if endpoint not in self.producers:
+            return None
+
+        key = self.key_for(endpoint, user_info)
+        self._exemplars[key] = user_info
+        queue = self._queues.setdefault(key, deque())
+        counters = self._counters[endpoint]
+
+        content = None
+        skipped = []
+        now = time.monotonic()
+        while queue:
+            created_at, item = queue.popleft()
+            if now - created_at > self.max_age:
+                counters["expired"] += 1
+            elif accept is not None and not accept(item):
+                counters["skipped"] += 1
+                skipped.append((created_at, item))
+            else:
+                content = item
+                break
+        queue.extendleft(reversed(skipped))
+
+        if content is None:
+            counters["misses"] += 1
+        else:
+            counters["hits"] += 1
+
+        if len(queue) < self.low_watermark:
+            self._schedule_refill(key)
+
+        return content
+
+    def _schedule_refill(self, key: PoolKey):
+        task = self._refill_tasks.get(key)
+        if task is not None and not task.done():
+            return
+        self._refill_tasks[key] = asyncio.create_task(self._refill(key))
+
+    async def _refill(self, key: PoolKey):
+        # Görev, doldurmayı tetikleyen isteğin bağlamını kopyalar; loglarda o istekle karışmasın
+        request_id_var.set(f"pool-{key[0]}")
+        endpoint = key[0]
+        producer = self.producers[endpoint]
+        queue = self._queues[key]
+        counters = self._counters[endpoint]
+
+        while len(queue) < self.high_watermark:
+            async with self._refill_semaphore:
+                try:
+                    content = await producer(self._exemplars[key])
+                except asyncio.CancelledError:
+                    raise
+                except Exception as e:
+                    counters["refill_errors"] += 1
+                    logger.warning("⚠️ Havuz doldurma hatası %s: %s", key, e)
+                    return
+            if not content:
+                counters["refill_errors"] += 1
+                return
+            queue.append((time.monotonic(), content))
+            counters["generated"] += 1
+
+    async def close(self):
+        """
+        Çalışan arka plan doldurma görevlerini iptal eder
+        """
+        tasks = [task for task in self._refill_tasks.values() if not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._refill_tasks.clear()
+
+    def stats(self) -> dict:
+        return {
+            "endpoints": {endpoint: dict(counters) for endpoint, counters in self._counters.items()},
+            "depth": {"|".join(key): len(queue) for key, queue in self._queues.items()},
+            "refilling": sum(1 for task in self._refill_tasks.values() if not task.done()),
+        }
@@ -0,0 +1,309 @@
+import hashlib
+import zlib
+from collections import OrderedDict, deque
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Set
+import numpy as np
+from models import Question, SpellingQuestion
+from readability import TOKEN_PATTERN
+from turkish_phonology import turkish_casefold
+
+# MinHash için evrensel hash ailesi: (a * x + b) mod P, P = 2^31 - 1 (çarpım uint64'e sığar)
+MERSENNE_PRIME = (1 << 31) - 1
+
+# Kelimeleri sabit öğeler (yazım sorusunun 5 kelimesi) yakın tekrar yerine tam eşleşmeyle kontrol edilir
+EXACT_ENDPOINTS = ("spelling",)
+
+SHARED_SCOPE = ""
+
+
+class SignatureIndex:
+    """
+    Son `capacity` öğenin MinHash imzaları (halka tampon, doldukça en eskinin yerine yazılır).
+    `bands` verilirse imzalar LSH bantlarıyla kovalara da yerleştirilir ve sorgu yalnızca en az bir
+    bandı aynı olan adayları karşılaştırır; verilmezse tampon tek numpy karşılaştırmasıyla taranır
+    (öğrenci geçmişi gibi küçük tamponlarda kova tutmaktan hem hızlı hem az bellekli).
+    """
+
+    def __init__(self, num_perm: int, capacity: int, bands: int = 0):
+        self.capacity = capacity
+        self._signatures = np.empty((min(8, capacity), num_perm), dtype=np.uint32)
+        self._size = 0
+        self._next = 0
+        self._buckets: Optional[List[Dict[int, Set[int]]]] = [{} for _ in range(bands)] if bands else None
+        self._keys = np.empty((capacity, bands), dtype=np.uint64) if bands else None
+
+    def __len__(self) -> int:
+        return self._size
+
+    def similarity(self, signature: np.ndarray, band_keys: np.ndarray) -> float:
+        """
+        Kayıtlı öğeler arasında tahmini en yüksek Jaccard benzerliği (eşit imza bileşenlerinin oranı)
+        """
+        if not self._size:
+            return 0.0
+        if self._buckets is None:
+            rows = self._signatures[:self._size]
+        else:
+            candidates: Set[int] = set()
+            for bucket, key in zip(self._buckets, band_keys.tolist()):
+                candidates.update(bucket.get(key, ()))
+            if not candidates:
+                return 0.0
+            rows = self._signatures[np.fromiter(candidates, dtype=np.intp, count=len(candidates))]
+        return float((rows == signature).mean(axis=1).max())
+
+    def add(self, signature: np.ndarray, band_keys: np.ndarray):
+        if self._size < self.capacity:
+            slot = self._size
+            if slot == len(self._signatures):
+                grown = np.empty((min(self.capacity, 2 * slot), self._signatures.shape[1]), dtype=np.uint32)
+                grown[:slot] = self._signatures
+                self._signatures = grown
+            self._size += 1
+        else:
+            slot = self._next
+            self._next = (slot + 1) % self.capacity
+            if self._buckets is not None:
+                for bucket, key in zip(self._buckets, self._keys[slot].tolist()):
+                    members = bucket[key]
+                    members.discard(slot)
+                    if not members:
+                        del bucket[key]
+        self._signatures[slot] = signature
+        if self._buckets is not None:
+            self._keys[slot] = band_keys
+            for bucket, key in zip(self._buckets, band_keys.tolist()):
+                bucket.setdefault(key, set()).add(slot)
+
+
+class ExactIndex:
+    """
+    Son `capacity` öğenin 64 bitlik anahtarları; üyelik O(1)
+    """
+
+    def __init__(self, capacity: int):
+        self._order: Deque[int] = deque()
+        self._counts: Dict[int, int] = {}
+        self.capacity = capacity
+
+    def __len__(self) -> int:
+        return len(self._order)
+
+    def __contains__(self, key: int) -> bool:
+        return key in self._counts
+
+    def add(self, key: int):
+        if len(self._order) >= self.capacity:
+            old = self._order.popleft()
+            if self._counts[old] == 1:
+                del self._counts[old]
+            else:
+                self._counts[old] -= 1
+        self._order.append(key)
+        self._counts[key] = self._counts.get(key, 0) + 1
+
+
+def exact_key(words: Iterable[str]) -> int:
+    """
+    Kelime kümesinin sıradan bağımsız 64 bitlik anahtarı (aynı kelimeler farklı sırada da aynı sorudur)
+    """
+    joined = "\x1f".join(sorted(turkish_casefold(word.strip()) for word in words))
+    return int.from_bytes(hashlib.blake2b(joined.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def paragraph_shingles(paragraph: str) -> List[str]:
+    """
+    Paragrafın ardışık kelime ikilileri; tek kelimelik paragrafta kelimenin kendisi
+    """
+    words = [token for token in TOKEN_PATTERN.findall(turkish_casefold(paragraph)) if token[0] not in ".!?…"]
+    if len(words) < 2:
+        return words
+    return [f"{first} {second}" for first, second in zip(words, words[1:])]
+
+
+def item_tokens(endpoint: str, item) -> List[str]:
+    """
+    Yakın tekrar karşılaştırmasında kullanılan küme: soru için hedef ve seçenekler, kelime listesi
+    için kelimeler, paragraf için kelime ikilileri
+    """
+    if endpoint == "phonological" and isinstance(item, Question):
+        return ["?" + turkish_casefold(item.question), *(turkish_casefold(option.strip()) for option in item.options)]
+    if endpoint == "word_list":
+        return [turkish_casefold(word.strip()) for word in item]
+    if endpoint == "paragraph":
+        return paragraph_shingles(item)
+    raise ValueError(f"Tekrar kontrolü desteklenmeyen endpoint: {endpoint}")
+
+
+class ContentDeduplicator:
+    """
+    Üretilen içeriğin yakın tekrarlarını bulur. Her öğrencinin (user_id) ve kimliksiz isteklerle içerik
+    havuzunun paylaştığı ortak kapsamın endpoint başına son öğeleri tutulur:
+
+    - Hece Avcısı soruları (hedef + seçenekler), kelime listeleri ve paragraflar (kelime ikilileri)
+      MinHash imzasıyla; tahmini Jaccard benzerliği `threshold` ve üstündeyse yakın tekrardır.
+      İmzanın tüm permütasyonları tek numpy işlemiyle hesaplanır.
+    - Yazım sorularında aynı 5 kelime (sırası fark etmez) blake2b anahtarıyla tam eşleşmedir.
+
+    Ortak kapsam büyük olduğundan LSH bantlarıyla aranır (`bands` x `num_perm / bands` satır; varsayılan
+    16x2 ile 0.5 benzerliğindeki çiftlerin ~%99'u aday olur), ekleme ve sorgu kayıt sayısından bağımsızdır.
+    Öğrenci geçmişi `history` öğeyle sınırlı olduğundan doğrudan taranır; öğrenciler LRU ile sınırlanır.
+    """
+
+    def __init__(
+        self,
+        num_perm: int = 32,
+        bands: int = 16,
+        threshold: float = 0.5,
+        history: int = 50,
+        shared_history: int = 5000,
+        max_students: int = 10000,
+        seed: int = 1,
+    ):
+        if num_perm % bands:
+            raise ValueError("num_perm, bands sayısına tam bölünmeli")
+        if not 0.0 < threshold <= 1.0:
+            raise ValueError("Benzerlik eşiği 0 ile 1 arasında olmalı")
+        self.num_perm = num_perm
+        self.bands = bands
+        self.threshold = threshold
+        self.history = history
+        self.shared_history = shared_history
+        self.max_students = max_students
+        rng = np.random.default_rng(seed)
+        self._a = rng.integers(1, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        self._b = rng.integers(0, MERSENNE_PRIME, size=(num_perm, 1), dtype=np.uint64)
+        # Bant satırlarını tek 64 bitlik kova anahtarına katlayan çarpanlar (taşma kasıtlı)
+        self._band_mix = rng.integers(1, 1 << 63, size=num_perm // bands, dtype=np.uint64)
+        self._students: "OrderedDict[str, Dict[str, object]]" = OrderedDict()
+        self._shared: Dict[str, object] = {}
+        self._counters = {"checked": 0, "near_duplicates": 0, "exact_duplicates": 0, "recorded": 0}
+
+    def signature(self, tokens: Iterable[str]) -> Optional[np.ndarray]:
+        """
+        Token kümesinin MinHash imzası; boş kümede None
+        """
+        hashes = np.fromiter(
+            {zlib.crc32(token.encode("utf-8")) % MERSENNE_PRIME for token in tokens}, dtype=np.uint64
+        )
+        if not len(hashes):
+            return None
+        return ((self._a * hashes + self._b) % MERSENNE_PRIME).min(axis=1).astype(np.uint32)
+
+    def band_keys(self, signature: np.ndarray) -> np.ndarray:
+        # Dizi tamsayı taşması numpy'de sessizdir
+        return (signature.reshape(self.bands, -1).astype(np.uint64) * self._band_mix).sum(axis=1, dtype=np.uint64)
+
+    def _features(self, endpoint: str, item) -> Optional[tuple]:
+        if endpoint in EXACT_ENDPOINTS:
+            return ("exact", exact_key(item.words if isinstance(item, SpellingQuestion) else item))
+        signature = self.signature(item_tokens(endpoint, item))
+        if signature is None:
+            return None
+        return ("near", signature, self.band_keys(signature))
+
+    def _scope(self, user_id: Optional[str], create: bool) -> Optional[Dict[str, object]]:
+        if user_id is None or user_id == SHARED_SCOPE:
+            return self._shared
+        scope = self._students.get(user_id)
+        if scope is None and create:
+            scope = self._students[user_id] = {}
+            while len(self._students) > self.max_students:
+                self._students.popitem(last=False)
+        elif scope is not None:
+            self._students.move_to_end(user_id)
+        return scope
+
+    def _index(self, scope: Dict[str, object], shared: bool, endpoint: str, kind: str):
+        index = scope.get(endpoint)
+        if index is None:
+            capacity = self.shared_history if shared else self.history
+            if kind == "exact":
+                index = ExactIndex(capacity)
+            else:
+                index = SignatureIndex(self.num_perm, capacity, self.bands if shared else 0)
+            scope[endpoint] = index
+        return index
+
+    def _similarity(self, user_id: Optional[str], endpoint: str, features: tuple) -> float:
+        scope = self._scope(user_id, create=False)
+        return self._index_similarity(scope.get(endpoint) if scope is not None else None, features)
+
+    @staticmethod
+    def _index_similarity(index, features: tuple) -> float:
+        if index is None:
+            return 0.0
+        if features[0] == "exact":
+            return 1.0 if features[1] in index else 0.0
+        return index.similarity(features[1], features[2])
+
+    def similarity(self, user_id: Optional[str], endpoint: str, item) -> float:
+        """
+        Öğenin öğrencinin (user_id yoksa ortak kapsamın) geçmişindeki en benzer öğeye tahmini benzerliği
+        """
+        features = self._features(endpoint, item)
+        return self._similarity(user_id, endpoint, features) if features is not None else 0.0
+
+    def _is_duplicate(self, user_id: Optional[str], endpoint: str, features: Optional[tuple]) -> bool:
+        self._counters["checked"] += 1
+        if features is None or self._similarity(user_id, endpoint, features) < self.threshold:
+            return False
+        self._counters["exact_duplicates" if features[0] == "exact" else "near_duplicates"] += 1
+        return True
+
+    def is_duplicate(self, user_id: Optional[str], endpoint: str, item) -> bool:
+        return self._is_duplicate(user_id, endpoint, self._features(endpoint, item))
+
+    def duplicates(self, user_id: Optional[str], endpoint: str, items: Iterable) -> int:
+        """
+        Öğelerden kaçının geçmişte yakın tekrarı var
+        """
+        return sum(1 for item in items if self.is_duplicate(user_id, endpoint, item))
+
+    def _remember(self, user_id: Optional[str], endpoint: str, features: Optional[tuple]):
+        if features is None:
+            return
+        scope = self._scope(user_id, create=True)
+        self._add(self._index(scope, scope is self._shared, endpoint, features[0]), features)
+        self._counters["recorded"] += 1
+
+    @staticmethod
+    def _add(index, features: tuple):
+        if features[0] == "exact":
+            index.add(features[1])
+        else:
+            index.add(features[1], features[2])
+
+    def remember(self, user_id: Optional[str], endpoint: str, items: Iterable):
+        for item in items:
+            self._remember(user_id, endpoint, self._features(endpoint, item))
+
+    def checker(self, user_id: Optional[str], endpoint: str) -> Callable[[object], bool]:
+        """
+        Geçmişte ve aynı kontrolden daha önce geçen öğelerde (ör. aynı yanıttaki diğer öğeler) yakın
+        tekrarı olmayan öğe için True dönen kontrol. Geçmişe yazmaz; sunulan öğeler `remember` ile kaydedilir.
+        """
+        batch: Dict[str, object] = {}
+
+        def accept(item) -> bool:
+            features = self._features(endpoint, item)
+            if features is None:
+                return True
+            if self._is_duplicate(user_id, endpoint, features):
+                return False
+            index = self._index(batch, False, endpoint, features[0])
+            if self._index_similarity(index, features) >= self.threshold:
+                self._counters["exact_duplicates" if features[0] == "exact" else "near_duplicates"] += 1
+                return False
+            self._add(index, features)
+            return True
+
+        return accept
+
+    def stats(self) -> dict:
+        return {
+            "students": len(self._students),
+            "shared": {endpoint: len(index) for endpoint, index in self._shared.items()},
+            "threshold": self.threshold,
+            **self._counters,
+        }
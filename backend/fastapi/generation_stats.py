@@ -0,0 +1,45 @@
+from typing import Dict
+
+# Ollama süreleri nanosaniye cinsinden döndürür
+_NS = 1e9
+
+
+class GenerationStats:
+    """
+    Ollama yanıtlarındaki prompt_eval_count/prompt_eval_duration ve eval_count/eval_duration
+    değerlerini endpoint başına toplar. Prompt öneki önbellekten kullanıldığında
+    değerlendirilen prompt token sayısı düşer; bu sayede tasarruf endpoint bazında görülebilir.
+    """
+
+    def __init__(self):
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def record(self, endpoint: str, response: dict):
+        counters = self._counters.setdefault(endpoint, {
+            "calls": 0,
+            "prompt_eval_count": 0,
+            "prompt_eval_seconds": 0.0,
+            "eval_count": 0,
+            "eval_seconds": 0.0,
+            "last_prompt_eval_count": 0,
+        })
+        counters["calls"] += 1
+        counters["prompt_eval_count"] += response.get("prompt_eval_count") or 0
+        counters["prompt_eval_seconds"] += (response.get("prompt_eval_duration") or 0) / _NS
+        counters["eval_count"] += response.get("eval_count") or 0
+        counters["eval_seconds"] += (response.get("eval_duration") or 0) / _NS
+        counters["last_prompt_eval_count"] = response.get("prompt_eval_count") or 0
+
+    def stats(self) -> dict:
+        endpoints = {}
+        for endpoint, counters in self._counters.items():
+            calls = counters["calls"] or 1
+            endpoints[endpoint] = {
+                **counters,
+                "avg_prompt_eval_count": counters["prompt_eval_count"] / calls,
+                "avg_prompt_eval_seconds": counters["prompt_eval_seconds"] / calls,
+                "tokens_per_second": (
+                    counters["eval_count"] / counters["eval_seconds"] if counters["eval_seconds"] else None
+                ),
+            }
+        return {"endpoints": endpoints}
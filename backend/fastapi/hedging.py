@@ -0,0 +1,110 @@
+import math
+from collections import deque
+from typing import Deque, Dict, Optional
+
+
+class LatencyTracker:
+    """
+    Endpoint bazında son başarılı Ollama çağrılarının süreleri; hedge gecikmesi bunların yüzdeliğinden hesaplanır
+    """
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self.window = window
+        self.min_samples = min_samples
+        self._samples: Dict[str, Deque[float]] = {}
+
+    def record(self, endpoint: str, latency: float):
+        self._samples.setdefault(endpoint, deque(maxlen=self.window)).append(latency)
+
+    def percentile(self, endpoint: str, pct: float) -> Optional[float]:
+        """
+        En yakın sıra yöntemiyle yüzdelik; yeterli örnek yoksa None
+        """
+        samples = self._samples.get(endpoint)
+        if not samples or len(samples) < self.min_samples:
+            return None
+        ordered = sorted(samples)
+        return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+    def stats(self) -> dict:
+        return {endpoint: len(samples) for endpoint, samples in self._samples.items()}
+
+
+class HedgeBudget:
+    """
+    Hedge isteklerinin ek yükünü sınırlayan jeton kovası: her birincil istek `ratio` jeton ekler,
+    her hedge bir jeton harcar. Uzun vadede hedge sayısı birincil isteklerin `ratio` katını geçemez.
+    """
+
+    def __init__(self, ratio: float = 0.1, burst: float = 5.0):
+        self.ratio = ratio
+        self.burst = burst
+        self.tokens = 0.0
+        self.primaries = 0
+        self.hedges = 0
+        self.denied = 0
+
+    def deposit(self):
+        self.primaries += 1
+        self.tokens = min(self.burst, self.tokens + self.ratio)
+
+    def try_spend(self) -> bool:
+        if self.tokens < 1.0:
+            self.denied += 1
+            return False
+        self.tokens -= 1.0
+        self.hedges += 1
+        return True
+
+    def stats(self) -> dict:
+        return {
+            "ratio": self.ratio,
+            "tokens": round(self.tokens, 3),
+            "primaries": self.primaries,
+            "hedges": self.hedges,
+            "denied": self.denied,
+            "extra_load": self.hedges / self.primaries if self.primaries else 0.0,
+        }
+
+
+class HedgePolicy:
+    """
+    Bir üretim, endpoint'in son gecikmelerinin `percentile` yüzdeliğine kadar bitmezse ikinci bir
+    istek (mümkünse başka backend'e) gönderilir; ilk geçerli sonuç alınır, diğeri iptal edilir.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 95.0,
+        budget_ratio: float = 0.1,
+        min_samples: int = 20,
+        min_delay: float = 0.5,
+        window: int = 200,
+    ):
+        if not 0 < percentile < 100:
+            raise ValueError("Hedge yüzdeliği 0 ile 100 arasında olmalı")
+        self.percentile = percentile
+        self.min_delay = min_delay
+        self.tracker = LatencyTracker(window=window, min_samples=min_samples)
+        self.budget = HedgeBudget(ratio=budget_ratio)
+        self._outcomes: Dict[str, Dict[str, int]] = {}
+
+    def delay(self, endpoint: str) -> Optional[float]:
+        """
+        Hedge isteğinin gönderileceği süre; ölçüm yetersizse None (hedge yapılmaz)
+        """
+        value = self.tracker.percentile(endpoint, self.percentile)
+        return None if value is None else max(self.min_delay, value)
+
+    def record_outcome(self, endpoint: str, outcome: str):
+        counters = self._outcomes.setdefault(endpoint, {})
+        counters[outcome] = counters.get(outcome, 0) + 1
+
+    def stats(self) -> dict:
+        return {
+            "percentile": self.percentile,
+            "delays": {endpoint: self.delay(endpoint) for endpoint in self.tracker.stats()},
+            "samples": self.tracker.stats(),
+            "budget": self.budget.stats(),
+            "outcomes": {endpoint: dict(counters) for endpoint, counters in self._outcomes.items()},
+        }
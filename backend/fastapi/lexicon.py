@@ -0,0 +1,54 @@
+import os
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Tuple
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data")
+LEXICON_PATH = os.path.join(DATA_DIR, "lexicon_tr.tsv")
+SPELLING_PAIRS_PATH = os.path.join(DATA_DIR, "spelling_pairs.tsv")
+
+
+class LexiconEntry(NamedTuple):
+    word: str
+    band: int  # 1 = çok yaygın, 2 = yaygın, 3 = az yaygın
+    topics: Tuple[str, ...]
+
+
+class SpellingPair(NamedTuple):
+    correct: str
+    wrong: str
+    confusion: str  # Karıştırılan harf çifti, örn. "b/p"
+
+
+def iter_lexicon(path: str = LEXICON_PATH) -> Iterator[LexiconEntry]:
+    """
+    Kelime listesini bellekte tutmadan satır satır okur (büyük listelerden indeks kurmak için)
+    """
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            word, band, topics = (line.rstrip("\n").split("\t") + ["", ""])[:3]
+            yield LexiconEntry(word, int(band or 2), tuple(t for t in topics.split(",") if t))
+
+
+@lru_cache(maxsize=None)
+def load_lexicon(path: str = LEXICON_PATH) -> List[LexiconEntry]:
+    """
+    Paketle gelen Türkçe kelime listesini bir kez okuyup önbellekte tutar
+    """
+    return list(iter_lexicon(path))
+
+
+@lru_cache(maxsize=None)
+def load_spelling_pairs(path: str = SPELLING_PAIRS_PATH) -> List[SpellingPair]:
+    """
+    Doğru/yanlış yazım çiftlerini bir kez okuyup önbellekte tutar
+    """
+    pairs = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip() or line.startswith("#"):
+                continue
+            correct, wrong, confusion = line.rstrip("\n").split("\t")[:3]
+            pairs.append(SpellingPair(correct, wrong, confusion))
+    return pairs
@@ -0,0 +1,390 @@
+import argparse
+import hashlib
+import json
+import logging
+import os
+import random
+import shutil
+from collections import OrderedDict
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+import numpy as np
+try:
+    import fcntl
+except ImportError:  # Windows: kilit yok, indeks tek süreçte kurulmalı
+    fcntl = None
+from lexicon import DATA_DIR, LEXICON_PATH, iter_lexicon
+from turkish_phonology import syllables_of, turkish_casefold
+
+logger = logging.getLogger(__name__)
+
+LEXICON_INDEX_DIR = os.path.join(DATA_DIR, "lexicon_index")
+INDEX_VERSION = 1
+
+# Sütun adı -> dosya; hepsi .npy olarak yazılır ve np.load(mmap_mode="r") ile ayrıştırılmadan açılır
+COLUMNS = (
+    "words",  # Tüm kelimelerin art arda UTF-8 baytları (uint8)
+    "offsets",  # i. kelime words[offsets[i]:offsets[i + 1]] (int64, n + 1)
+    "rank",  # Sıklık sırası; 0 en yaygın (int32)
+    "band",  # Sıklık bandı: 1 = çok yaygın, 2 = yaygın, 3 = az yaygın (uint8)
+    "length",  # Harf sayısı (uint8)
+    "syllable_count",  # Hece sayısı (uint8)
+    "syllables",  # Hece kimlikleri, sabit genişlikte ve -1 dolgulu (int32, n x width)
+    "topics",  # Konu bit maskesi (uint64)
+    "hashes",  # Kelime özetleri, sıralı (uint64)
+    "hash_rows",  # hashes ile aynı sırada kelime satırları (int32)
+)
+
+# Kullanıcının serbest metnindeki (zorluk alanı, hedef, sevdiği oyunlar) ifadeler -> sözlük konusu.
+# Konu adının kendisi de her zaman eşleşir.
+TOPIC_KEYWORDS = {
+    "hayvanlar": ("hayvan",),
+    "doga": ("doğa", "bitki", "orman", "çevre"),
+    "muzik": ("müzik", "şarkı", "enstrüman"),
+    "spor": ("spor", "futbol", "basketbol", "voleybol", "yüzme"),
+    "teknoloji": ("teknoloji", "bilgisayar", "robot", "kodlama", "yazılım"),
+    "bilim": ("bilim", "deney", "uzay"),
+    "sanat": ("sanat", "resim", "çizim", "tiyatro", "sinema"),
+    "yemek": ("yemek", "mutfak"),
+    "seyahat": ("seyahat", "gezi", "tatil"),
+    "okul": ("okul",),
+    "meslek": ("meslek", "kariyer"),
+    "duygu": ("duygu",),
+    "aile": ("aile",),
+}
+
+Bands = Union[int, Sequence[int], None]
+
+
+def _word_hash(key: str) -> int:
+    return int.from_bytes(hashlib.blake2b(key.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _source_signature(source: str) -> Optional[dict]:
+    try:
+        stat = os.stat(source)
+    except OSError:
+        return None
+    return {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+
+
+def build_lexicon_index(source: str = LEXICON_PATH, directory: str = LEXICON_INDEX_DIR, width: int = 8) -> str:
+    """
+    TSV kelime listesinden sütun dosyalarını üretir. Kelimeler (band, dosya sırası) ile sıralanır, böylece
+    satır numarası sıklık sırasıdır. Dosyalar geçici dizine yazılıp tek adımda yerine taşınır.
+    """
+    words: List[str] = []
+    bands: List[int] = []
+    entry_topics: List[Tuple[str, ...]] = []
+    seen = set()
+    for entry in iter_lexicon(source):
+        key = turkish_casefold(entry.word.strip())
+        if not key or key in seen:
+            continue
+        seen.add(key)
+        words.append(entry.word.strip())
+        bands.append(entry.band)
+        entry_topics.append(entry.topics)
+    if not words:
+        raise ValueError(f"Sözlükte kelime yok: {source}")
+
+    order = sorted(range(len(words)), key=bands.__getitem__)
+    words = [words[i] for i in order]
+    bands = [bands[i] for i in order]
+    entry_topics = [entry_topics[i] for i in order]
+    count = len(words)
+
+    topic_names = sorted({topic for topics in entry_topics for topic in topics})
+    if len(topic_names) > 64:
+        raise ValueError(f"En fazla 64 konu desteklenir, sözlükte {len(topic_names)} konu var")
+    topic_bits = {topic: 1 << i for i, topic in enumerate(topic_names)}
+
+    encoded = [word.encode("utf-8") for word in words]
+    offsets = np.zeros(count + 1, dtype=np.int64)
+    np.cumsum([len(data) for data in encoded], out=offsets[1:])
+
+    vocabulary: Dict[str, int] = {}
+    syllables = np.full((count, width), -1, dtype=np.int32)
+    syllable_count = np.zeros(count, dtype=np.uint8)
+    for row, word in enumerate(words):
+        parts = syllables_of(word)
+        ids = [vocabulary.setdefault(part, len(vocabulary)) for part in parts][:width]
+        syllables[row, :len(ids)] = ids
+        syllable_count[row] = min(len(parts), 255)
+
+    hashes = np.fromiter((_word_hash(turkish_casefold(word)) for word in words), dtype=np.uint64, count=count)
+    hash_order = np.argsort(hashes, kind="stable")
+    columns = {
+        "words": np.frombuffer(b"".join(encoded), dtype=np.uint8),
+        "offsets": offsets,
+        "rank": np.arange(count, dtype=np.int32),
+        "band": np.array(bands, dtype=np.uint8),
+        "length": np.fromiter((min(len(turkish_casefold(word)), 255) for word in words), dtype=np.uint8, count=count),
+        "syllable_count": syllable_count,
+        "syllables": syllables,
+        "topics": np.fromiter(
+            (sum(topic_bits[topic] for topic in set(topics)) for topics in entry_topics), dtype=np.uint64, count=count
+        ),
+        "hashes": hashes[hash_order],
+        "hash_rows": hash_order.astype(np.int32),
+    }
+    meta = {
+        "version": INDEX_VERSION,
+        "count": count,
+        "width": width,
+        "topics": topic_names,
+        "syllables": sorted(vocabulary, key=vocabulary.get),
+        "source": _source_signature(source),
+    }
+
+    directory = os.path.abspath(directory)
+    staging = f"{directory}.tmp-{os.getpid()}"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(staging)
+    for name in COLUMNS:
+        np.save(os.path.join(staging, f"{name}.npy"), columns[name])
+    # meta.json en son yazılır; yarım kalmış bir indeks hiçbir zaman geçerli görünmez
+    with open(os.path.join(staging, "meta.json"), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False)
+    previous = f"{directory}.old-{os.getpid()}"
+    if os.path.exists(directory):
+        os.replace(directory, previous)
+    os.replace(staging, directory)
+    shutil.rmtree(previous, ignore_errors=True)
+    return directory
+
+
+@contextmanager
+def index_lock(directory: str):
+    """
+    İndeks dizini için süreçler arası dosya kilidi. Birden fazla uvicorn işçisi aynı anda açtığında
+    indeksi yalnızca biri kurar; diğerleri bekler ve kurulmuş indeksi açar.
+    """
+    directory = os.path.abspath(directory)
+    os.makedirs(os.path.dirname(directory), exist_ok=True)
+    with open(f"{directory}.lock", "w") as lock:
+        if fcntl is not None:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock, fcntl.LOCK_UN)
+
+
+def topics_for_text(text: str, topics: Iterable[str]) -> Tuple[str, ...]:
+    """
+    Serbest metinde geçen konular; kısa ifadeler tam kelime, diğerleri ek almış halleriyle de eşleşir
+    ("hayvanları" -> hayvanlar, "evet" -> ev değil)
+    """
+    tokens = set(turkish_casefold(text).replace(",", " ").split())
+    found = []
+    for topic in topics:
+        keywords = {turkish_casefold(keyword) for keyword in TOPIC_KEYWORDS.get(topic, ())} | {topic}
+        if any(token == keyword or (len(keyword) >= 4 and token.startswith(keyword)) for keyword in keywords for token in tokens):
+            found.append(topic)
+    return tuple(found)
+
+
+class LexiconStore:
+    """
+    Sütun dosyalarından oluşan sözlük indeksi. Dosyalar bellek eşlemeli açıldığı için açılış süresi ve
+    bellek kullanımı kelime sayısından bağımsızdır; yalnızca sorguların dokunduğu sayfalar belleğe gelir.
+
+    - Filtreli örnekleme (uzunluk, konu, sıklık bandı): filtre sonucu satırlar bir kez vektörel
+      olarak hesaplanır ve LRU ile saklanır, sonraki örneklemeler O(istenen kelime sayısı)dır
+    - Kelime doğrulama: sıralı özet dizisinde ikili arama, O(log n)
+    """
+
+    def __init__(self, directory: str = LEXICON_INDEX_DIR, max_filters: int = 256):
+        self.directory = directory
+        with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+            self.meta = json.load(f)
+        if self.meta.get("version") != INDEX_VERSION:
+            raise ValueError(f"Desteklenmeyen sözlük indeksi sürümü: {self.meta.get('version')}")
+        # np.memmap alt sınıfı her işlemde ek yük getirir; aynı eşlemeye düz ndarray görünümü olarak erişilir
+        self.columns = {
+            name: np.asarray(np.load(os.path.join(directory, f"{name}.npy"), mmap_mode="r")) for name in COLUMNS
+        }
+        self._words = memoryview(self.columns["words"])
+        self.topics: List[str] = self.meta["topics"]
+        self._topic_bits = {topic: 1 << i for i, topic in enumerate(self.topics)}
+        self._syllable_index: Optional[Dict[str, int]] = None
+        # Örneklemede aynı kelimeler tekrar tekrar karşılaştırıldığı için normalize hali önbelleğe alınır
+        self._key = lru_cache(maxsize=65536)(turkish_casefold)
+        self.max_filters = max_filters
+        self._filters: "OrderedDict[tuple, np.ndarray]" = OrderedDict()
+        self._counters = {"lookups": 0, "samples": 0, "filter_builds": 0}
+
+    def __len__(self) -> int:
+        return self.meta["count"]
+
+    def word(self, row: int) -> str:
+        offsets = self.columns["offsets"]
+        return str(self._words[offsets[row]:offsets[row + 1]], "utf-8")
+
+    def lookup(self, word: str) -> Optional[int]:
+        """
+        Kelimenin satırı; büyük harf ve şapka farkı gözetilmez, sözlükte yoksa None
+        """
+        self._counters["lookups"] += 1
+        key = turkish_casefold(word.strip())
+        if not key:
+            return None
+        hashes = self.columns["hashes"]
+        target = np.uint64(_word_hash(key))
+        position = int(np.searchsorted(hashes, target))
+        while position < len(hashes) and hashes[position] == target:
+            row = int(self.columns["hash_rows"][position])
+            if turkish_casefold(self.word(row)) == key:
+                return row
+            position += 1
+        return None
+
+    def lookup_many(self, keys: Sequence[str]) -> np.ndarray:
+        """
+        Normalize edilmiş (turkish_casefold) anahtarların satırları tek bir searchsorted ile; yoksa -1.
+        Toplu istatistikler için özet eşitliği yeterli kabul edilir (64 bit özette çakışma ihmal edilebilir).
+        """
+        if not keys:
+            return np.zeros(0, dtype=np.int64)
+        hashes = self.columns["hashes"]
+        targets = np.fromiter((_word_hash(key) for key in keys), dtype=np.uint64, count=len(keys))
+        positions = np.minimum(np.searchsorted(hashes, targets), len(hashes) - 1)
+        found = hashes[positions] == targets
+        return np.where(found, self.columns["hash_rows"][positions], -1)
+
+    def contains(self, word: str) -> bool:
+        return self.lookup(word) is not None
+
+    def features(self, row: int) -> dict:
+        syllables = self.meta["syllables"]
+        bits = int(self.columns["topics"][row])
+        return {
+            "word": self.word(row),
+            "rank": int(self.columns["rank"][row]),
+            "band": int(self.columns["band"][row]),
+            "length": int(self.columns["length"][row]),
+            "syllables": [syllables[i] for i in self.columns["syllables"][row] if i >= 0],
+            "syllable_count": int(self.columns["syllable_count"][row]),
+            "topics": [topic for topic, bit in self._topic_bits.items() if bits & bit],
+        }
+
+    def syllable_id(self, syllable: str) -> int:
+        """
+        Hecenin indeksteki kimliği; hiç görülmemişse -2 (dolguyla da eşleşmez)
+        """
+        if self._syllable_index is None:
+            self._syllable_index = {syllable: i for i, syllable in enumerate(self.meta["syllables"])}
+        return self._syllable_index.get(turkish_casefold(syllable), -2)
+
+    def candidates(self, length: Optional[int] = None, topics: Optional[Iterable[str]] = None, band: Bands = None) -> np.ndarray:
+        """
+        Filtrelere uyan satırlar (sıklık sırasıyla). Konulardan herhangi birini taşıyan kelimeler eşleşir;
+        indekste olmayan konular yok sayılır, hiçbiri yoksa sonuç boştur.
+        """
+        topic_key = tuple(sorted(set(topics))) if topics else ()
+        band_key = (band,) if isinstance(band, int) else tuple(sorted(set(band or ())))
+        key = (length, topic_key, band_key)
+        rows = self._filters.get(key)
+        if rows is not None:
+            self._filters.move_to_end(key)
+            return rows
+
+        mask = np.ones(len(self), dtype=bool)
+        if length is not None:
+            mask &= self.columns["length"] == length
+        if topic_key:
+            bits = sum(self._topic_bits.get(topic, 0) for topic in topic_key)
+            mask &= (self.columns["topics"] & np.uint64(bits)) != 0
+        if band_key:
+            mask &= np.isin(self.columns["band"], band_key)
+        rows = np.flatnonzero(mask).astype(np.int32)
+        self._counters["filter_builds"] += 1
+        self._filters[key] = rows
+        while len(self._filters) > self.max_filters:
+            self._filters.popitem(last=False)
+        return rows
+
+    def sample(
+        self,
+        count: int,
+        length: Optional[int] = None,
+        topics: Optional[Iterable[str]] = None,
+        band: Bands = None,
+        exclude: Iterable[str] = (),
+        rng: Optional[random.Random] = None,
+    ) -> List[str]:
+        """
+        Filtrelere uyan, `exclude` içinde olmayan en fazla `count` farklı kelime (yerine koymadan rastgele)
+        """
+        self._counters["samples"] += 1
+        rng = rng or random
+        rows = self.candidates(length, topics, band)
+        excluded = {self._key(word) for word in exclude}
+        words: List[str] = []
+        if len(rows) < 2 * (count + len(excluded)):
+            # Az aday: hepsi karıştırılıp sırayla denenir
+            picks = rng.sample(range(len(rows)), len(rows))
+        else:
+            # Çok aday: dışlananlar adayların yarısından az olduğundan reddetmeli seçim birkaç denemede biter
+            picks = iter(lambda: rng.randrange(len(rows)), None)
+        tried = set()
+        for pick in picks:
+            if pick in tried:
+                continue
+            tried.add(pick)
+            word = self.word(int(rows[pick]))
+            key = self._key(word)
+            if key not in excluded:
+                excluded.add(key)
+                words.append(word)
+                if len(words) == count:
+                    break
+        return words
+
+    def topics_for(self, text: str) -> Tuple[str, ...]:
+        return topics_for_text(text, self.topics)
+
+    def stats(self) -> dict:
+        return {
+            "words": len(self),
+            "topics": len(self.topics),
+            "cached_filters": len(self._filters),
+            **self._counters,
+        }
+
+
+def open_lexicon_store(directory: Optional[str] = None, source: str = LEXICON_PATH) -> LexiconStore:
+    """
+    İndeksi açar; indeks yoksa ya da kaynak TSV indeks kurulduktan sonra değiştiyse önce yeniden kurar.
+    Kaynak dosya olmadan (yalnızca indeksin dağıtıldığı kurulumlarda) mevcut indeks olduğu gibi açılır.
+    Kontrol, kurulum ve açılış kilit altında yapılır; bir işçi diğerinin açmakta veya kurmakta olduğu
+    dizini yerinden taşıyamaz. Docker imajında indeks derleme sırasında kurulduğundan çalışma zamanında
+    normalde yeniden kurulmaz.
+    """
+    directory = directory or LEXICON_INDEX_DIR
+    with index_lock(directory):
+        signature = _source_signature(source)
+        try:
+            with open(os.path.join(directory, "meta.json"), encoding="utf-8") as f:
+                meta = json.load(f)
+        except (OSError, ValueError):
+            meta = None
+        stale = meta is None or meta.get("version") != INDEX_VERSION or (signature is not None and meta.get("source") != signature)
+        if stale:
+            logger.info("📚 Sözlük indeksi kuruluyor: %s", directory)
+            build_lexicon_index(source, directory)
+        return LexiconStore(directory)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TSV kelime listesinden bellek eşlemeli sözlük indeksi kurar")
+    parser.add_argument("--source", default=LEXICON_PATH)
+    parser.add_argument("--out", default=LEXICON_INDEX_DIR)
+    parser.add_argument("--width", type=int, default=8, help="Kelime başına saklanan en fazla hece kimliği")
+    args = parser.parse_args()
+    with index_lock(args.out):
+        path = build_lexicon_index(args.source, args.out, args.width)
+    print(f"{len(LexiconStore(path))} kelime -> {path}")
@@ -1,144 +1,893 @@
+import asyncio
+import copy
 import httpx
+import hashlib
 import json
-from typing import List
-from models import UserInfo, Question, SpellingQuestion
+import time
+import logging
+import re
+import metrics
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
+from models import UserInfo, Question, SpellingQuestion, UserStatistics
+from admission import OverloadedError, BACKGROUND_PRIORITY
+from backends import BackendPool, NoBackendAvailableError, OllamaBackend
+from coalescing import SingleFlight
+from dedup import ContentDeduplicator
+from generation_stats import GenerationStats
+from hedging import HedgePolicy
+from lexicon import SpellingPair
+from lexicon_store import open_lexicon_store
+from logging_setup import log_payload
+from phonological_engine import PhonologicalEngine
+from planner import AnalysisRenderer, RoadmapPlanner
+from readability import ReadabilityScorer, ScoredParagraphPool, level_for
+from prompts import PARAGRAPH_LEVEL_PROMPT, PARTIAL_AVOID_PROMPT, PARTIAL_ITEM_LABELS, PARTIAL_PROMPT, POLISH_PROMPT, SYSTEM_PROMPTS
+from spelling_engine import SpellingEngine
+from structured_output import InvalidGenerationError, is_valid_output, parse_document, parse_items, response_format
+from stream_parser import IncrementalJSONParser, SentenceStream, split_sentences
+from text_utils import format_rate, normalize_text
+from turkish_phonology import match_targets, turkish_casefold
+from word_list_engine import WORD_COUNT, WORD_LENGTH, WordListEngine
+
+logger = logging.getLogger(__name__)
+
+# Endpoint bazında Ollama okuma zaman aşımları (saniye)
+DEFAULT_TIMEOUTS = {
+    "phonological": 60.0,
+    "spelling": 120.0,
+    "word_list": 60.0,
+    "paragraph": 90.0,
+    "analysis": 90.0,
+    "roadmap": 90.0,
+}
+
+# Llama eksik/boş yanıt verdiğinde kullanılan varsayılan içerikler
+DEFAULT_PARAGRAPHS = [
+    "Ali kitap okumaya karar verdi. Kütüphaneye gitti ve bir kitap seçti. Saatlerce okuyarak hikayeye daldı. Kitabı bitirdiğinde çok mutlu oldu.",
+    "Ayşe resim yapmaya başladı. Renkli boyalarla tuvaline hayat verdi. Farklı teknikler deneyerek yeteneğini geliştirdi. Sonunda harika bir tablo ortaya çıkardı.",
+    "Mehmet bisiklet sürmeyi öğrendi. Parkta pratik yaparak denge kazandı. Zamanla hızlandı ve zorlu parkurları aşmaya başladı. Artık bisiklet sürmek onun en sevdiği aktivite oldu.",
+    "Zeynep yemek pişirmeye karar verdi. Malzemeleri hazırlayarak mutfağa geçti. Adım adım tarifi takip ederek lezzetli bir yemek hazırladı. Ailesi yemeği çok beğendi ve Zeynep gurur duydu.",
+    "Can müzik öğrenmeye başladı. Gitarını eline alarak pratik yapmaya başladı. Günlerce çalışarak melodileri öğrendi. Artık sevdiği şarkıları çalabiliyor ve çok mutlu."
+]
+
+# Arka plan üretimlerinde (ör. içerik havuzu) birleştirmeyi kapatmak ve önceliği düşürmek için
+_coalescing_enabled: ContextVar[bool] = ContextVar("coalescing_enabled", default=True)
+_priority_override: ContextVar[Optional[int]] = ContextVar("priority_override", default=None)
+
+# Soru metnindeki hedef hece: "Hedef hece 'ka' içeren kelimeleri seç:"
+TARGET_PATTERN = re.compile(r"'([^']+)'")
+
+# Llama'nın ürettiği kelime tek parça ve yalnızca Türkçe harflerden oluşmalı
+WORD_PATTERN = re.compile(r"[a-zçğıöşüâîû]+")
+
+DEFAULT_ANALYSIS = "Kullanıcının performansı değerlendirildi. Düzenli çalışma ile gelişim gösterilebilir. Güçlü yönleri desteklenmeli, zayıf alanlar üzerinde odaklanılmalı. Motivasyon sürekli yüksek tutulmalıdır."
+
+DEFAULT_ROADMAP = {
+    "daily_plans": [
+        {"day": 1, "phonological_games": 2, "spelling_games": 1, "word_exercises": 1, "reading_time": 10},
+        {"day": 2, "phonological_games": 2, "spelling_games": 1, "word_exercises": 1, "reading_time": 10},
+        {"day": 3, "phonological_games": 3, "spelling_games": 2, "word_exercises": 1, "reading_time": 15},
+        {"day": 4, "phonological_games": 2, "spelling_games": 2, "word_exercises": 2, "reading_time": 15},
+        {"day": 5, "phonological_games": 3, "spelling_games": 2, "word_exercises": 2, "reading_time": 20},
+        {"day": 6, "phonological_games": 2, "spelling_games": 1, "word_exercises": 1, "reading_time": 10},
+        {"day": 7, "phonological_games": 1, "spelling_games": 1, "word_exercises": 1, "reading_time": 5}
+    ],
+    "total_duration_days": 7,
+    "focus_areas": ["Hece tanıma", "Yazım doğruluğu", "Kelime dağarcığı"]
+}
+
+
+class LlamaUnavailableError(Exception):
+    """
+    Ollama'ya ulaşılamıyor (bağlantı hatası, 5xx veya tüm devreler açık); çağıran yedek içerik sunabilir
+    """
+
 
 class LlamaService:
-    def __init__(self, llama_url: str = "http://172.30.48.23:11434"):
-        self.llama_url = llama_url
+    def __init__(
+        self,
+        llama_url: str = "http://172.30.48.23:11434",
+        llama_urls: Optional[List[str]] = None,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        connect_timeout: float = 5.0,
+        http2: bool = False,
+        timeouts: Optional[Dict[str, float]] = None,
+        coalesce_window: float = 0.0,
+        max_concurrency: int = 4,
+        max_queue_depth: int = 64,
+        retry_after: int = 5,
+        balancing_strategy: str = "least_outstanding",
+        max_retries: int = 1,
+        failure_threshold: int = 3,
+        eject_duration: float = 30.0,
+        health_check_interval: float = 10.0,
+        phonological_mode: str = "local",
+        spelling_mode: str = "local",
+        roadmap_mode: str = "local",
+        analysis_mode: str = "local",
+        word_list_mode: str = "local",
+        lexicon_index_dir: Optional[str] = None,
+        word_recent_window: int = 50,
+        word_validation: str = "shape",
+        readability_unknown_rare: bool = False,
+        dedup_enabled: bool = True,
+        dedup_threshold: float = 0.5,
+        dedup_history: int = 50,
+        dedup_attempts: int = 3,
+        keep_alive: str = "30m",
+        structured_format: bool = True,
+        repair_rounds: int = 1,
+        hedge_percentile: float = 95.0,
+        hedge_budget: float = 0.0,
+        hedge_min_samples: int = 20,
+    ):
         self.model_name = "llama3:8b"#'ahmets/ytu_cosmos'  # Mevcut model adı
-    
-    async def generate_phonological_game(self, user_info: UserInfo) -> List[Question]:
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.connect_timeout = connect_timeout
+        self.http2 = http2
+        self.timeouts = {**DEFAULT_TIMEOUTS, **(timeouts or {})}
+        self._client: Optional[httpx.AsyncClient] = None
+        # Modelin istekler arasında Ollama belleğinde kalma süresi (ör. "30m", "-1" süresiz)
+        self.keep_alive = keep_alive
+        # True: Ollama'ya models.py'den türetilen JSON Schema gönderilir, False: yalnızca "json" (eski Ollama sürümleri)
+        self.structured_format = structured_format
+        # Geçersiz/eksik öğeler için en fazla kaç kez kısmi yeniden üretim yapılacağı
+        self.repair_rounds = repair_rounds
+        self.generation_stats = GenerationStats()
+        # Aynı prompt ile eşzamanlı gelen istekler tek Ollama çağrısını paylaşır
+        self.single_flight = SingleFlight(window=coalesce_window)
+        # Her Ollama sunucusu kendi öncelikli kuyruğuna sahiptir; istekler aralarında dengelenir
+        self.backends = BackendPool(
+            llama_urls or [llama_url],
+            max_concurrency=max_concurrency,
+            max_queue_depth=max_queue_depth,
+            retry_after=retry_after,
+            strategy=balancing_strategy,
+            failure_threshold=failure_threshold,
+            eject_duration=eject_duration,
+            health_check_interval=health_check_interval,
+        )
+        # Üretimler yan etkisiz olduğundan başarısız backend'de başka bir backend ile tekrar denenir
+        self.max_retries = max_retries
+        # Yavaş kalan üretimler için ikinci istek; hedge_budget ek yükün birincil isteklere oranıdır (0: kapalı)
+        self.hedging = HedgePolicy(
+            percentile=hedge_percentile, budget_ratio=hedge_budget, min_samples=hedge_min_samples
+        ) if hedge_budget > 0 else None
+        # "local": Hece Avcısı soruları sözlükten üretilir, "llm": eski Llama akışı
+        if phonological_mode not in ("local", "llm"):
+            raise ValueError(f"Bilinmeyen fonolojik oyun modu: {phonological_mode}")
+        self.phonological_mode = phonological_mode
+        # "llm" modunda da Llama'ya ulaşılamadığında yedek içerik için kullanılır
+        self.phonological_engine = PhonologicalEngine()
+        # Yazım oyununda "llm" modu da çiftleri yerel listeden örnekler, Llama yalnızca soruları dizer
+        if spelling_mode not in ("local", "llm"):
+            raise ValueError(f"Bilinmeyen yazım oyunu modu: {spelling_mode}")
+        self.spelling_mode = spelling_mode
+        self.spelling_engine = SpellingEngine()
+        # "local": plan kurallarla hesaplanır, "llm": 7 günlük plan Llama'dan (30 günlük plan her zaman yerel)
+        if roadmap_mode not in ("local", "llm"):
+            raise ValueError(f"Bilinmeyen yol haritası modu: {roadmap_mode}")
+        self.roadmap_mode = roadmap_mode
+        self.roadmap_planner = RoadmapPlanner()
+        # "local": şablonla analiz, "polish": şablon taslağı Llama'ya akıcılaştırılır, "llm": eski Llama akışı
+        if analysis_mode not in ("local", "llm", "polish"):
+            raise ValueError(f"Bilinmeyen analiz modu: {analysis_mode}")
+        self.analysis_mode = analysis_mode
+        self.analysis_renderer = AnalysisRenderer()
+        # Bellek eşlemeli sözlük indeksi: kelime doğrulama ve filtreli örnekleme
+        self.lexicon_store = open_lexicon_store(lexicon_index_dir)
+        # "local": kelimeler sözlükten seçilir, "llm": Llama üretir, geçersiz kelimeler sözlükten tamamlanır
+        if word_list_mode not in ("local", "llm"):
+            raise ValueError(f"Bilinmeyen kelime listesi modu: {word_list_mode}")
+        self.word_list_mode = word_list_mode
+        self.word_list_engine = WordListEngine(self.lexicon_store, recent=word_recent_window)
+        # "shape": Llama kelimeleri biçim (tek kelime, 6 harf, tekrar yok) açısından, "lexicon": ayrıca sözlükte var mı diye kontrol edilir
+        if word_validation not in ("shape", "lexicon"):
+            raise ValueError(f"Bilinmeyen kelime doğrulama modu: {word_validation}")
+        self.word_validation = word_validation
+        # Paragraflar yaş grubunun okuma düzeyine göre puanlanır; uymayanlar tek tek yeniden üretilir,
+        # yine de eksik kalırsa daha önce düzeye uyduğu doğrulanmış paragraflardan tamamlanır
+        self.readability = ReadabilityScorer(self.lexicon_store, unknown_rare=readability_unknown_rare)
+        self.paragraph_pool = ScoredParagraphPool(self.readability, DEFAULT_PARAGRAPHS)
+        # Öğrenci başına ve ortak (havuz/kimliksiz) geçmişte yakın tekrar kontrolü: Llama öğeleri tek tek
+        # yeniden üretilir, yerel oyunlarda `dedup_attempts` aday arasından en az tekrar içereni seçilir
+        self.dedup = ContentDeduplicator(threshold=dedup_threshold, history=dedup_history) if dedup_enabled else None
+        self.dedup_attempts = max(1, dedup_attempts)
+
+    @property
+    def local_endpoints(self) -> set:
         """
-        Kullanıcı bilgilerine göre Fonolojik (Hece Avcısı) oyunu soruları üretir
+        Llama'ya gitmeden yerel olarak üretilen endpoint'ler
         """
-        prompt = self._create_phonological_prompt(user_info)
-        
-        async with httpx.AsyncClient(timeout=60.0) as client:
+        endpoints = set()
+        if self.phonological_mode == "local":
+            endpoints.add("phonological")
+        if self.spelling_mode == "local":
+            endpoints.add("spelling")
+        if self.roadmap_mode == "local":
+            endpoints.add("roadmap")
+        if self.analysis_mode == "local":
+            endpoints.add("analysis")
+        if self.word_list_mode == "local":
+            endpoints.add("word_list")
+        return endpoints
+
+    @staticmethod
+    def is_unavailable(error: Exception) -> bool:
+        """
+        Hata Ollama'ya ulaşılamadığını mı gösteriyor (yedek içerik sunulabilecek durum)
+        """
+        if isinstance(error, (LlamaUnavailableError, NoBackendAvailableError, httpx.RequestError)):
+            return True
+        return isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500
+
+    async def _guard_stream(self, tokens: AsyncIterator[str]) -> AsyncIterator[str]:
+        """
+        Stream sırasında Ollama'ya ulaşılamazsa hatayı LlamaUnavailableError olarak iletir
+        """
+        try:
+            async for token in tokens:
+                yield token
+        except Exception as e:
+            if self.is_unavailable(e) and not isinstance(e, LlamaUnavailableError):
+                raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}") from e
+            raise
+
+    def fallback_content(
+        self,
+        endpoint: str,
+        user_info: Optional[UserInfo] = None,
+        user_statistics: Optional[UserStatistics] = None,
+        days: int = 7,
+        targets: Optional[List[str]] = None,
+        user_id: Optional[str] = None,
+    ):
+        """
+        Ollama kullanılamadığında dönülecek yerel içerik; generate_* metotlarıyla aynı biçimdedir
+        """
+        metrics.DEGRADED_RESPONSES.labels(endpoint).inc()
+        if endpoint == "phonological":
+            return self._least_repeated(user_id, endpoint, lambda: self.phonological_engine.generate_game(user_info, targets=targets))
+        if endpoint == "spelling":
+            return self._least_repeated(user_id, endpoint, lambda: self.spelling_engine.generate_game(user_info, confusions=targets))
+        if endpoint == "word_list":
+            return self._local_word_list(user_info, user_id)
+        if endpoint == "paragraph":
+            return self._pick_paragraphs(user_id, level_for(user_info.age_group) if user_info is not None else "17-24", 5)
+        if endpoint == "analysis":
+            if user_info is not None and user_statistics is not None:
+                return self.analysis_renderer.render(user_info, user_statistics)
+            return DEFAULT_ANALYSIS
+        if endpoint == "roadmap":
+            if user_info is not None:
+                return self.roadmap_planner.plan(user_info, user_statistics, days)
+            return copy.deepcopy(DEFAULT_ROADMAP)
+        raise ValueError(f"Yedek içeriği olmayan endpoint: {endpoint}")
+
+    def unseen_by(self, user_id: Optional[str], endpoint: str) -> Optional[Callable[[list], bool]]:
+        """
+        Hazır bir oyunun (ör. içerik havuzundan) öğrencinin geçmişinde yakın tekrarı yoksa True dönen kontrol
+        """
+        if self.dedup is None or user_id is None:
+            return None
+        return lambda game: not self.dedup.duplicates(user_id, endpoint, game)
+
+    def remember_served(self, user_id: Optional[str], endpoint: str, game: list):
+        """
+        Başka kaynaktan (ör. içerik havuzundan) sunulan oyunu öğrencinin geçmişine ekler
+        """
+        if self.dedup is not None and user_id is not None:
+            self.dedup.remember(user_id, endpoint, game)
+
+    def _unseen(self, user_id: Optional[str], endpoint: str) -> Optional[Callable[[Any], bool]]:
+        """
+        Llama öğeleri için kabul kontrolü: geçmişte veya aynı üretimde yakın tekrarı olan öğe elenir.
+        Geçmişe yalnızca döndürülen öğeler `_remember` ile yazılır.
+        """
+        if self.dedup is None:
+            return None
+        return self.dedup.checker(user_id, endpoint)
+
+    def _remember(self, user_id: Optional[str], endpoint: str, items: list):
+        if self.dedup is not None:
+            self.dedup.remember(user_id, endpoint, items)
+
+    def _least_repeated(self, user_id: Optional[str], endpoint: str, produce: Callable[[], list], items: Callable[[list], list] = list) -> list:
+        """
+        Yerel üretimde en fazla `dedup_attempts` aday oyun üretir ve geçmişte en az yakın tekrarı olanı seçer
+        """
+        if self.dedup is None:
+            return produce()
+        best, best_count = None, 0
+        for _ in range(self.dedup_attempts):
+            game = produce()
+            count = self.dedup.duplicates(user_id, endpoint, items(game))
+            if best is None or count < best_count:
+                best, best_count = game, count
+            if not count:
+                break
+        if best_count:
+            metrics.VALIDATION_FIXUPS.labels(endpoint, "duplicate").inc(best_count)
+        self.dedup.remember(user_id, endpoint, items(best))
+        return best
+
+    def _local_word_list(self, user_info: Optional[UserInfo], user_id: Optional[str]) -> List[str]:
+        words = self._least_repeated(
+            user_id, "word_list", lambda: self.word_list_engine.generate(user_info, user_id, remember=False), lambda words: [words]
+        )
+        self.word_list_engine.remember(user_id, words)
+        return words
+
+    def _pick_paragraphs(self, user_id: Optional[str], level: str, count: int, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        Düzeye uygun havuzdan, öğrencinin geçmişinde yakın tekrarı olmayanları öne alarak paragraf seçer
+        """
+        if self.dedup is None:
+            return self.paragraph_pool.pick(level, count, exclude)
+        picked = self.paragraph_pool.pick(
+            level, count, exclude, accept=lambda paragraph: not self.dedup.is_duplicate(user_id, "paragraph", paragraph)
+        )
+        self.dedup.remember(user_id, "paragraph", picked)
+        return picked
+
+    async def start(self):
+        """
+        Uygulama açılışında paylaşılan (connection pool'lu) HTTP istemcisini oluşturur
+        ve backend sağlık kontrollerini başlatır
+        """
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                limits=self.limits,
+                http2=self.http2,
+                timeout=httpx.Timeout(max(self.timeouts.values()), connect=self.connect_timeout),
+            )
+            self.backends.start(self._client)
+
+    async def close(self):
+        """
+        Uygulama kapanışında sağlık kontrollerini durdurur, HTTP istemcisini ve açık bağlantıları kapatır
+        """
+        await self.backends.close()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _is_retryable(self, error: Exception) -> bool:
+        if isinstance(error, httpx.RequestError):
+            return True
+        return isinstance(error, httpx.HTTPStatusError) and error.response.status_code >= 500
+
+    def without_coalescing(self, generate: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        """
+        Verilen generate_* metodunu istek birleştirme kapalı olarak çalıştıran sarmalayıcı döndürür.
+        Birbirinden farklı içerik beklenen üretimlerde (havuz doldurma gibi) kullanılır.
+        """
+        async def wrapper(*args, **kwargs):
+            token = _coalescing_enabled.set(False)
+            try:
+                return await generate(*args, **kwargs)
+            finally:
+                _coalescing_enabled.reset(token)
+        return wrapper
+
+    def background(self, generate: Callable[..., Awaitable]) -> Callable[..., Awaitable]:
+        """
+        Arka plan üretimleri için sarmalayıcı: birleştirme kapalı ve kuyrukta en düşük öncelik
+        """
+        generate = self.without_coalescing(generate)
+
+        async def wrapper(*args, **kwargs):
+            token = _priority_override.set(BACKGROUND_PRIORITY)
+            try:
+                return await generate(*args, **kwargs)
+            finally:
+                _priority_override.reset(token)
+        return wrapper
+
+    def _game_generator(self, endpoint: str) -> Callable[[UserInfo], Awaitable[list]]:
+        generators = {
+            "phonological": self.generate_phonological_game,
+            "spelling": self.generate_spelling_game,
+            "word_list": self.generate_word_list,
+            "paragraph": self.generate_paragraph,
+        }
+        if endpoint not in generators:
+            raise ValueError(f"Toplu üretim desteklenmeyen endpoint: {endpoint}")
+        return generators[endpoint]
+
+    @staticmethod
+    def _game_signature(game: list) -> str:
+        items = [item.model_dump() if hasattr(item, "model_dump") else item for item in game]
+        return json.dumps(items, ensure_ascii=False, sort_keys=True)
+
+    async def stream_batch(
+        self,
+        endpoint: str,
+        user_info: UserInfo,
+        count: int,
+        exclude: Optional[List[list]] = None,
+    ) -> AsyncIterator[list]:
+        """
+        `count` oyunu eşzamanlı üretir (istek birleştirme kapalı) ve tamamlanan her oyunu hemen verir.
+        Boş veya daha önce verilmiş bir oyunla aynı olan sonuçlar atılıp yerine yenisi üretilir;
+        toplam deneme sayısı `count`un iki katıyla sınırlıdır.
+        """
+        generate = self.without_coalescing(self._game_generator(endpoint))
+        seen = {self._game_signature(game) for game in exclude or []}
+        max_attempts = count * 2
+        attempts = 0
+        produced = 0
+        errors: List[Exception] = []
+        pending = set()
+
+        def launch():
+            nonlocal attempts
+            attempts += 1
+            pending.add(asyncio.ensure_future(generate(user_info)))
+
+        for _ in range(count):
+            launch()
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        # Hatalar tekrar denenmez; backend katmanı zaten yeniden deniyor
+                        errors.append(task.exception())
+                        continue
+                    game = task.result()
+                    signature = self._game_signature(game) if game else None
+                    if signature is not None and signature not in seen:
+                        seen.add(signature)
+                        produced += 1
+                        yield game
+                    elif produced + len(pending) < count and attempts < max_attempts:
+                        logger.warning("⚠️ Toplu üretimde boş/tekrarlanan %s oyunu, yeniden üretiliyor", endpoint)
+                        launch()
+        finally:
+            for task in pending:
+                task.cancel()
+
+        if produced == 0 and errors:
+            raise errors[0]
+        if errors:
+            logger.warning("⚠️ Toplu %s üretiminde %s oyun başarısız oldu, %s oyun döndürüldü", endpoint, len(errors), produced)
+
+    async def generate_batch(
+        self,
+        endpoint: str,
+        user_info: UserInfo,
+        count: int,
+        exclude: Optional[List[list]] = None,
+    ) -> List[list]:
+        """
+        stream_batch sonuçlarını toplayıp liste olarak döndürür
+        """
+        return [game async for game in self.stream_batch(endpoint, user_info, count, exclude)]
+
+    async def _generate(self, endpoint: str, prompt: str, options: dict, count: Optional[int] = None) -> str:
+        """
+        Ollama /api/generate çağrısı yapar. Aynı prompt ve seçeneklerle eşzamanlı gelen çağrılar birleştirilir.
+        `count` verilirse şema öğe listesini bu uzunluğa sabitler (kısmi yeniden üretim).
+        """
+        if not _coalescing_enabled.get():
+            return await self._post_generate(endpoint, prompt, options, count)
+
+        key = hashlib.sha256(
+            json.dumps([endpoint, self.model_name, prompt, options, count], ensure_ascii=False, sort_keys=True).encode("utf-8")
+        ).hexdigest()
+        return await self.single_flight.do(
+            key, lambda: self._post_generate(endpoint, prompt, options, count), group=endpoint
+        )
+
+    async def _generate_items(
+        self,
+        endpoint: str,
+        prompt: str,
+        options: dict,
+        expected: int,
+        items: Optional[list] = None,
+        accept: Optional[Callable[[Any], bool]] = None,
+    ) -> list:
+        """
+        Öğe listesi üreten endpoint'ler için şemalı üretim. Yanıt tek geçişte doğrulanır; eksik veya
+        geçersiz öğeler için oyunun tamamı yerine yalnızca o sayıda öğe yeniden üretilir.
+        `items` verilirse (ör. yarım kalan stream) doğrudan eksikler üretilir. `accept` şemaya uyan
+        ama içerik kontrolünden geçmeyen öğeleri eler; bunlar da tek tek yeniden üretilir.
+        """
+        items = list(items or [])
+        partial = bool(items)
+        rejected = 0
+        for _ in range(self.repair_rounds + (0 if partial else 1)):
+            missing = expected - len(items)
+            if missing <= 0:
+                break
+            if partial:
+                metrics.PARTIAL_REGENERATIONS.labels(endpoint).inc()
+                generated_text = await self._generate(endpoint, self._partial_prompt(endpoint, prompt, missing, items), options, missing)
+            else:
+                generated_text = await self._generate(endpoint, prompt, options)
+            valid, result = parse_items(endpoint, generated_text, missing)
+            metrics.STRUCTURED_OUTPUT.labels(endpoint, result).inc()
+            if result != "valid":
+                logger.warning("⚠️ %s çıktısı şemaya uymuyor (%s): %s/%s geçerli öğe", endpoint, result, len(valid), missing)
+                log_payload(logger, "Generated text", generated_text)
+            if accept is not None:
+                accepted = [item for item in valid if accept(item)]
+                if len(accepted) < len(valid):
+                    rejected += len(valid) - len(accepted)
+                    metrics.VALIDATION_FIXUPS.labels(endpoint, "rejected_item").inc(len(valid) - len(accepted))
+                valid = accepted
+            if partial:
+                metrics.REGENERATED_ITEMS.labels(endpoint).inc(len(valid[:missing]))
+            items.extend(valid[:missing])
+            partial = True
+
+        # Şemaya uyan öğeler yalnızca içerik kontrolünde elendiyse çağıran eksikleri kendisi tamamlar
+        if not items and not rejected:
+            raise InvalidGenerationError(f"{endpoint} için geçerli öğe üretilemedi")
+        return items
+
+    def _partial_prompt(self, endpoint: str, prompt: str, count: int, items: list) -> str:
+        partial_prompt = prompt + PARTIAL_PROMPT.format(count=count, label=PARTIAL_ITEM_LABELS[endpoint])
+        if endpoint == "word_list" and items:
+            # Kelimeler kısa olduğu için tekrarları önlemek adına mevcut olanlar listelenir
+            partial_prompt += PARTIAL_AVOID_PROMPT.format(items=", ".join(items))
+        if endpoint == "paragraph":
+            partial_prompt += PARAGRAPH_LEVEL_PROMPT
+        return partial_prompt
+
+    async def _generate_document(self, endpoint: str, prompt: str, options: dict):
+        """
+        Tek parça yanıtlar (analiz, yol haritası) için şemalı üretim; geçersizse tamamı yeniden üretilir.
+        Hiç geçerli yanıt alınamazsa None döner ve çağıran varsayılan içeriği kullanır.
+        """
+        for _ in range(self.repair_rounds + 1):
+            generated_text = await self._generate(endpoint, prompt, options)
+            document, result = parse_document(endpoint, generated_text)
+            metrics.STRUCTURED_OUTPUT.labels(endpoint, result).inc()
+            if document is not None:
+                return document
+            logger.warning("⚠️ %s çıktısı şemaya uymuyor (%s), yeniden üretiliyor", endpoint, result)
+            log_payload(logger, "Generated text", generated_text)
+        return None
+
+    def _record_generation(self, endpoint: str, response: dict):
+        self.generation_stats.record(endpoint, response)
+        metrics.observe_generation(endpoint, response)
+
+    def _request_body(self, endpoint: str, prompt: str, options: dict, stream: bool, count: Optional[int] = None) -> dict:
+        """
+        Ollama /api/generate gövdesi: sabit kurallar `system` olarak, kullanıcıya özel kısım `prompt` olarak gider.
+        Sabit önek ve keep_alive sayesinde model bellekte kalır ve önek değerlendirmesi tekrar kullanılabilir.
+        `format` olarak verilen JSON Schema, çıktıyı üretim sırasında yanıt modeline uymaya zorlar.
+        """
+        return {
+            "model": self.model_name,
+            "system": SYSTEM_PROMPTS[endpoint],
+            "prompt": prompt,
+            "format": response_format(endpoint, count) if self.structured_format else "json",
+            "stream": stream,
+            "keep_alive": self.keep_alive,
+            "options": options
+        }
+
+    async def _post_generate(self, endpoint: str, prompt: str, options: dict, count: Optional[int] = None) -> str:
+        """
+        Seçilen backend'e Ollama /api/generate çağrısı yapar; bağlantı veya 5xx hatasında başka backend dener
+        """
+        if self._client is None:
+            # start() çağrılmadan kullanılırsa (ör. script içinden) istemciyi tembel oluştur
+            await self.start()
+
+        tried: List[OllamaBackend] = []
+        while True:
+            backend = self.backends.pick(exclude=tried)
+            tried.append(backend)
+            try:
+                if self.hedging is None or _priority_override.get() == BACKGROUND_PRIORITY:
+                    return await self._post_to_backend(backend, endpoint, prompt, options, count)
+                return await self._hedged_post(backend, tried, endpoint, prompt, options, count)
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                if (not self._is_retryable(e) or len(tried) > self.max_retries
+                        or len(tried) >= len(self.backends.backends)):
+                    raise
+                logger.warning("⚠️ %s başarısız (%s), başka backend deneniyor", backend.url, e)
+
+    async def _hedged_post(
+        self,
+        primary: OllamaBackend,
+        tried: List[OllamaBackend],
+        endpoint: str,
+        prompt: str,
+        options: dict,
+        count: Optional[int] = None,
+    ) -> str:
+        """
+        Birincil istek endpoint'in gecikme yüzdeliğine kadar bitmezse (ve bütçe izin verirse) ikinci bir
+        istek gönderir; şemaya uyan ilk sonuç alınır, diğer istek iptal edilir ve Ollama üretimi keser.
+        """
+        hedging = self.hedging
+        hedging.budget.deposit()
+        primary_task = asyncio.ensure_future(self._post_to_backend(primary, endpoint, prompt, options, count))
+        tasks = [primary_task]
+        # Çağıran iptal edilirse (ör. toplu üretimde) istekler yetim kalıp kuyruk yerini ve Ollama üretimini tutmasın
+        try:
+            delay = hedging.delay(endpoint)
+            if delay is not None:
+                await asyncio.wait({primary_task}, timeout=delay)
+            if delay is None or primary_task.done():
+                return await primary_task
+            if not hedging.budget.try_spend():
+                hedging.record_outcome(endpoint, "budget_exhausted")
+                metrics.HEDGED_REQUESTS.labels(endpoint, "budget_exhausted").inc()
+                return await primary_task
+
+            # Mümkünse başka backend; tek backend varsa aynısına gönderilir
             try:
-                response = await client.post(
-                    f"{self.llama_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.8,  # Daha çeşitli sonuçlar için
-                            "top_p": 0.9
-                        }
-                    }
+                hedge_backend = self.backends.pick(exclude=tried)
+                tried.append(hedge_backend)
+            except NoBackendAvailableError:
+                hedge_backend = primary
+            logger.info("⏱️ %s %.1f sn içinde bitmedi, %s üzerinde hedge isteği gönderiliyor", endpoint, delay, hedge_backend.url)
+            hedge_task = asyncio.ensure_future(self._post_to_backend(hedge_backend, endpoint, prompt, options, count))
+            tasks.append(hedge_task)
+
+            labels = {primary_task: "primary_won", hedge_task: "hedge_won"}
+            pending = set(labels)
+            fallback: Optional[str] = None
+            errors: List[BaseException] = []
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+                    text = task.result()
+                    if is_valid_output(endpoint, text, count):
+                        hedging.record_outcome(endpoint, labels[task])
+                        metrics.HEDGED_REQUESTS.labels(endpoint, labels[task]).inc()
+                        return text
+                    # Şemaya uymayan sonuç yalnızca diğer istek de başarısız olursa kullanılır
+                    fallback = fallback if fallback is not None else text
+        finally:
+            unfinished = [task for task in tasks if not task.done()]
+            for task in unfinished:
+                task.cancel()
+            await asyncio.gather(*unfinished, return_exceptions=True)
+
+        outcome = "both_invalid" if fallback is not None else "both_failed"
+        hedging.record_outcome(endpoint, outcome)
+        metrics.HEDGED_REQUESTS.labels(endpoint, outcome).inc()
+        if fallback is not None:
+            return fallback
+        raise errors[0]
+
+    async def _post_to_backend(
+        self, backend: OllamaBackend, endpoint: str, prompt: str, options: dict, count: Optional[int] = None
+    ) -> str:
+        queued_at = time.monotonic()
+        async with backend.admission.slot(endpoint, _priority_override.get()):
+            started = time.monotonic()
+            try:
+                response = await self._client.post(
+                    f"{backend.url}/api/generate",
+                    json=self._request_body(endpoint, prompt, options, stream=False, count=count),
+                    timeout=httpx.Timeout(self.timeouts[endpoint], connect=self.connect_timeout),
                 )
                 response.raise_for_status()
-                
-                llama_response = response.json()
-                generated_text = llama_response.get("response", "")
-                
-                # JSON yanıtını parse et
-                questions_data = json.loads(generated_text)
-                
-                # Doğru cevapları kontrol et ve düzelt
-                corrected_questions = []
-                for q_data in questions_data.get("questions", []):
-                    corrected_q = self._fix_correct_answers(q_data)
-                    corrected_questions.append(Question(**corrected_q))
-                
-                return corrected_questions
-                
-            except httpx.RequestError as e:
-                print(f"Llama RequestError: {e}")
-                raise Exception(f"Llama API'sine bağlanılamıyor: {str(e)}")
-            except httpx.HTTPStatusError as e:
-                print(f"Llama HTTPStatusError: {e}")
-                print(f"Response: {e.response.text if hasattr(e, 'response') else 'No response'}")
-                raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                print(f"Generated text: {generated_text}")
-                raise Exception(f"Llama'dan gelen yanıt JSON formatında değil: {str(e)}")
-            except Exception as e:
-                print(f"Genel Exception: {e}")
-                print(f"Exception type: {type(e)}")
-                import traceback
-                traceback.print_exc()
-                raise Exception(f"Beklenmeyen hata: {str(e)}")
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                if self._is_retryable(e):
+                    self.backends.record_failure(backend)
+                raise
+            self.backends.record_success(backend, time.monotonic() - started)
+            if self.hedging is not None and count is None:
+                # Hedge gecikmesi kuyrukta bekleme dahil toplam süreden hesaplanır
+                self.hedging.tracker.record(endpoint, time.monotonic() - queued_at)
+
+            llama_response = response.json()
+            self._record_generation(endpoint, llama_response)
+            return llama_response.get("response", "")
+
+    async def _stream_generate(self, endpoint: str, prompt: str, options: dict) -> AsyncIterator[str]:
+        """
+        Ollama /api/generate çağrısını stream modunda yapar ve gelen token parçalarını sırayla döndürür.
+        İlk token gelmeden oluşan hatalarda başka backend denenir.
+        """
+        if self._client is None:
+            await self.start()
+
+        tried: List[OllamaBackend] = []
+        while True:
+            backend = self.backends.pick(exclude=tried)
+            tried.append(backend)
+            yielded = False
+            try:
+                async with backend.admission.slot(endpoint, _priority_override.get()):
+                    started = time.monotonic()
+                    async with self._client.stream(
+                        "POST",
+                        f"{backend.url}/api/generate",
+                        json=self._request_body(endpoint, prompt, options, stream=True),
+                        timeout=httpx.Timeout(self.timeouts[endpoint], connect=self.connect_timeout),
+                    ) as response:
+                        response.raise_for_status()
+                        async for line in response.aiter_lines():
+                            if not line.strip():
+                                continue
+                            chunk = json.loads(line)
+                            if chunk.get("response"):
+                                yielded = True
+                                yield chunk["response"]
+                            if chunk.get("done"):
+                                # Son parça süre ve token sayılarını içerir
+                                self._record_generation(endpoint, chunk)
+                                break
+                    self.backends.record_success(backend, time.monotonic() - started)
+                    return
+            except (httpx.RequestError, httpx.HTTPStatusError) as e:
+                if self._is_retryable(e):
+                    self.backends.record_failure(backend)
+                if (yielded or not self._is_retryable(e) or len(tried) > self.max_retries
+                        or len(tried) >= len(self.backends.backends)):
+                    raise
+                logger.warning("⚠️ %s stream başarısız (%s), başka backend deneniyor", backend.url, e)
     
-    def _create_phonological_prompt(self, user_info: UserInfo) -> str:
+    async def generate_phonological_game(
+        self, user_info: UserInfo, targets: Optional[List[str]] = None, user_id: Optional[str] = None
+    ) -> List[Question]:
         """
-        Kullanıcı bilgilerine göre Llama için prompt oluşturur
+        Kullanıcı bilgilerine göre Fonolojik (Hece Avcısı) oyunu soruları üretir.
+        `targets` uyarlamalı motorun seçtiği hedef hecelerdir; `user_id` verilirse öğrencinin
+        daha önce gördüğü soruların yakın tekrarları verilmez.
         """
-        prompt = f"""
-Disleksik bireyler için "Hece Avcısı" oyunu oluştur. TAM OLARAK 5 SORU yap.
+        if self.phonological_mode == "local":
+            # Sözlükten yerel üretim; doğru cevaplar üretim sırasında kesinleştiği için düzeltme gerekmez
+            return self._least_repeated(user_id, "phonological", lambda: self.phonological_engine.generate_game(user_info, targets=targets))
 
-Yaş Grubu: {user_info.age_group}
+        prompt = self._create_phonological_prompt(user_info, targets)
+        
+        try:
+            questions = await self._generate_items(
+                "phonological",
+                prompt,
+                {
+                    "temperature": 0.8,  # Daha çeşitli sonuçlar için
+                    "top_p": 0.9
+                },
+                expected=5,
+                accept=self._phonological_accept(user_id),
+            )
+            
+            # Doğru cevapları hece tablosuyla tek seferde kontrol et ve düzelt
+            question_data = [question.model_dump() for question in questions]
+            matches = self._match_question_targets(question_data)
+            corrected_questions = []
+            for data, found in zip(question_data, matches):
+                corrected_q = self._fix_correct_answers(data, found)
+                if corrected_q is not None:
+                    corrected_questions.append(Question(**corrected_q))
+
+            # Doğru cevabı olmayan sorular elendiyse eksikler sözlükten yerel olarak tamamlanır
+            if len(corrected_questions) < 5:
+                logger.warning("⚠️ %s geçerli soru var, 5 olması gerekiyor", len(corrected_questions))
+                metrics.FALLBACK_CONTENT.labels("phonological").inc()
+                corrected_questions.extend(self._local_questions(targets, corrected_questions, 5 - len(corrected_questions)))
+            self._remember(user_id, "phonological", corrected_questions)
+            
+            return corrected_questions
+            
+        except OverloadedError:
+            raise
+        except (httpx.RequestError, NoBackendAvailableError) as e:
+            logger.error("Llama RequestError: %s", e)
+            raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error("Llama HTTPStatusError: %s", e)
+            logger.debug("Response: %s", e.response.text if hasattr(e, 'response') else 'No response')
+            if e.response.status_code >= 500:
+                raise LlamaUnavailableError(f"Llama API HTTP hatası: {e.response.status_code}")
+            raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
+        except InvalidGenerationError as e:
+            logger.error("Invalid generation: %s", e)
+            metrics.JSON_PARSE_FAILURES.labels("phonological").inc()
+            raise Exception(f"Llama'dan gelen yanıt şemaya uymuyor: {str(e)}")
+        except Exception as e:
+            logger.exception("Genel Exception: %s", e)
+            raise Exception(f"Beklenmeyen hata: {str(e)}")
 
-KURALLAR:
-- Her soruda 2 harfli hedef hece ver. (ka, al, er, on, an, el, at, it, vb.)
-- 4 tane GERÇEK Türkçe kelime seçeneği sun.
-- Hedef hece, kelimenin başında, ortasında veya sonunda olabilir
-- Her soruda EN AZ 1, EN FAZLA 3 doğru cevap olmak zorunda. 
-- Cevap seçenekleri arasında hedef heceyi içeren kelimeler doğru kabul edilir
-- Cevap seçenekleri arasında hedef heceyi içeren EN AZ 1 kelime olmalı.
-- Hedef hece seçeneklerin hepsinde birden kelimenin başında bulunamaz. Yani "ka" hecesi için "kalem", "kapı", "kasa", "kağıt",gibi kelimeler aynı soru içerisinde seçenek olarak kullanılamaz.
-- Seçenkler TEK KELİME olmalı, birden fazla kelime içeren seçenekler kullanma.
-
-ÖNEMLİ:
-- Soru metni şu şekilde olmalı: "Hedef hece 'XX' içeren kelimeleri seç:"
-- Soru metni SADECE TÜRKÇE OLMALI.
-- Türkçe karakter farkına dikkat et: "ol" != "öl", "ul" != "ül"
-- Her soruda farklı kelimeler kullan
-- BİR SORUNUN CEVAPLARI 4 ADET OLAMAZ. 
-
-JSON formatında 5 soru döndür:
-{{
-  "questions": [
-    {{
-      "question": "Hedef hece 'ka' içeren kelimeleri seç:",
-      "options": ["word1", "word2", "word3", "word4"],
-      "correct_answers": [0]
-    }}
-  ]
-}}
+    def _create_phonological_prompt(self, user_info: UserInfo, targets: Optional[List[str]] = None) -> str:
+        """
+        Kullanıcı bilgilerine göre Llama için prompt oluşturur (kurallar prompts.PHONOLOGICAL_SYSTEM içinde)
+        """
+        prompt = f"""
+Yaş Grubu: {user_info.age_group}
 """
+        if targets:
+            prompt += f"Hedef heceler (her soruda sırayla birini kullan): {', '.join(targets)}\n"
         return prompt
     
-    def _fix_correct_answers(self, question_data: dict) -> dict:
+    @staticmethod
+    def _question_target(question: str) -> Optional[str]:
         """
-        Llama'dan gelen sorunun correct_answers değerlerini kontrol eder ve düzeltir
+        Soru metnindeki tırnak içindeki hedef hece
         """
-        import re
-        
-        question = question_data.get("question", "")
-        options = question_data.get("options", [])
-        
-        # Soruda hedef ses/heceyi bul
-        target_match = re.search(r"'([^']+)'", question)
-        if not target_match:
+        target_match = TARGET_PATTERN.search(question)
+        return target_match.group(1) if target_match else None
+
+    def _match_question_targets(self, questions: List[dict]) -> List[Optional[list]]:
+        """
+        Tüm soruların seçeneklerini tek vektörel karşılaştırmayla hedef heceye göre kontrol eder;
+        hedefi bulunamayan sorular için None
+        """
+        targets = [self._question_target(q.get("question", "")) for q in questions]
+        indexed = [i for i, target in enumerate(targets) if target]
+        found = match_targets([targets[i] for i in indexed], [questions[i].get("options", []) for i in indexed])
+        result: List[Optional[list]] = [None] * len(questions)
+        for row, i in enumerate(indexed):
+            result[i] = found[row, :len(questions[i].get("options", []))].tolist()
+        return result
+
+    def _phonological_accept(self, user_id: Optional[str]) -> Callable[[Question], bool]:
+        """
+        Soruda hedef heceyi içeren en az bir seçenek varsa ve geçmişte yakın tekrarı yoksa kabul edilir;
+        doğru cevabı olmayan soru öğrenciye gönderilmez, yalnızca o soru yeniden üretilir
+        """
+        unseen = self._unseen(user_id, "phonological")
+        if unseen is None:
+            return self._has_correct_answer
+        return lambda question: self._has_correct_answer(question) and unseen(question)
+
+    def _has_correct_answer(self, question: Question) -> bool:
+        found = self._match_question_targets([question.model_dump()])[0]
+        if found is not None and not any(found):
+            metrics.VALIDATION_FIXUPS.labels("phonological", "no_correct_answer").inc()
+            return False
+        return True
+
+    def _local_questions(self, targets: Optional[List[str]], questions: List[Question], count: int) -> List[Question]:
+        """
+        Eksik sorular için sözlükten yerel sorular; mevcut sorularda sorulan hedef heceler tekrarlanmaz
+        """
+        asked = {self._question_target(question.question) for question in questions}
+        preferred = [target for target in targets or () if target not in asked]
+        game = self.phonological_engine.generate_game(question_count=count + len(asked), targets=preferred)
+        return [question for question in game if self._question_target(question.question) not in asked][:count]
+
+    def _fix_correct_answers(self, question_data: dict, found: Optional[list] = None) -> Optional[dict]:
+        """
+        Llama'dan gelen sorunun correct_answers değerlerini hece bazında kontrol eder ve düzeltir.
+        Alt dizi araması yerine heceleme kullanılır: "ka" "şa-ka"da doğru, "a-kan"da yanlış sayılır.
+        Hiçbir seçenek hedef heceyi içermiyorsa soru geçersizdir ve None döner.
+        """
+        if found is None:
+            found = self._match_question_targets([question_data])[0]
+        if found is None:
             # Hedef bulunamazsa mevcut correct_answers'ı koru
             return question_data
-            
-        target_sound = target_match.group(1).lower()
-        
-        # Her seçenekte hedef ses/hece var mı kontrol et
-        correct_indices = []
-        for i, option in enumerate(options):
-            option_lower = option.lower()
-            # Türkçe karakter duyarlı arama
-            if target_sound in option_lower:
-                correct_indices.append(i)
-                print(f"✅ '{target_sound}' bulundu: {option} (indis: {i})")
-            else:
-                print(f"❌ '{target_sound}' bulunamadı: {option}")
+
+        correct_indices = [i for i, matched in enumerate(found) if matched]
+        logger.debug("Hece eşleşmeleri: %s", found)
         
         # En az 1, en fazla 3 doğru cevap kontrolü
         if len(correct_indices) == 0:
-            print(f"⚠️ Hiç doğru cevap bulunamadı! İlk seçeneği doğru kabul ediyoruz.")
-            correct_indices = [0]  # En az 1 doğru cevap garantisi
-        elif len(correct_indices) > 3:
-            print(f"⚠️ {len(correct_indices)} doğru cevap var, ilk 3'ünü alıyoruz.")
+            logger.warning("⚠️ Hiç doğru cevap bulunamadı, soru atlanıyor: %s", question_data.get("question"))
+            return None
+        if len(correct_indices) > 3:
+            logger.warning("⚠️ %s doğru cevap var, ilk 3'ünü alıyoruz.", len(correct_indices))
+            metrics.VALIDATION_FIXUPS.labels("phonological", "too_many_correct_answers").inc()
             correct_indices = correct_indices[:3]  # En fazla 3 doğru cevap
         
-        print(f"Final correct_answers: {correct_indices}")
+        logger.debug("Final correct_answers: %s", correct_indices)
+        if correct_indices != question_data.get("correct_answers"):
+            metrics.VALIDATION_FIXUPS.labels("phonological", "correct_answers").inc()
         
         # Düzeltilmiş question_data döndür
         corrected_data = question_data.copy()
@@ -146,161 +895,101 @@ JSON formatında 5 soru döndür:
         
         return corrected_data
 
-    async def generate_spelling_game(self, user_info: UserInfo) -> List[SpellingQuestion]:
+    async def generate_spelling_game(
+        self, user_info: UserInfo, confusions: Optional[List[str]] = None, user_id: Optional[str] = None
+    ) -> List[SpellingQuestion]:
         """
-        Kullanıcı bilgilerine göre Yazım Hatası Tespit oyunu oluşturur
+        Kullanıcı bilgilerine göre Yazım Hatası Tespit oyunu oluşturur.
+        `confusions` uyarlamalı motorun seçtiği karışıklık türleridir (örn. "b/p"); `user_id` verilirse
+        öğrencinin daha önce gördüğü kelime beşlileri tekrar verilmez.
         """
-        prompt = self._create_spelling_prompt(user_info)
-        
-        async with httpx.AsyncClient(timeout=120.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.llama_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.8,  # Daha çeşitli sonuçlar için
-                            "top_p": 0.9
-                        }
-                    }
-                )
-                response.raise_for_status()
-                
-                llama_response = response.json()
-                generated_text = llama_response.get("response", "")
-                
-                # JSON yanıtını parse et
-                spelling_data = json.loads(generated_text)
-                
-                # Her soruyu kontrol et ve düzelt
-                corrected_questions = []
-                for q_data in spelling_data.get("questions", []):
-                    corrected_q = self._fix_spelling_game(q_data)
-                    corrected_questions.append(SpellingQuestion(**corrected_q))
-                
-                return corrected_questions
-                
-            except httpx.RequestError as e:
-                print(f"Llama RequestError: {e}")
-                raise Exception(f"Llama API'sine bağlanılamıyor: {str(e)}")
-            except httpx.HTTPStatusError as e:
-                print(f"Llama HTTPStatusError: {e}")
-                print(f"Response: {e.response.text if hasattr(e, 'response') else 'No response'}")
-                raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                print(f"Generated text: {generated_text}")
-                raise Exception(f"Llama'dan gelen yanıt JSON formatında değil: {str(e)}")
-            except Exception as e:
-                print(f"Genel Exception: {e}")
-                print(f"Exception type: {type(e)}")
-                import traceback
-                traceback.print_exc()
-                raise Exception(f"Beklenmeyen hata: {str(e)}")
-
-    def _create_spelling_prompt(self, user_info: UserInfo) -> str:
-        """
-        Yazım hatası tespit oyunu için prompt oluşturur
-        """
-        # 50 adet doğru ve yanlış kelime çifti
-        word_pairs = [
-            {"correct": "bilgisayar", "wrong": "pilgisayar"},  # b->p
-            {"correct": "matematik", "wrong": "natematik"},    # m->n
-            {"correct": "teknoloji", "wrong": "teknoloci"},    # j->c (görsel benzerlik)
-            {"correct": "doktor", "wrong": "toktor"},          # d->t
-            {"correct": "kahraman", "wrong": "gahraman"},      # k->g
-            {"correct": "merhaba", "wrong": "nerhaba"},        # m->n
-            {"correct": "algoritma", "wrong": "algoritna"},    # m->n
-            {"correct": "elektronik", "wrong": "eleftronik"},  # k->f (görsel)
-            {"correct": "psikoloji", "wrong": "bsikoloji"},    # p->b
-            {"correct": "biyoloji", "wrong": "piyoloji"},      # b->p
-            {"correct": "kimya", "wrong": "ginya"},            # k->g, m->n
-            {"correct": "fizik", "wrong": "fisik"},            # z->s
-            {"correct": "tarih", "wrong": "tarıh"},            # i->ı
-            {"correct": "coğrafya", "wrong": "çoğrafya"},      # c->ç
-            {"correct": "edebiyat", "wrong": "edepiyat"},      # b->p
-            {"correct": "felsefe", "wrong": "felşefe"},        # s->ş
-            {"correct": "sosyoloji", "wrong": "şosyoloji"},    # s->ş
-            {"correct": "antropoloji", "wrong": "antropoloci"}, # j->c
-            {"correct": "arkeoloji", "wrong": "argeoloji"},    # k->g
-            {"correct": "mühendislik", "wrong": "nühendislik"}, # m->n
-            {"correct": "mimarlık", "wrong": "minarlık"},      # m->n
-            {"correct": "hukuk", "wrong": "huguk"},            # k->g
-            {"correct": "ekonomi", "wrong": "egonomi"},        # k->g
-            {"correct": "işletme", "wrong": "işretme"},        # l->r
-            {"correct": "muhasebe", "wrong": "muhaşebe"},      # s->ş
-            {"correct": "pazarlama", "wrong": "pasarlama"},    # z->s
-            {"correct": "finans", "wrong": "finañs"},          # s->ş (son harf)
-            {"correct": "yönetim", "wrong": "yönetın"},        # i->ı
-            {"correct": "proje", "wrong": "proce"},            # j->c
-            {"correct": "sistem", "wrong": "şistem"},          # s->ş
-            {"correct": "program", "wrong": "proğram"},        # g->ğ
-            {"correct": "internet", "wrong": "ınternet"},      # i->ı
-            {"correct": "bilim", "wrong": "pilim"},            # b->p
-            {"correct": "araştırma", "wrong": "araştırna"},    # m->n
-            {"correct": "geliştirme", "wrong": "keliştirnı"},  # g->k, m->n
-            {"correct": "tasarım", "wrong": "tasarın"},        # ı->ı, m->n
-            {"correct": "uygulama", "wrong": "uygulana"},      # m->n
-            {"correct": "analiz", "wrong": "anariz"},          # l->r
-            {"correct": "sentez", "wrong": "şentez"},          # s->ş
-            {"correct": "hipotez", "wrong": "hibotez"},        # p->b
-            {"correct": "teori", "wrong": "teorı"},            # i->ı
-            {"correct": "pratik", "wrong": "bradik"},          # p->b, t->d
-            {"correct": "deneyim", "wrong": "teneyim"},        # d->t
-            {"correct": "beceri", "wrong": "peçeri"},          # b->p
-            {"correct": "yetenek", "wrong": "yeteneğ"},        # k->ğ
-            {"correct": "başarı", "wrong": "paşarı"},          # b->p
-            {"correct": "gelişim", "wrong": "kelişim"},        # g->k
-            {"correct": "öğretim", "wrong": "öğretın"},        # i->ı
-            {"correct": "eğitim", "wrong": "eğitın"},          # i->ı
-            {"correct": "öğrenci", "wrong": "öğrenpi"}         # c->p
-        ]
-        
-        # Kelime çiftlerini JSON string'e çevir
-        words_json = json.dumps(word_pairs, ensure_ascii=False, indent=2)
-        
-        prompt = f"""
-Yazım hatası tespit oyunu oluştur.
+        if self.spelling_mode == "local":
+            # Çift listesinden yerel üretim; hatalı kelimenin yeri üretim sırasında belli
+            return self._least_repeated(user_id, "spelling", lambda: self.spelling_engine.generate_game(user_info, confusions=confusions))
 
-ADIM 1: Bu kelimelerden 5 tanesini seç:
-matematik, bilgisayar, teknoloji, doktor, kahraman, merhaba, algoritma, elektronik, psikoloji, biyoloji, kimya, fizik, tarih, coğrafya, edebiyat, felsefe, sosyoloji, antropoloji, arkeoloji, mühendislik, mimarlık, hukuk, ekonomi, işletme, muhasebe, pazarlama, finans, yönetim, proje, sistem, program, internet, bilim, araştırma, geliştirme, tasarım, uygulama, analiz, sentez, hipotez, teori, pratik, deneyim, beceri, yetenek, başarı, gelişim, öğretim, eğitim, öğrenci
-
-ADIM 2: Seçtiğin 5 kelimeden SADECE 1 TANESİNİ şu şekilde değiştir:
-matematik→natematik, bilgisayar→pilgisayar, teknoloji→teknoloci, doktor→toktor, kahraman→gahraman, merhaba→nerhaba, algoritma→algoritna, elektronik→eleftronik, psikoloji→bsikoloji, biyoloji→piyoloji, kimya→ginya, fizik→fisik, tarih→tarıh, coğrafya→çoğrafya, edebiyat→edepiyat, felsefe→felşefe, sosyoloji→şosyoloji, antropoloji→antropoloci, arkeoloji→argeoloji, mühendislik→nühendislik, mimarlık→minarlık, hukuk→huguk, ekonomi→egonomi, işletme→işretme, muhasebe→muhaşebe, pazarlama→pasarlama, finans→finañs, yönetim→yönetın, proje→proce, sistem→şistem, program→proğram, internet→ınternet, bilim→pilim, araştırma→araştırna, geliştirme→keliştirnı, tasarım→tasarın, uygulama→uygulana, analiz→anariz, sentez→şentez, hipotez→hibotez, teori→teorı, pratik→bradik, deneyim→teneyim, beceri→peçeri, yetenek→yeteneğ, başarı→paşarı, gelişim→kelişim, öğretim→öğretın, eğitim→eğitın, öğrenci→öğrenpi
+        pairs, fillers = self.spelling_engine.sample_for_prompt(confusions=confusions)
+        wrong_words = {pair.wrong for pair in pairs}
+        prompt = self._create_spelling_prompt(user_info, pairs, fillers)
+        
+        try:
+            questions = await self._generate_items(
+                "spelling",
+                prompt,
+                {
+                    "temperature": 0.8,  # Daha çeşitli sonuçlar için
+                    "top_p": 0.9
+                },
+                expected=5,
+                accept=self._unseen(user_id, "spelling"),
+            )
+            
+            # Şema uzunluk ve aralığı garanti eder; hatalı kelimenin yeri gönderilen çiftlerden doğrulanır
+            corrected_questions = []
+            for question in questions:
+                corrected_q = self._fix_spelling_game(question.model_dump(), wrong_words)
+                corrected_questions.append(SpellingQuestion(**corrected_q))
+            self._remember(user_id, "spelling", corrected_questions)
+            
+            return corrected_questions
+            
+        except OverloadedError:
+            raise
+        except (httpx.RequestError, NoBackendAvailableError) as e:
+            logger.error("Llama RequestError: %s", e)
+            raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error("Llama HTTPStatusError: %s", e)
+            logger.debug("Response: %s", e.response.text if hasattr(e, 'response') else 'No response')
+            if e.response.status_code >= 500:
+                raise LlamaUnavailableError(f"Llama API HTTP hatası: {e.response.status_code}")
+            raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
+        except InvalidGenerationError as e:
+            logger.error("Invalid generation: %s", e)
+            metrics.JSON_PARSE_FAILURES.labels("spelling").inc()
+            raise Exception(f"Llama'dan gelen yanıt şemaya uymuyor: {str(e)}")
+        except Exception as e:
+            logger.exception("Genel Exception: %s", e)
+            raise Exception(f"Beklenmeyen hata: {str(e)}")
 
-ADIM 3: Yanlış kelimenin hangi sırada olduğunu say (0'dan başla)
+    def _create_spelling_prompt(self, user_info: UserInfo, pairs: List[SpellingPair], fillers: List[str]) -> str:
+        """
+        Yazım hatası tespit oyunu için prompt oluşturur (adımlar prompts.SPELLING_SYSTEM içinde).
+        Tüm çift listesi yerine yalnızca bu oyun için seçilen çiftler gönderilir.
+        """
+        words = ", ".join(fillers)
+        changes = ", ".join(f"{pair.correct}→{pair.wrong}" for pair in pairs)
 
-ÖRNEK:
-Seç: matematik, bilgisayar, teknoloji, doktor, kahraman
-Değiştir: bilgisayar→pilgisayar
-Sonuç: ["matematik", "pilgisayar", "teknoloji", "doktor", "kahraman"]
-İndeks: 1
+        prompt = f"""
+KELİMELER:
+{words}
 
-5 farklı soru yap:
-{{
-  "questions": [
-    {{"words": ["..."], "wrong_index": 0}}
-  ]
-}}
+YANLIŞ YAZIMLAR:
+{changes}
 """
         return prompt
 
-    def _fix_spelling_game(self, spelling_data: dict) -> dict:
+    def _fix_spelling_game(self, spelling_data: dict, wrong_words: Optional[set] = None) -> dict:
         """
         Spelling game verilerini kontrol eder ve düzeltir
         """
         words = spelling_data.get("words", [])
         wrong_index = spelling_data.get("wrong_index", 0)
+
+        # Gönderilen yanlış kelimeler biliniyorsa indeksi doğrudan onlardan bul
+        if wrong_words:
+            positions = [i for i, word in enumerate(words[:5]) if word in wrong_words]
+            if positions and wrong_index not in positions:
+                logger.warning("⚠️ Wrong index %s yanlış kelimeyi göstermiyor, %s olarak düzeltiliyor", wrong_index, positions[0])
+                metrics.VALIDATION_FIXUPS.labels("spelling", "wrong_index").inc()
+                wrong_index = positions[0]
         
-        print(f"📝 Spelling Game Words: {words}")
-        print(f"🎯 Wrong Index: {wrong_index}")
+        logger.debug("📝 Spelling Game Words: %s", words)
+        logger.debug("🎯 Wrong Index: %s", wrong_index)
         
         # 5 kelime kontrolü
         if len(words) != 5:
-            print(f"⚠️ {len(words)} kelime var, 5 olması gerekiyor")
+            logger.warning("⚠️ %s kelime var, 5 olması gerekiyor", len(words))
+            metrics.VALIDATION_FIXUPS.labels("spelling", "word_count").inc()
             # Eksikse dummy kelimeler ekle veya fazlaysa kırp
             if len(words) < 5:
                 words.extend([f"kelime{i}" for i in range(len(words), 5)])
@@ -309,7 +998,8 @@ Sonuç: ["matematik", "pilgisayar", "teknoloji", "doktor", "kahraman"]
         
         # wrong_index kontrolü
         if wrong_index < 0 or wrong_index >= 5:
-            print(f"⚠️ Wrong index {wrong_index} geçersiz, 2 olarak ayarlanıyor")
+            logger.warning("⚠️ Wrong index %s geçersiz, 2 olarak ayarlanıyor", wrong_index)
+            metrics.VALIDATION_FIXUPS.labels("spelling", "invalid_wrong_index").inc()
             wrong_index = 2
         
         corrected_data = {
@@ -317,198 +1007,225 @@ Sonuç: ["matematik", "pilgisayar", "teknoloji", "doktor", "kahraman"]
             "wrong_index": wrong_index
         }
         
-        print(f"Final spelling data: {corrected_data}")
+        logger.debug("Final spelling data: %s", corrected_data)
         return corrected_data
 
-    async def generate_word_list(self, user_info: UserInfo) -> List[str]:
+    async def generate_word_list(self, user_info: UserInfo, user_id: Optional[str] = None) -> List[str]:
         """
-        Kullanıcının ilgi alanına göre 5 rastgele Türkçe kelime üretir
+        Kullanıcının ilgi alanına göre 5 rastgele Türkçe kelime üretir.
+        user_id verilirse öğrencinin son gördüğü kelimeler tekrar verilmez.
         """
+        if self.word_list_mode == "local":
+            return self._local_word_list(user_info, user_id)
+
         prompt = self._create_word_list_prompt(user_info)
         
-        async with httpx.AsyncClient(timeout=60.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.llama_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.9,  # Daha çeşitli sonuçlar için
-                            "top_p": 0.9
-                        }
-                    }
-                )
-                response.raise_for_status()
-                
-                llama_response = response.json()
-                generated_text = llama_response.get("response", "")
-                
-                # JSON yanıtını parse et
-                word_data = json.loads(generated_text)
-                
-                # Kelimeleri al
-                words = word_data.get("words", [])
-                
-                # 5 kelime kontrolü
-                if len(words) != 5:
-                    print(f"⚠️ {len(words)} kelime var, 5 olması gerekiyor")
-                    # Eksikse dummy kelimeler ekle veya fazlaysa kırp
-                    if len(words) < 5:
-                        words.extend([f"kelime{i}" for i in range(len(words), 5)])
-                    else:
-                        words = words[:5]
-                
-                print(f"Generated words: {words}")
-                return words
-                
-            except httpx.RequestError as e:
-                print(f"Llama RequestError: {e}")
-                raise Exception(f"Llama API'sine bağlanılamıyor: {str(e)}")
-            except httpx.HTTPStatusError as e:
-                print(f"Llama HTTPStatusError: {e}")
-                raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                print(f"Generated text: {generated_text}")
-                raise Exception(f"Llama'dan gelen yanıt JSON formatında değil: {str(e)}")
-            except Exception as e:
-                print(f"Genel Exception: {e}")
-                raise Exception(f"Beklenmeyen hata: {str(e)}")
+        try:
+            words = await self._generate_items(
+                "word_list",
+                prompt,
+                {
+                    "temperature": 0.9,  # Daha çeşitli sonuçlar için
+                    "top_p": 0.9
+                },
+                expected=WORD_COUNT,
+            )
+            seen = self.word_list_engine.seen(user_id)
+            words = self._validate_words(words, seen)
+
+            # Kısmi yeniden üretimden sonra da eksik kaldıysa ya da kelimeler elendiyse sözlükten tamamla
+            if len(words) != WORD_COUNT:
+                logger.warning("⚠️ %s geçerli kelime var, %s olması gerekiyor", len(words), WORD_COUNT)
+                metrics.VALIDATION_FIXUPS.labels("word_list", "word_count").inc()
+                if len(words) < WORD_COUNT:
+                    words.extend(self.word_list_engine.sample(user_info, WORD_COUNT - len(words), [*seen, *words]))
+                else:
+                    words = words[:WORD_COUNT]
+            self.word_list_engine.remember(user_id, words)
+            self._remember(user_id, "word_list", [words])
+
+            log_payload(logger, "Generated words", words)
+            return words
+            
+        except OverloadedError:
+            raise
+        except (httpx.RequestError, NoBackendAvailableError) as e:
+            logger.error("Llama RequestError: %s", e)
+            raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error("Llama HTTPStatusError: %s", e)
+            if e.response.status_code >= 500:
+                raise LlamaUnavailableError(f"Llama API HTTP hatası: {e.response.status_code}")
+            raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
+        except InvalidGenerationError as e:
+            logger.error("Invalid generation: %s", e)
+            metrics.JSON_PARSE_FAILURES.labels("word_list").inc()
+            raise Exception(f"Llama'dan gelen yanıt şemaya uymuyor: {str(e)}")
+        except Exception as e:
+            logger.exception("Genel Exception: %s", e)
+            raise Exception(f"Beklenmeyen hata: {str(e)}")
+
+    def _validate_words(self, words: List[str], exclude=()) -> List[str]:
+        """
+        Llama'nın ürettiği her kelimeyi kontrol eder; tek parça olmayan, 6 harfli olmayan, tekrar eden,
+        öğrencinin yakın zamanda gördüğü (`exclude`) ve ("lexicon" modunda) sözlükte bulunmayan kelimeler elenir
+        """
+        valid: List[str] = []
+        seen = {turkish_casefold(word) for word in exclude}
+        for word in words:
+            word = normalize_text(word)
+            key = turkish_casefold(word)
+            if not WORD_PATTERN.fullmatch(word) or len(key) != WORD_LENGTH:
+                metrics.VALIDATION_FIXUPS.labels("word_list", "invalid_word").inc()
+                continue
+            if key in seen:
+                metrics.VALIDATION_FIXUPS.labels("word_list", "repeated_word").inc()
+                continue
+            if self.word_validation == "lexicon" and not self.lexicon_store.contains(word):
+                metrics.VALIDATION_FIXUPS.labels("word_list", "unknown_word").inc()
+                continue
+            seen.add(key)
+            valid.append(word)
+        return valid
 
     def _create_word_list_prompt(self, user_info: UserInfo) -> str:
         """
-        Kullanıcının ilgi alanına göre kelime listesi oluşturmak için prompt
+        Kullanıcının ilgi alanına göre kelime listesi oluşturmak için prompt (kurallar prompts.WORD_LIST_SYSTEM içinde)
         """
         prompt = f"""
-Kullanıcının ilgi alanına göre 5 rastgele Türkçe kelime üret.
-
 Kullanıcı Bilgileri:
 - Yaş Grubu: {user_info.age_group}
 - İlgi Alanı: {user_info.hard_area}
 - Hedef: {user_info.reading_goal}
 - Motivasyon: {user_info.motivating_games}
-
-KURALLAR:
-- Tam olarak 5 adet Türkçe kelime ver.
-- Kelimeler 6 adet harf olacak
-- Kullanıcının ilgi alanına uygun kelimeler seç
-- Yaş grubuna uygun zorluk seviyesi
-- Sadece tek kelimeler (birleşik kelime yok)
-- Gerçek ve anlamlı Türkçe kelimeler
-
-JSON formatında döndür:
-{{
-  "words": ["kelime1", "kelime2", "kelime3", "kelime4", "kelime5"]
-}}
 """
         return prompt
 
-    async def generate_paragraph(self, user_info: UserInfo) -> List[str]:
+    async def generate_paragraph(self, user_info: UserInfo, user_id: Optional[str] = None) -> List[str]:
         """
-        Kullanıcının ilgi alanına göre 5 adet 4 cümlelik anlamlı paragraf üretir
+        Kullanıcının ilgi alanına göre 5 adet 4 cümlelik anlamlı paragraf üretir.
+        user_id verilirse öğrencinin daha önce okuduğu paragrafların yakın tekrarları verilmez.
         """
         prompt = self._create_paragraph_prompt(user_info)
-        
-        async with httpx.AsyncClient(timeout=90.0) as client:
+        level = level_for(user_info.age_group)
+
+        try:
+            paragraphs = await self._generate_items(
+                "paragraph",
+                prompt,
+                {
+                    "temperature": 0.8,  # Yaratıcı ama kontrollü
+                    "top_p": 0.9
+                },
+                expected=5,
+                accept=self._paragraph_accept(user_id, level),
+            )
+            self.paragraph_pool.add(level, paragraphs)
+            self._remember(user_id, "paragraph", paragraphs)
+
+            # Kısmi yeniden üretimden sonra da eksik kaldıysa düzeye uygun havuzdan tamamla
+            if len(paragraphs) != 5:
+                logger.warning("⚠️ %s paragraf var, 5 olması gerekiyor", len(paragraphs))
+                if len(paragraphs) < 5:
+                    metrics.FALLBACK_CONTENT.labels("paragraph").inc()
+                    paragraphs.extend(self._pick_paragraphs(user_id, level, 5 - len(paragraphs), paragraphs))
+                else:
+                    paragraphs = paragraphs[:5]
+            
+            log_payload(logger, "Generated paragraphs", paragraphs)
+            return paragraphs
+            
+        except OverloadedError:
+            raise
+        except (httpx.RequestError, NoBackendAvailableError) as e:
+            logger.error("Llama RequestError: %s", e)
+            raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error("Llama HTTPStatusError: %s", e)
+            if e.response.status_code >= 500:
+                raise LlamaUnavailableError(f"Llama API HTTP hatası: {e.response.status_code}")
+            raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
+        except InvalidGenerationError as e:
+            logger.error("Invalid generation: %s", e)
+            metrics.JSON_PARSE_FAILURES.labels("paragraph").inc()
+            raise Exception(f"Llama'dan gelen yanıt şemaya uymuyor: {str(e)}")
+        except Exception as e:
+            logger.exception("Genel Exception: %s", e)
+            raise Exception(f"Beklenmeyen hata: {str(e)}")
+
+    async def stream_paragraphs(self, user_info: UserInfo, user_id: Optional[str] = None) -> AsyncIterator[str]:
+        """
+        Paragrafları Llama'dan stream ederek her paragraf tamamlandığı anda döndürür
+        """
+        prompt = self._create_paragraph_prompt(user_info)
+        options = {
+            "temperature": 0.8,  # Yaratıcı ama kontrollü
+            "top_p": 0.9
+        }
+        parser = IncrementalJSONParser()
+        paragraphs: List[str] = []
+        level = level_for(user_info.age_group)
+        accept = self._paragraph_accept(user_id, level)
+
+        async for token in self._guard_stream(self._stream_generate("paragraph", prompt, options)):
+            for key, value in parser.feed(token):
+                if key == "paragraphs" and value.strip() and len(paragraphs) < 5:
+                    # Düzeye uymayan ya da tekrar eden paragraf gösterilmez, stream sonunda yerine yenisi üretilir
+                    if not accept(value):
+                        metrics.VALIDATION_FIXUPS.labels("paragraph", "rejected_item").inc()
+                        continue
+                    paragraphs.append(value)
+                    self._remember(user_id, "paragraph", [value])
+                    yield value
+
+        if len(paragraphs) < 5:
+            logger.warning("⚠️ %s paragraf stream edildi, 5 olması gerekiyor", len(paragraphs))
+            # Önce yalnızca eksik paragrafları yeniden üret
             try:
-                response = await client.post(
-                    f"{self.llama_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.8,  # Yaratıcı ama kontrollü
-                            "top_p": 0.9
-                        }
-                    }
+                repaired = await self._generate_items(
+                    "paragraph", prompt, options, expected=5, items=paragraphs, accept=accept,
                 )
-                response.raise_for_status()
-                
-                llama_response = response.json()
-                generated_text = llama_response.get("response", "")
-                
-                # JSON yanıtını parse et
-                paragraph_data = json.loads(generated_text)
-                
-                # Paragrafları al
-                paragraphs = paragraph_data.get("paragraphs", [])
-                
-                # 5 paragraf kontrolü
-                if len(paragraphs) != 5:
-                    print(f"⚠️ {len(paragraphs)} paragraf var, 5 olması gerekiyor")
-                    # Eksikse varsayılan paragraflar ekle
-                    default_paragraphs = [
-                        "Ali kitap okumaya karar verdi. Kütüphaneye gitti ve bir kitap seçti. Saatlerce okuyarak hikayeye daldı. Kitabı bitirdiğinde çok mutlu oldu.",
-                        "Ayşe resim yapmaya başladı. Renkli boyalarla tuvaline hayat verdi. Farklı teknikler deneyerek yeteneğini geliştirdi. Sonunda harika bir tablo ortaya çıkardı.",
-                        "Mehmet bisiklet sürmeyi öğrendi. Parkta pratik yaparak denge kazandı. Zamanla hızlandı ve zorlu parkurları aşmaya başladı. Artık bisiklet sürmek onun en sevdiği aktivite oldu.",
-                        "Zeynep yemek pişirmeye karar verdi. Malzemeleri hazırlayarak mutfağa geçti. Adım adım tarifi takip ederek lezzetli bir yemek hazırladı. Ailesi yemeği çok beğendi ve Zeynep gurur duydu.",
-                        "Can müzik öğrenmeye başladı. Gitarını eline alarak pratik yapmaya başladı. Günlerce çalışarak melodileri öğrendi. Artık sevdiği şarkıları çalabiliyor ve çok mutlu."
-                    ]
-                    
-                    if len(paragraphs) < 5:
-                        paragraphs.extend(default_paragraphs[len(paragraphs):5])
-                    else:
-                        paragraphs = paragraphs[:5]
-                
-                print(f"Generated paragraphs: {paragraphs}")
-                return paragraphs
-                
-            except httpx.RequestError as e:
-                print(f"Llama RequestError: {e}")
-                raise Exception(f"Llama API'sine bağlanılamıyor: {str(e)}")
-            except httpx.HTTPStatusError as e:
-                print(f"Llama HTTPStatusError: {e}")
-                raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                print(f"Generated text: {generated_text}")
-                raise Exception(f"Llama'dan gelen yanıt JSON formatında değil: {str(e)}")
             except Exception as e:
-                print(f"Genel Exception: {e}")
-                raise Exception(f"Beklenmeyen hata: {str(e)}")
+                logger.warning("⚠️ Eksik paragraflar yeniden üretilemedi: %s", e)
+                repaired = paragraphs
+            self._remember(user_id, "paragraph", repaired[len(paragraphs):5])
+            for paragraph in repaired[len(paragraphs):5]:
+                yield paragraph
+            paragraphs = repaired[:5]
+            # Hâlâ eksikse düzeye uygun havuzdan ekle
+            if len(paragraphs) < 5:
+                metrics.FALLBACK_CONTENT.labels("paragraph").inc()
+                for paragraph in self._pick_paragraphs(user_id, level, 5 - len(paragraphs), paragraphs):
+                    yield paragraph
+        self.paragraph_pool.add(level, paragraphs)
+
+    def _paragraph_accept(self, user_id: Optional[str], level: str) -> Callable[[str], bool]:
+        """
+        Paragraf düzeye uyuyorsa ve geçmişte yakın tekrarı yoksa kabul edilir
+        """
+        unseen = self._unseen(user_id, "paragraph")
+        if unseen is None:
+            return lambda paragraph: self._paragraph_fits(paragraph, level)
+        return lambda paragraph: self._paragraph_fits(paragraph, level) and unseen(paragraph)
+
+    def _paragraph_fits(self, paragraph: str, level: str) -> bool:
+        """
+        Paragraf 4 cümle mi ve okunabilirlik/seyrek kelime oranı yaş grubunun düzeyine uyuyor mu
+        """
+        score = self.readability.score(paragraph)
+        metrics.PARAGRAPH_READABILITY.labels(level).observe(score.atesman)
+        return self.readability.fits(score, level)
 
     def _create_paragraph_prompt(self, user_info: UserInfo) -> str:
         """
-        Kullanıcının ilgi alanına göre paragraf oluşturmak için prompt
+        Kullanıcının ilgi alanına göre paragraf oluşturmak için prompt (kurallar prompts.PARAGRAPH_SYSTEM içinde)
         """
         prompt = f"""
-Kullanıcının ilgi alanına göre 5 adet farklı konuda 4 cümlelik paragraf yaz.
-
 Kullanıcı Bilgileri:
 - Yaş Grubu: {user_info.age_group}
 - Zorluk Çektiği Alanı: {user_info.hard_area}
 - Hedef: {user_info.reading_goal}
 - Motivasyon: {user_info.motivating_games}
-
-KURALLAR:
-- TAM OLARAK 5 adet paragraf oluştur
-- Her paragraf TAM OLARAK 4 cümle olmalı
-- Her paragrafın cümleleri MANTIKLI BİR EYLEM AKIŞI olmalı:
-  * 1. Cümle: Hazırlık (bir şeye hazırlanma, karar verme)
-  * 2. Cümle: Eylemin başlaması (ilk adım, hareket)
-  * 3. Cümle: Gelişim/İlerleme (eylemde yaşanan değişim, zorluk/başarı)
-  * 4. Cümle: Sonuç/Bitiş (eylemden çıkan sonuç)
-- Her paragraf farklı bir konuda olmalı
-- Her cümle kronolojik sırada olmalı ki kullanıcı doğru sırayı bulabilsin
-- Örnek konular: kitap okuma, resim yapma, bisiklet sürme, yemek pişirme, bahçe işleri, spor yapma, müzik dinleme, seyahat etme, dans etme, oyun oynama
-- Sadece Türkçe yaz
-- Her paragrafın cümleleri birbirini tamamlamalı
-
-JSON formatında döndür:
-{{
-  "paragraphs": [
-    "İlk paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
-    "İkinci paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
-    "Üçüncü paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
-    "Dördüncü paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
-    "Beşinci paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle."
-  ]
-}}
 """
         return prompt
 
@@ -516,62 +1233,86 @@ JSON formatında döndür:
         """
         Kullanıcı bilgileri ve istatistiklerini analiz ederek kişiselleştirilmiş rapor üretir
         """
-        prompt = self._create_analysis_prompt(user_info, user_statistics)
+        if self.analysis_mode == "local":
+            # Şablonla yerel üretim; sayılar doğrudan istatistiklerden gelir
+            return self.analysis_renderer.render(user_info, user_statistics)
+
+        draft = self.analysis_renderer.render(user_info, user_statistics) if self.analysis_mode == "polish" else None
+        prompt = self._create_analysis_prompt(user_info, user_statistics, draft)
         
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.llama_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.7,  # Daha objektif analiz için
-                            "top_p": 0.8
-                        }
-                    }
-                )
-                response.raise_for_status()
-                
-                llama_response = response.json()
-                generated_text = llama_response.get("response", "")
-                
-                # JSON yanıtını parse et
-                analysis_data = json.loads(generated_text)
-                
-                # Analizi al
-                analysis = analysis_data.get("analysis", "")
-                
-                if not analysis.strip():
-                    print("⚠️ Boş analiz alındı, varsayılan analiz kullanılıyor")
-                    analysis = "Kullanıcının performansı değerlendirildi. Düzenli çalışma ile gelişim gösterilebilir. Güçlü yönleri desteklenmeli, zayıf alanlar üzerinde odaklanılmalı. Motivasyon sürekli yüksek tutulmalıdır."
-                
-                print(f"Generated analysis: {analysis}")
-                return analysis
-                
-            except httpx.RequestError as e:
-                print(f"Llama RequestError: {e}")
-                raise Exception(f"Llama API'sine bağlanılamıyor: {str(e)}")
-            except httpx.HTTPStatusError as e:
-                print(f"Llama HTTPStatusError: {e}")
-                raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                print(f"Generated text: {generated_text}")
-                raise Exception(f"Llama'dan gelen yanıt JSON formatında değil: {str(e)}")
-            except Exception as e:
-                print(f"Genel Exception: {e}")
-                raise Exception(f"Beklenmeyen hata: {str(e)}")
+        try:
+            document = await self._generate_document(
+                "analysis",
+                prompt,
+                {
+                    "temperature": 0.7,  # Daha objektif analiz için
+                    "top_p": 0.8
+                }
+            )
+            
+            # Analizi al
+            analysis = document.analysis if document is not None else ""
+            
+            if not analysis.strip():
+                logger.warning("⚠️ Boş analiz alındı, varsayılan analiz kullanılıyor")
+                metrics.FALLBACK_CONTENT.labels("analysis").inc()
+                analysis = draft or DEFAULT_ANALYSIS
+            
+            log_payload(logger, "Generated analysis", analysis)
+            return analysis
+            
+        except OverloadedError:
+            raise
+        except (httpx.RequestError, NoBackendAvailableError) as e:
+            logger.error("Llama RequestError: %s", e)
+            raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error("Llama HTTPStatusError: %s", e)
+            if e.response.status_code >= 500:
+                raise LlamaUnavailableError(f"Llama API HTTP hatası: {e.response.status_code}")
+            raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
+        except Exception as e:
+            logger.exception("Genel Exception: %s", e)
+            raise Exception(f"Beklenmeyen hata: {str(e)}")
 
-    def _create_analysis_prompt(self, user_info, user_statistics) -> str:
+    async def stream_analysis(self, user_info, user_statistics) -> AsyncIterator[str]:
         """
-        Kullanıcı bilgileri ve istatistiklerini analiz etmek için prompt
+        Analiz metnini Llama'dan stream ederek her cümle tamamlandığı anda döndürür
         """
-        prompt = f"""
-Disleksik bir öğrencinin profil bilgileri ve performans istatistiklerini analiz et. Kişiselleştirilmiş, yapıcı ve motive edici bir analiz raporu yaz.
+        if self.analysis_mode == "local":
+            for sentence in split_sentences(self.analysis_renderer.render(user_info, user_statistics)):
+                yield sentence
+            return
+
+        draft = self.analysis_renderer.render(user_info, user_statistics) if self.analysis_mode == "polish" else None
+        prompt = self._create_analysis_prompt(user_info, user_statistics, draft)
+        sentences = SentenceStream("analysis")
+        emitted = False
+
+        async for token in self._guard_stream(self._stream_generate(
+            "analysis",
+            prompt,
+            {
+                "temperature": 0.7,  # Daha objektif analiz için
+                "top_p": 0.8
+            }
+        )):
+            for sentence in sentences.feed(token):
+                emitted = True
+                yield sentence
+
+        if not emitted:
+            logger.warning("⚠️ Boş analiz stream edildi, varsayılan analiz kullanılıyor")
+            metrics.FALLBACK_CONTENT.labels("analysis").inc()
+            for sentence in split_sentences(draft or DEFAULT_ANALYSIS):
+                yield sentence
 
+    def _create_analysis_prompt(self, user_info, user_statistics, draft: Optional[str] = None) -> str:
+        """
+        Kullanıcı bilgileri ve istatistiklerini analiz etmek için prompt (kurallar prompts.ANALYSIS_SYSTEM içinde).
+        Taslak verilirse sona eklenir; sistem prompt'u aynı kaldığı için Ollama'daki önbellekli önek korunur.
+        """
+        prompt = f"""
 KULLANICI BİLGİLERİ:
 - Yaş Grubu: {user_info.age_group}
 - Zorluk Alanı: {user_info.hard_area}
@@ -582,108 +1323,68 @@ KULLANICI BİLGİLERİ:
 
 PERFORMANS İSTATİSTİKLERİ:
 - Toplam Oyun: {user_statistics.total_games_played}
-- Fonolojik Oyun Başarı: %{user_statistics.phonological_success_rate}
-- Yazım Oyunu Başarı: %{user_statistics.spelling_success_rate}
-- Kelime Listesi Oyunu Başarı: %{user_statistics.word_list_success_rate}
-- Paragraf Oyunu Başarı: %{user_statistics.paragraph_success_rate}
-
-GÖREV:
-Bu bilgileri sentezleyerek 4-5 cümlelik profesyonel bir analiz yaz. Şunları içer:
-1. Mevcut durumun objektif değerlendirmesi
-2. Güçlü yönlerin vurgulanması
-3. Gelişim alanlarının belirlenmesi
-4. Konstruktif öneriler ve motivasyon
-
-KURALLAR:
-- 3. ŞAHIS (objektif gözlemci) bakış açısı kullan
-- "Kullanıcının...", diye başla
-- "...edilmesi önerilir", "...yoğunlaşılması gerekir" gibi pasif yapılar kullan
-- Profesyonel ve objektif dil kullan
-- Pozitif ve motive edici ol
-- Somut verilerden örnekler ver
-- Sadece Türkçe yaz
-- Eleştirel değil, yapıcı ol
-
-ÖRNEK YAZIM TARZI:
-"Kullanıcının 45 oyunluk deneyiminde %72.5 fonolojik başarı oranı göze çarpmaktadır. Kelime listesi alanında %85.2 gibi yüksek bir performans sergilenmesi güçlü yönlerini ortaya koymaktadır. Paragraf alanında %79.8 başarı oranı olduğundan bu alanda daha fazla practice yapılması önerilir. Genel olarak istikrarlı bir gelişim trendi gösterilmektedir."
-
-JSON formatında döndür:
-{{
-  "analysis": "Kullanıcının performans analizi burada yer alır. Objektif bir değerlendirme sunulur ve gelişim alanları belirlenir. Güçlü yönler vurgulanır ve gelecek için öneriler sunulur."
-}}
+- Fonolojik Oyun Başarı: {format_rate(user_statistics.phonological_success_rate)}
+- Yazım Oyunu Başarı: {format_rate(user_statistics.spelling_success_rate)}
+- Kelime Listesi Oyunu Başarı: {format_rate(user_statistics.word_list_success_rate)}
+- Paragraf Oyunu Başarı: {format_rate(user_statistics.paragraph_success_rate)}
 """
+        if draft:
+            prompt += POLISH_PROMPT.format(draft=draft)
         return prompt
 
-    async def generate_roadmap(self, user_info) -> dict:
+    async def generate_roadmap(
+        self, user_info, user_statistics: Optional[UserStatistics] = None, days: int = 7
+    ) -> dict:
         """
         Kullanıcı bilgilerine göre kişiselleştirilmiş yol haritası oluşturur
         """
+        if self.roadmap_mode == "local" or days != 7:
+            # Kurallarla yerel plan; Llama prompt'u yalnızca 7 günlük plan ürettiği için 30 günlük plan hep yerel
+            roadmap_data = self.roadmap_planner.plan(user_info, user_statistics, days)
+            log_payload(logger, "Generated roadmap", roadmap_data)
+            return roadmap_data
+
         prompt = self._create_roadmap_prompt(user_info)
         
-        async with httpx.AsyncClient(timeout=90.0) as client:
-            try:
-                response = await client.post(
-                    f"{self.llama_url}/api/generate",
-                    json={
-                        "model": self.model_name,
-                        "prompt": prompt,
-                        "format": "json",
-                        "stream": False,
-                        "options": {
-                            "temperature": 0.6,  # Daha tutarlı plan için
-                            "top_p": 0.8
-                        }
-                    }
-                )
-                response.raise_for_status()
-                
-                llama_response = response.json()
-                generated_text = llama_response.get("response", "")
-                
-                # JSON yanıtını parse et
-                roadmap_data = json.loads(generated_text)
-                
-                # Varsayılan yol haritası
-                if not roadmap_data or not roadmap_data.get("daily_plans"):
-                    print("⚠️ Boş yol haritası alındı, varsayılan plan kullanılıyor")
-                    roadmap_data = {
-                        "daily_plans": [
-                            {"day": 1, "phonological_games": 2, "spelling_games": 1, "word_exercises": 1, "reading_time": 10},
-                            {"day": 2, "phonological_games": 2, "spelling_games": 1, "word_exercises": 1, "reading_time": 10},
-                            {"day": 3, "phonological_games": 3, "spelling_games": 2, "word_exercises": 1, "reading_time": 15},
-                            {"day": 4, "phonological_games": 2, "spelling_games": 2, "word_exercises": 2, "reading_time": 15},
-                            {"day": 5, "phonological_games": 3, "spelling_games": 2, "word_exercises": 2, "reading_time": 20},
-                            {"day": 6, "phonological_games": 2, "spelling_games": 1, "word_exercises": 1, "reading_time": 10},
-                            {"day": 7, "phonological_games": 1, "spelling_games": 1, "word_exercises": 1, "reading_time": 5}
-                        ],
-                        "total_duration_days": 7,
-                        "focus_areas": ["Hece tanıma", "Yazım doğruluğu", "Kelime dağarcığı"]
-                    }
-                
-                print(f"Generated roadmap: {roadmap_data}")
-                return roadmap_data
-                
-            except httpx.RequestError as e:
-                print(f"Llama RequestError: {e}")
-                raise Exception(f"Llama API'sine bağlanılamıyor: {str(e)}")
-            except httpx.HTTPStatusError as e:
-                print(f"Llama HTTPStatusError: {e}")
-                raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
-            except json.JSONDecodeError as e:
-                print(f"JSON Decode Error: {e}")
-                print(f"Generated text: {generated_text}")
-                raise Exception(f"Llama'dan gelen yanıt JSON formatında değil: {str(e)}")
-            except Exception as e:
-                print(f"Genel Exception: {e}")
-                raise Exception(f"Beklenmeyen hata: {str(e)}")
+        try:
+            document = await self._generate_document(
+                "roadmap",
+                prompt,
+                {
+                    "temperature": 0.6,  # Daha tutarlı plan için
+                    "top_p": 0.8
+                }
+            )
+            
+            # Varsayılan yol haritası
+            roadmap_data = document.model_dump(exclude={"degraded"}) if document is not None else None
+            if not roadmap_data:
+                logger.warning("⚠️ Boş yol haritası alındı, varsayılan plan kullanılıyor")
+                metrics.FALLBACK_CONTENT.labels("roadmap").inc()
+                roadmap_data = copy.deepcopy(DEFAULT_ROADMAP)
+            
+            log_payload(logger, "Generated roadmap", roadmap_data)
+            return roadmap_data
+            
+        except OverloadedError:
+            raise
+        except (httpx.RequestError, NoBackendAvailableError) as e:
+            logger.error("Llama RequestError: %s", e)
+            raise LlamaUnavailableError(f"Llama API'sine bağlanılamıyor: {str(e)}")
+        except httpx.HTTPStatusError as e:
+            logger.error("Llama HTTPStatusError: %s", e)
+            if e.response.status_code >= 500:
+                raise LlamaUnavailableError(f"Llama API HTTP hatası: {e.response.status_code}")
+            raise Exception(f"Llama API HTTP hatası: {e.response.status_code}")
+        except Exception as e:
+            logger.exception("Genel Exception: %s", e)
+            raise Exception(f"Beklenmeyen hata: {str(e)}")
 
     def _create_roadmap_prompt(self, user_info) -> str:
         """
-        Kullanıcı bilgilerine göre yol haritası oluşturmak için prompt
+        Kullanıcı bilgilerine göre yol haritası oluşturmak için prompt (kurallar prompts.ROADMAP_SYSTEM içinde)
         """
         prompt = f"""
-Disleksik bir öğrenci için kişiselleştirilmiş 7 günlük yol haritası oluştur.
-
 KULLANICI BİLGİLERİ:
 - Yaş Grubu: {user_info.age_group}
 - Zorluk Alanı: {user_info.hard_area}
@@ -691,40 +1392,5 @@ KULLANICI BİLGİLERİ:
 - Tanı Durumu: {user_info.diagnosis_time}
 - Sevdiği Oyunlar: {user_info.motivating_games}
 - Uzman Desteği: {user_info.working_with_professional}
-
-GÖREV:
-7 günlük günlük egzersiz planı oluştur. Her gün için:
-- Fonolojik oyun sayısı (1-5 arası)
-- Yazım oyunu sayısı (1-4 arası)  
-- Kelime egzersizi sayısı (1-3 arası)
-- Okuma süresi dakika (5-30 arası)
-
-KURALLAR:
-- İlk günler daha az, ilerleyen günlerde artırarak zorluk
-- Hafta sonu daha hafif program
-- Kullanıcının zorluk alanına odaklan
-- Yaş grubuna uygun yoğunluk
-- Motivasyonu koruyacak çeşitlilik
-
-ODAK ALANLARI:
-Kullanıcının zorluk alanına göre odaklanılacak alanları belirle:
-- Hece tanıma, Ses-harf eşleştirme, Yazım doğruluğu, Kelime dağarcığı, vb.
-
-JSON formatında döndür:
-{{
-  "daily_plans": [
-    {{
-      "day": 1,
-      "phonological_games": 2,
-      "spelling_games": 1,
-      "word_exercises": 1,
-      "reading_time": 10
-    }}
-  ],
-  "total_duration_days": 7,
-  "focus_areas": ["Hece tanıma", "Yazım doğruluğu"]
-}}
-
-TAM OLARAK 7 günlük plan oluştur!
 """
         return prompt
@@ -0,0 +1,114 @@
+import atexit
+import json
+import logging
+import queue
+import random
+import sys
+import uuid
+from contextvars import ContextVar
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Optional
+
+# Her HTTP isteğine atanan kimlik; LlamaService ve arka plan görevlerindeki loglara da taşınır
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+_listener: Optional[QueueListener] = None
+_payload_sample_rate = 0.0
+
+
+def new_request_id() -> str:
+    return uuid.uuid4().hex[:16]
+
+
+class RequestIdFilter(logging.Filter):
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+
+class JsonFormatter(logging.Formatter):
+    """
+    Her log kaydını tek satırlık JSON olarak yazar; `extra={"fields": {...}}` ile ek alanlar eklenebilir
+    """
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            "ts": self.formatTime(record, "%Y-%m-%dT%H:%M:%S"),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        entry.update(getattr(record, "fields", None) or {})
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class _QueueHandler(QueueHandler):
+    """
+    Kaydı olduğu gibi kuyruğa bırakır. Standart QueueHandler mesajı burada biçimlendirir;
+    biçimlendirme ve yazma işi dinleyici iş parçacığına bırakılır ki olay döngüsü beklemesin.
+    """
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # Argümanlar sonradan değişebileceği için mesaj metni sabitlenir, ağır olan JSON/istisna biçimlendirmesi ertelenir
+        record.msg = record.getMessage()
+        record.args = None
+        return record
+
+
+def setup_logging(level: str = "INFO", fmt: str = "json", payload_sample_rate: float = 0.0):
+    """
+    Kök logger'ı sınırsız bir kuyruğa yazan engellemesiz bir handler ile yapılandırır.
+    Asıl stdout yazımı ayrı bir iş parçacığındaki QueueListener tarafından yapılır.
+    """
+    global _listener, _payload_sample_rate
+    _payload_sample_rate = payload_sample_rate
+    if _listener is not None:
+        return
+
+    stream_handler = logging.StreamHandler(sys.stdout)
+    if fmt == "json":
+        stream_handler.setFormatter(JsonFormatter())
+    else:
+        stream_handler.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s [%(request_id)s] %(message)s"))
+
+    log_queue: "queue.SimpleQueue[Any]" = queue.SimpleQueue()
+    queue_handler = _QueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+
+    root = logging.getLogger()
+    root.handlers = [queue_handler]
+    root.setLevel(level.upper())
+    # uvicorn erişim logları da aynı kuyruktan geçsin
+    for name in ("uvicorn", "uvicorn.error", "uvicorn.access"):
+        logging.getLogger(name).handlers = []
+        logging.getLogger(name).propagate = True
+    # Kütüphanelerin istek başına ürettiği ayrıntılı loglar yüksek istek hızında gürültü ve yük oluşturur
+    for name in ("httpx", "httpcore", "asyncio"):
+        logging.getLogger(name).setLevel(logging.WARNING)
+
+    _listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    _listener.start()
+    atexit.register(shutdown_logging)
+
+
+def shutdown_logging():
+    """
+    Kuyrukta kalan kayıtları yazıp dinleyiciyi durdurur
+    """
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+
+def log_payload(logger: logging.Logger, message: str, payload: Any, **fields):
+    """
+    Üretilen içeriği yalnızca DEBUG açıkken ve örnekleme oranına göre loglar.
+    Yüksek istek hızında tüm çıktıları yazmak yerine küçük bir örneklem yeterlidir.
+    """
+    if not logger.isEnabledFor(logging.DEBUG) or random.random() >= _payload_sample_rate:
+        return
+    logger.debug(message, extra={"fields": {**fields, "payload": payload}})
@@ -1,12 +1,305 @@
-from fastapi import FastAPI, HTTPException
+import os
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, List, Optional, Tuple
+import time
+from fastapi import FastAPI, Header, HTTPException, Query, Request
 from fastapi.middleware.cors import CORSMiddleware
-from models import GameRequest, GameResponse, SpellingGameResponse, WordListResponse, ParagraphResponse, AnalysisRequest, AnalysisResponse, RoadmapResponse
-from llama_service import LlamaService
+from fastapi.responses import Response, StreamingResponse
+from models import GameRequest, GameResponse, SpellingGameResponse, WordListResponse, ParagraphResponse, AnalysisRequest, AnalysisResponse, RoadmapRequest, RoadmapResponse
+from models import GameBatchResponse, SpellingGameBatchResponse, WordListBatchResponse, ParagraphBatchResponse
+from models import ProgressEventBatch, ProgressIngestResponse, UserStatistics
+from llama_service import LlamaService, LlamaUnavailableError
+from admission import OverloadedError
+from content_pool import ContentPool
+from progress_store import ProgressStore, SqliteProgressBackend
+from adaptive import build_adaptive_engine
+from response_cache import ResponseCache, MemoryCacheBackend, SqliteCacheBackend, cache_key, normalize_user_info, bucket_statistics
+from stream_parser import split_sentences
+import metrics
+from logging_setup import setup_logging, log_payload, new_request_id, request_id_var
+
+# stdout'a yazma ayrı bir iş parçacığında yapılır; olay döngüsü log yüzünden beklemez
+setup_logging(
+    level=os.getenv("LOG_LEVEL", "INFO"),
+    fmt=os.getenv("LOG_FORMAT", "json"),
+    payload_sample_rate=float(os.getenv("LOG_PAYLOAD_SAMPLE_RATE", "0.01")),
+)
+logger = logging.getLogger(__name__)
+
+# Llama servisini oluştur (HTTP istemcisi lifespan içinde açılıp kapanır)
+llama_service = LlamaService(
+    llama_url=os.getenv("OLLAMA_URL", "http://172.30.48.23:11434"),
+    # Birden fazla Ollama sunucusu virgülle ayrılarak verilebilir
+    llama_urls=[url.strip() for url in os.getenv("OLLAMA_URLS", "").split(",") if url.strip()] or None,
+    max_connections=int(os.getenv("OLLAMA_MAX_CONNECTIONS", "100")),
+    max_keepalive_connections=int(os.getenv("OLLAMA_MAX_KEEPALIVE", "20")),
+    keepalive_expiry=float(os.getenv("OLLAMA_KEEPALIVE_EXPIRY", "30")),
+    http2=os.getenv("OLLAMA_HTTP2", "0") == "1",
+    coalesce_window=float(os.getenv("COALESCE_WINDOW", "0")),
+    max_concurrency=int(os.getenv("OLLAMA_MAX_CONCURRENCY", "4")),
+    max_queue_depth=int(os.getenv("OLLAMA_MAX_QUEUE_DEPTH", "64")),
+    retry_after=int(os.getenv("OLLAMA_RETRY_AFTER", "5")),
+    balancing_strategy=os.getenv("OLLAMA_BALANCING", "least_outstanding"),
+    max_retries=int(os.getenv("OLLAMA_MAX_RETRIES", "1")),
+    failure_threshold=int(os.getenv("OLLAMA_FAILURE_THRESHOLD", "3")),
+    eject_duration=float(os.getenv("OLLAMA_EJECT_SECONDS", "30")),
+    health_check_interval=float(os.getenv("OLLAMA_HEALTH_INTERVAL", "10")),
+    phonological_mode=os.getenv("PHONOLOGICAL_MODE", "local"),
+    spelling_mode=os.getenv("SPELLING_MODE", "local"),
+    roadmap_mode=os.getenv("ROADMAP_MODE", "local"),
+    analysis_mode=os.getenv("ANALYSIS_MODE", "local"),
+    word_list_mode=os.getenv("WORD_LIST_MODE", "local"),
+    lexicon_index_dir=os.getenv("LEXICON_INDEX_DIR") or None,
+    word_recent_window=int(os.getenv("WORD_RECENT_WINDOW", "50")),
+    word_validation=os.getenv("WORD_LIST_VALIDATION", "shape"),
+    readability_unknown_rare=os.getenv("READABILITY_UNKNOWN_RARE", "0") == "1",
+    dedup_enabled=os.getenv("DEDUP_ENABLED", "1") == "1",
+    dedup_threshold=float(os.getenv("DEDUP_THRESHOLD", "0.5")),
+    dedup_history=int(os.getenv("DEDUP_HISTORY", "50")),
+    dedup_attempts=int(os.getenv("DEDUP_ATTEMPTS", "3")),
+    keep_alive=os.getenv("OLLAMA_KEEP_ALIVE", "30m"),
+    structured_format=os.getenv("OLLAMA_STRUCTURED_FORMAT", "1") == "1",
+    repair_rounds=int(os.getenv("SCHEMA_REPAIR_ROUNDS", "1")),
+    hedge_percentile=float(os.getenv("HEDGE_PERCENTILE", "95")),
+    hedge_budget=float(os.getenv("HEDGE_BUDGET", "0.1")),
+    hedge_min_samples=int(os.getenv("HEDGE_MIN_SAMPLES", "20")),
+)
+
+# Oyun endpoint'leri için önceden üretilmiş içerik havuzu
+content_pool = ContentPool(
+    producers={
+        endpoint: llama_service.background(generate)
+        for endpoint, generate in {
+            "phonological": llama_service.generate_phonological_game,
+            "spelling": llama_service.generate_spelling_game,
+            "word_list": llama_service.generate_word_list,
+            "paragraph": llama_service.generate_paragraph,
+        }.items()
+        # Yerel üretilen oyunlar zaten anında hazır, havuzlamaya gerek yok
+        if endpoint not in llama_service.local_endpoints
+    } if os.getenv("POOL_ENABLED", "1") == "1" else {},
+    low_watermark=int(os.getenv("POOL_LOW_WATERMARK", "2")),
+    high_watermark=int(os.getenv("POOL_HIGH_WATERMARK", "5")),
+    max_age=float(os.getenv("POOL_MAX_AGE", "1800")),
+    max_refill_concurrency=int(os.getenv("POOL_REFILL_CONCURRENCY", "2")),
+)
+
+# Analiz ve yol haritası için yanıt önbelleği
+cache_max_entries = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+response_cache = ResponseCache(
+    backend=SqliteCacheBackend(os.getenv("CACHE_SQLITE_PATH", "response_cache.sqlite3"), cache_max_entries)
+    if os.getenv("CACHE_BACKEND", "memory") == "sqlite" else MemoryCacheBackend(cache_max_entries),
+    ttls={
+        "roadmap": float(os.getenv("CACHE_TTL_ROADMAP", "86400")),
+        "analysis": float(os.getenv("CACHE_TTL_ANALYSIS", "3600")),
+    },
+)
+
+# Oyunlardan gelen cevap olaylarının sunucu tarafı toplamları
+progress_store = ProgressStore(
+    SqliteProgressBackend(
+        os.getenv("PROGRESS_DB_PATH", "progress.sqlite3"),
+        rolling_alpha=float(os.getenv("PROGRESS_ROLLING_ALPHA", "0.1")),
+    )
+)
+
+# Öğrenci başına hece/karışıklık türü ustalığı; tekil oyun isteklerinde user_id ile hedef seçer
+adaptive_engine = build_adaptive_engine(
+    llama_service.phonological_engine,
+    llama_service.spelling_engine,
+    target_success=float(os.getenv("ADAPTIVE_TARGET_SUCCESS", "0.7")),
+    max_students=int(os.getenv("ADAPTIVE_MAX_STUDENTS", "10000")),
+)
+
+async def _ensure_adaptive(user_id: str):
+    """
+    Bellekte olmayan öğrencinin ustalıklarını ilerleme kaydından yükler
+    """
+    if not adaptive_engine.knows(user_id):
+        adaptive_engine.seed(user_id, await progress_store.item_stats(user_id))
+
+async def _adaptive_targets(user_id: Optional[str], skill: str) -> Optional[List[str]]:
+    if not user_id:
+        return None
+    await _ensure_adaptive(user_id)
+    return adaptive_engine.select(user_id, skill, 5)
+
+async def _resolve_statistics(
+    user_statistics: Optional[UserStatistics], user_id: Optional[str], required: bool
+) -> Optional[UserStatistics]:
+    """
+    İstekte istatistik varsa onu, yoksa user_id ile ilerleme kaydındaki toplamları döndürür
+    """
+    if user_statistics is not None:
+        return user_statistics
+    if user_id:
+        statistics = await progress_store.user_statistics(user_id)
+        if statistics is None and required:
+            raise HTTPException(status_code=404, detail=f"İlerleme kaydı bulunamadı: {user_id}")
+        return statistics
+    if required:
+        raise HTTPException(status_code=422, detail="user_statistics veya user_id gönderilmelidir")
+    return None
+
+def _cache_mode(cache_control: Optional[str], endpoint: Optional[str] = None) -> Tuple[bool, bool]:
+    """
+    Cache-Control başlığına göre önbellekten (okuma, yazma) izinlerini döndürür.
+    Yerel üretilen endpoint'ler önbelleğe alınmaz; hesaplama önbellek erişiminden ucuzdur ve kovalanmış
+    istatistikler yerine isteğin kendi sayılarıyla üretilir.
+    """
+    if endpoint is not None and endpoint in llama_service.local_endpoints:
+        return False, False
+    directives = {d.strip().lower() for d in (cache_control or "").split(",")}
+    if "no-store" in directives:
+        return False, False
+    if "no-cache" in directives:
+        return False, True
+    return True, True
+
+def _overloaded(error: OverloadedError) -> HTTPException:
+    """
+    Kuyruk dolu hatasını Retry-After başlıklı 503 yanıtına çevirir
+    """
+    logger.warning("⚠️ İstek reddedildi: %s", error)
+    return HTTPException(
+        status_code=503,
+        detail=str(error),
+        headers={"Retry-After": str(error.retry_after)}
+    )
+
+async def _ndjson_response(events: AsyncIterator[dict], error_detail: str) -> StreamingResponse:
+    """
+    Olay üretecini NDJSON (satır başına bir JSON) olarak stream eder.
+    İlk olay beklenir ki Llama'ya hiç ulaşılamazsa normal bir 500 hatası dönebilsin.
+    """
+    try:
+        first = await events.__anext__()
+    except StopAsyncIteration:
+        first = None
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except Exception as e:
+        logger.error("Stream başlatma hatası: %s", e)
+        raise HTTPException(status_code=500, detail=f"{error_detail}: {str(e) or 'Bilinmeyen hata'}")
+
+    async def body():
+        if first is not None:
+            yield json.dumps(first, ensure_ascii=False) + "\n"
+        try:
+            async for event in events:
+                yield json.dumps(event, ensure_ascii=False) + "\n"
+        except Exception as e:
+            logger.error("Stream hatası: %s", e)
+            yield json.dumps({"error": f"{error_detail}: {str(e) or 'Bilinmeyen hata'}"}, ensure_ascii=False) + "\n"
+
+    return StreamingResponse(body(), media_type="application/x-ndjson")
+
+# Ollama backend kuyruk/durum göstergeleri /metrics'e bağlanır
+metrics.register_backends(llama_service.backends)
+loop_lag_monitor = metrics.LoopLagMonitor(interval=float(os.getenv("LOOP_LAG_INTERVAL", "0.5")))
+
+# Tek istekte üretilebilecek en fazla oyun sayısı
+BATCH_MAX_COUNT = int(os.getenv("BATCH_MAX_COUNT", "10"))
+
+# Toplu endpoint'lerde tek oyunun yanıt modeli: endpoint -> (model, alan adı)
+BATCH_GAME_MODELS = {
+    "phonological": (GameResponse, "questions"),
+    "spelling": (SpellingGameResponse, "questions"),
+    "word_list": (WordListResponse, "words"),
+    "paragraph": (ParagraphResponse, "paragraphs"),
+}
+
+def _fallback_games(endpoint: str, request: GameRequest, count: int, exclude: List[list]) -> List[list]:
+    """
+    Ollama kullanılamadığında toplu yanıtın eksik oyunları için yerel/varsayılan içerik; havuzdan gelen
+    ve birbirinin aynı oyunlar atlanır, toplam deneme sayısı `count`un iki katıyla sınırlıdır
+    """
+    games: List[list] = []
+    for _ in range(count * 2):
+        if len(games) >= count:
+            break
+        game = llama_service.fallback_content(endpoint, request.user_info, user_id=request.user_id)
+        if game and game not in exclude and game not in games:
+            games.append(game)
+    return games
+
+async def _batch_response(endpoint: str, request: GameRequest, count: int, stream: bool, response_model, error_detail: str):
+    """
+    Toplu oyun üretimi: önce hazır içerik havuzu kullanılır, kalan oyunlar eşzamanlı üretilir.
+    `stream` ise her oyun hazır olduğunda NDJSON satırı olarak gönderilir. Ollama kullanılamazsa
+    eksik oyunlar yerel içerikle tamamlanır ve yanıt `degraded` olarak işaretlenir.
+    """
+    game_model, field = BATCH_GAME_MODELS[endpoint]
+    pooled = []
+    while len(pooled) < count:
+        game = await content_pool.get(endpoint, request.user_info)
+        if game is None:
+            break
+        if game and game not in pooled:
+            pooled.append(game)
+
+    games = llama_service.stream_batch(endpoint, request.user_info, count - len(pooled), exclude=pooled) if len(pooled) < count else None
+
+    if stream:
+        async def events():
+            index = 0
+            for game in pooled:
+                yield {"index": index, "game": game_model(**{field: game}).model_dump()}
+                index += 1
+            if games is not None:
+                try:
+                    async for game in games:
+                        yield {"index": index, "game": game_model(**{field: game}).model_dump()}
+                        index += 1
+                except LlamaUnavailableError as e:
+                    logger.warning("⚠️ Llama kullanılamıyor, toplu %s yedek içerikle tamamlanıyor: %s", endpoint, e)
+                    for game in _fallback_games(endpoint, request, count - index, pooled):
+                        yield {"index": index, "game": game_model(**{field: game}, degraded=True).model_dump()}
+                        index += 1
+                    yield {"done": True, "degraded": True}
+                    return
+            yield {"done": True}
+
+        return await _ndjson_response(events(), error_detail)
+
+    try:
+        generated = [game async for game in games] if games is not None else []
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya tüm devreler açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, toplu %s yedek içerikle tamamlanıyor: %s", endpoint, e)
+        fallback = _fallback_games(endpoint, request, count - len(pooled), pooled)
+        return response_model(
+            games=[game_model(**{field: game}) for game in pooled] + [game_model(**{field: game}, degraded=True) for game in fallback],
+            degraded=True,
+        )
+    except Exception as e:
+        error_message = str(e) if str(e) else "Bilinmeyen hata"
+        logger.error("Toplu %s üretim hatası: %s", endpoint, error_message)
+        raise HTTPException(status_code=500, detail=f"{error_detail}: {error_message}")
+
+    logger.debug("Toplu %s: istenen %s, havuzdan %s, üretilen %s", endpoint, count, len(pooled), len(generated))
+    return response_model(games=[game_model(**{field: game}) for game in pooled + generated])
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    await llama_service.start()
+    loop_lag_monitor.start()
+    yield
+    await loop_lag_monitor.close()
+    await content_pool.close()
+    await response_cache.close()
+    await progress_store.close()
+    await llama_service.close()
 
 app = FastAPI(
     title="Disleksik Bireyler İçin Oyun API",
     description="Fonolojik disleksi için kişiselleştirilmiş Hece Avcısı oyunu",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
 # CORS ayarları
@@ -18,8 +311,27 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Llama servisini başlat
-llama_service = LlamaService()
+@app.middleware("http")
+async def assign_request_id(request: Request, call_next):
+    # İstemci X-Request-ID gönderirse o kullanılır; LlamaService dahil tüm loglar bu kimliği taşır
+    request_id = request.headers.get("X-Request-ID") or new_request_id()
+    token = request_id_var.set(request_id)
+    try:
+        response = await call_next(request)
+    finally:
+        request_id_var.reset(token)
+    response.headers["X-Request-ID"] = request_id
+    return response
+
+@app.middleware("http")
+async def record_request_latency(request: Request, call_next):
+    started = time.monotonic()
+    response = await call_next(request)
+    # Etiket olarak gerçek yol yerine route şablonu kullanılır ki seri sayısı sınırlı kalsın
+    route = request.scope.get("route")
+    path = route.path if route is not None else "unmatched"
+    metrics.REQUEST_LATENCY.labels(request.method, path, str(response.status_code)).observe(time.monotonic() - started)
+    return response
 
 @app.get("/")
 async def root():
@@ -39,13 +351,18 @@ async def create_phonological_game(request: GameRequest):
     Kullanıcı bilgilerine göre Fonolojik (Hece Avcısı) oyunu oluşturur
     
     - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
+    - **user_id**: (İsteğe bağlı) Hedef heceler öğrencinin ustalığına göre seçilir, daha önce gördüğü soruların yakın tekrarları verilmez; havuz kullanılmaz
     - **return**: 5 sorudan oluşan oyun
     """
+    targets = None
     try:
-        # Llama'dan oyun sorularını al
-        questions = await llama_service.generate_phonological_game(request.user_info)
+        targets = await _adaptive_targets(request.user_id, "phonological")
+        # Önce hazır içerik havuzuna bak, yoksa Llama'dan oyun sorularını al
+        questions = await content_pool.get("phonological", request.user_info) if targets is None else None
+        if questions is None:
+            questions = await llama_service.generate_phonological_game(request.user_info, targets, request.user_id)
         
-        print(f"Alınan soru sayısı: {len(questions) if questions else 0}")
+        logger.debug("Alınan soru sayısı: %s", len(questions) if questions else 0)
         
         if not questions:
             raise HTTPException(
@@ -54,17 +371,23 @@ async def create_phonological_game(request: GameRequest):
             )
         
         if len(questions) != 5:
-            print(f"⚠️ Beklenen 5 soru, alınan {len(questions)} soru")
+            logger.warning("⚠️ Beklenen 5 soru, alınan %s soru", len(questions))
             # 5 soru yoksa hata verme, mevcut soruları döndür
         
         return GameResponse(questions=questions)
         
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya devre açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, yedek içerik dönülüyor: %s", e)
+        return GameResponse(
+            questions=llama_service.fallback_content("phonological", request.user_info, targets=targets, user_id=request.user_id),
+            degraded=True,
+        )
     except Exception as e:
         error_message = str(e) if str(e) else "Bilinmeyen hata"
-        print(f"Oyun oluşturma hatası: {error_message}")
-        print(f"Hata tipi: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Oyun oluşturma hatası: %s", error_message)
         raise HTTPException(
             status_code=500, 
             detail=f"Oyun oluşturulamadı: {error_message}"
@@ -76,13 +399,18 @@ async def create_spelling_game(request: GameRequest):
     Kullanıcı bilgilerine göre Yazım Hatası Tespit oyunu oluşturur
     
     - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
+    - **user_id**: (İsteğe bağlı) Karışıklık türleri öğrencinin ustalığına göre seçilir, daha önce gördüğü kelime beşlileri tekrar verilmez; havuz kullanılmaz
     - **return**: 5 sorudan oluşan yazım hatası tespit oyunu
     """
+    confusions = None
     try:
-        # Llama'dan oyun sorularını al
-        questions = await llama_service.generate_spelling_game(request.user_info)
+        confusions = await _adaptive_targets(request.user_id, "spelling")
+        # Önce hazır içerik havuzuna bak, yoksa Llama'dan oyun sorularını al
+        questions = await content_pool.get("spelling", request.user_info) if confusions is None else None
+        if questions is None:
+            questions = await llama_service.generate_spelling_game(request.user_info, confusions, request.user_id)
         
-        print(f"Alınan spelling soru sayısı: {len(questions) if questions else 0}")
+        logger.debug("Alınan spelling soru sayısı: %s", len(questions) if questions else 0)
         
         if not questions:
             raise HTTPException(
@@ -91,16 +419,22 @@ async def create_spelling_game(request: GameRequest):
             )
         
         if len(questions) != 5:
-            print(f"⚠️ Beklenen 5 soru, alınan {len(questions)} soru")
+            logger.warning("⚠️ Beklenen 5 soru, alınan %s soru", len(questions))
         
         return SpellingGameResponse(questions=questions)
         
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya devre açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, yedek içerik dönülüyor: %s", e)
+        return SpellingGameResponse(
+            questions=llama_service.fallback_content("spelling", request.user_info, targets=confusions, user_id=request.user_id),
+            degraded=True,
+        )
     except Exception as e:
         error_message = str(e) if str(e) else "Bilinmeyen hata"
-        print(f"Spelling oyun oluşturma hatası: {error_message}")
-        print(f"Hata tipi: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Spelling oyun oluşturma hatası: %s", error_message)
         raise HTTPException(
             status_code=500, 
             detail=f"Yazım hatası tespit oyunu oluşturulamadı: {error_message}"
@@ -112,13 +446,16 @@ async def create_word_list(request: GameRequest):
     Kullanıcının ilgi alanına göre 5 rastgele Türkçe kelime döndürür
     
     - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
+    - **user_id**: (İsteğe bağlı) Öğrencinin son gördüğü kelimeler tekrar verilmez; havuz kullanılmaz
     - **return**: İlgi alanına uygun 5 rastgele Türkçe kelime
     """
     try:
-        # Llama'dan kelime listesini al
-        words = await llama_service.generate_word_list(request.user_info)
+        # Önce hazır içerik havuzuna bak, yoksa Llama'dan kelime listesini al
+        words = await content_pool.get("word_list", request.user_info) if request.user_id is None else None
+        if words is None:
+            words = await llama_service.generate_word_list(request.user_info, request.user_id)
         
-        print(f"Generated word list: {words}")
+        log_payload(logger, "Generated word list", words)
         
         if not words or len(words) == 0:
             raise HTTPException(
@@ -128,12 +465,18 @@ async def create_word_list(request: GameRequest):
         
         return WordListResponse(words=words)
         
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya devre açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, yedek içerik dönülüyor: %s", e)
+        return WordListResponse(
+            words=llama_service.fallback_content("word_list", request.user_info, user_id=request.user_id),
+            degraded=True,
+        )
     except Exception as e:
         error_message = str(e) if str(e) else "Bilinmeyen hata"
-        print(f"Kelime listesi oluşturma hatası: {error_message}")
-        print(f"Hata tipi: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Kelime listesi oluşturma hatası: %s", error_message)
         raise HTTPException(
             status_code=500, 
             detail=f"Kelime listesi oluşturulamadı: {error_message}"
@@ -145,13 +488,20 @@ async def create_paragraph(request: GameRequest):
     Kullanıcının ilgi alanına göre 5 adet 4 cümlelik anlamlı paragraf oluşturur
     
     - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
+    - **user_id**: (İsteğe bağlı) Öğrencinin daha önce okuduğu paragrafların yakın tekrarları verilmez
     - **return**: İlgi alanına uygun 5 adet 4 cümlelik paragraf
     """
     try:
-        # Llama'dan paragrafları al
-        paragraphs = await llama_service.generate_paragraph(request.user_info)
+        # Önce hazır içerik havuzuna bak (öğrencinin okuduklarına benzeyenler atlanır), yoksa Llama'dan paragrafları al
+        paragraphs = await content_pool.get(
+            "paragraph", request.user_info, accept=llama_service.unseen_by(request.user_id, "paragraph")
+        )
+        if paragraphs is not None:
+            llama_service.remember_served(request.user_id, "paragraph", paragraphs)
+        else:
+            paragraphs = await llama_service.generate_paragraph(request.user_info, request.user_id)
         
-        print(f"Generated paragraphs: {paragraphs}")
+        log_payload(logger, "Generated paragraphs", paragraphs)
         
         if not paragraphs or len(paragraphs) == 0:
             raise HTTPException(
@@ -161,31 +511,143 @@ async def create_paragraph(request: GameRequest):
         
         return ParagraphResponse(paragraphs=paragraphs)
         
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya devre açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, yedek içerik dönülüyor: %s", e)
+        return ParagraphResponse(
+            paragraphs=llama_service.fallback_content("paragraph", request.user_info, user_id=request.user_id),
+            degraded=True,
+        )
     except Exception as e:
         error_message = str(e) if str(e) else "Bilinmeyen hata"
-        print(f"Paragraf oluşturma hatası: {error_message}")
-        print(f"Hata tipi: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Paragraf oluşturma hatası: %s", error_message)
         raise HTTPException(
             status_code=500, 
             detail=f"Paragraflar oluşturulamadı: {error_message}"
         )
 
+@app.post("/api/paragraph/stream")
+async def stream_paragraph(request: GameRequest):
+    """
+    /api/paragraph ile aynı içeriği NDJSON olarak stream eder; her paragraf tamamlandığı anda gönderilir
+    
+    - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
+    - **user_id**: (İsteğe bağlı) Öğrencinin daha önce okuduğu paragrafların yakın tekrarları verilmez
+    - **return**: `{"index": 0, "paragraph": "..."}` satırları ve son olarak `{"done": true}`
+    """
+    async def events():
+        paragraphs = await content_pool.get(
+            "paragraph", request.user_info, accept=llama_service.unseen_by(request.user_id, "paragraph")
+        )
+        if paragraphs is not None:
+            llama_service.remember_served(request.user_id, "paragraph", paragraphs)
+            for index, paragraph in enumerate(paragraphs):
+                yield {"index": index, "paragraph": paragraph}
+        else:
+            index = 0
+            try:
+                async for paragraph in llama_service.stream_paragraphs(request.user_info, request.user_id):
+                    yield {"index": index, "paragraph": paragraph}
+                    index += 1
+            except LlamaUnavailableError as e:
+                if index > 0:
+                    raise
+                logger.warning("⚠️ Llama kullanılamıyor, yedek paragraflar dönülüyor: %s", e)
+                for index, paragraph in enumerate(llama_service.fallback_content("paragraph", request.user_info, user_id=request.user_id)):
+                    yield {"index": index, "paragraph": paragraph}
+                yield {"done": True, "degraded": True}
+                return
+        yield {"done": True}
+
+    return await _ndjson_response(events(), "Paragraflar oluşturulamadı")
+
+@app.post("/api/phonological-game/batch", response_model=GameBatchResponse)
+async def create_phonological_game_batch(
+    request: GameRequest,
+    count: int = Query(5, ge=1, le=BATCH_MAX_COUNT),
+    stream: bool = Query(False),
+):
+    """
+    Bir oturum için birden fazla Fonolojik (Hece Avcısı) oyununu tek istekte üretir
+
+    - **count**: Üretilecek oyun sayısı
+    - **stream**: `true` ise oyunlar hazır oldukça NDJSON olarak gönderilir (`{"index": 0, "game": {...}}`, sonunda `{"done": true}`; Ollama kullanılamazsa `{"done": true, "degraded": true}`)
+    - **return**: Birbirinden farklı en fazla `count` oyun
+    """
+    return await _batch_response("phonological", request, count, stream, GameBatchResponse, "Oyunlar oluşturulamadı")
+
+@app.post("/api/spelling-game/batch", response_model=SpellingGameBatchResponse)
+async def create_spelling_game_batch(
+    request: GameRequest,
+    count: int = Query(5, ge=1, le=BATCH_MAX_COUNT),
+    stream: bool = Query(False),
+):
+    """
+    Bir oturum için birden fazla Yazım Hatası Tespit oyununu tek istekte üretir
+
+    - **count**: Üretilecek oyun sayısı
+    - **stream**: `true` ise oyunlar hazır oldukça NDJSON olarak gönderilir (`{"index": 0, "game": {...}}`, sonunda `{"done": true}`; Ollama kullanılamazsa `{"done": true, "degraded": true}`)
+    - **return**: Birbirinden farklı en fazla `count` oyun
+    """
+    return await _batch_response("spelling", request, count, stream, SpellingGameBatchResponse, "Yazım hatası tespit oyunları oluşturulamadı")
+
+@app.post("/api/word-list/batch", response_model=WordListBatchResponse)
+async def create_word_list_batch(
+    request: GameRequest,
+    count: int = Query(5, ge=1, le=BATCH_MAX_COUNT),
+    stream: bool = Query(False),
+):
+    """
+    Bir oturum için birden fazla Kelime listesi oyununu tek istekte üretir
+
+    - **count**: Üretilecek oyun sayısı
+    - **stream**: `true` ise oyunlar hazır oldukça NDJSON olarak gönderilir (`{"index": 0, "game": {...}}`, sonunda `{"done": true}`; Ollama kullanılamazsa `{"done": true, "degraded": true}`)
+    - **return**: Birbirinden farklı en fazla `count` oyun
+    """
+    return await _batch_response("word_list", request, count, stream, WordListBatchResponse, "Kelime listeleri oluşturulamadı")
+
+@app.post("/api/paragraph/batch", response_model=ParagraphBatchResponse)
+async def create_paragraph_batch(
+    request: GameRequest,
+    count: int = Query(5, ge=1, le=BATCH_MAX_COUNT),
+    stream: bool = Query(False),
+):
+    """
+    Bir oturum için birden fazla Paragraf oyununu tek istekte üretir
+
+    - **count**: Üretilecek oyun sayısı
+    - **stream**: `true` ise oyunlar hazır oldukça NDJSON olarak gönderilir (`{"index": 0, "game": {...}}`, sonunda `{"done": true}`; Ollama kullanılamazsa `{"done": true, "degraded": true}`)
+    - **return**: Birbirinden farklı en fazla `count` oyun
+    """
+    return await _batch_response("paragraph", request, count, stream, ParagraphBatchResponse, "Paragraflar oluşturulamadı")
+
 @app.post("/api/analysis", response_model=AnalysisResponse)
-async def create_analysis(request: AnalysisRequest):
+async def create_analysis(request: AnalysisRequest, cache_control: Optional[str] = Header(None)):
     """
     Kullanıcı bilgileri ve istatistiklerini analiz ederek kişiselleştirilmiş rapor oluşturur
     
     - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
     - **user_statistics**: Kullanıcının oyun performans istatistikleri
+    - **user_id**: `user_statistics` yerine sunucudaki ilerleme kaydını kullanmak için
+    - **Cache-Control**: `no-cache` önbelleği atlar, `no-store` sonucu önbelleğe de yazmaz
     - **return**: Kişiselleştirilmiş analiz raporu
     """
+    statistics = await _resolve_statistics(request.user_statistics, request.user_id, required=True)
     try:
-        # Llama'dan analizi al
-        analysis = await llama_service.generate_analysis(request.user_info, request.user_statistics)
+        key = cache_key("analysis", normalize_user_info(request.user_info), bucket_statistics(statistics))
+        read_cache, write_cache = _cache_mode(cache_control, "analysis")
+        analysis = await response_cache.get("analysis", key) if read_cache else None
+        if analysis is None:
+            if not read_cache and "analysis" not in llama_service.local_endpoints:
+                response_cache.record_bypass("analysis")
+            # Llama'dan analizi al
+            analysis = await llama_service.generate_analysis(request.user_info, statistics)
+            if write_cache and analysis and analysis.strip():
+                await response_cache.set("analysis", key, analysis)
         
-        print(f"Generated analysis: {analysis}")
+        log_payload(logger, "Generated analysis", analysis)
         
         if not analysis or not analysis.strip():
             raise HTTPException(
@@ -195,30 +657,95 @@ async def create_analysis(request: AnalysisRequest):
         
         return AnalysisResponse(analysis=analysis)
         
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya devre açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, yedek içerik dönülüyor: %s", e)
+        return AnalysisResponse(
+            analysis=llama_service.fallback_content("analysis", request.user_info, statistics),
+            degraded=True,
+        )
     except Exception as e:
         error_message = str(e) if str(e) else "Bilinmeyen hata"
-        print(f"Analiz oluşturma hatası: {error_message}")
-        print(f"Hata tipi: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Analiz oluşturma hatası: %s", error_message)
         raise HTTPException(
             status_code=500, 
             detail=f"Analiz raporu oluşturulamadı: {error_message}"
         )
 
+@app.post("/api/analysis/stream")
+async def stream_analysis(request: AnalysisRequest, cache_control: Optional[str] = Header(None)):
+    """
+    /api/analysis ile aynı raporu NDJSON olarak stream eder; her cümle tamamlandığı anda gönderilir
+    
+    - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
+    - **user_statistics**: Kullanıcının oyun performans istatistikleri
+    - **user_id**: `user_statistics` yerine sunucudaki ilerleme kaydını kullanmak için
+    - **return**: `{"index": 0, "sentence": "..."}` satırları ve son olarak `{"done": true, "analysis": "..."}`
+    """
+    statistics = await _resolve_statistics(request.user_statistics, request.user_id, required=True)
+    key = cache_key("analysis", normalize_user_info(request.user_info), bucket_statistics(statistics))
+    read_cache, write_cache = _cache_mode(cache_control, "analysis")
+
+    async def events():
+        analysis = await response_cache.get("analysis", key) if read_cache else None
+        if analysis is not None:
+            sentences = split_sentences(analysis)
+            for index, sentence in enumerate(sentences):
+                yield {"index": index, "sentence": sentence}
+        else:
+            if not read_cache and "analysis" not in llama_service.local_endpoints:
+                response_cache.record_bypass("analysis")
+            sentences = []
+            try:
+                async for sentence in llama_service.stream_analysis(request.user_info, statistics):
+                    yield {"index": len(sentences), "sentence": sentence}
+                    sentences.append(sentence)
+            except LlamaUnavailableError as e:
+                if sentences:
+                    raise
+                logger.warning("⚠️ Llama kullanılamıyor, yedek analiz dönülüyor: %s", e)
+                analysis = llama_service.fallback_content("analysis", request.user_info, statistics)
+                for index, sentence in enumerate(split_sentences(analysis)):
+                    yield {"index": index, "sentence": sentence}
+                yield {"done": True, "analysis": analysis, "degraded": True}
+                return
+            analysis = " ".join(sentences)
+            if write_cache and analysis.strip():
+                await response_cache.set("analysis", key, analysis)
+        yield {"done": True, "analysis": analysis}
+
+    return await _ndjson_response(events(), "Analiz raporu oluşturulamadı")
+
 @app.post("/api/roadmap", response_model=RoadmapResponse)
-async def create_roadmap(request: GameRequest):
+async def create_roadmap(request: RoadmapRequest, cache_control: Optional[str] = Header(None)):
     """
-    Kullanıcı bilgilerine göre kişiselleştirilmiş 7 günlük yol haritası oluşturur
+    Kullanıcı bilgilerine göre kişiselleştirilmiş 7 veya 30 günlük yol haritası oluşturur
     
     - **user_info**: Kullanıcının kayıt sırasında toplanan detaylı bilgileri
-    - **return**: 7 günlük egzersiz planı
+    - **user_statistics**: (İsteğe bağlı) Oyun performans istatistikleri; en zayıf alana ek pay verilir
+    - **user_id**: (İsteğe bağlı) İstatistik yerine sunucudaki ilerleme kaydını kullanmak için
+    - **duration_days**: Plan süresi, `7` (varsayılan) veya `30`
+    - **Cache-Control**: `no-cache` önbelleği atlar, `no-store` sonucu önbelleğe de yazmaz
+    - **return**: Günlük egzersiz planı
     """
+    statistics = await _resolve_statistics(request.user_statistics, request.user_id, required=False)
     try:
-        # Llama'dan yol haritasını al
-        roadmap_data = await llama_service.generate_roadmap(request.user_info)
+        bucketed = bucket_statistics(statistics) if statistics is not None else None
+        key = cache_key("roadmap", normalize_user_info(request.user_info), bucketed, request.duration_days)
+        read_cache, write_cache = _cache_mode(cache_control, "roadmap")
+        roadmap_data = await response_cache.get("roadmap", key) if read_cache else None
+        if roadmap_data is None:
+            if not read_cache and "roadmap" not in llama_service.local_endpoints:
+                response_cache.record_bypass("roadmap")
+            roadmap_data = await llama_service.generate_roadmap(
+                request.user_info, statistics, request.duration_days
+            )
+            if write_cache and roadmap_data and roadmap_data.get("daily_plans"):
+                await response_cache.set("roadmap", key, roadmap_data)
         
-        print(f"Generated roadmap: {roadmap_data}")
+        log_payload(logger, "Generated roadmap", roadmap_data)
         
         if not roadmap_data or not roadmap_data.get("daily_plans"):
             raise HTTPException(
@@ -228,17 +755,76 @@ async def create_roadmap(request: GameRequest):
         
         return RoadmapResponse(**roadmap_data)
         
+    except OverloadedError as e:
+        raise _overloaded(e)
+    except LlamaUnavailableError as e:
+        # Ollama erişilemiyor veya devre açık: beklemeden yerel/varsayılan içerikle dön
+        logger.warning("⚠️ Llama kullanılamıyor, yedek içerik dönülüyor: %s", e)
+        return RoadmapResponse(
+            **llama_service.fallback_content(
+                "roadmap", request.user_info, statistics, request.duration_days
+            ),
+            degraded=True,
+        )
     except Exception as e:
         error_message = str(e) if str(e) else "Bilinmeyen hata"
-        print(f"Yol haritası oluşturma hatası: {error_message}")
-        print(f"Hata tipi: {type(e)}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Yol haritası oluşturma hatası: %s", error_message)
         raise HTTPException(
             status_code=500, 
             detail=f"Yol haritası oluşturulamadı: {error_message}"
         )
 
+@app.post("/api/progress/events", response_model=ProgressIngestResponse)
+async def ingest_progress_events(batch: ProgressEventBatch):
+    """
+    Oyunlardaki cevap olaylarını öğrencinin ilerleme kaydına ekler
+    
+    - **user_id**: Öğrenci kimliği
+    - **events**: Bir veya daha fazla cevap olayı; çevrimdışı cihazlar biriken olayları tek istekte gönderebilir
+    - **return**: Eklenen ve daha önce alınmış (aynı `event_id`) olay sayısı
+    """
+    await _ensure_adaptive(batch.user_id)
+    fresh, duplicates = await progress_store.ingest(batch.user_id, batch.events)
+    adaptive_engine.observe(batch.user_id, fresh)
+    return ProgressIngestResponse(accepted=len(fresh), duplicates=duplicates)
+
+@app.get("/api/progress/{user_id}")
+async def get_progress(user_id: str):
+    """
+    Öğrencinin toplam, oyun türü bazında ve en zayıf hece/kelime çifti istatistiklerini döndürür
+    """
+    summary = await progress_store.summary(user_id)
+    if summary is None:
+        raise HTTPException(status_code=404, detail=f"İlerleme kaydı bulunamadı: {user_id}")
+    return summary
+
+@app.get("/api/stats")
+async def get_stats():
+    """
+    Servis bileşenlerinin çalışma zamanı istatistiklerini döndürür
+    """
+    return {
+        "content_pool": content_pool.stats(),
+        "response_cache": await response_cache.stats(),
+        "progress": await progress_store.stats(),
+        "adaptive": adaptive_engine.stats(),
+        "lexicon": llama_service.lexicon_store.stats(),
+        "word_list": llama_service.word_list_engine.stats(),
+        "paragraph_pool": llama_service.paragraph_pool.stats(),
+        "dedup": llama_service.dedup.stats() if llama_service.dedup else None,
+        "coalescing": llama_service.single_flight.stats(),
+        "backends": llama_service.backends.stats(),
+        "prompt_eval": llama_service.generation_stats.stats(),
+        "hedging": llama_service.hedging.stats() if llama_service.hedging else None
+    }
+
+@app.get("/metrics", include_in_schema=False)
+async def get_metrics():
+    """
+    Prometheus formatında metrikler
+    """
+    return Response(metrics.render(), media_type=metrics.CONTENT_TYPE_LATEST)
+
 @app.get("/api/sample-user")
 async def get_sample_user():
     """
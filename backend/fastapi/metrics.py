@@ -0,0 +1,178 @@
+import asyncio
+import time
+from typing import Optional
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+# Llama üretimleri saniyeler sürdüğü için varsayılan kovalar yerine daha geniş aralık kullanılır
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 90, 120)
+
+REQUEST_LATENCY = Histogram(
+    "heyai_http_request_duration_seconds",
+    "HTTP isteklerinin yanıt başlangıcına kadar geçen süre",
+    ["method", "path", "status"],
+    buckets=LATENCY_BUCKETS,
+)
+
+OLLAMA_DURATION = Histogram(
+    "heyai_ollama_duration_seconds",
+    "Ollama yanıtındaki süre kırılımları (total, load, prompt_eval, eval)",
+    ["endpoint", "phase"],
+    buckets=LATENCY_BUCKETS,
+)
+
+OLLAMA_TOKENS = Counter(
+    "heyai_ollama_tokens_total",
+    "Ollama'nın değerlendirdiği (prompt) ve ürettiği (eval) token sayısı",
+    ["endpoint", "kind"],
+)
+
+OLLAMA_TOKENS_PER_SECOND = Histogram(
+    "heyai_ollama_tokens_per_second",
+    "Üretim hızı (eval_count / eval_duration)",
+    ["endpoint"],
+    buckets=(1, 2, 5, 10, 15, 20, 30, 40, 60, 80, 120, 200),
+)
+
+VALIDATION_FIXUPS = Counter(
+    "heyai_validation_fixups_total",
+    "Llama çıktısında yapılan düzeltmeler",
+    ["endpoint", "kind"],
+)
+
+JSON_PARSE_FAILURES = Counter(
+    "heyai_json_parse_failures_total",
+    "JSON olarak ayrıştırılamayan Llama yanıtları",
+    ["endpoint"],
+)
+
+FALLBACK_CONTENT = Counter(
+    "heyai_fallback_content_total",
+    "Llama çıktısı eksik/boş olduğu için varsayılan içerik kullanılan yanıtlar",
+    ["endpoint"],
+)
+
+STRUCTURED_OUTPUT = Counter(
+    "heyai_structured_output_total",
+    "Şemaya göre doğrulanan Llama çıktıları (valid, wrong_count, item_errors, schema_error, invalid_json)",
+    ["endpoint", "result"],
+)
+
+PARTIAL_REGENERATIONS = Counter(
+    "heyai_partial_regenerations_total",
+    "Oyunun tamamı yerine yalnızca eksik/geçersiz öğeler için yapılan yeniden üretim çağrıları",
+    ["endpoint"],
+)
+
+REGENERATED_ITEMS = Counter(
+    "heyai_regenerated_items_total",
+    "Kısmi yeniden üretimle tamamlanan öğe sayısı",
+    ["endpoint"],
+)
+
+PARAGRAPH_READABILITY = Histogram(
+    "heyai_paragraph_readability",
+    "Llama paragraflarının Ateşman okunabilirlik puanı (yüksek = kolay)",
+    ["level"],
+    buckets=(10, 20, 30, 40, 50, 60, 70, 80, 90, 100, 110),
+)
+
+HEDGED_REQUESTS = Counter(
+    "heyai_hedged_requests_total",
+    "Gecikme yüzdeliğini aşan üretimler için hedge sonuçları (primary_won, hedge_won, both_invalid, both_failed, budget_exhausted)",
+    ["endpoint", "outcome"],
+)
+
+DEGRADED_RESPONSES = Counter(
+    "heyai_degraded_responses_total",
+    "Ollama'ya ulaşılamadığı için yedek (yerel/varsayılan) içerikle dönülen yanıtlar",
+    ["endpoint"],
+)
+
+BACKEND_OUTSTANDING = Gauge(
+    "heyai_ollama_backend_outstanding",
+    "Ollama backend'inde çalışan ve kuyrukta bekleyen üretim sayısı",
+    ["backend"],
+)
+
+BACKEND_QUEUE_DEPTH = Gauge(
+    "heyai_ollama_backend_queue_depth",
+    "Ollama backend'i önündeki kuyrukta bekleyen istek sayısı",
+    ["backend"],
+)
+
+BACKEND_EJECTED = Gauge(
+    "heyai_ollama_backend_ejected",
+    "Backend'in devresi açık veya yarı açıksa 1",
+    ["backend"],
+)
+
+EVENT_LOOP_LAG = Histogram(
+    "heyai_event_loop_lag_seconds",
+    "asyncio olay döngüsünün planlanan uyanma zamanından gecikmesi",
+    buckets=(0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5),
+)
+
+# Ollama süreleri nanosaniye cinsinden döndürür
+_NS = 1e9
+_PHASES = {
+    "total": "total_duration",
+    "load": "load_duration",
+    "prompt_eval": "prompt_eval_duration",
+    "eval": "eval_duration",
+}
+
+
+def observe_generation(endpoint: str, response: dict):
+    """
+    Ollama /api/generate yanıtındaki (veya stream'in son parçasındaki) süre ve token bilgilerini kaydeder
+    """
+    for phase, field in _PHASES.items():
+        if response.get(field) is not None:
+            OLLAMA_DURATION.labels(endpoint, phase).observe(response[field] / _NS)
+    if response.get("prompt_eval_count"):
+        OLLAMA_TOKENS.labels(endpoint, "prompt").inc(response["prompt_eval_count"])
+    if response.get("eval_count"):
+        OLLAMA_TOKENS.labels(endpoint, "eval").inc(response["eval_count"])
+        if response.get("eval_duration"):
+            OLLAMA_TOKENS_PER_SECOND.labels(endpoint).observe(response["eval_count"] / (response["eval_duration"] / _NS))
+
+
+def register_backends(pool):
+    """
+    Backend havuzundaki her Ollama sunucusu için anlık kuyruk ve durum göstergelerini bağlar
+    """
+    for backend in pool.backends:
+        BACKEND_OUTSTANDING.labels(backend.url).set_function(lambda backend=backend: backend.outstanding)
+        BACKEND_QUEUE_DEPTH.labels(backend.url).set_function(lambda backend=backend: backend.admission.queue_depth)
+        BACKEND_EJECTED.labels(backend.url).set_function(lambda backend=backend: 1 if backend.ejected else 0)
+
+
+def render() -> bytes:
+    return generate_latest()
+
+
+class LoopLagMonitor:
+    """
+    Olay döngüsünü bloklayan (senkron) işleri görmek için periyodik olarak uyanıp gecikmeyi ölçer
+    """
+
+    def __init__(self, interval: float = 0.5):
+        self.interval = interval
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self):
+        if self._task is None and self.interval > 0:
+            self._task = asyncio.create_task(self._run())
+
+    async def _run(self):
+        while True:
+            started = time.monotonic()
+            await asyncio.sleep(self.interval)
+            EVENT_LOOP_LAG.observe(max(0.0, time.monotonic() - started - self.interval))
+
+    async def close(self):
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
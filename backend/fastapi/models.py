@@ -1,5 +1,8 @@
-from pydantic import BaseModel
-from typing import List, Optional
+from pydantic import BaseModel, Field
+from typing import Annotated, List, Literal, Optional
+
+# Kısıtlar Llama'ya JSON Schema olarak gönderilir (structured_output.py) ve yanıt tek geçişte doğrulanır
+NonEmptyStr = Annotated[str, Field(min_length=1)]
 
 class UserInfo(BaseModel):
     age_group: str  # "14-17" veya "17-24"
@@ -10,28 +13,49 @@ class UserInfo(BaseModel):
     working_with_professional: str  # Uzmanla çalışma durumu
 
 class Question(BaseModel):
-    question: str  # Soru açıklaması
-    options: List[str]  # Soru seçenekleri (4 adet)
+    question: NonEmptyStr  # Soru açıklaması
+    options: List[NonEmptyStr] = Field(min_length=4, max_length=4)  # Soru seçenekleri (4 adet)
     correct_answers: List[int]  # Doğru cevapların indisleri
 
 class GameResponse(BaseModel):
     questions: List[Question]
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için yedek içerik döndüyse true
 
 class GameRequest(BaseModel):
     user_info: UserInfo
+    user_id: Optional[str] = None  # Verilirse hedef heceler/karışıklık türleri öğrencinin ustalığına göre seçilir, görülen içeriğin yakın tekrarları verilmez
 
 class SpellingQuestion(BaseModel):
-    words: List[str]  # 5 kelime (4 doğru, 1 hatalı)
-    wrong_index: int  # Hatalı kelimenin indisi (0-4)
+    words: List[NonEmptyStr] = Field(min_length=5, max_length=5)  # 5 kelime (4 doğru, 1 hatalı)
+    wrong_index: int = Field(ge=0, le=4)  # Hatalı kelimenin indisi (0-4)
 
 class SpellingGameResponse(BaseModel):
     questions: List[SpellingQuestion]  # 5 adet spelling sorusu
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için yedek içerik döndüyse true
 
 class WordListResponse(BaseModel):
-    words: List[str]  # 5 rastgele Türkçe kelime
+    words: List[NonEmptyStr] = Field(min_length=5, max_length=5)  # 5 rastgele Türkçe kelime
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için yedek içerik döndüyse true
 
 class ParagraphResponse(BaseModel):
-    paragraphs: List[str]  # 5 adet 4 cümlelik anlamlı paragraf
+    paragraphs: List[NonEmptyStr] = Field(min_length=5, max_length=5)  # 5 adet 4 cümlelik anlamlı paragraf
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için yedek içerik döndüyse true
+
+class GameBatchResponse(BaseModel):
+    games: List[GameResponse]  # Toplu üretilen fonolojik oyunlar
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için oyunların bir kısmı yedek içerikse true
+
+class SpellingGameBatchResponse(BaseModel):
+    games: List[SpellingGameResponse]
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için oyunların bir kısmı yedek içerikse true
+
+class WordListBatchResponse(BaseModel):
+    games: List[WordListResponse]
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için oyunların bir kısmı yedek içerikse true
+
+class ParagraphBatchResponse(BaseModel):
+    games: List[ParagraphResponse]
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için oyunların bir kısmı yedek içerikse true
 
 class UserStatistics(BaseModel):
     total_games_played: int  # Toplam oynanan oyun sayısı
@@ -42,19 +66,45 @@ class UserStatistics(BaseModel):
 
 class AnalysisRequest(BaseModel):
     user_info: UserInfo
-    user_statistics: UserStatistics
+    user_statistics: Optional[UserStatistics] = None  # Verilmezse user_id ile sunucudaki ilerleme kaydından okunur
+    user_id: Optional[str] = None  # /api/progress/events ile olay gönderen öğrencinin kimliği
 
 class AnalysisResponse(BaseModel):
-    analysis: str  # Kişiselleştirilmiş analiz paragrafı
+    analysis: NonEmptyStr  # Kişiselleştirilmiş analiz paragrafı
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için yedek içerik döndüyse true
+
+class RoadmapRequest(BaseModel):
+    user_info: UserInfo
+    user_statistics: Optional[UserStatistics] = None  # Verilirse en zayıf alana odaklanılır
+    duration_days: Literal[7, 30] = 7  # Plan süresi (gün)
+    user_id: Optional[str] = None  # İstatistik verilmezse sunucudaki ilerleme kaydı kullanılır
 
 class DailyPlan(BaseModel):
-    day: int  # Gün numarası (1-7 veya 1-30)
-    phonological_games: int  # Fonolojik oyun sayısı
-    spelling_games: int  # Yazım oyunu sayısı
-    word_exercises: int  # Kelime egzersizi sayısı
-    reading_time: int  # Okuma süresi (dakika)
+    day: int = Field(ge=1)  # Gün numarası (1-7 veya 1-30)
+    phonological_games: int = Field(ge=0)  # Fonolojik oyun sayısı
+    spelling_games: int = Field(ge=0)  # Yazım oyunu sayısı
+    word_exercises: int = Field(ge=0)  # Kelime egzersizi sayısı
+    reading_time: int = Field(ge=0)  # Okuma süresi (dakika)
 
 class RoadmapResponse(BaseModel):
-    daily_plans: List[DailyPlan]  # Günlük plan listesi
-    total_duration_days: int  # Toplam süre (gün)
+    daily_plans: List[DailyPlan] = Field(min_length=1)  # Günlük plan listesi
+    total_duration_days: int = Field(ge=1)  # Toplam süre (gün)
     focus_areas: List[str]  # Odaklanılacak alanlar
+    degraded: bool = False  # Ollama'ya ulaşılamadığı için yedek içerik döndüyse true
+
+class ProgressEvent(BaseModel):
+    event_id: Optional[str] = Field(None, max_length=128)  # İstemcinin ürettiği kimlik; tekrar gönderilen olay bir kez sayılır
+    game_type: Literal["phonological", "spelling", "word_list", "paragraph"]
+    correct: bool  # Cevap doğru mu
+    syllable: Optional[str] = Field(None, max_length=32)  # Hece Avcısı'nda sorulan hece/ses
+    confusion_pair: Optional[str] = Field(None, max_length=128)  # Yazım oyununda "doğru/hatalı" kelime çifti (örn. "herkes/herkez")
+    game_completed: bool = False  # Oyunun son cevabıysa true (oynanan oyun sayısı buradan artar)
+    occurred_at: Optional[float] = None  # Cevabın verildiği an (Unix zamanı); çevrimdışı senkronda sıralama için
+
+class ProgressEventBatch(BaseModel):
+    user_id: NonEmptyStr = Field(max_length=128)
+    events: List[ProgressEvent] = Field(min_length=1, max_length=1000)
+
+class ProgressIngestResponse(BaseModel):
+    accepted: int  # Toplamlara eklenen olay sayısı
+    duplicates: int  # Daha önce alınmış (aynı event_id) olaylar
@@ -0,0 +1,117 @@
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence
+from lexicon import LexiconEntry, load_lexicon
+from models import Question, UserInfo
+from turkish_phonology import VOWELS, syllabify
+
+# Disleksik öğrencilerin sık karıştırdığı ünlüler: "ol" != "öl", "ul" != "ül"
+CONFUSABLE_VOWELS = {"o": "ö", "ö": "o", "u": "ü", "ü": "u", "ı": "i", "i": "ı"}
+
+QUESTION_TEMPLATE = "Hedef hece '{}' içeren kelimeleri seç:"
+
+
+class PhonologicalEngine:
+    """
+    Llama'ya gitmeden, paketle gelen sözlükten "Hece Avcısı" soruları üretir.
+    Hece -> kelime ters indeksi bir kez kurulur; her soru birkaç rastgele seçimle oluşur.
+    """
+
+    def __init__(self, entries: Optional[Sequence[LexiconEntry]] = None, min_matches: int = 3, rng: Optional[random.Random] = None):
+        self.entries = list(entries if entries is not None else load_lexicon())
+        self.rng = rng or random.Random()
+        self.words = [entry.word for entry in self.entries if " " not in entry.word]
+
+        # hece -> o heceyi içeren kelimeler; ayrıca hecenin kelime başında olmadığı kelimeler
+        self.index: Dict[str, List[str]] = defaultdict(list)
+        self.non_initial: Dict[str, List[str]] = defaultdict(list)
+        for word in self.words:
+            syllables = syllabify(word)
+            for syllable in dict.fromkeys(syllables):
+                self.index[syllable].append(word)
+                if syllables.index(syllable) > 0:
+                    self.non_initial[syllable].append(word)
+
+        # Hedef olabilecek 2 harfli heceler: yeterince kelime ve en az bir iç/son konum örneği olmalı
+        self.targets = sorted(
+            syllable for syllable, words in self.index.items()
+            if len(syllable) == 2 and any(c in VOWELS for c in syllable)
+            and len(words) >= min_matches and self.non_initial[syllable]
+        )
+        if not self.targets:
+            raise ValueError("Sözlükte hedef hece olarak kullanılabilecek hece bulunamadı")
+
+    def _confusable(self, target: str) -> List[str]:
+        """
+        Hedefle karıştırılabilecek heceler (ünlü çiftleri ve ters çevrilmiş hali, örn. ka -> ak)
+        """
+        variants = []
+        for i, char in enumerate(target):
+            if char in CONFUSABLE_VOWELS:
+                variants.append(target[:i] + CONFUSABLE_VOWELS[char] + target[i + 1:])
+        variants.append(target[::-1])
+        return [v for v in variants if v != target]
+
+    def _pick_distractors(self, target: str, count: int, used: set) -> List[str]:
+        distractors: List[str] = []
+        # Önce karıştırılabilir heceyi içeren kelimeler, ki soru gerçekten ayırt etmeyi gerektirsin
+        for variant in self._confusable(target):
+            candidates = [w for w in self.index.get(variant, ()) if target not in w and w not in used]
+            if candidates and len(distractors) < count:
+                word = self.rng.choice(candidates)
+                distractors.append(word)
+                used.add(word)
+        while len(distractors) < count:
+            word = self.rng.choice(self.words)
+            # Alt dizi olarak bile hedefi içermemeli ki doğru cevap kontrolü ile çelişmesin
+            if target not in word and word not in used:
+                distractors.append(word)
+                used.add(word)
+        return distractors
+
+    def generate_question(self, used: Optional[set] = None, target: Optional[str] = None) -> Question:
+        used = used if used is not None else set()
+        target = target or self.rng.choice(self.targets)
+
+        # En az bir doğru cevapta hece kelimenin başında olmamalı; bu kelime diğerlerinden önce ayrılır.
+        # generate_game bu kelimeler tükenmiş hedefleri atlar, tek soru üretiminde tekrar kullanılabilir.
+        non_initial = [w for w in self.non_initial[target] if w not in used] or list(self.non_initial[target])
+        matches = [self.rng.choice(non_initial)] if non_initial else []
+        # Uygun kelimeler önceki sorularda tükendiyse tekrar kullanımına izin ver
+        matches_pool = [w for w in self.index[target] if w not in used and w not in matches] or [
+            w for w in self.index[target] if w not in matches
+        ]
+        match_count = self.rng.randint(1, min(3, len(matches_pool) + len(matches)))
+        matches += self.rng.sample(matches_pool, min(len(matches_pool), match_count - len(matches)))
+        used.update(matches)
+
+        options = matches + self._pick_distractors(target, 4 - len(matches), used)
+        self.rng.shuffle(options)
+        return Question(
+            question=QUESTION_TEMPLATE.format(target),
+            options=options,
+            correct_answers=[i for i, option in enumerate(options) if option in matches],
+        )
+
+    def generate_game(
+        self,
+        user_info: Optional[UserInfo] = None,
+        question_count: int = 5,
+        targets: Optional[Sequence[str]] = None,
+    ) -> List[Question]:
+        """
+        Aynı oyunda kelime ve hedef hece tekrarı olmadan soru listesi üretir.
+        `targets` verilirse (uyarlamalı seçim) önce bu heceler sorulur, eksik kalanlar rastgele tamamlanır.
+        """
+        used: set = set()
+        preferred = [target for target in dict.fromkeys(targets or ()) if target in self.index]
+        rest = [target for target in self.targets if target not in preferred]
+        self.rng.shuffle(rest)
+        questions: List[Question] = []
+        # Başta olmayan kullanılmamış kelimesi kalmayan hedefler atlanır; yerine sıradaki hedef sorulur
+        for target in preferred + rest:
+            if len(questions) >= question_count:
+                break
+            if any(word not in used for word in self.non_initial.get(target, ())):
+                questions.append(self.generate_question(used, target))
+        return questions
@@ -0,0 +1,191 @@
+from typing import Dict, List, Optional, Tuple
+from content_pool import hard_area_bucket
+from models import UserInfo, UserStatistics
+from text_utils import normalize_text, parse_rate
+
+# İstatistik alanı -> (DailyPlan alanı, odak alanı, analizdeki adı)
+AREAS = {
+    "phonological": ("phonological_games", "Hece tanıma", "fonolojik oyun"),
+    "spelling": ("spelling_games", "Yazım doğruluğu", "yazım oyunu"),
+    "word_list": ("word_exercises", "Kelime dağarcığı", "kelime listesi"),
+    "paragraph": ("reading_time", "Okuma akıcılığı", "paragraf okuma"),
+}
+
+# hard_area kovası -> istatistik yoksa odaklanılacak alan
+BUCKET_AREAS = {"hece": "phonological", "yazim": "spelling", "kelime": "word_list", "okuma": "paragraph"}
+
+# Tam yoğunluktaki günlük miktar ve (en az, en fazla) sınırlar; sınırlar Llama prompt'undakiyle aynı
+PLAN_BASE = {"phonological_games": 3, "spelling_games": 2, "word_exercises": 2, "reading_time": 15}
+PLAN_LIMITS = {
+    "phonological_games": (1, 5),
+    "spelling_games": (1, 4),
+    "word_exercises": (1, 3),
+    "reading_time": (5, 30),
+}
+# Odak alanına eklenen miktar: en zayıf alan ve eşiğin altındaki diğer alanlar
+FOCUS_BOOST = {"phonological_games": 2, "spelling_games": 2, "word_exercises": 1, "reading_time": 10}
+SECONDARY_BOOST = {"phonological_games": 1, "spelling_games": 1, "word_exercises": 1, "reading_time": 5}
+
+WEAK_RATE = 70.0
+# Uzman desteği sorusuna verilen olumsuz yanıtlar
+NEGATIVE_ANSWERS = ("hayır", "yok", "çalışmıyor", "almıyor", "değil")
+SUPPORTED_DURATIONS = (7, 30)
+
+
+def parse_rates(user_statistics: Optional[UserStatistics]) -> Dict[str, float]:
+    """
+    Geçerli başarı oranlarını alan adına göre döndürür
+    """
+    if user_statistics is None:
+        return {}
+    rates = {}
+    for area in AREAS:
+        rate = parse_rate(getattr(user_statistics, f"{area}_success_rate"))
+        if rate is not None:
+            rates[area] = rate
+    return rates
+
+
+def _clamp(value: float, limits: Tuple[int, int]) -> int:
+    return int(max(limits[0], min(limits[1], value)))
+
+
+class RoadmapPlanner:
+    """
+    Llama'ya gitmeden UserInfo ve istatistiklerden günlük plan hesaplar.
+
+    - İlk günler hafif başlar, yoğunluk kademeli artar (30 günlük planda ilk üç haftaya yayılır)
+    - Hafta sonu (6. ve 7. günler) daha hafif program
+    - En düşük başarı oranlı alan (istatistik yoksa zorluk alanı) ek pay alır
+    """
+
+    def __init__(self, start_intensity: float = 0.55, weekend_factor: float = 0.6):
+        self.start_intensity = start_intensity
+        self.weekend_factor = weekend_factor
+
+    def intensity(self, day: int, days: int) -> float:
+        ramp_days = 4 if days <= 7 else 20
+        value = self.start_intensity + (1 - self.start_intensity) * min(1.0, (day - 1) / ramp_days)
+        if day % 7 in (6, 0):
+            value *= self.weekend_factor
+        return value
+
+    def _weights(self, user_info: UserInfo, rates: Dict[str, float]) -> Tuple[Dict[str, float], List[str]]:
+        """
+        Tam yoğunluktaki günlük miktarlar ve zayıftan güçlüye sıralı odak alanları
+        """
+        weights = dict(PLAN_BASE)
+        if rates:
+            ordered = sorted(rates, key=rates.get)
+            weak = [area for area in ordered if rates[area] < WEAK_RATE]
+        else:
+            ordered = []
+            weak = []
+        bucket_area = BUCKET_AREAS.get(hard_area_bucket(user_info.hard_area))
+        primary = ordered[0] if ordered else bucket_area
+        if primary is not None:
+            weights[AREAS[primary][0]] += FOCUS_BOOST[AREAS[primary][0]]
+        for area in weak[1:]:
+            weights[AREAS[area][0]] += SECONDARY_BOOST[AREAS[area][0]]
+
+        focus = [area for area in [primary, *weak, bucket_area] if area is not None]
+        return weights, list(dict.fromkeys(focus))
+
+    def plan(
+        self,
+        user_info: UserInfo,
+        user_statistics: Optional[UserStatistics] = None,
+        days: int = 7,
+    ) -> dict:
+        """
+        RoadmapResponse biçiminde plan döndürür; aynı girdi için her zaman aynı planı üretir
+        """
+        if days not in SUPPORTED_DURATIONS:
+            raise ValueError(f"Desteklenmeyen plan süresi: {days}")
+        rates = parse_rates(user_statistics)
+        weights, focus = self._weights(user_info, rates)
+
+        # Yeni başlayanlarda hafif, deneyimlilerde biraz daha yoğun program; küçük yaş grubunda okuma süresi kısa
+        scale = 1.0
+        if user_statistics is not None:
+            if user_statistics.total_games_played < 20:
+                scale = 0.85
+            elif user_statistics.total_games_played > 100:
+                scale = 1.1
+        reading_scale = 0.8 if normalize_text(user_info.age_group).startswith("14") else 1.0
+
+        daily_plans = []
+        for day in range(1, days + 1):
+            factor = self.intensity(day, days) * scale
+            plan = {"day": day}
+            for field, base in weights.items():
+                value = base * factor
+                if field == "reading_time":
+                    # Okuma süresi 5 dakikalık adımlarla verilir
+                    value = round(value * reading_scale / 5) * 5
+                plan[field] = _clamp(round(value), PLAN_LIMITS[field])
+            daily_plans.append(plan)
+
+        focus_areas = [AREAS[area][1] for area in focus] or [AREAS["phonological"][1], AREAS["spelling"][1]]
+        return {
+            "daily_plans": daily_plans,
+            "total_duration_days": days,
+            "focus_areas": focus_areas[:3],
+        }
+
+
+class AnalysisRenderer:
+    """
+    İstatistiklerden şablonla, Llama prompt'undaki üslupta (3. şahıs, yapıcı) 4-5 cümlelik analiz üretir
+    """
+
+    def render(self, user_info: UserInfo, user_statistics: UserStatistics) -> str:
+        rates = parse_rates(user_statistics)
+        total = user_statistics.total_games_played
+        if not rates:
+            return (
+                f"Kullanıcının {total} oyunluk deneyimi değerlendirilmiştir. "
+                "Başarı oranları henüz yeterli veri içermediğinden düzenli oyun oynanması önerilir. "
+                f"{self._support_sentence(user_info)} {self._motivation_sentence(user_info)}"
+            )
+
+        ordered = sorted(rates, key=rates.get)
+        weakest, strongest = ordered[0], ordered[-1]
+        average = sum(rates.values()) / len(rates)
+        sentences = [
+            f"Kullanıcının {total} oyunluk deneyiminde ortalama %{average:.1f} başarı oranı göze çarpmaktadır.",
+        ]
+        if strongest != weakest:
+            sentences.append(
+                f"{AREAS[strongest][2].capitalize()} alanında %{rates[strongest]:.1f} gibi bir performans sergilenmesi güçlü yönlerini ortaya koymaktadır."
+            )
+        sentences.append(self._weakness_sentence(weakest, rates[weakest]))
+        if rates[strongest] - rates[weakest] < 10:
+            sentences.append("Alanlar arasında dengeli bir gelişim trendi gösterilmektedir.")
+        else:
+            sentences.append(self._support_sentence(user_info))
+        sentences.append(self._motivation_sentence(user_info))
+        return " ".join(sentences)
+
+    @staticmethod
+    def _weakness_sentence(area: str, rate: float) -> str:
+        name = AREAS[area][2].capitalize()
+        if rate < 50:
+            return f"{name} alanında başarı oranı %{rate:.1f} olduğundan öncelikli olarak bu alana yoğunlaşılması gerekir."
+        if rate < WEAK_RATE:
+            return f"{name} alanında %{rate:.1f} başarı oranı olduğundan bu alanda daha fazla pratik yapılması önerilir."
+        return f"En düşük oran %{rate:.1f} ile {AREAS[area][2]} alanında olsa da düzenli tekrarla bu seviyenin korunması önerilir."
+
+    @staticmethod
+    def _support_sentence(user_info: UserInfo) -> str:
+        answer = normalize_text(user_info.working_with_professional)
+        if answer and not any(word in answer for word in NEGATIVE_ANSWERS):
+            return "Uzman desteğinin sürdürülmesi gelişimin olumlu yönde ilerlemesine katkı sağlayacaktır."
+        return "Bir uzmanla birlikte çalışılması gelişim sürecinin daha verimli ilerlemesine katkı sağlayabilir."
+
+    @staticmethod
+    def _motivation_sentence(user_info: UserInfo) -> str:
+        games = user_info.motivating_games.strip()
+        if games:
+            return f"Sevdiği oyun türlerinin ({games}) çalışmalara dahil edilmesi motivasyonun yüksek tutulmasına yardımcı olacaktır."
+        return "Kısa ama düzenli çalışmaların sürdürülmesi motivasyonun yüksek tutulmasına yardımcı olacaktır."
@@ -0,0 +1,266 @@
+import asyncio
+import sqlite3
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+from models import ProgressEvent, UserStatistics
+from text_utils import NOT_PLAYED, normalize_text
+
+GAME_TYPES = ("phonological", "spelling", "word_list", "paragraph")
+
+# Öğe bazlı doğruluk türleri: Hece Avcısı'nda hedef hece, yazım oyununda doğru/hatalı kelime çifti
+ITEM_KINDS = {"syllable": "syllable", "confusion": "confusion_pair"}
+
+# SQL yalnızca standart sözdizimi (ON CONFLICT ... DO UPDATE) kullanır; PostgreSQL'de parametre
+# işaretçisi (? -> $1/%s) dışında değişiklik gerekmez
+SCHEMA = (
+    "CREATE TABLE IF NOT EXISTS progress_events ("
+    " user_id TEXT NOT NULL, event_id TEXT NOT NULL, received_at REAL NOT NULL,"
+    " PRIMARY KEY (user_id, event_id))",
+    "CREATE TABLE IF NOT EXISTS progress_totals ("
+    " user_id TEXT PRIMARY KEY, total_games INTEGER NOT NULL, total_answers INTEGER NOT NULL,"
+    " updated_at REAL NOT NULL)",
+    "CREATE TABLE IF NOT EXISTS progress_game_stats ("
+    " user_id TEXT NOT NULL, game_type TEXT NOT NULL, games INTEGER NOT NULL,"
+    " answers INTEGER NOT NULL, correct INTEGER NOT NULL, rolling_rate REAL NOT NULL,"
+    " PRIMARY KEY (user_id, game_type))",
+    "CREATE TABLE IF NOT EXISTS progress_item_stats ("
+    " user_id TEXT NOT NULL, kind TEXT NOT NULL, item TEXT NOT NULL,"
+    " attempts INTEGER NOT NULL, correct INTEGER NOT NULL,"
+    " PRIMARY KEY (user_id, kind, item))",
+)
+
+
+class SqliteProgressBackend:
+    """
+    Öğrenci ilerlemesini WAL modunda SQLite'ta tutar. Olaylar saklanmaz; her toplu gönderim tek
+    işlemde mevcut toplamları artırır, okumalar yalnızca birincil anahtarla yapılır.
+    Bloklayan SQLite çağrıları event loop'u tutmasın diye thread üzerinde çalıştırılır.
+    """
+
+    def __init__(self, path: str = "progress.sqlite3", rolling_alpha: float = 0.1):
+        # Kayan başarı oranı üstel ortalamadır; alpha=0.1 yaklaşık son 10-20 cevabı yansıtır
+        self.rolling_alpha = rolling_alpha
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = asyncio.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        for statement in SCHEMA:
+            self._conn.execute(statement)
+
+    def _ingest(self, user_id: str, events: List[ProgressEvent]) -> List[ProgressEvent]:
+        now = time.time()
+        conn = self._conn
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            fresh = []
+            for event in events:
+                if event.event_id is not None:
+                    inserted = conn.execute(
+                        "INSERT INTO progress_events (user_id, event_id, received_at) VALUES (?, ?, ?)"
+                        " ON CONFLICT (user_id, event_id) DO NOTHING",
+                        (user_id, event.event_id, now),
+                    ).rowcount
+                    if not inserted:
+                        continue
+                fresh.append(event)
+
+            # Kayan oran sıraya bağlı olduğundan olaylar zaman sırasıyla uygulanır (zamanı olmayanlar geliş sırasıyla)
+            fresh.sort(key=lambda e: e.occurred_at or 0.0)
+            if fresh:
+                self._apply(user_id, fresh, now)
+            conn.execute("COMMIT")
+        except BaseException:
+            conn.execute("ROLLBACK")
+            raise
+        return fresh
+
+    def _apply(self, user_id: str, events: List[ProgressEvent], now: float):
+        conn = self._conn
+        games: Dict[str, List] = {
+            row[0]: list(row[1:])
+            for row in conn.execute(
+                "SELECT game_type, games, answers, correct, rolling_rate FROM progress_game_stats WHERE user_id = ?",
+                (user_id,),
+            )
+        }
+        items: Dict[Tuple[str, str], List[int]] = {}
+        completed = 0
+        for event in events:
+            stats = games.setdefault(event.game_type, [0, 0, 0, None])
+            stats[1] += 1
+            stats[2] += int(event.correct)
+            value = 100.0 if event.correct else 0.0
+            stats[3] = value if stats[3] is None else stats[3] + self.rolling_alpha * (value - stats[3])
+            if event.game_completed:
+                stats[0] += 1
+                completed += 1
+            for kind, field in ITEM_KINDS.items():
+                item = normalize_text(getattr(event, field) or "")
+                if item:
+                    counters = items.setdefault((kind, item), [0, 0])
+                    counters[0] += 1
+                    counters[1] += int(event.correct)
+
+        conn.executemany(
+            "INSERT INTO progress_game_stats (user_id, game_type, games, answers, correct, rolling_rate)"
+            " VALUES (?, ?, ?, ?, ?, ?) ON CONFLICT (user_id, game_type) DO UPDATE SET"
+            " games = excluded.games, answers = excluded.answers, correct = excluded.correct,"
+            " rolling_rate = excluded.rolling_rate",
+            [(user_id, game_type, *stats) for game_type, stats in games.items()],
+        )
+        conn.executemany(
+            "INSERT INTO progress_item_stats (user_id, kind, item, attempts, correct) VALUES (?, ?, ?, ?, ?)"
+            " ON CONFLICT (user_id, kind, item) DO UPDATE SET"
+            " attempts = progress_item_stats.attempts + excluded.attempts,"
+            " correct = progress_item_stats.correct + excluded.correct",
+            [(user_id, kind, item, *counters) for (kind, item), counters in items.items()],
+        )
+        conn.execute(
+            "INSERT INTO progress_totals (user_id, total_games, total_answers, updated_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT (user_id) DO UPDATE SET"
+            " total_games = progress_totals.total_games + excluded.total_games,"
+            " total_answers = progress_totals.total_answers + excluded.total_answers,"
+            " updated_at = excluded.updated_at",
+            (user_id, completed, len(events), now),
+        )
+
+    def _summary(self, user_id: str, item_limit: int) -> Optional[dict]:
+        conn = self._conn
+        totals = conn.execute(
+            "SELECT total_games, total_answers, updated_at FROM progress_totals WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if totals is None:
+            return None
+        games = {
+            game_type: {
+                "games": games_played,
+                "answers": answers,
+                "correct": correct,
+                "success_rate": round(correct / answers * 100, 1) if answers else None,
+                "rolling_success_rate": round(rolling_rate, 1),
+            }
+            for game_type, games_played, answers, correct, rolling_rate in conn.execute(
+                "SELECT game_type, games, answers, correct, rolling_rate FROM progress_game_stats WHERE user_id = ?",
+                (user_id,),
+            )
+        }
+        summary = {
+            "user_id": user_id,
+            "total_games_played": totals[0],
+            "total_answers": totals[1],
+            "updated_at": totals[2],
+            "games": games,
+        }
+        for kind in ITEM_KINDS:
+            # En düşük doğruluklu öğeler; yalnızca en az 2 kez görülenler
+            summary[f"weakest_{kind}s"] = [
+                {"item": item, "attempts": attempts, "accuracy": round(correct / attempts * 100, 1)}
+                for item, attempts, correct in conn.execute(
+                    "SELECT item, attempts, correct FROM progress_item_stats"
+                    " WHERE user_id = ? AND kind = ? AND attempts >= 2"
+                    " ORDER BY CAST(correct AS REAL) / attempts ASC, attempts DESC LIMIT ?",
+                    (user_id, kind, item_limit),
+                )
+            ]
+        return summary
+
+    def _item_stats(self, user_id: str) -> List[Tuple[str, str, int, int]]:
+        return self._conn.execute(
+            "SELECT kind, item, attempts, correct FROM progress_item_stats WHERE user_id = ?", (user_id,)
+        ).fetchall()
+
+    def _game_rates(self, user_id: str) -> Optional[Tuple[int, Dict[str, float]]]:
+        totals = self._conn.execute(
+            "SELECT total_games FROM progress_totals WHERE user_id = ?", (user_id,)
+        ).fetchone()
+        if totals is None:
+            return None
+        rates = dict(self._conn.execute(
+            "SELECT game_type, rolling_rate FROM progress_game_stats WHERE user_id = ?", (user_id,)
+        ).fetchall())
+        return totals[0], rates
+
+    async def ingest(self, user_id: str, events: List[ProgressEvent]) -> List[ProgressEvent]:
+        """
+        Olayları toplamlara ekler; daha önce alınmamış olayları uygulandıkları sırayla döndürür
+        """
+        async with self._lock:
+            return await asyncio.to_thread(self._ingest, user_id, events)
+
+    async def summary(self, user_id: str, item_limit: int = 5) -> Optional[dict]:
+        async with self._lock:
+            return await asyncio.to_thread(self._summary, user_id, item_limit)
+
+    async def item_stats(self, user_id: str) -> List[Tuple[str, str, int, int]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._item_stats, user_id)
+
+    async def game_rates(self, user_id: str) -> Optional[Tuple[int, Dict[str, float]]]:
+        async with self._lock:
+            return await asyncio.to_thread(self._game_rates, user_id)
+
+    async def size(self) -> int:
+        async with self._lock:
+            return await asyncio.to_thread(
+                lambda: self._conn.execute("SELECT COUNT(*) FROM progress_totals").fetchone()[0]
+            )
+
+    async def close(self):
+        self._conn.close()
+
+
+class ProgressStore:
+    """
+    Oyunlardan gelen cevap olaylarını toplar ve analiz/yol haritası için UserStatistics üretir.
+    Backend aynı async arayüzü (ingest, summary, item_stats, game_rates, size, close) sağlayan herhangi bir depo olabilir.
+    """
+
+    def __init__(self, backend):
+        self.backend = backend
+        self._counters = {"accepted": 0, "duplicates": 0, "batches": 0, "lookups": 0, "misses": 0}
+
+    async def ingest(self, user_id: str, events: Iterable[ProgressEvent]) -> Tuple[List[ProgressEvent], int]:
+        """
+        Yeni (toplamlara eklenen) olayları ve tekrar gönderildiği için atlanan olay sayısını döndürür
+        """
+        events = list(events)
+        fresh = await self.backend.ingest(user_id, events)
+        self._counters["batches"] += 1
+        self._counters["accepted"] += len(fresh)
+        self._counters["duplicates"] += len(events) - len(fresh)
+        return fresh, len(events) - len(fresh)
+
+    async def summary(self, user_id: str) -> Optional[dict]:
+        return await self.backend.summary(user_id)
+
+    async def item_stats(self, user_id: str) -> List[Tuple[str, str, int, int]]:
+        """
+        Öğrencinin (tür, öğe, deneme, doğru) hece ve kelime çifti toplamları
+        """
+        return await self.backend.item_stats(user_id)
+
+    async def user_statistics(self, user_id: str) -> Optional[UserStatistics]:
+        """
+        İstemcinin hesapladığı istatistikler yerine kayan başarı oranlarından UserStatistics oluşturur;
+        hiç oynanmamış oyun türlerinin oranı NOT_PLAYED olur (planlayıcı bu alanları hesaba katmaz)
+        """
+        self._counters["lookups"] += 1
+        result = await self.backend.game_rates(user_id)
+        if result is None:
+            self._counters["misses"] += 1
+            return None
+        total_games, rates = result
+        return UserStatistics(
+            total_games_played=total_games,
+            **{f"{game_type}_success_rate": f"{rates[game_type]:.1f}" if game_type in rates else NOT_PLAYED for game_type in GAME_TYPES},
+        )
+
+    async def close(self):
+        await self.backend.close()
+
+    async def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "users": await self.backend.size(),
+            **self._counters,
+        }
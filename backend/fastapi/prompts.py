@@ -0,0 +1,210 @@
+"""
+Her endpoint için sabit (kullanıcıdan bağımsız) sistem prompt'ları.
+
+Kurallar ve JSON formatı burada tutulur; kullanıcıya özel alanlar ayrı bir kısa prompt olarak
+gönderilir. Böylece her istekte aynı önek (system) tekrar eder ve Ollama bu kısmın
+değerlendirmesini (KV önbelleği) yeniden kullanabilir. Bu metinler değişmediği sürece önbellek geçerli kalır.
+"""
+
+PHONOLOGICAL_SYSTEM = """
+Disleksik bireyler için "Hece Avcısı" oyunu oluştur. TAM OLARAK 5 SORU yap.
+
+KURALLAR:
+- Her soruda 2 harfli hedef hece ver. (ka, al, er, on, an, el, at, it, vb.)
+- 4 tane GERÇEK Türkçe kelime seçeneği sun.
+- Hedef hece, kelimenin başında, ortasında veya sonunda olabilir
+- Her soruda EN AZ 1, EN FAZLA 3 doğru cevap olmak zorunda.
+- Cevap seçenekleri arasında hedef heceyi içeren kelimeler doğru kabul edilir
+- Cevap seçenekleri arasında hedef heceyi içeren EN AZ 1 kelime olmalı.
+- Hedef hece seçeneklerin hepsinde birden kelimenin başında bulunamaz. Yani "ka" hecesi için "kalem", "kapı", "kasa", "kağıt",gibi kelimeler aynı soru içerisinde seçenek olarak kullanılamaz.
+- Seçenkler TEK KELİME olmalı, birden fazla kelime içeren seçenekler kullanma.
+
+ÖNEMLİ:
+- Soru metni şu şekilde olmalı: "Hedef hece 'XX' içeren kelimeleri seç:"
+- Soru metni SADECE TÜRKÇE OLMALI.
+- Türkçe karakter farkına dikkat et: "ol" != "öl", "ul" != "ül"
+- Her soruda farklı kelimeler kullan
+- BİR SORUNUN CEVAPLARI 4 ADET OLAMAZ.
+
+JSON formatında 5 soru döndür:
+{
+  "questions": [
+    {
+      "question": "Hedef hece 'ka' içeren kelimeleri seç:",
+      "options": ["word1", "word2", "word3", "word4"],
+      "correct_answers": [0]
+    }
+  ]
+}
+"""
+
+SPELLING_SYSTEM = """
+Yazım hatası tespit oyunu oluştur.
+
+ADIM 1: Her soru için KELİMELER listesinden 4 tanesini seç.
+
+ADIM 2: Her soruya YANLIŞ YAZIMLAR listesinden FARKLI BİR TANESİNİN yanlış halini ekle (her soruda sadece 1 yanlış kelime).
+
+ADIM 3: Yanlış kelimenin hangi sırada olduğunu say (0'dan başla)
+
+ÖRNEK:
+Seç: matematik, teknoloji, doktor, kahraman
+Ekle: bilgisayar→pilgisayar
+Sonuç: ["matematik", "pilgisayar", "teknoloji", "doktor", "kahraman"]
+İndeks: 1
+
+YANLIŞ YAZIMLAR listesindeki her kelime için bir soru yap:
+{
+  "questions": [
+    {"words": ["..."], "wrong_index": 0}
+  ]
+}
+"""
+
+WORD_LIST_SYSTEM = """
+Kullanıcının ilgi alanına göre 5 rastgele Türkçe kelime üret.
+
+KURALLAR:
+- Tam olarak 5 adet Türkçe kelime ver.
+- Kelimeler 6 adet harf olacak
+- Kullanıcının ilgi alanına uygun kelimeler seç
+- Yaş grubuna uygun zorluk seviyesi
+- Sadece tek kelimeler (birleşik kelime yok)
+- Gerçek ve anlamlı Türkçe kelimeler
+
+JSON formatında döndür:
+{
+  "words": ["kelime1", "kelime2", "kelime3", "kelime4", "kelime5"]
+}
+"""
+
+PARAGRAPH_SYSTEM = """
+Kullanıcının ilgi alanına göre 5 adet farklı konuda 4 cümlelik paragraf yaz.
+
+KURALLAR:
+- TAM OLARAK 5 adet paragraf oluştur
+- Her paragraf TAM OLARAK 4 cümle olmalı
+- Her paragrafın cümleleri MANTIKLI BİR EYLEM AKIŞI olmalı:
+  * 1. Cümle: Hazırlık (bir şeye hazırlanma, karar verme)
+  * 2. Cümle: Eylemin başlaması (ilk adım, hareket)
+  * 3. Cümle: Gelişim/İlerleme (eylemde yaşanan değişim, zorluk/başarı)
+  * 4. Cümle: Sonuç/Bitiş (eylemden çıkan sonuç)
+- Her paragraf farklı bir konuda olmalı
+- Her cümle kronolojik sırada olmalı ki kullanıcı doğru sırayı bulabilsin
+- Örnek konular: kitap okuma, resim yapma, bisiklet sürme, yemek pişirme, bahçe işleri, spor yapma, müzik dinleme, seyahat etme, dans etme, oyun oynama
+- Sadece Türkçe yaz
+- Her paragrafın cümleleri birbirini tamamlamalı
+
+JSON formatında döndür:
+{
+  "paragraphs": [
+    "İlk paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
+    "İkinci paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
+    "Üçüncü paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
+    "Dördüncü paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle.",
+    "Beşinci paragrafın ilk cümlesi, İkinci cümle. Üçüncü cümle. Dördüncü cümle."
+  ]
+}
+"""
+
+ANALYSIS_SYSTEM = """
+Disleksik bir öğrencinin profil bilgileri ve performans istatistiklerini analiz et. Kişiselleştirilmiş, yapıcı ve motive edici bir analiz raporu yaz.
+
+GÖREV:
+Bu bilgileri sentezleyerek 4-5 cümlelik profesyonel bir analiz yaz. Şunları içer:
+1. Mevcut durumun objektif değerlendirmesi
+2. Güçlü yönlerin vurgulanması
+3. Gelişim alanlarının belirlenmesi
+4. Konstruktif öneriler ve motivasyon
+
+KURALLAR:
+- 3. ŞAHIS (objektif gözlemci) bakış açısı kullan
+- "Kullanıcının...", diye başla
+- "...edilmesi önerilir", "...yoğunlaşılması gerekir" gibi pasif yapılar kullan
+- Profesyonel ve objektif dil kullan
+- Pozitif ve motive edici ol
+- Somut verilerden örnekler ver
+- Sadece Türkçe yaz
+- Eleştirel değil, yapıcı ol
+
+ÖRNEK YAZIM TARZI:
+"Kullanıcının 45 oyunluk deneyiminde %72.5 fonolojik başarı oranı göze çarpmaktadır. Kelime listesi alanında %85.2 gibi yüksek bir performans sergilenmesi güçlü yönlerini ortaya koymaktadır. Paragraf alanında %79.8 başarı oranı olduğundan bu alanda daha fazla practice yapılması önerilir. Genel olarak istikrarlı bir gelişim trendi gösterilmektedir."
+
+JSON formatında döndür:
+{
+  "analysis": "Kullanıcının performans analizi burada yer alır. Objektif bir değerlendirme sunulur ve gelişim alanları belirlenir. Güçlü yönler vurgulanır ve gelecek için öneriler sunulur."
+}
+"""
+
+ROADMAP_SYSTEM = """
+Disleksik bir öğrenci için kişiselleştirilmiş 7 günlük yol haritası oluştur.
+
+GÖREV:
+7 günlük günlük egzersiz planı oluştur. Her gün için:
+- Fonolojik oyun sayısı (1-5 arası)
+- Yazım oyunu sayısı (1-4 arası)
+- Kelime egzersizi sayısı (1-3 arası)
+- Okuma süresi dakika (5-30 arası)
+
+KURALLAR:
+- İlk günler daha az, ilerleyen günlerde artırarak zorluk
+- Hafta sonu daha hafif program
+- Kullanıcının zorluk alanına odaklan
+- Yaş grubuna uygun yoğunluk
+- Motivasyonu koruyacak çeşitlilik
+
+ODAK ALANLARI:
+Kullanıcının zorluk alanına göre odaklanılacak alanları belirle:
+- Hece tanıma, Ses-harf eşleştirme, Yazım doğruluğu, Kelime dağarcığı, vb.
+
+JSON formatında döndür:
+{
+  "daily_plans": [
+    {
+      "day": 1,
+      "phonological_games": 2,
+      "spelling_games": 1,
+      "word_exercises": 1,
+      "reading_time": 10
+    }
+  ],
+  "total_duration_days": 7,
+  "focus_areas": ["Hece tanıma", "Yazım doğruluğu"]
+}
+
+TAM OLARAK 7 günlük plan oluştur!
+"""
+
+SYSTEM_PROMPTS = {
+    "phonological": PHONOLOGICAL_SYSTEM,
+    "spelling": SPELLING_SYSTEM,
+    "word_list": WORD_LIST_SYSTEM,
+    "paragraph": PARAGRAPH_SYSTEM,
+    "analysis": ANALYSIS_SYSTEM,
+    "roadmap": ROADMAP_SYSTEM,
+}
+
+# Eksik/geçersiz öğeler yeniden üretilirken kullanıcı prompt'una eklenir; şema da öğe sayısını sabitler
+PARTIAL_ITEM_LABELS = {
+    "phonological": "soru",
+    "spelling": "soru",
+    "word_list": "kelime",
+    "paragraph": "paragraf",
+}
+
+PARTIAL_PROMPT = """
+DİKKAT: Bu sefer YALNIZCA {count} adet {label} üret. JSON formatı aynı kalsın.
+"""
+
+PARTIAL_AVOID_PROMPT = """Şunları tekrar etme: {items}
+"""
+
+# Okuma düzeyine uymadığı için elenen paragraflar yeniden üretilirken eklenir
+PARAGRAPH_LEVEL_PROMPT = """Her paragraf TAM OLARAK 4 cümle olsun. Cümleler kısa (en fazla 8 kelime), kelimeler günlük ve yaygın olsun.
+"""
+
+# ANALYSIS_MODE=polish: yerel şablonla üretilen taslak analiz kullanıcı prompt'una eklenir, Llama yalnızca üslubu iyileştirir
+POLISH_PROMPT = """
+TASLAK ANALİZ (sayılar doğru, yalnızca dili daha akıcı ve kişisel hale getir; yeni sayı ekleme):
+{draft}
+"""
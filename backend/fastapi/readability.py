@@ -0,0 +1,217 @@
+import random
+import re
+from collections import deque
+from typing import Callable, Deque, Dict, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+from lexicon_store import LexiconStore
+from text_utils import normalize_text
+from turkish_phonology import turkish_casefold
+
+# Kelimeler ve cümle sonu işaretleri tek düzenli ifade ile, tek geçişte okunur
+TOKEN_PATTERN = re.compile(r"[A-Za-zÇĞİIÖŞÜÂÎÛçğıöşüâîû]+(?:'[a-zçğıöşüâîû]+)?|[.!?…]+")
+
+# Sözlükte ekli hali bulunmayan kelimenin kökü en uzun ön ekten en az bu uzunluğa kadar aranır
+MIN_STEM = 3
+
+SENTENCE_COUNT = 4
+
+# turkish_casefold şapkaları kaldırdığı için düz ünlüler yeterlidir
+PLAIN_VOWELS = "aeıioöuü"
+
+
+class ReadabilityTarget(NamedTuple):
+    min_score: float
+    max_score: float
+    max_rare_ratio: float
+
+
+# Ateşman puanı: 90-100 çok kolay, 70-89 kolay, 50-69 orta, 30-49 zor, 1-29 çok zor.
+# Okuma güçlüğü olan öğrenciler için yaş grubunun okul düzeyinin biraz altı hedeflenir.
+LEVEL_TARGETS = {
+    "14-17": ReadabilityTarget(min_score=60.0, max_score=110.0, max_rare_ratio=0.3),
+    "17-24": ReadabilityTarget(min_score=50.0, max_score=100.0, max_rare_ratio=0.4),
+}
+
+
+def level_for(age_group: str) -> str:
+    return "14-17" if normalize_text(age_group).startswith("14") else "17-24"
+
+
+class ParagraphScore(NamedTuple):
+    sentences: int
+    words: int
+    syllables_per_word: float
+    words_per_sentence: float
+    atesman: float
+    rare_ratio: float
+
+
+def atesman(syllables_per_word: float, words_per_sentence: float) -> float:
+    """
+    Ateşman (1997) Türkçe okunabilirlik formülü
+    """
+    return 198.825 - 40.175 * syllables_per_word - 2.610 * words_per_sentence
+
+
+class ReadabilityScorer:
+    """
+    Paragrafları tek geçişte puanlar: cümle sayısı, kelime başına hece, Ateşman puanı ve seyrek kelime oranı. Seyrek kelime, kökü (ekleri atılarak bulunur)
+    sözlükte az yaygın bantta olan kelimedir; `unknown_rare` ise sözlükte hiç bulunmayanlar da seyrek
+    sayılır (yalnızca sözlük genel bir sıklık listesiyse anlamlıdır; paketle gelen konu sözlüğünde
+    fiiller ve bağlaçlar yoktur). Cümle ortasında büyük harfle başlayan özel isimler sayılmaz.
+    Görülmemiş kelimelerin tüm kök adayları tek bir toplu aramayla kontrol edilir, sonuç önbelleğe alınır.
+    """
+
+    def __init__(
+        self,
+        store: LexiconStore,
+        rare_band: int = 3,
+        unknown_rare: bool = False,
+        targets: Optional[Dict[str, ReadabilityTarget]] = None,
+        max_cached_words: int = 100_000,
+    ):
+        self.store = store
+        self.rare_band = rare_band
+        self.unknown_rare = unknown_rare
+        self.targets = targets or LEVEL_TARGETS
+        self.max_cached_words = max_cached_words
+        # Kelime -> kökünün sıklık bandı (0: sözlükte yok)
+        self._bands: Dict[str, int] = {}
+
+    def score(self, text: str) -> ParagraphScore:
+        sentences = 0
+        word_count = 0
+        open_sentence = False
+        sentence_start = True
+        words: List[str] = []
+        # Metin bir kez küçültülür; desenin harflerinde uzunluk değişmediği için kelimeler konumla alınır
+        folded = turkish_casefold(text)
+        aligned = len(folded) == len(text)
+        for match in TOKEN_PATTERN.finditer(text):
+            token = match.group()
+            if token[0] in ".!?…":
+                if open_sentence:
+                    sentences += 1
+                open_sentence = False
+                sentence_start = True
+                continue
+            # Kesme işaretinden sonrası ektir ("Ali'nin")
+            stem, _, suffix = token.partition("'")
+            key = folded[match.start():match.start() + len(stem)] if aligned else turkish_casefold(stem)
+            word_count += 1
+            # Kesme işaretli kökler ve cümle ortasında büyük harfle başlayan kelimeler özel isimdir
+            if not suffix and (sentence_start or not stem[0].isupper()):
+                words.append(key)
+            open_sentence = True
+            sentence_start = False
+        if open_sentence:
+            sentences += 1
+        # Türkçede her hecede tek ünlü vardır; hece sayısı metindeki ünlülerin sayısıdır
+        syllables = sum(folded.count(vowel) for vowel in PLAIN_VOWELS)
+
+        if not word_count:
+            return ParagraphScore(sentences, 0, 0.0, 0.0, 0.0, 1.0)
+        syllables_per_word = syllables / word_count
+        words_per_sentence = word_count / max(1, sentences)
+        return ParagraphScore(
+            sentences=sentences,
+            words=word_count,
+            syllables_per_word=round(syllables_per_word, 2),
+            words_per_sentence=round(words_per_sentence, 2),
+            atesman=round(atesman(syllables_per_word, words_per_sentence), 1),
+            rare_ratio=round(self._rare_count(words) / word_count, 3),
+        )
+
+    def _rare_count(self, words: Sequence[str]) -> int:
+        """
+        Yeni kelimelerin kök adayları (kelimenin kendisi ve MIN_STEM'e kadar ön ekleri) tek seferde aranır;
+        en uzun eşleşen kök kelimenin bandını belirler
+        """
+        bands = self._bands
+        unseen = [word for word in dict.fromkeys(words) if word not in bands]
+        if unseen:
+            if len(bands) + len(unseen) > self.max_cached_words:
+                bands.clear()
+            keys: List[str] = []
+            spans: List[Tuple[int, int]] = []
+            for word in unseen:
+                start = len(keys)
+                keys.extend(word[:end] for end in range(len(word), min(MIN_STEM, len(word)) - 1, -1))
+                spans.append((start, len(keys)))
+            rows = self.store.lookup_many(keys)
+            band_column = self.store.columns["band"]
+            for word, (start, end) in zip(unseen, spans):
+                hits = rows[start:end]
+                hits = hits[hits >= 0]
+                bands[word] = int(band_column[hits[0]]) if len(hits) else 0
+        rare_band = self.rare_band
+        if self.unknown_rare:
+            return sum(1 for word in words if not bands[word] or bands[word] >= rare_band)
+        return sum(1 for word in words if bands[word] >= rare_band)
+
+    def target(self, level: str) -> ReadabilityTarget:
+        return self.targets.get(level, self.targets["17-24"])
+
+    def fits(self, score: ParagraphScore, level: str) -> bool:
+        target = self.target(level)
+        return (
+            score.sentences == SENTENCE_COUNT
+            and target.min_score <= score.atesman <= target.max_score
+            and score.rare_ratio <= target.max_rare_ratio
+        )
+
+
+class ScoredParagraphPool:
+    """
+    Düzeye uyduğu doğrulanmış paragraflar (düzey başına son `capacity` paragraf). Llama'dan yeterli
+    uygun paragraf gelmediğinde ya da Llama'ya ulaşılamadığında eksikler buradan tamamlanır.
+    """
+
+    def __init__(self, scorer: ReadabilityScorer, seeds: Iterable[str] = (), capacity: int = 200, rng: Optional[random.Random] = None):
+        self.scorer = scorer
+        self.capacity = capacity
+        self.rng = rng or random.Random()
+        self._pools: Dict[str, Deque[str]] = {level: deque(maxlen=capacity) for level in scorer.targets}
+        self._seeds = list(seeds)
+        for paragraph in self._seeds:
+            score = scorer.score(paragraph)
+            for level in self._pools:
+                if scorer.fits(score, level):
+                    self._pools[level].append(paragraph)
+
+    def add(self, level: str, paragraphs: Iterable[str]):
+        pool = self._pools.setdefault(level, deque(maxlen=self.capacity))
+        known = set(pool)
+        pool.extend(paragraph for paragraph in paragraphs if paragraph not in known)
+
+    def pick(
+        self, level: str, count: int, exclude: Iterable[str] = (), accept: Optional[Callable[[str], bool]] = None
+    ) -> List[str]:
+        """
+        Düzeye uygun, `exclude` dışında en fazla `count` paragraf; havuz yetmezse varsayılan paragraflarla tamamlanır.
+        `accept` verilirse (ör. öğrencinin geçmişinde tekrarı yok) geçen paragraflar öne alınır, geçmeyenler en sona kalır.
+        """
+        excluded = set(exclude)
+        candidates = [paragraph for paragraph in self._pools.get(level, ()) if paragraph not in excluded]
+        rejected: List[str] = []
+        if accept is None:
+            picked = self.rng.sample(candidates, min(count, len(candidates)))
+        else:
+            picked = []
+            for paragraph in self.rng.sample(candidates, len(candidates)):
+                if len(picked) >= count:
+                    break
+                (picked if accept(paragraph) else rejected).append(paragraph)
+        excluded.update(picked)
+        excluded.update(rejected)
+        for paragraph in self._seeds:
+            if len(picked) >= count:
+                break
+            if paragraph not in excluded:
+                if accept is None or accept(paragraph):
+                    picked.append(paragraph)
+                else:
+                    rejected.append(paragraph)
+        return picked + rejected[:count - len(picked)]
+
+    def stats(self) -> dict:
+        return {level: len(pool) for level, pool in self._pools.items()}
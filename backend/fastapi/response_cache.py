@@ -0,0 +1,185 @@
+import asyncio
+import hashlib
+import json
+import sqlite3
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+from models import UserInfo, UserStatistics
+from text_utils import normalize_text, parse_rate
+
+
+def normalize_user_info(user_info: UserInfo) -> dict:
+    """
+    Yazım/boşluk farkları aynı anahtara düşsün diye UserInfo alanlarını normalize eder
+    """
+    return {field: normalize_text(value) for field, value in user_info.model_dump().items()}
+
+
+def bucket_statistics(user_statistics: UserStatistics, rate_bucket: float = 5.0, games_bucket: int = 10) -> dict:
+    """
+    Başarı oranlarını ve oyun sayısını kovalara yuvarlar; yakın istatistikler aynı analizi paylaşır
+    """
+    bucketed = {"total_games_played": user_statistics.total_games_played // games_bucket * games_bucket}
+    for field, value in user_statistics.model_dump().items():
+        if field == "total_games_played":
+            continue
+        rate = parse_rate(value)
+        if rate is None:
+            bucketed[field] = normalize_text(str(value))
+            continue
+        bucketed[field] = round(rate / rate_bucket) * rate_bucket
+    return bucketed
+
+
+def cache_key(endpoint: str, *parts: Any) -> str:
+    payload = json.dumps([endpoint, *parts], ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class MemoryCacheBackend:
+    """
+    Süre sınırlı (TTL) ve boyut sınırlı (LRU) bellek içi önbellek
+    """
+
+    def __init__(self, max_entries: int = 1024):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+    async def get(self, key: str) -> Optional[str]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.time():
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    async def set(self, key: str, value: str, ttl: float):
+        self._entries[key] = (time.time() + ttl, value)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    async def size(self) -> int:
+        return len(self._entries)
+
+    async def close(self):
+        self._entries.clear()
+
+
+class SqliteCacheBackend:
+    """
+    Yeniden başlatmalarda korunan SQLite önbelleği. LRU için son erişim zamanı tutulur.
+    Bloklayan SQLite çağrıları event loop'u tutmasın diye thread üzerinde çalıştırılır.
+    """
+
+    def __init__(self, path: str = "response_cache.sqlite3", max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._lock = asyncio.Lock()
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS response_cache ("
+            " key TEXT PRIMARY KEY, value TEXT NOT NULL,"
+            " expires_at REAL NOT NULL, accessed_at REAL NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_response_cache_accessed ON response_cache (accessed_at)"
+        )
+
+    def _get(self, key: str) -> Optional[str]:
+        now = time.time()
+        row = self._conn.execute(
+            "SELECT value, expires_at FROM response_cache WHERE key = ?", (key,)
+        ).fetchone()
+        if row is None:
+            return None
+        if row[1] < now:
+            self._conn.execute("DELETE FROM response_cache WHERE key = ?", (key,))
+            return None
+        self._conn.execute("UPDATE response_cache SET accessed_at = ? WHERE key = ?", (now, key))
+        return row[0]
+
+    def _set(self, key: str, value: str, ttl: float):
+        now = time.time()
+        self._conn.execute(
+            "INSERT INTO response_cache (key, value, expires_at, accessed_at) VALUES (?, ?, ?, ?)"
+            " ON CONFLICT(key) DO UPDATE SET value = excluded.value,"
+            " expires_at = excluded.expires_at, accessed_at = excluded.accessed_at",
+            (key, value, now + ttl, now),
+        )
+        count = self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        if count > self.max_entries:
+            # Önce süresi dolanları, hâlâ fazlaysa en uzun süredir erişilmeyenleri sil
+            count -= self._conn.execute("DELETE FROM response_cache WHERE expires_at < ?", (now,)).rowcount
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM response_cache WHERE key IN ("
+                    " SELECT key FROM response_cache ORDER BY accessed_at ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    async def get(self, key: str) -> Optional[str]:
+        async with self._lock:
+            return await asyncio.to_thread(self._get, key)
+
+    async def set(self, key: str, value: str, ttl: float):
+        async with self._lock:
+            await asyncio.to_thread(self._set, key, value, ttl)
+
+    async def size(self) -> int:
+        async with self._lock:
+            return await asyncio.to_thread(
+                lambda: self._conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            )
+
+    async def close(self):
+        self._conn.close()
+
+
+class ResponseCache:
+    """
+    LlamaService önünde endpoint bazında TTL ile çalışan yanıt önbelleği
+    """
+
+    def __init__(self, backend, ttls: Dict[str, float]):
+        self.backend = backend
+        self.ttls = ttls
+        self._counters: Dict[str, Dict[str, int]] = {
+            endpoint: {"hits": 0, "misses": 0, "bypassed": 0} for endpoint in ttls
+        }
+
+    def enabled_for(self, endpoint: str) -> bool:
+        return self.ttls.get(endpoint, 0) > 0
+
+    async def get(self, endpoint: str, key: str) -> Optional[Any]:
+        if not self.enabled_for(endpoint):
+            return None
+        value = await self.backend.get(key)
+        if value is None:
+            self._counters[endpoint]["misses"] += 1
+            return None
+        self._counters[endpoint]["hits"] += 1
+        return json.loads(value)
+
+    async def set(self, endpoint: str, key: str, value: Any):
+        if not self.enabled_for(endpoint):
+            return
+        await self.backend.set(key, json.dumps(value, ensure_ascii=False), self.ttls[endpoint])
+
+    def record_bypass(self, endpoint: str):
+        if endpoint in self._counters:
+            self._counters[endpoint]["bypassed"] += 1
+
+    async def close(self):
+        await self.backend.close()
+
+    async def stats(self) -> dict:
+        return {
+            "backend": type(self.backend).__name__,
+            "size": await self.backend.size(),
+            "endpoints": {endpoint: dict(counters) for endpoint, counters in self._counters.items()},
+        }
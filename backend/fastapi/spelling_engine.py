@@ -0,0 +1,90 @@
+import random
+from collections import defaultdict
+from typing import Dict, List, Optional, Sequence, Tuple
+from lexicon import SpellingPair, load_spelling_pairs
+from models import SpellingQuestion, UserInfo
+
+WORDS_PER_QUESTION = 5
+
+
+class SpellingEngine:
+    """
+    Yazım Hatası Tespit sorularını paketle gelen çift listesinden yerel olarak üretir.
+    Çiftler karışıklık türüne (b/p, m/n, s/ş ...) göre bir kez indekslenir; her seçim O(1)'dir,
+    bu yüzden liste on binlerce çifte büyüse de üretim süresi değişmez.
+    """
+
+    def __init__(self, pairs: Optional[Sequence[SpellingPair]] = None, rng: Optional[random.Random] = None):
+        self.pairs = list(pairs if pairs is not None else load_spelling_pairs())
+        self.rng = rng or random.Random()
+
+        self.by_confusion: Dict[str, List[SpellingPair]] = defaultdict(list)
+        for pair in self.pairs:
+            self.by_confusion[pair.confusion].append(pair)
+        self.confusions = sorted(self.by_confusion)
+        # Dolgu (doğru yazılmış) kelimeler çiftlerin doğru halleridir
+        self.correct_words = list(dict.fromkeys(pair.correct for pair in self.pairs))
+        if len(self.correct_words) < WORDS_PER_QUESTION * 2:
+            raise ValueError("Yazım oyunu için yeterli kelime çifti yok")
+
+    def sample_pairs(self, count: int, confusions: Optional[Sequence[str]] = None) -> List[SpellingPair]:
+        """
+        Mümkün olduğunca farklı karışıklık türlerinden `count` çift seçer.
+        `confusions` verilirse (uyarlamalı seçim) önce bu türlerden seçilir.
+        """
+        confusions = [c for c in dict.fromkeys(confusions or ()) if c in self.by_confusion][:count]
+        if len(confusions) < count:
+            rest = [c for c in self.confusions if c not in confusions]
+            confusions += self.rng.sample(rest, min(count - len(confusions), len(rest)))
+        while len(confusions) < count:
+            confusions.append(self.rng.choice(self.confusions))
+
+        pairs: List[SpellingPair] = []
+        chosen = set()
+        for confusion in confusions:
+            candidates = self.by_confusion[confusion]
+            pair = self.rng.choice(candidates)
+            # Aynı kelime iki kez seçilirse (küçük gruplarda) başka bir türden tamamla
+            while pair.correct in chosen:
+                pair = self.rng.choice(self.pairs)
+            chosen.add(pair.correct)
+            pairs.append(pair)
+        return pairs
+
+    def sample_fillers(self, count: int, exclude: set) -> List[str]:
+        fillers: List[str] = []
+        while len(fillers) < count:
+            word = self.rng.choice(self.correct_words)
+            if word not in exclude:
+                fillers.append(word)
+                exclude.add(word)
+        return fillers
+
+    def build_question(self, pair: SpellingPair, used: set) -> SpellingQuestion:
+        used.add(pair.correct)
+        words = self.sample_fillers(WORDS_PER_QUESTION - 1, used)
+        wrong_index = self.rng.randrange(WORDS_PER_QUESTION)
+        words.insert(wrong_index, pair.wrong)
+        return SpellingQuestion(words=words, wrong_index=wrong_index)
+
+    def generate_game(
+        self,
+        user_info: Optional[UserInfo] = None,
+        question_count: int = 5,
+        confusions: Optional[Sequence[str]] = None,
+    ) -> List[SpellingQuestion]:
+        """
+        Her soruda 4 doğru ve 1 hatalı kelime; sorular farklı karışıklık türlerini hedefler
+        """
+        used: set = set()
+        return [self.build_question(pair, used) for pair in self.sample_pairs(question_count, confusions)]
+
+    def sample_for_prompt(
+        self, question_count: int = 5, confusions: Optional[Sequence[str]] = None
+    ) -> Tuple[List[SpellingPair], List[str]]:
+        """
+        LLM modu için yalnızca bu oyunda kullanılacak çiftleri ve dolgu kelimelerini seçer
+        """
+        pairs = self.sample_pairs(question_count, confusions)
+        fillers = self.sample_fillers(question_count * (WORDS_PER_QUESTION - 1), {pair.correct for pair in pairs})
+        return pairs, fillers
@@ -0,0 +1,146 @@
+import re
+from typing import List, Optional, Tuple
+
+# Cümle sonu: nokta/ünlem/soru işareti (ve tekrarları) ardından boşluk
+SENTENCE_END = re.compile(r"[.!?…]+[\"')\]]*\s+")
+
+_ESCAPES = {'"': '"', "\\": "\\", "/": "/", "b": "\b", "f": "\f", "n": "\n", "r": "\r", "t": "\t"}
+
+
+def split_sentences(text: str) -> List[str]:
+    """
+    Metni cümlelere böler (cümle sonu noktalama işaretleri korunur)
+    """
+    sentences = []
+    start = 0
+    for match in SENTENCE_END.finditer(text):
+        sentence = text[start:match.end()].strip()
+        if sentence:
+            sentences.append(sentence)
+        start = match.end()
+    rest = text[start:].strip()
+    if rest:
+        sentences.append(rest)
+    return sentences
+
+
+class IncrementalJSONParser:
+    """
+    Parça parça gelen (stream) JSON metnini karakter karakter işler.
+    Tamamlanan her string değeri, içinde bulunduğu anahtar ile birlikte hemen döndürür;
+    devam eden string'in o ana kadarki kısmına da `partial` ile erişilebilir.
+    """
+
+    def __init__(self):
+        # Her açık kap için [tip, şu anki anahtar, anahtar bekleniyor mu]
+        self._stack: List[list] = []
+        self._in_string = False
+        self._string_is_key = False
+        self._escape = False
+        self._unicode: Optional[str] = None
+        self._chars: List[str] = []
+
+    @property
+    def current_key(self) -> Optional[str]:
+        """
+        Şu an işlenen değerin bağlı olduğu en yakın nesne anahtarı
+        """
+        for container in reversed(self._stack):
+            if container[0] == "{":
+                return container[1]
+        return None
+
+    @property
+    def partial(self) -> Optional[Tuple[Optional[str], str]]:
+        """
+        Henüz kapanmamış değer string'i varsa (anahtar, o ana kadarki metin)
+        """
+        if not self._in_string or self._string_is_key:
+            return None
+        return self.current_key, self._decoded()
+
+    def _decoded(self) -> str:
+        return "".join(self._chars).encode("utf-16", "surrogatepass").decode("utf-16", "replace")
+
+    def feed(self, chunk: str) -> List[Tuple[Optional[str], str]]:
+        completed = []
+        for char in chunk:
+            if self._in_string:
+                value = self._consume_string_char(char)
+                if value is not None:
+                    if self._string_is_key:
+                        self._stack[-1][1] = value
+                        self._stack[-1][2] = False
+                    else:
+                        completed.append((self.current_key, value))
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_is_key = bool(self._stack) and self._stack[-1][0] == "{" and self._stack[-1][2]
+                self._chars = []
+            elif char in "{[":
+                self._stack.append([char, None, char == "{"])
+            elif char in "}]":
+                if self._stack:
+                    self._stack.pop()
+            elif char == "," and self._stack and self._stack[-1][0] == "{":
+                self._stack[-1][2] = True
+        return completed
+
+    def _consume_string_char(self, char: str) -> Optional[str]:
+        if self._unicode is not None:
+            self._unicode += char
+            if len(self._unicode) == 4:
+                try:
+                    code = int(self._unicode, 16)
+                except ValueError:
+                    code = 0xFFFD
+                self._chars.append(chr(code))
+                self._unicode = None
+            return None
+        if self._escape:
+            self._escape = False
+            if char == "u":
+                self._unicode = ""
+            else:
+                self._chars.append(_ESCAPES.get(char, char))
+            return None
+        if char == "\\":
+            self._escape = True
+            return None
+        if char == '"':
+            self._in_string = False
+            return self._decoded()
+        self._chars.append(char)
+        return None
+
+
+class SentenceStream:
+    """
+    Belirli bir anahtardaki string değerini akarken cümle cümle yayınlar
+    """
+
+    def __init__(self, key: str):
+        self.key = key
+        self.parser = IncrementalJSONParser()
+        self._emitted = 0
+        self._finished = False
+
+    def feed(self, chunk: str) -> List[str]:
+        sentences = []
+        for key, value in self.parser.feed(chunk):
+            if key == self.key and not self._finished:
+                sentences.extend(split_sentences(value[self._emitted:]))
+                self._emitted = len(value)
+                self._finished = True
+        partial = self.parser.partial
+        if partial and partial[0] == self.key and not self._finished:
+            text = partial[1]
+            last_end = None
+            for match in SENTENCE_END.finditer(text, self._emitted):
+                last_end = match.end()
+            if last_end is not None:
+                sentences.extend(split_sentences(text[self._emitted:last_end]))
+                self._emitted = last_end
+        return sentences
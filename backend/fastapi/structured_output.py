@@ -0,0 +1,142 @@
+import copy
+import json
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple, Type, get_args
+from pydantic import BaseModel, TypeAdapter, ValidationError, create_model
+from models import (
+    AnalysisResponse,
+    GameResponse,
+    ParagraphResponse,
+    RoadmapResponse,
+    SpellingGameResponse,
+    WordListResponse,
+)
+
+# Her endpoint'in Llama çıktısı bu modellere göre üretilir (Ollama `format`) ve doğrulanır
+GENERATION_MODELS: Dict[str, Type[BaseModel]] = {
+    "phonological": GameResponse,
+    "spelling": SpellingGameResponse,
+    "word_list": WordListResponse,
+    "paragraph": ParagraphResponse,
+    "analysis": AnalysisResponse,
+    "roadmap": RoadmapResponse,
+}
+
+# Öğe listesi üreten endpoint'ler; geçersiz öğeler oyunun tamamı yerine tek tek yeniden üretilir
+ITEM_FIELDS = {
+    "phonological": "questions",
+    "spelling": "questions",
+    "word_list": "words",
+    "paragraph": "paragraphs",
+}
+
+
+class InvalidGenerationError(Exception):
+    """
+    Yeniden üretim denemelerinden sonra da şemaya uyan çıktı alınamadı
+    """
+
+
+def _inline_refs(schema: Any, defs: Dict[str, Any]) -> Any:
+    """
+    $ref'leri $defs içeriğiyle değiştirir ve başlıkları atar; Ollama'nın şemadan gramer üretimi
+    düz ve küçük şemalarla daha güvenilir çalışır
+    """
+    if isinstance(schema, dict):
+        if "$ref" in schema:
+            return _inline_refs(defs[schema["$ref"].split("/")[-1]], defs)
+        return {key: _inline_refs(value, defs) for key, value in schema.items() if key not in ("title", "$defs")}
+    if isinstance(schema, list):
+        return [_inline_refs(value, defs) for value in schema]
+    return schema
+
+
+# Yanıt modellerinde bulunan ama Llama'nın değil sunucunun doldurduğu alanlar
+SERVER_FIELDS = ("degraded",)
+
+
+@lru_cache(maxsize=None)
+def _base_schema(endpoint: str) -> dict:
+    schema = GENERATION_MODELS[endpoint].model_json_schema()
+    for field in SERVER_FIELDS:
+        schema["properties"].pop(field, None)
+    return _inline_refs(schema, schema.get("$defs", {}))
+
+
+def response_format(endpoint: str, count: Optional[int] = None) -> dict:
+    """
+    Ollama /api/generate `format` alanı için JSON Schema. `count` verilirse öğe listesinin uzunluğu
+    bu sayıya sabitlenir (yalnızca eksik öğelerin yeniden üretimi için).
+    """
+    schema = _base_schema(endpoint)
+    if count is None:
+        return schema
+    schema = copy.deepcopy(schema)
+    items = schema["properties"][ITEM_FIELDS[endpoint]]
+    items["minItems"] = items["maxItems"] = count
+    return schema
+
+
+@lru_cache(maxsize=None)
+def _items_model(endpoint: str) -> Type[BaseModel]:
+    # Liste uzunluğu kısıtı olmayan sarmalayıcı; uzunluk ayrıca kontrol edilir ki eksik yanıttaki geçerli öğeler kaybolmasın
+    field = ITEM_FIELDS[endpoint]
+    annotation = GENERATION_MODELS[endpoint].model_fields[field].annotation
+    return create_model(f"{GENERATION_MODELS[endpoint].__name__}Items", **{field: (annotation, ...)})
+
+
+@lru_cache(maxsize=None)
+def _item_adapter(endpoint: str) -> TypeAdapter:
+    return TypeAdapter(get_args(_items_model(endpoint).model_fields[ITEM_FIELDS[endpoint]].annotation)[0])
+
+
+def parse_items(endpoint: str, text: str, count: int) -> Tuple[List[Any], str]:
+    """
+    Öğe listesini tek geçişte (model_validate_json) ayrıştırıp doğrular. Başarısız olursa
+    öğeler tek tek doğrulanır ve geçerli olanlar döner. İkinci değer sonucu özetler:
+    valid, wrong_count, item_errors, schema_error veya invalid_json.
+    """
+    field = ITEM_FIELDS[endpoint]
+    try:
+        items = getattr(_items_model(endpoint).model_validate_json(text), field)
+        return items, "valid" if len(items) == count else "wrong_count"
+    except ValidationError:
+        pass
+
+    try:
+        data = json.loads(text)
+    except json.JSONDecodeError:
+        return [], "invalid_json"
+    raw_items = data.get(field) if isinstance(data, dict) else None
+    if not isinstance(raw_items, list):
+        return [], "schema_error"
+
+    adapter = _item_adapter(endpoint)
+    items = []
+    for raw in raw_items:
+        try:
+            items.append(adapter.validate_python(raw))
+        except ValidationError:
+            continue
+    return items, "item_errors"
+
+
+def parse_document(endpoint: str, text: str) -> Tuple[Optional[BaseModel], str]:
+    """
+    Tek parça yanıtları (analiz, yol haritası) tek geçişte doğrular
+    """
+    try:
+        return GENERATION_MODELS[endpoint].model_validate_json(text), "valid"
+    except ValidationError as e:
+        if any(error["type"] == "json_invalid" for error in e.errors()):
+            return None, "invalid_json"
+        return None, "schema_error"
+
+
+def is_valid_output(endpoint: str, text: str, count: Optional[int] = None) -> bool:
+    """
+    Yanıt şemaya tam uyuyor mu; hedge edilen isteklerde kazananı seçmek için kullanılır
+    """
+    if endpoint in ITEM_FIELDS:
+        return parse_items(endpoint, text, count if count is not None else 5)[1] == "valid"
+    return parse_document(endpoint, text)[1] == "valid"
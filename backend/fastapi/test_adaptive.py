@@ -0,0 +1,145 @@
+"""
+Elo tabanlı uyarlamalı motor: güncellemeler, zorluk seçimi, tekrar öğeleri ve tohumlama
+"""
+import math
+import random
+import pytest
+from adaptive import K_ABILITY, K_DIFFICULTY, K_MASTERY, AdaptiveEngine, ItemBank, build_adaptive_engine
+from models import ProgressEvent
+from phonological_engine import PhonologicalEngine
+from spelling_engine import SpellingEngine
+
+
+def engine(difficulties=None, **kwargs):
+    difficulties = difficulties or {f"h{i}": (i - 50) / 10 for i in range(101)}
+    return AdaptiveEngine(
+        {"phonological": ItemBank(dict(difficulties)), "spelling": ItemBank({"b/p": 0.0, "s/z": 1.0})},
+        aliases={"spelling": {"herkes/herkez": "s/z"}},
+        rng=random.Random(1),
+        **kwargs,
+    )
+
+
+def answer(item, correct, game_type="phonological"):
+    field = "syllable" if game_type == "phonological" else "confusion_pair"
+    return ProgressEvent(game_type=game_type, correct=correct, **{field: item})
+
+
+def test_item_bank_near_and_rebuild():
+    bank = ItemBank({"a": 0.0, "b": 1.0, "c": 2.0, "d": 3.0}, min_rebuild=2)
+    assert bank.rebuild_every == 4
+    assert [bank.items[i] for i in bank.near(1.9, 2)] == ["b", "c"]
+    assert [bank.items[i] for i in bank.near(10.0, 2)] == ["c", "d"]
+    assert [bank.items[i] for i in bank.near(-10.0, 3)] == ["a", "b", "c"]
+    bank.update(bank.index["a"], 5.0)
+    # Sıralı kopya öğe sayısı kadar (en az min_rebuild) güncellemede bir yenilenir
+    assert [bank.items[i] for i in bank.near(5.0, 1)] == ["d"]
+    for _ in range(3):
+        bank.update(bank.index["b"], 0.0)
+    assert bank.rebuilds == 2
+    assert [bank.items[i] for i in bank.near(5.0, 1)] == ["a"]
+
+
+def test_elo_update_for_correct_answer():
+    adaptive = engine({"ka": 0.0})
+    adaptive.observe("ali", [answer("KA ", True)])
+    # p = 0.5, hata = 0.5
+    state = adaptive._students["ali"]
+    assert state.ability["phonological"] == pytest.approx(K_ABILITY * 0.5)
+    assert state.mastery["phonological"][0] == pytest.approx(K_MASTERY * 0.5)
+    assert adaptive.banks["phonological"].difficulty[0] == pytest.approx(-K_DIFFICULTY * 0.5)
+    p = 1 / (1 + math.exp(-(K_ABILITY * 0.5 + K_MASTERY * 0.5 + K_DIFFICULTY * 0.5)))
+    assert adaptive.probability("ali", "phonological", "ka") == pytest.approx(p)
+
+
+def test_wrong_answers_lower_probability():
+    adaptive = engine({"ka": 0.0, "ma": 0.0})
+    before = adaptive.probability("ali", "phonological", "ka")
+    adaptive.observe("ali", [answer("ka", False)] * 3)
+    assert adaptive.probability("ali", "phonological", "ka") < before
+    # Kişisel ustalık yalnızca görülen öğeyi etkiler, yetenek tüm öğeleri
+    assert adaptive.probability("ali", "phonological", "ka") < adaptive.probability("ali", "phonological", "ma") < before
+
+
+def test_unknown_items_and_aliases():
+    adaptive = engine()
+    adaptive.observe("ali", [answer("yok", True), answer(None, True), answer("herkes/herkez", False, "spelling"), answer("x", True, "word_list")])
+    assert adaptive.stats()["unknown_items"] == 2
+    assert adaptive.stats()["updates"] == 1
+    assert adaptive.probability("ali", "spelling", "s/z") < adaptive.probability("ali", "spelling", "b/p")
+    assert adaptive.probability("ali", "phonological", "yok") is None
+
+
+def test_selection_targets_success_probability():
+    adaptive = engine(target_success=0.7, review_ratio=0)
+    for _ in range(5):
+        chosen = adaptive.select("ali", "phonological", 5)
+        assert len(set(chosen)) == 5
+        for item in chosen:
+            assert abs(adaptive.probability("ali", "phonological", item) - 0.7) < 0.35
+
+
+def test_selection_follows_ability():
+    strong, weak = engine(review_ratio=0), engine(review_ratio=0)
+    for _ in range(30):
+        strong.observe("ali", [answer(item, True) for item in strong.select("ali", "phonological", 5)])
+        weak.observe("ali", [answer(item, False) for item in weak.select("ali", "phonological", 5)])
+
+    def mean_difficulty(adaptive):
+        bank = adaptive.banks["phonological"]
+        chosen = adaptive.select("ali", "phonological", 5)
+        return sum(bank.difficulty[bank.index[item]] for item in chosen) / len(chosen)
+
+    assert mean_difficulty(strong) > 1.0 > -1.0 > mean_difficulty(weak)
+
+
+def test_recent_items_are_not_repeated():
+    adaptive = engine(review_ratio=0, recent=15, window=10)
+    first = adaptive.select("ali", "phonological", 5)
+    second = adaptive.select("ali", "phonological", 5)
+    assert not set(first) & set(second)
+
+
+def test_review_picks_weakest_seen_items():
+    adaptive = engine(review_ratio=0.4, recent=0)
+    adaptive.observe("ali", [answer("h90", False)] * 4 + [answer("h10", True)] * 4)
+    chosen = adaptive.select("ali", "phonological", 5)
+    assert chosen[0] == "h90"
+    assert "h10" not in chosen[:2]
+
+
+def test_seed_from_item_stats():
+    adaptive = engine({"ka": 0.0, "ma": 0.0})
+    adaptive.seed("ali", [("syllable", "ka", 8, 0), ("syllable", "ma", 8, 8), ("confusion", "herkes/herkez", 3, 3), ("syllable", "yok", 5, 5)])
+    assert adaptive.knows("ali")
+    # Laplace: (0 + 1) / (8 + 2) ve (8 + 1) / (8 + 2)
+    assert adaptive.probability("ali", "phonological", "ka") == pytest.approx(0.1)
+    assert adaptive.probability("ali", "phonological", "ma") == pytest.approx(0.9)
+    assert adaptive.probability("ali", "spelling", "s/z") == pytest.approx(0.8)
+
+
+def test_students_are_lru_bounded():
+    adaptive = engine(max_students=2)
+    for user_id in ("ali", "ayşe", "veli"):
+        adaptive.select(user_id, "phonological", 1)
+    assert not adaptive.knows("ali") and adaptive.knows("veli")
+    assert adaptive.stats()["students"] == 2
+
+
+def test_invalid_target_success():
+    with pytest.raises(ValueError):
+        engine(target_success=1.0)
+
+
+def test_build_from_local_engines():
+    phonological, spelling = PhonologicalEngine(), SpellingEngine()
+    adaptive = build_adaptive_engine(phonological, spelling, rng=random.Random(1))
+    bank = adaptive.banks["phonological"]
+    counts = {target: len(phonological.index[target]) for target in phonological.targets}
+    common, rare = max(counts, key=counts.get), min(counts, key=counts.get)
+    # Az kelimede geçen hece daha zor başlar
+    assert bank.difficulty[bank.index[rare]] > bank.difficulty[bank.index[common]]
+    pair = spelling.pairs[0]
+    adaptive.observe("ali", [answer(f"{pair.correct}/{pair.wrong}", False, "spelling")])
+    assert adaptive.stats()["updates"] == 1
+    assert len(adaptive.select("ali", "spelling", 3)) == 3
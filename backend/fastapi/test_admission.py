@@ -0,0 +1,91 @@
+"""
+AdmissionController çevrimdışı testleri: eşzamanlılık sınırı, öncelik sırası, kuyruk sınırı ve iptal
+"""
+import asyncio
+import pytest
+from admission import AdmissionController, OverloadedError
+
+
+async def settle():
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def test_concurrency_limit_and_priority_order():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=10)
+        order = []
+
+        async def run(endpoint):
+            async with controller.slot(endpoint):
+                order.append(endpoint)
+                await settle()
+
+        await controller.acquire("roadmap")
+        tasks = [asyncio.create_task(run(endpoint)) for endpoint in ("analysis", "roadmap", "spelling")]
+        await settle()
+        assert controller.stats()["active"] == 1 and controller.queue_depth == 3
+        controller.release()
+        await asyncio.gather(*tasks)
+        assert controller.stats()["active"] == 0 and controller.queue_depth == 0
+        return order
+
+    # Etkileşimli istekler önce, aynı öncelikte geliş sırası korunur
+    assert asyncio.run(scenario()) == ["spelling", "analysis", "roadmap"]
+
+
+def test_full_queue_rejects_immediately():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=1, retry_after=7)
+        await controller.acquire("spelling")
+        waiter = asyncio.create_task(controller.acquire("spelling"))
+        await settle()
+        with pytest.raises(OverloadedError) as error:
+            await controller.acquire("spelling")
+        assert error.value.retry_after == 7
+        controller.release()
+        await waiter
+        controller.release()
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0
+    assert stats["endpoints"]["spelling"]["admitted"] == 2
+    assert stats["endpoints"]["spelling"]["rejected"] == 1
+
+
+def test_cancelled_waiter_does_not_leak_slot():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=10)
+        await controller.acquire("analysis")
+        cancelled = asyncio.create_task(controller.acquire("spelling"))
+        waiter = asyncio.create_task(controller.acquire("analysis"))
+        await settle()
+        cancelled.cancel()
+        await settle()
+        assert controller.queue_depth == 1
+        controller.release()
+        await waiter
+        controller.release()
+        return controller.stats()
+
+    stats = asyncio.run(scenario())
+    assert stats["active"] == 0 and stats["queue_depth"] == 0
+
+
+def test_cancel_after_handoff_passes_slot_on():
+    async def scenario():
+        controller = AdmissionController(max_concurrency=1, max_queue_depth=10)
+        await controller.acquire("spelling")
+        first = asyncio.create_task(controller.acquire("spelling"))
+        second = asyncio.create_task(controller.acquire("spelling"))
+        await settle()
+        # Yer ilk bekleyene devredildi ama o çalışmadan iptal edildi; yer ikinciye geçmeli
+        controller.release()
+        first.cancel()
+        await asyncio.wait_for(second, timeout=1)
+        assert controller.stats()["active"] == 1
+        controller.release()
+        return controller.stats()
+
+    assert asyncio.run(scenario())["active"] == 0
@@ -0,0 +1,104 @@
+"""
+BackendPool yük dengeleme, devre dışı bırakma ve başka backend'de yeniden deneme; sahte Ollama süreç içinde çalışır
+"""
+import asyncio
+import json
+import httpx
+import pytest
+from admission import AdmissionController
+from backends import BackendPool, CircuitOpenError, NoBackendAvailableError, OllamaBackend
+from conftest import FakeBackend
+
+PROMPT = "Kelime listesi üret"
+
+
+def post(service, endpoint="word_list"):
+    return service._post_generate(endpoint, PROMPT, {})
+
+
+def test_least_outstanding_prefers_idle_backend():
+    pool = BackendPool(["http://a", "http://b"])
+    busy, idle = pool.backends
+    busy.admission._active = 2
+    assert pool.pick() is idle
+    assert pool.pick(exclude=[idle]) is busy
+    with pytest.raises(NoBackendAvailableError):
+        pool.pick(exclude=[busy, idle])
+
+
+def test_latency_strategy_weights_by_ewma():
+    pool = BackendPool(["http://a", "http://b"], strategy="latency")
+    slow, fast = pool.backends
+    slow.record_success(2.0)
+    fast.record_success(0.5)
+    fast.admission._active = 2
+    # (2 + 1) * 0.5 < (0 + 1) * 2.0
+    assert pool.pick() is fast
+    fast.admission._active = 4
+    assert pool.pick() is slow
+
+
+def test_ewma_latency():
+    backend = OllamaBackend("http://a/", AdmissionController(), latency_alpha=0.5)
+    backend.record_success(1.0)
+    backend.record_success(3.0)
+    assert backend.url == "http://a" and backend.ewma_latency == 2.0
+
+
+def test_all_circuits_open_fails_fast():
+    pool = BackendPool(["http://a", "http://b"], failure_threshold=1, eject_duration=60)
+    for backend in pool.backends:
+        pool.record_failure(backend)
+    assert not pool.available
+    with pytest.raises(CircuitOpenError):
+        pool.pick()
+
+
+def test_retries_on_healthy_backend_and_ejects_failing_one(fake_service):
+    failing = FakeBackend("http://failing", latency=0.0, failure_rate=1.0)
+    healthy = FakeBackend("http://healthy", latency=0.0)
+    service = fake_service(failing, healthy, failure_threshold=2, eject_duration=60)
+
+    async def scenario():
+        return [await post(service) for _ in range(5)]
+
+    for text in asyncio.run(scenario()):
+        assert len(json.loads(text)["words"]) == 5
+    # Eşit yükte ilk backend seçilir; iki hatadan sonra devre açılır ve istekler yalnızca sağlıklıya gider
+    assert failing.started == 2
+    assert healthy.started == 5
+    failing_backend, healthy_backend = service.backends.backends
+    assert failing_backend.ejected and not healthy_backend.ejected
+    assert failing_backend.failures == 2 and healthy_backend.failures == 0
+
+
+def test_single_failing_backend_raises(fake_service):
+    failing = FakeBackend("http://failing", latency=0.0, failure_rate=1.0)
+    service = fake_service(failing)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(post(service))
+    assert failing.started == 1
+
+
+def test_max_retries_bounds_attempts(fake_service):
+    backends = [FakeBackend(f"http://failing-{i}", latency=0.0, failure_rate=1.0) for i in range(3)]
+    service = fake_service(*backends, max_retries=1)
+    with pytest.raises(httpx.HTTPStatusError):
+        asyncio.run(post(service))
+    assert [backend.started for backend in backends] == [1, 1, 0]
+
+
+def test_health_check_ejects_unreachable_backend(fake_service):
+    healthy = FakeBackend("http://healthy", latency=0.0)
+    pool = BackendPool(["http://healthy", "http://unreachable"], failure_threshold=1, eject_duration=60)
+
+    async def unreachable(request):
+        raise httpx.ConnectError("bağlantı reddedildi", request=request)
+
+    client = httpx.AsyncClient(mounts={
+        "http://healthy": httpx.ASGITransport(app=healthy),
+        "http://unreachable": httpx.MockTransport(unreachable),
+    })
+    asyncio.run(pool.check_health(client))
+    assert [backend.ejected for backend in pool.backends] == [False, True]
+    assert pool.pick().url == "http://healthy"
@@ -0,0 +1,46 @@
+"""
+Toplu endpoint'lerin Ollama erişilemezken yedek içerikle dönmesi; main modülü kapalı bir porta yönlendirilir
+"""
+import json
+import os
+import tempfile
+import pytest
+
+os.environ.update(
+    OLLAMA_URL="http://127.0.0.1:9",
+    POOL_ENABLED="0",
+    PROGRESS_DB_PATH=os.path.join(tempfile.mkdtemp(), "progress.sqlite3"),
+)
+from fastapi.testclient import TestClient  # noqa: E402
+import main  # noqa: E402
+
+USER_INFO = {
+    "age_group": "7-10",
+    "hard_area": "Hece tanıma",
+    "reading_goal": "Akıcı okuma",
+    "diagnosis_time": "1 yıl önce",
+    "motivating_games": "Kelime oyunları",
+    "working_with_professional": "Evet",
+}
+
+
+@pytest.fixture(scope="module")
+def client():
+    return TestClient(main.app)
+
+
+def test_batch_falls_back_to_local_content(client):
+    response = client.post("/api/paragraph/batch?count=3", json={"user_info": USER_INFO})
+    assert response.status_code == 200
+    body = response.json()
+    assert body["degraded"] is True
+    assert len(body["games"]) == 3
+    assert all(game["degraded"] and len(game["paragraphs"]) == 5 for game in body["games"])
+
+
+def test_batch_stream_ends_degraded(client):
+    response = client.post("/api/paragraph/batch?count=2&stream=true", json={"user_info": USER_INFO})
+    assert response.status_code == 200
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert [line["index"] for line in lines[:-1]] == [0, 1]
+    assert lines[-1] == {"done": True, "degraded": True}
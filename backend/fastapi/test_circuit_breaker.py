@@ -0,0 +1,75 @@
+"""
+CircuitBreaker durum geçişleri; zaman `time.monotonic` yerine elle ilerletilir
+"""
+import pytest
+import circuit_breaker
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(circuit_breaker.time, "monotonic", lambda: now[0])
+    return now
+
+
+def test_trips_after_consecutive_failures(clock):
+    breaker = CircuitBreaker("b", failure_threshold=3, reset_timeout=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CLOSED and breaker.try_probe()
+    breaker.record_failure()
+    assert breaker.state == OPEN and not breaker.try_probe()
+    assert breaker.stats() == {"state": OPEN, "consecutive_failures": 3, "trips": 1, "retry_in": 10.0}
+
+
+def test_success_resets_failure_count(clock):
+    breaker = CircuitBreaker("b", failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CLOSED
+
+
+def test_half_open_probe_success_closes(clock):
+    breaker = CircuitBreaker("b", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.state == HALF_OPEN
+    assert breaker.try_probe()
+    # Deneme sürerken başka istek gönderilmez
+    assert breaker.state == HALF_OPEN and not breaker.try_probe()
+    breaker.record_success()
+    assert breaker.state == CLOSED and breaker.consecutive_failures == 0
+
+
+def test_half_open_probe_failure_reopens(clock):
+    breaker = CircuitBreaker("b", failure_threshold=1, reset_timeout=10)
+    breaker.record_failure()
+    clock[0] += 10
+    assert breaker.try_probe()
+    breaker.record_failure()
+    assert breaker.state == OPEN and breaker.trips == 1
+    clock[0] += 9
+    assert not breaker.try_probe()
+    clock[0] += 1
+    assert breaker.try_probe()
+
+
+def test_unresolved_probe_allows_another_after_timeout(clock):
+    breaker = CircuitBreaker("b", failure_threshold=1, reset_timeout=10)
+    breaker.trip()
+    clock[0] += 10
+    assert breaker.try_probe()
+    clock[0] += 10
+    assert breaker.try_probe()
+
+
+def test_manual_trip_and_close(clock):
+    breaker = CircuitBreaker("b", reset_timeout=5)
+    breaker.trip()
+    breaker.trip()
+    assert breaker.state == OPEN and breaker.trips == 1
+    breaker.close()
+    assert breaker.state == CLOSED
+    assert breaker.stats()["retry_in"] == 0.0
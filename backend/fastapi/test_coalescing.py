@@ -0,0 +1,141 @@
+"""
+SingleFlight istek birleştirme ve LlamaService'te birleştirmenin kapatılması
+"""
+import asyncio
+import pytest
+import coalescing
+from coalescing import SingleFlight
+from conftest import FakeBackend
+from models import UserInfo
+
+USER = UserInfo(
+    age_group="7-10",
+    hard_area="Hece tanıma",
+    reading_goal="Akıcı okuma",
+    diagnosis_time="1 yıl önce",
+    motivating_games="Kelime oyunları",
+    working_with_professional="Evet",
+)
+
+
+def counting(result="sonuç", delay=0.01, error=None):
+    calls = []
+
+    async def fn():
+        calls.append(1)
+        await asyncio.sleep(delay)
+        if error is not None:
+            raise error
+        return result
+
+    return fn, calls
+
+
+def test_identical_concurrent_calls_are_merged():
+    flight = SingleFlight()
+    fn, calls = counting()
+    other, other_calls = counting("diğer")
+
+    async def scenario():
+        return await asyncio.gather(flight.do("a", fn), flight.do("a", fn), flight.do("a", fn), flight.do("b", other))
+
+    assert asyncio.run(scenario()) == ["sonuç", "sonuç", "sonuç", "diğer"]
+    assert len(calls) == 1 and len(other_calls) == 1
+    assert flight.stats()["groups"] == {"default": {"calls": 4, "coalesced": 2}}
+    assert flight.stats()["inflight"] == 0
+
+
+def test_sequential_calls_are_not_merged_without_window():
+    flight = SingleFlight()
+    fn, calls = counting()
+
+    async def scenario():
+        await flight.do("a", fn)
+        await flight.do("a", fn)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_error_reaches_all_waiters_and_is_not_cached():
+    flight = SingleFlight(window=60)
+    fn, calls = counting(error=RuntimeError("ollama hatası"))
+
+    async def scenario():
+        results = await asyncio.gather(flight.do("a", fn), flight.do("a", fn), return_exceptions=True)
+        assert all(isinstance(result, RuntimeError) for result in results)
+        with pytest.raises(RuntimeError):
+            await flight.do("a", fn)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_cancelled_first_caller_does_not_cancel_waiters():
+    flight = SingleFlight()
+    fn, calls = counting(delay=0.05)
+
+    async def scenario():
+        first = asyncio.ensure_future(flight.do("a", fn))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flight.do("a", fn))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(scenario()) == "sonuç"
+    assert len(calls) == 1
+
+
+def test_window_reuses_recent_result(monkeypatch):
+    now = [100.0]
+    monkeypatch.setattr(coalescing.time, "monotonic", lambda: now[0])
+    flight = SingleFlight(window=5)
+    fn, calls = counting(delay=0)
+
+    async def scenario():
+        await flight.do("a", fn)
+        now[0] += 4
+        await flight.do("a", fn)
+        now[0] += 2
+        await flight.do("a", fn)
+
+    asyncio.run(scenario())
+    assert len(calls) == 2
+
+
+def test_service_merges_identical_generations(fake_service):
+    backend = FakeBackend("http://ollama", latency=0.05)
+    service = fake_service(backend)
+
+    async def scenario():
+        return await asyncio.gather(*(service._generate("word_list", "aynı prompt", {}) for _ in range(3)))
+
+    texts = asyncio.run(scenario())
+    assert len(set(texts)) == 1 and backend.started == 1
+
+
+def test_without_coalescing_sends_every_call(fake_service):
+    backend = FakeBackend("http://ollama", latency=0.05)
+    service = fake_service(backend)
+    generate = service.without_coalescing(service._generate)
+
+    async def scenario():
+        await asyncio.gather(*(generate("word_list", "aynı prompt", {}) for _ in range(3)))
+        # Sarmalayıcı dışındaki çağrılarda birleştirme yeniden açıktır
+        await asyncio.gather(*(service._generate("word_list", "aynı prompt", {}) for _ in range(2)))
+
+    asyncio.run(scenario())
+    assert backend.started == 4
+
+
+def test_stream_batch_does_not_coalesce(fake_service):
+    backend = FakeBackend("http://ollama", latency=0.05)
+    service = fake_service(backend, word_list_mode="llm", dedup_enabled=False)
+
+    async def scenario():
+        return [game async for game in service.stream_batch("word_list", USER, 3)]
+
+    games = asyncio.run(scenario())
+    assert len(games) == 3 and len({tuple(game) for game in games}) == 3
+    assert backend.started == 3
@@ -0,0 +1,173 @@
+"""
+ContentPool: boş/dolu havuzdan okuma, arka plan doldurma, süre aşımı ve `accept` ile atlama
+"""
+import asyncio
+import pytest
+import content_pool
+from content_pool import ContentPool, hard_area_bucket
+from llama_service import LlamaService
+from models import UserInfo
+
+
+def user(age_group="7-10", hard_area="Hece tanıma"):
+    return UserInfo(
+        age_group=age_group,
+        hard_area=hard_area,
+        reading_goal="Akıcı okuma",
+        diagnosis_time="1 yıl önce",
+        motivating_games="Kelime oyunları",
+        working_with_professional="Evet",
+    )
+
+
+def counting_producer(fail_after=None):
+    produced = []
+
+    async def produce(user_info):
+        if fail_after is not None and len(produced) >= fail_after:
+            raise RuntimeError("ollama hatası")
+        produced.append(user_info)
+        return [f"oyun-{len(produced)}"]
+
+    return produce, produced
+
+
+async def drain(pool):
+    await asyncio.gather(*pool._refill_tasks.values())
+
+
+def test_hard_area_bucket():
+    assert hard_area_bucket("HECE tanımada zorlanıyor") == "hece"
+    assert hard_area_bucket("İmla hataları") == "yazim"
+    assert hard_area_bucket("Okuma hızı düşük") == "okuma"
+    assert hard_area_bucket("Dikkat") == "genel"
+
+
+def test_key_groups_similar_profiles():
+    pool = ContentPool({"spelling": counting_producer()[0]})
+    assert pool.key_for("spelling", user(" 7-10 ", "hece ayırma")) == pool.key_for("spelling", user("7-10", "Ses farkındalığı"))
+    assert pool.key_for("spelling", user("7-10")) != pool.key_for("spelling", user("11-13"))
+
+
+def test_invalid_watermarks():
+    with pytest.raises(ValueError):
+        ContentPool({}, low_watermark=5, high_watermark=2)
+
+
+def test_empty_pool_misses_and_refills():
+    produce, produced = counting_producer()
+    pool = ContentPool({"spelling": produce}, low_watermark=1, high_watermark=3)
+
+    async def scenario():
+        assert await pool.get("spelling", user()) is None
+        await drain(pool)
+        assert pool.stats()["depth"] == {"spelling|7-10|hece": 3}
+        # Doldurma, kovanın son görülen profiliyle yapılır
+        assert produced[0] == user()
+        first = await pool.get("spelling", user())
+        second = await pool.get("spelling", user())
+        return first, second
+
+    assert asyncio.run(scenario()) == (["oyun-1"], ["oyun-2"])
+    assert pool.stats()["endpoints"]["spelling"] == {
+        "hits": 2, "misses": 1, "expired": 0, "skipped": 0, "generated": 3, "refill_errors": 0,
+    }
+
+
+def test_unknown_endpoint_is_not_pooled():
+    pool = ContentPool({"spelling": counting_producer()[0]})
+    assert asyncio.run(pool.get("roadmap", user())) is None
+
+
+def test_accept_skips_but_keeps_items_in_order():
+    produce, _ = counting_producer()
+    pool = ContentPool({"spelling": produce}, low_watermark=0, high_watermark=3)
+
+    async def scenario():
+        await pool.get("spelling", user())
+        pool._schedule_refill(pool.key_for("spelling", user()))
+        await drain(pool)
+        seen = [["oyun-1"], ["oyun-2"]]
+        assert await pool.get("spelling", user(), accept=lambda game: game not in seen) == ["oyun-3"]
+        return await pool.get("spelling", user()), await pool.get("spelling", user(), accept=lambda game: False)
+
+    assert asyncio.run(scenario()) == (["oyun-1"], None)
+    assert pool.stats()["endpoints"]["spelling"]["skipped"] == 3
+    assert pool.stats()["depth"] == {"spelling|7-10|hece": 1}
+
+
+def test_expired_items_are_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(content_pool.time, "monotonic", lambda: now[0])
+    produce, _ = counting_producer()
+    pool = ContentPool({"spelling": produce}, low_watermark=1, high_watermark=2, max_age=60)
+
+    async def scenario():
+        await pool.get("spelling", user())
+        await drain(pool)
+        now[0] += 61
+        return await pool.get("spelling", user())
+
+    assert asyncio.run(scenario()) is None
+    assert pool.stats()["endpoints"]["spelling"]["expired"] == 2
+
+
+def test_refill_error_stops_refill():
+    produce, produced = counting_producer(fail_after=1)
+    pool = ContentPool({"spelling": produce}, low_watermark=1, high_watermark=3)
+
+    async def scenario():
+        await pool.get("spelling", user())
+        await drain(pool)
+
+    asyncio.run(scenario())
+    assert len(produced) == 1
+    assert pool.stats()["endpoints"]["spelling"]["refill_errors"] == 1
+
+
+def test_close_cancels_refills():
+    async def slow(user_info):
+        await asyncio.sleep(10)
+
+    pool = ContentPool({"spelling": slow})
+
+    async def scenario():
+        await pool.get("spelling", user())
+        assert pool.stats()["refilling"] == 1
+        await pool.close()
+        return pool.stats()["refilling"]
+
+    assert asyncio.run(scenario()) == 0
+
+
+def scripted_batch(games):
+    service = LlamaService()
+    calls = []
+
+    async def generate(user_info):
+        calls.append(user_info)
+        return games[len(calls) - 1] if len(calls) <= len(games) else None
+
+    service._game_generator = lambda endpoint: generate
+    return service, calls
+
+
+def test_batch_skips_pooled_and_repeated_games():
+    # Havuzdan gelen oyun (exclude) ve aynı toplu yanıttaki tekrar atlanıp yeniden üretilir
+    service, calls = scripted_batch([["a"], ["havuz"], ["a"], ["b"]])
+
+    async def scenario():
+        return [game async for game in service.stream_batch("spelling", user(), 2, exclude=[["havuz"]])]
+
+    assert asyncio.run(scenario()) == [["a"], ["b"]]
+    assert len(calls) == 4
+
+
+def test_batch_regeneration_is_bounded():
+    service, calls = scripted_batch([["havuz"]] * 10)
+
+    async def scenario():
+        return [game async for game in service.stream_batch("spelling", user(), 2, exclude=[["havuz"]])]
+
+    assert asyncio.run(scenario()) == []
+    assert len(calls) == 4
@@ -0,0 +1,95 @@
+"""
+ContentDeduplicator çevrimdışı testleri
+"""
+import pytest
+from dedup import ContentDeduplicator, exact_key, paragraph_shingles
+from models import Question, SpellingQuestion
+
+WORDS = ["elma", "armut", "kiraz", "erik", "incir"]
+
+
+def question(target, *options):
+    return Question(question=f"'{target}' hecesini içeren kelimeler hangileri?", options=list(options), correct_answers=[0])
+
+
+def test_exact_key_ignores_order_and_case():
+    assert exact_key(["Kitap", "kalem"]) == exact_key(["kalem", "KİTAP"])
+    assert exact_key(["kitap", "kalem"]) != exact_key(["kitap", "kale"])
+
+
+def test_paragraph_shingles():
+    assert paragraph_shingles("Ali okula gitti.") == ["ali okula", "okula gitti"]
+    assert paragraph_shingles("Merhaba!") == ["merhaba"]
+
+
+def test_invalid_parameters():
+    with pytest.raises(ValueError):
+        ContentDeduplicator(num_perm=30, bands=16)
+    with pytest.raises(ValueError):
+        ContentDeduplicator(threshold=0.0)
+
+
+def test_near_duplicate_word_list():
+    dedup = ContentDeduplicator()
+    dedup.remember("ali", "word_list", [WORDS])
+    assert dedup.is_duplicate("ali", "word_list", ["elma", "armut", "kiraz", "erik", "dut"])
+    assert not dedup.is_duplicate("ali", "word_list", ["masa", "sandalye", "kapı", "pencere", "duvar"])
+    # Geçmiş öğrenci başınadır
+    assert not dedup.is_duplicate("ayşe", "word_list", WORDS)
+    assert dedup.similarity("ali", "word_list", WORDS) == 1.0
+
+
+def test_phonological_questions():
+    dedup = ContentDeduplicator()
+    dedup.remember("ali", "phonological", [question("ka", "kalem", "kapı", "masa", "okul")])
+    assert dedup.is_duplicate("ali", "phonological", question("ka", "kapı", "kalem", "okul", "masa"))
+    assert not dedup.is_duplicate("ali", "phonological", question("ma", "mavi", "anne", "deniz", "güneş"))
+
+
+def test_spelling_is_exact_match():
+    dedup = ContentDeduplicator()
+    dedup.remember(None, "spelling", [SpellingQuestion(words=WORDS, wrong_index=0)])
+    assert dedup.is_duplicate(None, "spelling", SpellingQuestion(words=list(reversed(WORDS)), wrong_index=2))
+    assert not dedup.is_duplicate(None, "spelling", SpellingQuestion(words=WORDS[:4] + ["dut"], wrong_index=0))
+    assert dedup.stats()["exact_duplicates"] == 1
+
+
+def test_checker_rejects_history_and_batch_without_recording():
+    dedup = ContentDeduplicator()
+    dedup.remember("ali", "word_list", [WORDS])
+    accept = dedup.checker("ali", "word_list")
+    fresh = ["masa", "sandalye", "kapı", "pencere", "duvar"]
+    assert not accept(WORDS)
+    assert accept(fresh)
+    # Aynı yanıtta ikinci kez gelen öğe elenir
+    assert not accept(fresh)
+    # Kontrol geçmişe yazmaz; yeni bir kontrol aynı öğeyi kabul eder
+    assert not dedup.is_duplicate("ali", "word_list", fresh)
+    assert dedup.checker("ali", "word_list")(fresh)
+    assert dedup.stats()["recorded"] == 1
+
+
+def test_history_is_bounded():
+    dedup = ContentDeduplicator(history=2)
+    lists = [WORDS, ["masa", "sandalye", "kapı", "pencere", "duvar"], ["kedi", "köpek", "kuş", "balık", "tavşan"]]
+    dedup.remember("ali", "word_list", lists)
+    assert not dedup.is_duplicate("ali", "word_list", lists[0])
+    assert dedup.is_duplicate("ali", "word_list", lists[2])
+
+
+def test_students_are_lru_bounded():
+    dedup = ContentDeduplicator(max_students=2)
+    for user_id in ("ali", "ayşe", "veli"):
+        dedup.remember(user_id, "word_list", [WORDS])
+    assert dedup.stats()["students"] == 2
+    assert not dedup.is_duplicate("ali", "word_list", WORDS)
+    assert dedup.is_duplicate("veli", "word_list", WORDS)
+
+
+def test_shared_scope_uses_lsh():
+    dedup = ContentDeduplicator(shared_history=100)
+    paragraphs = [f"Küçük {name} sabah erkenden kalktı ve bahçede oynadı." for name in ("ali", "ayşe", "veli", "zeynep")]
+    dedup.remember(None, "paragraph", paragraphs)
+    assert dedup.is_duplicate(None, "paragraph", "Küçük ali sabah erkenden kalktı ve bahçede koştu.")
+    assert not dedup.is_duplicate(None, "paragraph", "Dedem akşamları kitap okumayı çok sever.")
+    assert dedup.stats()["shared"] == {"paragraph": 4}
@@ -0,0 +1,131 @@
+"""
+LlamaService._generate_items çevrimdışı testleri: Ollama çağrısı (_generate) sahte yanıtlarla değiştirilir
+"""
+import asyncio
+import json
+import pytest
+from llama_service import LlamaService
+from models import UserInfo
+from turkish_phonology import has_syllable
+from structured_output import InvalidGenerationError
+
+
+def scripted_service(responses, repair_rounds=1, **kwargs):
+    """
+    Her _generate çağrısında sıradaki yanıtı döner; çağrılar (prompt, count) olarak kaydedilir
+    """
+    service = LlamaService(repair_rounds=repair_rounds, **kwargs)
+    calls = []
+
+    async def fake_generate(endpoint, prompt, options, count=None):
+        calls.append((prompt, count))
+        return responses[len(calls) - 1]
+
+    service._generate = fake_generate
+    return service, calls
+
+
+def words(*items):
+    return json.dumps({"words": list(items)})
+
+
+def generate(service, **kwargs):
+    return asyncio.run(service._generate_items("word_list", "prompt", {}, 5, **kwargs))
+
+
+def test_valid_response_is_not_repaired():
+    service, calls = scripted_service([words("elma", "armut", "kiraz", "erik", "incir")])
+    assert generate(service) == ["elma", "armut", "kiraz", "erik", "incir"]
+    assert calls == [("prompt", None)]
+
+
+def test_only_missing_items_are_regenerated():
+    service, calls = scripted_service([words("elma", "armut", "kiraz"), words("erik", "incir")])
+    assert generate(service) == ["elma", "armut", "kiraz", "erik", "incir"]
+    assert len(calls) == 2
+    prompt, count = calls[1]
+    assert count == 2
+    assert "YALNIZCA 2 adet" in prompt and "elma, armut, kiraz" in prompt
+
+
+def test_invalid_items_are_regenerated_individually():
+    service, calls = scripted_service([words("elma", "", "kiraz", "", "incir"), words("erik", "dut")])
+    assert generate(service) == ["elma", "kiraz", "incir", "erik", "dut"]
+    assert calls[1][1] == 2
+
+
+def test_extra_items_are_truncated():
+    service, _ = scripted_service([words("elma", "armut", "kiraz"), words("erik", "incir", "dut", "nar")])
+    assert generate(service) == ["elma", "armut", "kiraz", "erik", "incir"]
+
+
+def test_partial_items_skip_full_generation():
+    service, calls = scripted_service([words("erik", "incir")])
+    assert generate(service, items=["elma", "armut", "kiraz"]) == ["elma", "armut", "kiraz", "erik", "incir"]
+    assert calls[0][1] == 2
+
+
+def test_repair_rounds_bound_the_calls():
+    service, calls = scripted_service([words("elma"), words("armut"), words("kiraz")], repair_rounds=1)
+    assert generate(service) == ["elma", "armut"]
+    assert len(calls) == 2
+
+
+def test_rejected_items_are_regenerated():
+    service, calls = scripted_service([words("elma", "armut", "kiraz", "erik", "incir"), words("dut")])
+    assert generate(service, accept=lambda word: word != "kiraz") == ["elma", "armut", "erik", "incir", "dut"]
+    assert calls[1][1] == 1
+
+
+def test_all_rejected_returns_empty_list():
+    # İçerik kontrolünde elenen öğeler çağıranın yedek içeriğiyle tamamlanır, hata fırlatılmaz
+    service, _ = scripted_service([words("elma"), words("elma")])
+    assert generate(service, accept=lambda word: False) == []
+
+
+def test_invalid_json_everywhere_raises():
+    service, calls = scripted_service(["{", "değil json"])
+    with pytest.raises(InvalidGenerationError):
+        generate(service)
+    assert len(calls) == 2
+
+
+USER = UserInfo(
+    age_group="7-10",
+    hard_area="Hece tanıma",
+    reading_goal="Akıcı okuma",
+    diagnosis_time="1 yıl önce",
+    motivating_games="Kelime oyunları",
+    working_with_professional="Evet",
+)
+
+
+def phonological(target, *options):
+    return {"question": f"Hedef hece '{target}' içeren kelimeleri seç:", "options": list(options), "correct_answers": [0]}
+
+
+def test_phonological_question_without_answer_is_regenerated():
+    answered = phonological("ka", "kalem", "masa", "şaka", "okul")
+    unanswered = phonological("ka", "akan", "masa", "elma", "okul")
+    service, calls = scripted_service(
+        [json.dumps({"questions": [answered] * 4 + [unanswered]}), json.dumps({"questions": [answered]})],
+        phonological_mode="llm", dedup_enabled=False,
+    )
+    questions = asyncio.run(service.generate_phonological_game(USER))
+    assert len(calls) == 2 and calls[1][1] == 1
+    assert [question.correct_answers for question in questions] == [[0, 2]] * 5
+
+
+def test_phonological_questions_without_answer_are_filled_locally():
+    unanswered = phonological("ka", "akan", "masa", "elma", "okul")
+    service, _ = scripted_service(
+        [json.dumps({"questions": [unanswered] * 5}), json.dumps({"questions": [unanswered]})],
+        phonological_mode="llm", dedup_enabled=False,
+    )
+    questions = asyncio.run(service.generate_phonological_game(USER, targets=["ma"]))
+    assert len(questions) == 5
+    assert "'ma'" in questions[0].question
+    for question in questions:
+        target = service._question_target(question.question)
+        assert question.correct_answers
+        assert all(has_syllable(question.options[i], target) for i in question.correct_answers)
@@ -0,0 +1,126 @@
+"""
+Hedge politikası ve LlamaService._hedged_post; yavaş ve hızlı sahte Ollama backend'leri süreç içinde çalışır
+"""
+import asyncio
+import json
+import time
+import pytest
+from conftest import FakeBackend
+from hedging import HedgeBudget, HedgePolicy, LatencyTracker
+
+ENDPOINT = "word_list"
+
+
+def test_latency_tracker_percentile():
+    tracker = LatencyTracker(window=5, min_samples=3)
+    tracker.record(ENDPOINT, 1.0)
+    tracker.record(ENDPOINT, 2.0)
+    assert tracker.percentile(ENDPOINT, 95) is None
+    for latency in (3.0, 4.0, 5.0, 6.0):
+        tracker.record(ENDPOINT, latency)
+    # Pencere son 5 örneği tutar: 2..6
+    assert tracker.percentile(ENDPOINT, 50) == 4.0
+    assert tracker.percentile(ENDPOINT, 95) == 6.0
+    assert tracker.percentile("paragraph", 95) is None
+
+
+def test_policy_delay_has_floor():
+    policy = HedgePolicy(percentile=90, min_samples=2, min_delay=0.5)
+    assert policy.delay(ENDPOINT) is None
+    policy.tracker.record(ENDPOINT, 0.1)
+    policy.tracker.record(ENDPOINT, 0.2)
+    assert policy.delay(ENDPOINT) == 0.5
+    policy.tracker.record(ENDPOINT, 3.0)
+    assert policy.delay(ENDPOINT) == 3.0
+    with pytest.raises(ValueError):
+        HedgePolicy(percentile=100)
+
+
+def test_budget_token_bucket():
+    budget = HedgeBudget(ratio=0.5, burst=1.0)
+    budget.deposit()
+    assert not budget.try_spend()
+    budget.deposit()
+    assert budget.try_spend()
+    for _ in range(10):
+        budget.deposit()
+    # Birikim burst ile sınırlı
+    assert budget.try_spend() and not budget.try_spend()
+    assert budget.stats()["hedges"] == 2 and budget.stats()["denied"] == 2
+
+
+def hedged_service(fake_service, slow_latency=1.0, budget=1.0, delay=0.1):
+    slow = FakeBackend("http://slow", latency=slow_latency)
+    fast = FakeBackend("http://fast", latency=0.0)
+    service = fake_service(slow, fast, hedge_budget=budget)
+    # Yüzdelik hesabı ayrıca test edilir; burada gecikme sabitlenir ki ölçülen süreler onu değiştirmesin
+    service.hedging.delay = lambda endpoint: delay
+    return service, slow, fast
+
+
+def timed_post(service):
+    async def scenario():
+        started = time.monotonic()
+        text = await service._post_generate(ENDPOINT, "Kelime listesi üret", {})
+        return text, time.monotonic() - started
+
+    return asyncio.run(scenario())
+
+
+def test_no_hedge_without_samples(fake_service):
+    service, slow, fast = hedged_service(fake_service, slow_latency=0.2, delay=None)
+    text, elapsed = timed_post(service)
+    assert len(json.loads(text)["words"]) == 5
+    assert (slow.started, fast.started) == (1, 0) and elapsed >= 0.2
+
+
+def test_no_hedge_before_deadline(fake_service):
+    service, slow, fast = hedged_service(fake_service, slow_latency=0.05, delay=0.5)
+    timed_post(service)
+    assert (slow.started, fast.started) == (1, 0)
+    assert service.hedging.budget.hedges == 0
+
+
+def test_hedge_fires_after_deadline_and_cancels_loser(fake_service):
+    service, slow, fast = hedged_service(fake_service, slow_latency=1.0, delay=0.1)
+    text, elapsed = timed_post(service)
+    assert len(json.loads(text)["words"]) == 5
+    assert 0.1 <= elapsed < 0.8
+    assert (slow.started, fast.started) == (1, 1)
+    # Birincil istek iptal edildi, kuyruk yeri bırakıldı
+    assert slow.cancelled == 1 and fast.cancelled == 0
+    assert all(backend.admission.stats()["active"] == 0 for backend in service.backends.backends)
+    assert service.hedging.stats()["outcomes"] == {ENDPOINT: {"hedge_won": 1}}
+
+
+def test_hedge_stops_when_budget_is_used_up(fake_service):
+    service, slow, fast = hedged_service(fake_service, slow_latency=0.3, budget=0.5, delay=0.1)
+    # İlk istek bütçeye yalnızca 0.5 jeton ekler: hedge yapılmaz
+    timed_post(service)
+    assert fast.started == 0
+    # İkincide jeton 1'e ulaşır ve harcanır
+    timed_post(service)
+    assert fast.started == 1
+    timed_post(service)
+    assert fast.started == 1
+    outcomes = service.hedging.stats()["outcomes"][ENDPOINT]
+    assert outcomes == {"budget_exhausted": 2, "hedge_won": 1}
+
+
+def test_cancelling_caller_cancels_both_requests(fake_service):
+    slow = FakeBackend("http://slow", latency=1.0)
+    other = FakeBackend("http://other", latency=1.0)
+    service = fake_service(slow, other, hedge_budget=1.0)
+    service.hedging.delay = lambda endpoint: 0.05
+
+    async def scenario():
+        task = asyncio.ensure_future(service._post_generate(ENDPOINT, "Kelime listesi üret", {}))
+        await asyncio.sleep(0.2)
+        task.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await task
+
+    asyncio.run(scenario())
+    assert (slow.started, other.started) == (1, 1)
+    assert (slow.cancelled, other.cancelled) == (1, 1)
+    assert all(backend.admission.stats()["active"] == 0 for backend in service.backends.backends)
@@ -0,0 +1,159 @@
+"""
+Bellek eşlemeli sözlük indeksi: kurulum, arama, filtreli örnekleme ve süreçler arası kurulum kilidi
+"""
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pytest
+import lexicon_store
+from lexicon_store import LexiconStore, build_lexicon_index, index_lock, open_lexicon_store, topics_for_text
+
+LEXICON = """# kelime	siklik_bandi	konular
+kedi	1	hayvanlar
+köpek	1	hayvanlar
+Kâğıt	2	okul
+kalem	1	okul
+ırmak	3	doga
+deniz	2	doga,spor
+İstanbul	2
+kedi	1	hayvanlar
+masa	1
+"""
+
+
+@pytest.fixture
+def source(tmp_path):
+    path = tmp_path / "lexicon.tsv"
+    path.write_text(LEXICON, encoding="utf-8")
+    return str(path)
+
+
+@pytest.fixture
+def store(source, tmp_path):
+    return LexiconStore(build_lexicon_index(source, str(tmp_path / "index")))
+
+
+def test_build_orders_by_band_and_deduplicates(store):
+    words = [store.word(row) for row in range(len(store))]
+    assert words == ["kedi", "köpek", "kalem", "masa", "Kâğıt", "deniz", "İstanbul", "ırmak"]
+    assert store.topics == ["doga", "hayvanlar", "okul", "spor"]
+
+
+def test_lookup_ignores_case_and_circumflex(store):
+    assert store.word(store.lookup("KAĞIT")) == "Kâğıt"
+    assert store.word(store.lookup(" istanbul ")) == "İstanbul"
+    assert store.lookup("IRMAK") == store.lookup("ırmak") is not None
+    assert store.lookup("kedicik") is None and store.lookup("  ") is None
+    assert store.contains("Deniz") and not store.contains("dağ")
+    rows = store.lookup_many(["kedi", "yok", "deniz"])
+    assert rows[0] == store.lookup("kedi") and rows[1] == -1 and rows[2] == store.lookup("deniz")
+
+
+def test_features(store):
+    assert store.features(store.lookup("deniz")) == {
+        "word": "deniz", "rank": 5, "band": 2, "length": 5,
+        "syllables": ["de", "niz"], "syllable_count": 2, "topics": ["doga", "spor"],
+    }
+    assert store.syllable_id("DE") == store.meta["syllables"].index("de")
+    assert store.syllable_id("zzz") == -2
+
+
+def test_candidates_filters_and_cache(store):
+    def words(rows):
+        return [store.word(row) for row in rows]
+
+    assert words(store.candidates(length=4)) == ["kedi", "masa"]
+    assert words(store.candidates(topics=["okul", "spor"])) == ["kalem", "Kâğıt", "deniz"]
+    assert words(store.candidates(band=[2, 3], length=5)) == ["Kâğıt", "deniz", "ırmak"]
+    assert words(store.candidates(topics=["yok"])) == []
+    store.candidates(length=4)
+    assert store.stats()["filter_builds"] == 4
+
+
+def test_filter_cache_is_bounded(source, tmp_path):
+    store = LexiconStore(build_lexicon_index(source, str(tmp_path / "index")), max_filters=2)
+    for length in (3, 4, 5):
+        store.candidates(length=length)
+    assert store.stats()["cached_filters"] == 2
+
+
+def test_sample_respects_exclude_and_count(store):
+    rng = random.Random(1)
+    for _ in range(20):
+        words = store.sample(3, band=1, exclude=["KEDİ"], rng=rng)
+        assert len(words) == 3 and len(set(words)) == 3
+        assert "kedi" not in words
+        assert set(words) <= {"köpek", "kalem", "masa"}
+    # Yeterli aday yoksa bulunabilenler döner
+    assert sorted(store.sample(5, topics=["hayvanlar"], rng=rng)) == ["kedi", "köpek"]
+
+
+def test_topics_for_text():
+    topics = ["hayvanlar", "doga", "okul", "aile"]
+    assert topics_for_text("Hayvanları ve ormanı sever", topics) == ("hayvanlar", "doga")
+    # Kısa anahtar kelimeler yalnızca tam eşleşir
+    assert topics_for_text("evet, okulda", topics) == ("okul",)
+    assert topics_for_text("Aile, okul", topics) == ("okul", "aile")
+
+
+def test_open_builds_once_and_rebuilds_when_source_changes(source, tmp_path, monkeypatch):
+    builds = []
+    build = lexicon_store.build_lexicon_index
+    monkeypatch.setattr(lexicon_store, "build_lexicon_index", lambda *args: builds.append(args) or build(*args))
+    directory = str(tmp_path / "index")
+    assert len(open_lexicon_store(directory, source)) == 8
+    assert len(open_lexicon_store(directory, source)) == 8
+    assert len(builds) == 1
+    with open(source, "a", encoding="utf-8") as f:
+        f.write("balık\t1\thayvanlar\n")
+    assert open_lexicon_store(directory, source).contains("balık")
+    assert len(builds) == 2
+    # Kaynak yoksa mevcut indeks olduğu gibi açılır
+    assert len(open_lexicon_store(directory, str(tmp_path / "yok.tsv"))) == 9
+    assert len(builds) == 2
+
+
+def test_rebuild_replaces_index_atomically(source, tmp_path):
+    directory = str(tmp_path / "index")
+    build_lexicon_index(source, directory)
+    build_lexicon_index(source, directory)
+    assert sorted(os.listdir(tmp_path)) == ["index", "lexicon.tsv"]
+
+
+@pytest.mark.skipif(lexicon_store.fcntl is None, reason="fcntl yok")
+def test_concurrent_opens_build_once(source, tmp_path, monkeypatch):
+    builds = []
+    build = lexicon_store.build_lexicon_index
+
+    def slow_build(*args):
+        builds.append(args)
+        time.sleep(0.1)
+        return build(*args)
+
+    monkeypatch.setattr(lexicon_store, "build_lexicon_index", slow_build)
+    directory = str(tmp_path / "index")
+    # flock her open() için ayrıdır; iş parçacıkları da ayrı işçi süreçleri gibi birbirini bekler
+    with ThreadPoolExecutor(6) as pool:
+        sizes = list(pool.map(lambda _: len(open_lexicon_store(directory, source)), range(6)))
+    assert sizes == [8] * 6
+    assert len(builds) == 1
+
+
+@pytest.mark.skipif(lexicon_store.fcntl is None, reason="fcntl yok")
+def test_open_waits_for_lock(source, tmp_path):
+    directory = str(tmp_path / "index")
+    opened = threading.Event()
+    with index_lock(directory):
+        worker = threading.Thread(target=lambda: open_lexicon_store(directory, source) and opened.set())
+        worker.start()
+        assert not opened.wait(0.2)
+    worker.join(5)
+    assert opened.is_set()
+
+
+def test_columns_are_memory_mapped(store):
+    assert isinstance(np.load(os.path.join(store.directory, "hashes.npy"), mmap_mode="r"), np.memmap)
+    assert not store.columns["hashes"].flags.writeable
@@ -0,0 +1,130 @@
+"""
+SQLite ilerleme deposu: artımlı toplamlar, tekrar gönderilen olaylar ve UserStatistics üretimi
+"""
+import asyncio
+import pytest
+from models import ProgressEvent
+from progress_store import ProgressStore, SqliteProgressBackend
+from text_utils import NOT_PLAYED, format_rate, parse_rate
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ProgressStore(SqliteProgressBackend(str(tmp_path / "progress.sqlite3"), rolling_alpha=0.5))
+    yield store
+    asyncio.run(store.close())
+
+
+def event(game_type="phonological", correct=True, **fields):
+    return ProgressEvent(game_type=game_type, correct=correct, **fields)
+
+
+def test_unknown_user(store):
+    assert asyncio.run(store.summary("yok")) is None
+    assert asyncio.run(store.user_statistics("yok")) is None
+
+
+def test_aggregates_are_incremental(store):
+    async def scenario():
+        await store.ingest("ali", [event(correct=True), event(correct=False, game_completed=True)])
+        await store.ingest("ali", [event("spelling", correct=True, game_completed=True), event(correct=True)])
+        return await store.summary("ali")
+
+    summary = asyncio.run(scenario())
+    assert summary["total_games_played"] == 2 and summary["total_answers"] == 4
+    phonological = summary["games"]["phonological"]
+    assert (phonological["games"], phonological["answers"], phonological["correct"]) == (1, 3, 2)
+    assert phonological["success_rate"] == 66.7
+    # Kayan oran (alpha=0.5): 100 -> 50 -> 75
+    assert phonological["rolling_success_rate"] == 75.0
+    assert summary["games"]["spelling"]["success_rate"] == 100.0
+
+
+def test_rolling_rate_follows_occurred_at(store):
+    # Çevrimdışı gönderilen olaylar zaman sırasıyla uygulanır
+    events = [event(correct=True, occurred_at=3.0), event(correct=False, occurred_at=1.0), event(correct=False, occurred_at=2.0)]
+    asyncio.run(store.ingest("ali", events))
+    # 0 -> 0 -> 50
+    assert asyncio.run(store.summary("ali"))["games"]["phonological"]["rolling_success_rate"] == 50.0
+
+
+def test_duplicate_events_are_counted_once(store):
+    async def scenario():
+        first = await store.ingest("ali", [event(event_id="1"), event(event_id="2"), event()])
+        second = await store.ingest("ali", [event(event_id="2"), event(event_id="3")])
+        # Aynı kimlik başka öğrencide ayrı olaydır
+        third = await store.ingest("ayşe", [event(event_id="1")])
+        return first, second, third, await store.summary("ali"), await store.stats()
+
+    first, second, third, summary, stats = asyncio.run(scenario())
+    assert (len(first[0]), first[1]) == (3, 0)
+    assert (len(second[0]), second[1]) == (1, 1)
+    assert (len(third[0]), third[1]) == (1, 0)
+    assert summary["total_answers"] == 4
+    assert stats["users"] == 2 and stats["duplicates"] == 1 and stats["accepted"] == 5
+
+
+def test_item_stats_and_weakest_items(store):
+    events = [
+        event(syllable="KA", correct=False),
+        event(syllable="ka ", correct=False),
+        event(syllable="ma", correct=True),
+        event(syllable="ma", correct=False),
+        event(syllable="la", correct=False),
+        event("spelling", confusion_pair="herkes/herkez", correct=True),
+    ]
+
+    async def scenario():
+        await store.ingest("ali", events)
+        return await store.item_stats("ali"), await store.summary("ali")
+
+    items, summary = asyncio.run(scenario())
+    assert sorted(items) == [
+        ("confusion", "herkes/herkez", 1, 1), ("syllable", "ka", 2, 0), ("syllable", "la", 1, 0), ("syllable", "ma", 2, 1),
+    ]
+    # Yalnızca en az 2 kez görülenler, en düşük doğruluk önce
+    assert [item["item"] for item in summary["weakest_syllables"]] == ["ka", "ma"]
+    assert summary["weakest_confusions"] == []
+
+
+def test_user_statistics_marks_unplayed_types(store):
+    async def scenario():
+        await store.ingest("ali", [event(correct=True, game_completed=True), event("paragraph", correct=False)])
+        return await store.user_statistics("ali")
+
+    statistics = asyncio.run(scenario())
+    assert statistics.total_games_played == 1
+    assert statistics.phonological_success_rate == "100.0"
+    assert statistics.paragraph_success_rate == "0.0"
+    assert statistics.spelling_success_rate == NOT_PLAYED
+    assert statistics.word_list_success_rate == NOT_PLAYED
+
+
+def test_failed_batch_is_rolled_back(store, monkeypatch):
+    backend = store.backend
+
+    def broken(*args):
+        raise RuntimeError("yazma hatası")
+
+    monkeypatch.setattr(backend, "_apply", broken)
+    with pytest.raises(RuntimeError):
+        asyncio.run(store.ingest("ali", [event(event_id="1")]))
+    monkeypatch.undo()
+    # Olay kimliği de geri alındığı için tekrar gönderim kabul edilir
+    fresh, duplicates = asyncio.run(store.ingest("ali", [event(event_id="1")]))
+    assert (len(fresh), duplicates) == (1, 0)
+
+
+@pytest.mark.parametrize("value, rate, text", [
+    ("72.5", 72.5, "%72.5"),
+    ("%68,0", 68.0, "%68"),
+    ("120", 100.0, "%100"),
+    ("-5", 0.0, "%0"),
+    ("nan", None, NOT_PLAYED),
+    ("inf", None, NOT_PLAYED),
+    (NOT_PLAYED, None, NOT_PLAYED),
+    ("", None, NOT_PLAYED),
+])
+def test_rate_parsing_and_formatting(value, rate, text):
+    assert parse_rate(value) == rate
+    assert format_rate(value) == text
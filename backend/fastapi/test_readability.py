@@ -0,0 +1,170 @@
+"""
+Okunabilirlik puanı, düzey hedefleri ve doğrulanmış paragraf havuzu
+"""
+import random
+import pytest
+from lexicon_store import LEXICON_PATH, LexiconStore, build_lexicon_index
+from llama_service import DEFAULT_PARAGRAPHS
+from readability import (
+    LEVEL_TARGETS,
+    ParagraphScore,
+    ReadabilityScorer,
+    ScoredParagraphPool,
+    atesman,
+    level_for,
+)
+
+# "zürafa" az yaygın bantta; diğer fiiller sözlükte yok
+LEXICON = """kedi	1	hayvanlar
+zürafa	3	hayvanlar
+"""
+
+POOLED = [
+    "Deniz sahile indi. Kumda yürüdü. Dalgaları izledi. Eve mutlu döndü.",
+    "Ece bahçeye çıktı. Çiçekleri suladı. Kuşları besledi. Sonra içeri girdi.",
+]
+
+
+@pytest.fixture(scope="module")
+def scorer(tmp_path_factory):
+    """Paketle gelen sözlükle; varsayılan paragraflar bununla puanlanır"""
+    directory = tmp_path_factory.mktemp("lexicon")
+    return ReadabilityScorer(LexiconStore(build_lexicon_index(LEXICON_PATH, str(directory / "index"))))
+
+
+@pytest.fixture(scope="module")
+def small_store(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("small")
+    source = directory / "lexicon.tsv"
+    source.write_text(LEXICON, encoding="utf-8")
+    return LexiconStore(build_lexicon_index(str(source), str(directory / "index")))
+
+
+def score(sentences=4, value=75.0, rare_ratio=0.0):
+    return ParagraphScore(sentences, 20, 2.6, 5.0, value, rare_ratio)
+
+
+def test_atesman_formula():
+    assert atesman(2.0, 5.0) == pytest.approx(198.825 - 80.35 - 13.05)
+
+
+def test_level_for():
+    assert level_for("14-17") == "14-17"
+    assert level_for(" 14-17 yaş") == "14-17"
+    assert level_for("17-24") == "17-24"
+    assert level_for("7-10") == "17-24"
+
+
+def test_score_counts_sentences_words_and_syllables(small_store):
+    result = ReadabilityScorer(small_store).score("Kedi uyudu. Zürafa koştu!")
+    assert result.sentences == 2
+    assert result.words == 4
+    # ke-di u-yu-du zü-ra-fa koş-tu
+    assert result.syllables_per_word == 2.5
+    assert result.words_per_sentence == 2.0
+    assert result.atesman == round(atesman(2.5, 2.0), 1)
+
+
+def test_score_of_empty_text(small_store):
+    result = ReadabilityScorer(small_store).score("...")
+    assert (result.sentences, result.words, result.rare_ratio) == (0, 0, 1.0)
+
+
+def test_rare_ratio_uses_stem_band(small_store):
+    # "zürafalar" kökü "zürafa" üzerinden az yaygın bulunur
+    assert ReadabilityScorer(small_store).score("Kedi uyudu. Zürafalar koştu.").rare_ratio == 0.25
+    assert ReadabilityScorer(small_store, unknown_rare=True).score("Kedi uyudu. Zürafalar koştu.").rare_ratio == 0.75
+
+
+def test_proper_names_are_not_rare(small_store):
+    # Kesme işaretli ve cümle ortasında büyük harfle başlayan kelimeler özel isimdir
+    scorer = ReadabilityScorer(small_store, unknown_rare=True)
+    assert scorer.score("Kedi Zürafa ile Ali'nin evine gitti.").rare_ratio == pytest.approx(3 / 6, abs=1e-3)
+    assert scorer.score("Zürafa kedi ile gitti.").rare_ratio == 0.75
+
+
+def test_fits_requires_sentence_count_score_range_and_rare_ratio(small_store):
+    scorer = ReadabilityScorer(small_store)
+    target = LEVEL_TARGETS["14-17"]
+    assert scorer.fits(score(), "14-17")
+    assert not scorer.fits(score(sentences=3), "14-17")
+    assert not scorer.fits(score(sentences=5), "14-17")
+    assert scorer.fits(score(value=target.min_score), "14-17")
+    assert not scorer.fits(score(value=target.min_score - 0.1), "14-17")
+    assert not scorer.fits(score(value=target.max_score + 0.1), "14-17")
+    assert scorer.fits(score(rare_ratio=target.max_rare_ratio), "14-17")
+    assert not scorer.fits(score(rare_ratio=target.max_rare_ratio + 0.01), "14-17")
+
+
+def test_fits_uses_level_targets(small_store):
+    scorer = ReadabilityScorer(small_store)
+    # 55 puan ve %35 seyrek kelime yalnızca 17-24 için uygundur
+    assert scorer.fits(score(value=55.0), "17-24")
+    assert not scorer.fits(score(value=55.0), "14-17")
+    assert scorer.fits(score(rare_ratio=0.35), "17-24")
+    assert not scorer.fits(score(rare_ratio=0.35), "14-17")
+    # Bilinmeyen düzey 17-24 hedefini kullanır
+    assert scorer.fits(score(value=55.0), "7-10")
+
+
+@pytest.mark.parametrize("paragraph", DEFAULT_PARAGRAPHS)
+@pytest.mark.parametrize("level", sorted(LEVEL_TARGETS))
+def test_default_paragraphs_fit_every_level(scorer, paragraph, level):
+    assert scorer.fits(scorer.score(paragraph), level)
+
+
+def test_pool_seeds_every_level_with_default_paragraphs(scorer):
+    pool = ScoredParagraphPool(scorer, DEFAULT_PARAGRAPHS)
+    assert pool.stats() == {level: len(DEFAULT_PARAGRAPHS) for level in LEVEL_TARGETS}
+
+
+def make_pool(scorer, seeds=DEFAULT_PARAGRAPHS):
+    pool = ScoredParagraphPool(scorer, rng=random.Random(7))
+    pool._seeds = list(seeds)
+    pool.add("14-17", POOLED)
+    return pool
+
+
+def test_pick_prefers_pool_then_fills_from_seeds(scorer):
+    pool = make_pool(scorer)
+    picked = pool.pick("14-17", 4)
+    assert len(picked) == len(set(picked)) == 4
+    assert set(picked[:2]) == set(POOLED)
+    assert picked[2:] == DEFAULT_PARAGRAPHS[:2]
+    # Havuzu olmayan düzey yalnızca varsayılanlardan tamamlanır
+    assert pool.pick("17-24", 2) == DEFAULT_PARAGRAPHS[:2]
+
+
+def test_pick_skips_excluded(scorer):
+    pool = make_pool(scorer)
+    exclude = [POOLED[0], DEFAULT_PARAGRAPHS[0]]
+    picked = pool.pick("14-17", 10, exclude=exclude)
+    assert not set(picked) & set(exclude)
+    assert picked == [POOLED[1]] + DEFAULT_PARAGRAPHS[1:]
+
+
+def test_pick_puts_rejected_last(scorer):
+    pool = make_pool(scorer)
+    seen = {POOLED[0], DEFAULT_PARAGRAPHS[0]}
+    picked = pool.pick("14-17", 3, accept=lambda paragraph: paragraph not in seen)
+    assert picked == [POOLED[1]] + DEFAULT_PARAGRAPHS[1:3]
+    # Kabul edilen yetmezse reddedilenler en sona eklenir
+    picked = pool.pick("14-17", 7, accept=lambda paragraph: paragraph not in seen)
+    assert picked[:5] == [POOLED[1]] + DEFAULT_PARAGRAPHS[1:]
+    assert set(picked[5:]) == seen
+
+
+def test_pick_with_accept_and_exclude(scorer):
+    pool = make_pool(scorer)
+    picked = pool.pick(
+        "14-17", 7, exclude=[POOLED[1]], accept=lambda paragraph: paragraph != POOLED[0]
+    )
+    assert POOLED[1] not in picked
+    assert picked == DEFAULT_PARAGRAPHS + [POOLED[0]]
+
+
+def test_add_ignores_duplicates(scorer):
+    pool = make_pool(scorer, seeds=())
+    pool.add("14-17", POOLED + [POOLED[0]])
+    assert pool.stats()["14-17"] == len(POOLED)
+    assert sorted(pool.pick("14-17", 10)) == sorted(POOLED)
@@ -0,0 +1,147 @@
+"""
+Yanıt önbelleği: normalize edilmiş profil anahtarı, TTL ve LRU boyut sınırı
+"""
+import asyncio
+import pytest
+import response_cache
+from models import UserInfo, UserStatistics
+from response_cache import MemoryCacheBackend, ResponseCache, SqliteCacheBackend, bucket_statistics, cache_key, normalize_user_info
+
+
+def user(**overrides):
+    fields = dict(
+        age_group="7-10",
+        hard_area="Hece tanıma",
+        reading_goal="Akıcı okuma",
+        diagnosis_time="1 yıl önce",
+        motivating_games="Kelime oyunları",
+        working_with_professional="Evet",
+    )
+    fields.update(overrides)
+    return UserInfo(**fields)
+
+
+def statistics(**overrides):
+    fields = dict(
+        total_games_played=27,
+        phonological_success_rate="72.4",
+        spelling_success_rate="%68,0",
+        word_list_success_rate="henüz oynanmadı",
+        paragraph_success_rate="nan",
+    )
+    fields.update(overrides)
+    return UserStatistics(**fields)
+
+
+def test_profile_key_ignores_case_and_whitespace():
+    a = cache_key("roadmap", normalize_user_info(user()), 7)
+    b = cache_key("roadmap", normalize_user_info(user(hard_area="  HECE   tanıma ", reading_goal="AKICI OKUMA")), 7)
+    assert a == b
+    assert normalize_user_info(user(hard_area="IŞIK"))["hard_area"] == "ışık"
+
+
+def test_key_depends_on_endpoint_and_parts():
+    profile = normalize_user_info(user())
+    assert cache_key("roadmap", profile, 7) != cache_key("roadmap", profile, 14)
+    assert cache_key("roadmap", profile, 7) != cache_key("analysis", profile, 7)
+    assert cache_key("roadmap", profile, 7) != cache_key("roadmap", normalize_user_info(user(age_group="11-13")), 7)
+
+
+def test_bucket_statistics():
+    assert bucket_statistics(statistics()) == {
+        "total_games_played": 20,
+        "phonological_success_rate": 70.0,
+        "spelling_success_rate": 70.0,
+        "word_list_success_rate": "henüz oynanmadı",
+        "paragraph_success_rate": "nan",
+    }
+    # Yakın istatistikler aynı kovaya düşer
+    assert bucket_statistics(statistics(total_games_played=29, phonological_success_rate="71")) == bucket_statistics(statistics())
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def backend(request, tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    if request.param == "memory":
+        cache = MemoryCacheBackend(max_entries=2)
+    else:
+        cache = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=2)
+    yield cache, now
+    asyncio.run(cache.close())
+
+
+def test_ttl_expiry(backend):
+    backend, clock = backend
+
+    async def scenario():
+        await backend.set("a", "1", ttl=10)
+        assert await backend.get("a") == "1"
+        clock[0] += 11
+        assert await backend.get("a") is None
+        assert await backend.size() == 0
+
+    asyncio.run(scenario())
+
+
+def test_lru_eviction(backend):
+    backend, clock = backend
+
+    async def scenario():
+        await backend.set("a", "1", ttl=60)
+        clock[0] += 1
+        await backend.set("b", "2", ttl=60)
+        clock[0] += 1
+        # "a" okunduğu için en uzun süredir erişilmeyen "b" olur
+        assert await backend.get("a") == "1"
+        clock[0] += 1
+        await backend.set("c", "3", ttl=60)
+        return [await backend.get(key) for key in ("a", "b", "c")], await backend.size()
+
+    assert asyncio.run(scenario()) == (["1", None, "3"], 2)
+
+
+def test_sqlite_prefers_evicting_expired(tmp_path, monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(response_cache.time, "time", lambda: now[0])
+    backend = SqliteCacheBackend(str(tmp_path / "cache.sqlite3"), max_entries=2)
+
+    async def scenario():
+        await backend.set("eski", "1", ttl=60)
+        now[0] += 1
+        await backend.set("kisa", "2", ttl=1)
+        now[0] += 5
+        await backend.set("yeni", "3", ttl=60)
+        return [await backend.get(key) for key in ("eski", "kisa", "yeni")]
+
+    assert asyncio.run(scenario()) == ["1", None, "3"]
+    asyncio.run(backend.close())
+
+
+def test_sqlite_survives_reopen(tmp_path):
+    path = str(tmp_path / "cache.sqlite3")
+
+    async def scenario():
+        first = SqliteCacheBackend(path)
+        await first.set("a", '{"x": 1}', ttl=60)
+        await first.close()
+        second = SqliteCacheBackend(path)
+        value = await second.get("a")
+        await second.close()
+        return value
+
+    assert asyncio.run(scenario()) == '{"x": 1}'
+
+
+def test_response_cache_per_endpoint_ttl():
+    cache = ResponseCache(MemoryCacheBackend(), {"roadmap": 60, "analysis": 0})
+
+    async def scenario():
+        await cache.set("roadmap", "k", {"plan": ["gün 1"]})
+        await cache.set("analysis", "k2", "metin")
+        return await cache.get("roadmap", "k"), await cache.get("roadmap", "yok"), await cache.get("analysis", "k2"), await cache.stats()
+
+    hit, miss, disabled, stats = asyncio.run(scenario())
+    assert hit == {"plan": ["gün 1"]} and miss is None and disabled is None
+    assert stats["size"] == 1
+    assert stats["endpoints"]["roadmap"] == {"hits": 1, "misses": 1, "bypassed": 0}
@@ -0,0 +1,108 @@
+"""
+Stream JSON ayrıştırıcısı: parça sınırları string, kaçış dizisi ve çok baytlı karakterlerin ortasına düşebilir
+"""
+import json
+import pytest
+from stream_parser import IncrementalJSONParser, SentenceStream, split_sentences
+
+DOCUMENT = json.dumps(
+    {
+        "analysis": "Ali \"hece\" oyununda iyi.\nYazımda {zorlanıyor}, [ama] gelişiyor\\ilerliyor 🙂",
+        "paragraphs": ["Çiçekler açtı. Güneş doğdu!", "İğne, ışık, öğün, şüphe."],
+        "nested": {"key": "değer", "list": [1, "iki", {"üç": "dört"}]},
+    }
+)
+
+
+def values(document):
+    expected = []
+
+    def walk(node, key):
+        if isinstance(node, dict):
+            for child_key, child in node.items():
+                walk(child, child_key)
+        elif isinstance(node, list):
+            for child in node:
+                walk(child, key)
+        elif isinstance(node, str):
+            expected.append((key, node))
+
+    walk(json.loads(document), None)
+    return expected
+
+
+def feed_chunks(parser, chunks):
+    completed = []
+    for chunk in chunks:
+        completed.extend(parser.feed(chunk))
+    return completed
+
+
+@pytest.mark.parametrize("ensure_ascii", [True, False])
+def test_every_split_point(ensure_ascii):
+    document = json.dumps(json.loads(DOCUMENT), ensure_ascii=ensure_ascii)
+    expected = values(document)
+    # ensure_ascii ile emoji "🙂" vekil çifti ve Türkçe harfler "ç" kaçışı olur
+    for split in range(len(document) + 1):
+        assert feed_chunks(IncrementalJSONParser(), [document[:split], document[split:]]) == expected, split
+    assert feed_chunks(IncrementalJSONParser(), list(document)) == expected
+
+
+def test_split_inside_unicode_escape_and_surrogate_pair():
+    parser = IncrementalJSONParser()
+    assert parser.feed('{"a": "g\\u00') == []
+    assert parser.partial == ("a", "g")
+    assert parser.feed('fcl \\ud83d') == []
+    assert parser.feed('\\ude42"}') == [("a", "gül 🙂")]
+
+
+def test_partial_tracks_open_string():
+    parser = IncrementalJSONParser()
+    parser.feed('{"paragraphs": ["Bir", "İki cüm')
+    assert parser.partial == ("paragraphs", "İki cüm")
+    assert parser.current_key == "paragraphs"
+    parser.feed('le"], "ke')
+    # Anahtar string'i değer sayılmaz
+    assert parser.partial is None
+
+
+def test_truncated_final_chunk():
+    parser = IncrementalJSONParser()
+    completed = parser.feed('{"paragraphs": ["Tamam.", "Yarım kal')
+    assert completed == [("paragraphs", "Tamam.")]
+    assert parser.partial == ("paragraphs", "Yarım kal")
+    # Kaçış dizisinin ortasında kesilirse yarım kaçış metne eklenmez
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": "x\\')
+    assert parser.partial == ("a", "x")
+    parser = IncrementalJSONParser()
+    parser.feed('{"a": "x\\u00')
+    assert parser.partial == ("a", "x")
+
+
+def test_invalid_unicode_escape_is_replaced():
+    assert IncrementalJSONParser().feed('{"a": "\\uzzzz!"}') == [("a", "�!")]
+
+
+def test_split_sentences():
+    assert split_sentences("Merhaba! Nasılsın? İyiyim... \"Tamam.\" Son") == [
+        "Merhaba!", "Nasılsın?", "İyiyim...", "\"Tamam.\"", "Son",
+    ]
+    assert split_sentences("   ") == []
+
+
+def test_sentence_stream_emits_each_sentence_once():
+    text = "Birinci cümle. İkinci cümle! Üçüncü \"alıntılı.\" Son cümle"
+    document = json.dumps({"other": "Atla. Bunu.", "analysis": text, "x": "Yok."}, ensure_ascii=False)
+    for size in (1, 3, 7, len(document)):
+        stream = SentenceStream("analysis")
+        sentences = []
+        for i in range(0, len(document), size):
+            sentences.extend(stream.feed(document[i:i + size]))
+        assert sentences == split_sentences(text), size
+
+
+def test_sentence_stream_holds_back_truncated_sentence():
+    stream = SentenceStream("analysis")
+    assert stream.feed('{"analysis": "Tamamlandı. Yarım kal') == ["Tamamlandı."]
+    assert stream.feed("an") == []
@@ -0,0 +1,73 @@
+"""
+structured_output çevrimdışı testleri: tek geçişli doğrulama, öğe bazında geri dönüş ve şema düzleştirme
+"""
+import json
+from models import SpellingQuestion
+from structured_output import is_valid_output, parse_document, parse_items, response_format
+
+
+def spelling_question(wrong_index=0):
+    return {"words": ["kitap", "kalem", "defter", "silgi", "çanta"], "wrong_index": wrong_index}
+
+
+def test_parse_items_valid():
+    items, result = parse_items("spelling", json.dumps({"questions": [spelling_question()] * 2}), 2)
+    assert result == "valid"
+    assert len(items) == 2 and all(isinstance(item, SpellingQuestion) for item in items)
+
+
+def test_parse_items_wrong_count_keeps_valid_items():
+    items, result = parse_items("word_list", json.dumps({"words": ["elma", "armut", "kiraz"]}), 5)
+    assert result == "wrong_count"
+    assert items == ["elma", "armut", "kiraz"]
+
+
+def test_parse_items_drops_only_invalid_items():
+    questions = [spelling_question(1), {"words": ["bir", "iki"], "wrong_index": 0}, spelling_question(9), spelling_question(4)]
+    items, result = parse_items("spelling", json.dumps({"questions": questions}), 4)
+    assert result == "item_errors"
+    assert [item.wrong_index for item in items] == [1, 4]
+
+
+def test_parse_items_empty_strings_are_item_errors():
+    items, result = parse_items("paragraph", json.dumps({"paragraphs": ["Bir paragraf.", "", "İkinci paragraf."]}), 3)
+    assert result == "item_errors"
+    assert items == ["Bir paragraf.", "İkinci paragraf."]
+
+
+def test_parse_items_invalid_json():
+    assert parse_items("word_list", '{"words": ["elma", "armut"', 5) == ([], "invalid_json")
+
+
+def test_parse_items_schema_error():
+    assert parse_items("word_list", json.dumps({"kelimeler": ["elma"]}), 5) == ([], "schema_error")
+    assert parse_items("word_list", json.dumps(["elma"]), 5) == ([], "schema_error")
+
+
+def test_parse_document():
+    document, result = parse_document("roadmap", "{")
+    assert (document, result) == (None, "invalid_json")
+    document, result = parse_document("roadmap", json.dumps({"unrelated": 1}))
+    assert (document, result) == (None, "schema_error")
+
+
+def test_is_valid_output_uses_count():
+    text = json.dumps({"words": ["elma", "armut", "kiraz", "erik", "incir"]})
+    assert is_valid_output("word_list", text)
+    assert not is_valid_output("word_list", text, count=3)
+
+
+def test_response_format_is_inlined():
+    schema = response_format("phonological")
+    text = json.dumps(schema)
+    assert "$ref" not in text and "$defs" not in text and '"title"' not in text
+    assert "degraded" not in schema["properties"]
+    question = schema["properties"]["questions"]["items"]
+    assert question["properties"]["options"]["minItems"] == 4
+
+
+def test_response_format_count_does_not_leak():
+    fixed = response_format("spelling", 2)
+    assert fixed["properties"]["questions"]["minItems"] == fixed["properties"]["questions"]["maxItems"] == 2
+    # Önbellekteki temel şema değişmemeli
+    assert "minItems" not in response_format("spelling")["properties"]["questions"]
@@ -0,0 +1,74 @@
+"""
+Türkçe heceleme ve toplu hece eşleştirme çevrimdışı testleri
+"""
+import numpy as np
+import pytest
+from turkish_phonology import SyllableTable, has_syllable, syllabify, syllables_of, turkish_casefold
+
+
+@pytest.mark.parametrize("word, expected", [
+    ("kalem", ("ka", "lem")),
+    ("kardeş", ("kar", "deş")),
+    ("türkçe", ("türk", "çe")),
+    ("kontrol", ("kont", "rol")),
+    ("istanbul", ("is", "tan", "bul")),
+    ("ilkokul", ("il", "ko", "kul")),
+    ("okul", ("o", "kul")),
+    ("saat", ("sa", "at")),
+    ("şiir", ("şi", "ir")),
+    ("trafik", ("tra", "fik")),
+    ("a", ("a",)),
+    ("st", ("st",)),
+    ("", ("",)),
+])
+def test_syllabify(word, expected):
+    assert syllabify(word) == expected
+
+
+def test_turkish_casefold():
+    assert turkish_casefold("KIRMIZI") == "kırmızı"
+    assert turkish_casefold("İSTANBUL") == "istanbul"
+    assert turkish_casefold("Kâğıt") == "kağıt"
+
+
+def test_syllables_of_normalizes_text():
+    assert syllables_of("Kâğıt") == ("ka", "ğıt")
+    assert syllables_of("Ankara'ya") == ("an", "ka", "ra", "ya")
+    assert syllables_of("Hoş  geldin") == ("hoş", "gel", "din")
+
+
+def test_has_syllable_matches_whole_syllables():
+    assert has_syllable("şaka", "ka")
+    assert not has_syllable("akan", "ka")
+    assert has_syllable("KALEM", "Ka")
+
+
+def test_syllable_table_match():
+    table = SyllableTable(["kalem", "masa"])
+    matches = table.match(["ka", "ma"], [["kalem", "akan", "şaka"], ["masa", "elma", "kapı"]])
+    assert matches.tolist() == [[True, False, True], [True, True, False]]
+
+
+def test_syllable_table_ragged_and_unknown():
+    table = SyllableTable()
+    matches = table.match(["ka", "zzz"], [["kalem", "şaka"], ["kapı"]])
+    # Eksik seçenek dolgu satırıdır; hiç görülmemiş hece hiçbir şeyle eşleşmez
+    assert matches.tolist() == [[True, True], [False, False]]
+    assert table.match([], []).shape == (0, 0)
+
+
+def test_syllable_table_matches_scalar_rule():
+    words = ["kalem", "kardeş", "saat", "şiir", "ilkokul", "Kâğıt", "Ankara'ya", "trafik"]
+    targets = ["ka", "at", "ir", "ko", "ğıt", "ra", "fik", "deş"]
+    options = [words[i:] + words[:i] for i in range(len(targets))]
+    expected = np.array([[has_syllable(word, target) for word in group] for target, group in zip(targets, options)])
+    assert (SyllableTable(words[:3]).match(targets, options) == expected).all()
+
+
+def test_syllable_table_is_bounded():
+    table = SyllableTable(["kalem"], max_words=4)
+    table.match(["ka"], [["elma", "armut", "kiraz"]])
+    assert len(table) == 4
+    # Sınır aşılınca sözlük dışı kelimeler atılır ama eşleştirme doğru kalır
+    assert table.match(["ra"], [["kiraz", "para", "masa"]]).tolist() == [[False, True, False]]
+    assert len(table) <= 4
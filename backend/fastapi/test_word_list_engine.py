@@ -0,0 +1,106 @@
+"""
+Yerel kelime listesi üretimi: konu/yaş filtreleri, kademeli gevşetme ve öğrenci başına son kelimeler penceresi
+"""
+import random
+import pytest
+from lexicon_store import LexiconStore, build_lexicon_index
+from models import UserInfo
+from word_list_engine import WordListEngine, age_bands
+
+# Altı harfli kelimeler: 4 hayvan (biri az yaygın), 3 spor, 4 konusuz; "kedi", "hakem", "raket" ve "kitaplık" uzunluk filtresine takılır
+LEXICON = """kaplan	1	hayvanlar
+tavşan	1	hayvanlar
+kartal	2	hayvanlar
+zürafa	3	hayvanlar
+kedi	1	hayvanlar
+koşucu	1	spor
+yüzücü	2	spor
+hakem	1	spor
+raket	2	spor
+antren	2	spor
+kitaplık	1
+tablet	1
+kalemi	2
+bardak	1
+sandal	2
+"""
+
+
+@pytest.fixture(scope="module")
+def store(tmp_path_factory):
+    directory = tmp_path_factory.mktemp("lexicon")
+    source = directory / "lexicon.tsv"
+    source.write_text(LEXICON, encoding="utf-8")
+    return LexiconStore(build_lexicon_index(str(source), str(directory / "index")))
+
+
+def user(age_group="7-10", interest="Hayvanları sever"):
+    return UserInfo(
+        age_group=age_group,
+        hard_area="Okuma",
+        reading_goal="Akıcı okuma",
+        diagnosis_time="1 yıl önce",
+        motivating_games=interest,
+        working_with_professional="Evet",
+    )
+
+
+def engine(store, **kwargs):
+    return WordListEngine(store, rng=random.Random(1), **kwargs)
+
+
+def test_age_bands():
+    assert age_bands(" 14-17 ") == (1, 2)
+    assert age_bands("17-24") is None
+
+
+def test_topic_and_length_filters(store):
+    words = engine(store).sample(user(), 3)
+    assert len(words) == 3 and set(words) <= {"kaplan", "tavşan", "kartal", "zürafa"}
+
+
+def test_age_band_filter(store):
+    for _ in range(10):
+        assert "zürafa" not in engine(store).sample(user("14-17"), 3)
+
+
+def test_filters_are_relaxed_in_order(store):
+    adaptive = engine(store)
+    # 14-17 için 3 uygun hayvan kelimesi var; önce konu filtresi gevşetilir, yaş filtresi korunur
+    words = adaptive.sample(user("14-17"), 5)
+    assert len(words) == 5 and len(set(words)) == 5
+    assert {"kaplan", "tavşan", "kartal"} <= set(words) and "zürafa" not in words
+    assert adaptive.stats()["relaxed"] == 1
+
+
+def test_generate_skips_recent_words(store):
+    adaptive = engine(store, recent=10)
+    first = adaptive.generate(user(), "ali")
+    second = adaptive.generate(user(), "ali")
+    assert len(first) == len(second) == 5
+    assert not set(first) & set(second)
+    assert adaptive.seen("ali") == tuple(first + second)
+    # Pencere öğrenci başınadır
+    assert adaptive.seen("ayşe") == ()
+
+
+def test_window_is_ignored_when_words_run_out(store):
+    adaptive = engine(store, recent=50)
+    lists = [adaptive.generate(user(), "ali") for _ in range(3)]
+    assert all(len(words) == 5 and len(set(words)) == 5 for words in lists)
+    assert adaptive.stats()["window_ignored"] >= 1
+
+
+def test_window_is_bounded(store):
+    adaptive = engine(store, recent=3, max_students=1)
+    adaptive.remember("ali", ["a", "b", "c", "d"])
+    assert adaptive.seen("ali") == ("b", "c", "d")
+    adaptive.remember("ayşe", ["e"])
+    assert adaptive.seen("ali") == () and adaptive.stats()["students"] == 1
+
+
+def test_generate_without_remember_or_user(store):
+    adaptive = engine(store)
+    adaptive.generate(user(), "ali", remember=False)
+    adaptive.generate(user())
+    assert adaptive.seen("ali") == () and adaptive.stats()["students"] == 0
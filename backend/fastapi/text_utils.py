@@ -0,0 +1,42 @@
+import math
+import re
+from typing import Optional
+
+# Hiç oynanmamış oyun türünün başarı oranı yerine kullanılır
+NOT_PLAYED = "henüz oynanmadı"
+
+
+def turkish_lower(text: str) -> str:
+    """
+    Türkçe I/İ harflerini doğru küçülten lower() karşılığı
+    """
+    return text.replace("I", "ı").replace("İ", "i").lower()
+
+
+def normalize_text(text: str) -> str:
+    """
+    Karşılaştırma/anahtar üretimi için metni küçültür ve boşlukları sadeleştirir
+    """
+    return re.sub(r"\s+", " ", turkish_lower(text)).strip()
+
+
+def parse_rate(value) -> Optional[float]:
+    """
+    "72.5", "72,5" veya "%72.5" biçimindeki başarı oranını 0-100 aralığına sınırlanmış sayıya çevirir;
+    geçersiz veya sonlu olmayan ("nan", "inf") değerlerde None
+    """
+    try:
+        rate = float(str(value).replace(",", ".").strip().lstrip("%"))
+    except ValueError:
+        return None
+    if not math.isfinite(rate):
+        return None
+    return max(0.0, min(100.0, rate))
+
+
+def format_rate(value) -> str:
+    """
+    Prompt için başarı oranı: geçerli oranlar "%72.5", oynanmamış veya geçersiz olanlar NOT_PLAYED
+    """
+    rate = parse_rate(value)
+    return f"%{rate:g}" if rate is not None else NOT_PLAYED
@@ -0,0 +1,160 @@
+import re
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Sequence
+import numpy as np
+from lexicon import load_lexicon
+from text_utils import turkish_lower
+
+VOWELS = frozenset("aeıioöuüâîû")
+
+# Şapkalı ünlüler eşleştirmede düz halleriyle aynı kabul edilir (kâğıt = kağıt)
+CIRCUMFLEX = str.maketrans("âîû", "aiu")
+# Kelime içindeki harf olmayan karakterler (kesme işareti, tire, boşluk) hece sınırı sayılır
+_NON_LETTER = re.compile(r"[^a-zçğıöşüâîû]+")
+
+
+def turkish_casefold(text: str) -> str:
+    """
+    Türkçe kurallarıyla büyük/küçük harf farkını ve şapkaları kaldırır: "KIRMIZI" -> "kırmızı",
+    "İSTANBUL" -> "istanbul", "Kâğıt" -> "kağıt". str.lower() "I"yı "i", "İ"yi "i̇" yapar.
+    """
+    return turkish_lower(text).translate(CIRCUMFLEX)
+
+
+@lru_cache(maxsize=65536)
+def syllabify(word: str) -> tuple:
+    """
+    Türkçe kelimeyi kural tabanlı olarak hecelerine ayırır (V, VC, CV, CVC, CVCC kalıpları).
+    İki ünlü arasındaki son ünsüz bir sonraki heceye geçer (ka-lem, kar-deş, Türk-çe).
+    """
+    vowel_positions = [i for i, char in enumerate(word) if char in VOWELS]
+    if len(vowel_positions) < 2:
+        return (word,)
+
+    boundaries: List[int] = []
+    for current, following in zip(vowel_positions, vowel_positions[1:]):
+        # Ünlüler yan yanaysa (sa-at) sınır ikincisinin önüdür
+        boundaries.append(following if following - current == 1 else following - 1)
+
+    syllables = []
+    start = 0
+    for boundary in boundaries:
+        syllables.append(word[start:boundary])
+        start = boundary
+    syllables.append(word[start:])
+    return tuple(syllables)
+
+
+@lru_cache(maxsize=65536)
+def syllables_of(text: str) -> tuple:
+    """
+    Herhangi bir yazımdaki (büyük harf, şapka, kesme işareti, birden fazla kelime) metnin heceleri
+    """
+    return tuple(
+        syllable
+        for part in _NON_LETTER.split(turkish_casefold(text))
+        if part
+        for syllable in syllabify(part)
+    )
+
+
+def has_syllable(text: str, target: str) -> bool:
+    """
+    Hedef hece kelimenin hecelerinden biri mi; "ka" "şa-ka"da vardır, "a-kan"da yoktur
+    """
+    return turkish_casefold(target) in syllables_of(text)
+
+
+class SyllableTable:
+    """
+    Kelimelerin hecelerini tamsayı kimliklere çevrilmiş, sabit genişlikte (-1 dolgulu) satırlar halinde
+    tek bir matriste tutar. Sözlük kelimeleri baştan tabloya alınır; yeni kelimeler ilk görüldüklerinde
+    eklenir ve tablo `max_words`u aşarsa sözlük kelimelerine geri döner. Böylece binlerce sorunun
+    seçenekleri tek bir indeksleme ve numpy karşılaştırmasıyla hedef heceye göre kontrol edilir.
+    """
+
+    def __init__(self, words: Iterable[str] = (), width: int = 8, max_words: int = 200_000):
+        self.width = width
+        self.max_words = max_words
+        self.vocabulary: Dict[str, int] = {}
+        # 0. satır eksik seçenekler için dolgudur
+        self._index: Dict[str, int] = {}
+        self._matrix = np.full((1024, width), -1, dtype=np.int32)
+        self._size = 1
+        for word in words:
+            self._add(word)
+        self._base_size = self._size
+        self._base_index = dict(self._index)
+
+    def _add(self, word: str) -> int:
+        if self._size == len(self._matrix):
+            grown = np.full((len(self._matrix) * 2, self.width), -1, dtype=np.int32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+        ids = [self.vocabulary.setdefault(s, len(self.vocabulary)) for s in syllables_of(word)][:self.width]
+        row = self._size
+        self._matrix[row] = -1
+        self._matrix[row, :len(ids)] = ids
+        self._index[word] = row
+        self._size += 1
+        return row
+
+    def syllable_id(self, syllable: str) -> int:
+        """
+        Tabloda hiç görülmemiş hece için -2 (dolguyla ve hiçbir heceyle eşleşmez)
+        """
+        found = self.vocabulary.get(syllable)
+        return found if found is not None else self.vocabulary.get(turkish_casefold(syllable), -2)
+
+    def encode(self, words: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        [soru, seçenek] kelime listesini [soru, seçenek, hece] kimlik dizisine çevirir
+        """
+        options = max((len(group) for group in words), default=0)
+        if self._size - 1 + len(words) * options > self.max_words:
+            # LLM'den gelen kelimeler tabloyu sınırsız büyütmesin
+            self._index = dict(self._base_index)
+            self._size = self._base_size
+        known = self._index.get
+        for group in words:
+            for word in group:
+                if known(word) is None:
+                    self._add(word)
+        known = self._index.get
+        if all(len(group) == options for group in words):
+            flat = (known(word) for group in words for word in group)
+        else:
+            # Eksik seçenekler 0. (dolgu) satırla tamamlanır
+            flat = (known(group[j]) if j < len(group) else 0 for group in words for j in range(options))
+        rows = np.fromiter(flat, dtype=np.intp, count=len(words) * options).reshape(len(words), options)
+        return self._matrix[rows]
+
+    def match(self, targets: Sequence[str], options: Sequence[Sequence[str]]) -> np.ndarray:
+        """
+        Her sorunun her seçeneği hedef heceyi içeriyor mu: [soru, seçenek] bool dizisi.
+        Seçenek sayısı eksik olan sorularda dolgu seçenekleri False döner.
+        """
+        if not targets:
+            return np.zeros((0, 0), dtype=bool)
+        # Önce seçenekler kodlanır ki yalnızca bu seçeneklerde geçen heceler de sözlüğe girsin
+        encoded = self.encode(options)
+        target_ids = np.fromiter(map(self.syllable_id, targets), dtype=np.int32, count=len(targets))
+        return (encoded == target_ids[:, None, None]).any(axis=2)
+
+    def __len__(self) -> int:
+        return self._size - 1
+
+
+@lru_cache(maxsize=None)
+def lexicon_syllable_table() -> SyllableTable:
+    """
+    Paketle gelen sözlük için önceden hesaplanmış hece tablosu (süreç başına bir kez kurulur)
+    """
+    return SyllableTable(entry.word for entry in load_lexicon())
+
+
+def match_targets(targets: Sequence[str], options: Sequence[Sequence[str]], table: Optional[SyllableTable] = None) -> np.ndarray:
+    """
+    Toplu hece eşleştirme; tablo verilmezse sözlük tablosu kullanılır
+    """
+    return (table if table is not None else lexicon_syllable_table()).match(targets, options)
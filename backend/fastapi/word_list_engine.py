@@ -0,0 +1,120 @@
+import random
+from collections import OrderedDict, deque
+from functools import lru_cache
+from typing import Deque, Iterable, List, Optional, Tuple
+from lexicon_store import LexiconStore
+from models import UserInfo
+from text_utils import normalize_text
+
+# Kelime listesi kuralları (prompts.WORD_LIST_SYSTEM ile aynı): 5 adet, 6 harfli kelime
+WORD_COUNT = 5
+WORD_LENGTH = 6
+
+# 14-17 yaş grubuna yalnızca çok yaygın ve yaygın kelimeler, diğer gruplara tüm bantlar
+YOUNG_BANDS = (1, 2)
+
+
+def age_bands(age_group: str) -> Optional[Tuple[int, ...]]:
+    return YOUNG_BANDS if normalize_text(age_group).startswith("14") else None
+
+
+class WordListEngine:
+    """
+    Kelime listesi oyununu Llama'ya gitmeden sözlük indeksinden üretir: ilgi alanı konularına ve yaş
+    grubuna uyan, birbirinden farklı 6 harfli kelimeler. Öğrenci kimliği verilirse son `recent`
+    kelime sonraki listelere girmez (öğrenci başına kayan pencere, bellekte LRU ile sınırlı).
+
+    Filtre sonuçları indekste saklandığı için liste başına maliyet yalnızca birkaç rastgele seçimdir.
+    Uyan kelime yetmezse sırasıyla yaş, sonra konu filtresi gevşetilir; en son pencere yok sayılır.
+    """
+
+    def __init__(
+        self,
+        store: LexiconStore,
+        word_count: int = WORD_COUNT,
+        word_length: int = WORD_LENGTH,
+        recent: int = 50,
+        max_students: int = 10000,
+        rng: Optional[random.Random] = None,
+    ):
+        self.store = store
+        self.word_count = word_count
+        self.word_length = word_length
+        self.recent = recent
+        self.max_students = max_students
+        self.rng = rng or random.Random()
+        self._recent: "OrderedDict[str, Deque[str]]" = OrderedDict()
+        # Aynı kullanıcı bilgileri her istekte tekrar geldiği için konu eşleştirmesi önbelleğe alınır
+        self._topics = lru_cache(maxsize=4096)(store.topics_for)
+        self._counters = {"lists": 0, "relaxed": 0, "window_ignored": 0}
+
+    def topics(self, user_info: Optional[UserInfo]) -> Tuple[str, ...]:
+        if user_info is None:
+            return ()
+        return self._topics(f"{user_info.hard_area} {user_info.reading_goal} {user_info.motivating_games}")
+
+    def seen(self, user_id: Optional[str]) -> Tuple[str, ...]:
+        """
+        Öğrenciye son gösterilen kelimeler (eskiden yeniye)
+        """
+        if user_id is None or user_id not in self._recent:
+            return ()
+        return tuple(self._recent[user_id])
+
+    def remember(self, user_id: Optional[str], words: Iterable[str]):
+        if user_id is None or not self.recent:
+            return
+        window = self._recent.get(user_id)
+        if window is None:
+            window = self._recent[user_id] = deque(maxlen=self.recent)
+            while len(self._recent) > self.max_students:
+                self._recent.popitem(last=False)
+        else:
+            self._recent.move_to_end(user_id)
+        window.extend(words)
+
+    def sample(self, user_info: Optional[UserInfo], count: int, exclude: Iterable[str] = ()) -> List[str]:
+        """
+        `exclude` dışında en fazla `count` kelime; filtreler gerektiğinde kademeli olarak gevşetilir
+        """
+        exclude = list(exclude)
+        topics = self.topics(user_info)
+        bands = age_bands(user_info.age_group) if user_info is not None else None
+        stages = list(dict.fromkeys([(topics, bands), ((), bands), (topics, None), ((), None)]))
+        words: List[str] = []
+        for stage, (stage_topics, stage_bands) in enumerate(stages):
+            if stage == 1:
+                self._counters["relaxed"] += 1
+            words += self.store.sample(
+                count - len(words),
+                length=self.word_length,
+                topics=stage_topics,
+                band=stage_bands,
+                exclude=[*exclude, *words],
+                rng=self.rng,
+            )
+            if len(words) >= count:
+                return words
+        return words
+
+    def generate(self, user_info: Optional[UserInfo] = None, user_id: Optional[str] = None, remember: bool = True) -> List[str]:
+        """
+        Öğrencinin son gördüğü kelimeleri içermeyen `word_count` farklı kelime.
+        `remember=False` ise liste pencereye eklenmez (çağıran birkaç aday arasından seçecekse).
+        """
+        words = self.sample(user_info, self.word_count, self.seen(user_id))
+        if len(words) < self.word_count:
+            # Uygun kelimelerin hepsi yakın zamanda gösterildi: tekrar, eksik listeden iyidir
+            self._counters["window_ignored"] += 1
+            words += self.sample(user_info, self.word_count - len(words), words)
+        if remember:
+            self.remember(user_id, words)
+        self._counters["lists"] += 1
+        return words
+
+    def stats(self) -> dict:
+        return {
+            "students": len(self._recent),
+            "recent_window": self.recent,
+            **self._counters,
+        }